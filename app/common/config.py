@@ -144,6 +144,20 @@ class Config(QConfig):
         EnumSerializer(TranscribeModelEnum),
     )
     use_asr_cache = ConfigItem("Transcribe", "UseASRCache", True, BoolValidator())
+    asr_timing_log = ConfigItem("Transcribe", "TimingLog", False, BoolValidator())
+    use_audio_cache = ConfigItem("Transcribe", "UseAudioCache", True, BoolValidator())
+    audio_cache_size_gb = RangeConfigItem(
+        "Transcribe", "AudioCacheSizeGB", 5, RangeValidator(1, 500)
+    )
+    chunked_transcribe = ConfigItem(
+        "Transcribe", "ChunkedTranscribe", False, BoolValidator()
+    )
+    chunk_length_seconds = RangeConfigItem(
+        "Transcribe", "ChunkLengthSeconds", 600, RangeValidator(60, 3600)
+    )
+    chunk_workers = RangeConfigItem(
+        "Transcribe", "ChunkWorkers", 4, RangeValidator(1, 32)
+    )
     transcribe_language = OptionsConfigItem(
         "Transcribe",
         "TranscribeLanguage",
@@ -160,6 +174,9 @@ class Config(QConfig):
         OptionsValidator(WhisperModelEnum),
         EnumSerializer(WhisperModelEnum),
     )
+    whisper_cpp_use_server = ConfigItem("Whisper", "UseServer", False, BoolValidator())
+    whisper_cpp_server_url = ConfigItem("Whisper", "ServerUrl", "")
+    whisper_cpp_use_gpu = ConfigItem("Whisper", "UseGpu", False, BoolValidator())
 
     # ------------------- Faster Whisper configuration -------------------
     faster_whisper_program = ConfigItem(
@@ -208,6 +225,9 @@ class Config(QConfig):
     whisper_api_key = ConfigItem("WhisperAPI", "WhisperApiKey", "")
     whisper_api_model = OptionsConfigItem("WhisperAPI", "WhisperApiModel", "")
     whisper_api_prompt = ConfigItem("WhisperAPI", "WhisperApiPrompt", "")
+    whisper_api_max_upload_mb = RangeConfigItem(
+        "WhisperAPI", "MaxUploadMB", 24, RangeValidator(1, 100)
+    )
 
     # ------------------- Subtitle configuration -------------------
     need_optimize = ConfigItem("Subtitle", "NeedOptimize", False, BoolValidator())
@@ -241,6 +261,14 @@ class Config(QConfig):
     # ------------------- Subtitle synthesis configuration -------------------
     soft_subtitle = ConfigItem("Video", "SoftSubtitle", False, BoolValidator())
     need_video = ConfigItem("Video", "NeedVideo", True, BoolValidator())
+    burn_segments = RangeConfigItem("Video", "BurnSegments", 1, RangeValidator(1, 32))
+    smart_burn = ConfigItem("Video", "SmartBurn", False, BoolValidator())
+    # 软字幕使用所选样式，以 ASS 字幕轨和内嵌字体输出 MKV
+    styled_soft_subtitle = ConfigItem(
+        "Video", "StyledSoftSubtitle", False, BoolValidator()
+    )
+    # 多规格输出，每项为 RenditionSpec 的字段字典
+    synthesis_renditions = ConfigItem("Video", "Renditions", [])
 
     # ------------------- Subtitle style configuration -------------------
     subtitle_style_name = ConfigItem("SubtitleStyle", "StyleName", "default")
@@ -2,7 +2,12 @@ from .bcut import BcutASR
 from .faster_whisper import FasterWhisperASR
 from .jianying import JianYingASR
 from .kuaishou import KuaiShouASR
-from .transcribe import transcribe
+from .transcribe import (
+    cache_transcription,
+    get_cached_transcription,
+    transcribe,
+    transcribe_batch,
+)
 from .whisper_api import WhisperAPI
 from .whisper_cpp import WhisperCppASR
 
@@ -14,4 +19,7 @@ __all__ = [
     "WhisperAPI",
     "FasterWhisperASR",
     "transcribe",
+    "transcribe_batch",
+    "get_cached_transcription",
+    "cache_transcription",
 ]
@@ -1,32 +1,364 @@
-import json
 import math
-import os
-import platform
+import operator
 import re
+import sys
+import weakref
+from array import array
+from bisect import bisect_left, bisect_right
+from collections.abc import MutableSequence
+from itertools import accumulate, islice
 from pathlib import Path
-from typing import List, Tuple, Optional
+from typing import Any, Dict, Iterable, Iterator, List, Tuple, Optional
+
+from .subtitle_binary import (
+    SubtitleBinary,
+    Word,
+    is_subtitle_binary,
+    write_subtitle_binary,
+)
+from .subtitle_export import (
+    ExportStats,
+    ExportTarget,
+    ass_dialogues,
+    ass_header,
+    export_rows,
+    handle_long_path,
+    layout_text,
+    ms_to_ass_time,
+    ms_to_srt_time,
+)
+from .subtitle_parser import (
+    SubtitleRow,
+    ass_rows,
+    iter_file_rows,
+    iter_json_rows,
+    srt_rows,
+    vtt_rows,
+    youtube_vtt_rows,
+)
+
+
+def _intern(text: str) -> str:
+    """驻留文本，字级时间戳中重复的字词只保存一份"""
+    return sys.intern(text) if type(text) is str else text
+
+
+def _intern_all(texts: List[str]) -> List[str]:
+    try:
+        return list(map(sys.intern, texts))
+    except TypeError:
+        return [_intern(text) for text in texts]
+
+
+def _int_array(values: List[int]) -> array:
+    try:
+        return array("q", values)
+    except TypeError:
+        # 个别接口返回浮点数毫秒
+        return array("q", map(int, values))
+
+
+# 一行字幕的值：(text, start_time, end_time, translated_text)
+_Row = Tuple[str, int, int, str]
+_row_values = operator.attrgetter("text", "start_time", "end_time", "translated_text")
+# 登记的视图超过该数量时清理已回收的视图
+_MIN_VIEWS_LIMIT = 1024
+
+
+class _SegmentColumns:
+    """分段的列式存储：起止时间为整数数组，文本为（驻留的）字符串列表
+
+    插入、删除和替换直接修改各列（数组切片赋值、列表 insert/del），不重建存储。
+    取得的分段视图以弱引用登记在 views 中，同一行在视图存活期间始终是同一个对象；
+    结构变化时视图的行号随之调整，被删除或替换掉的行的视图转为独立分段并保留原值。
+    结构变化或通过视图修改时间时 version 加一，区间索引据此判断是否失效。
+    """
 
+    __slots__ = (
+        "starts",
+        "ends",
+        "texts",
+        "translated",
+        "version",
+        "views",
+        "views_limit",
+    )
 
-def handle_long_path(path: str) -> str:
-    """处理Windows系统中的长路径问题
+    def __init__(self):
+        self.starts = array("q")
+        self.ends = array("q")
+        self.texts: List[str] = []
+        self.translated: List[str] = []
+        self.version = 0
+        self.views: Dict[int, "weakref.ref[_SegmentView]"] = {}
+        self.views_limit = _MIN_VIEWS_LIMIT
 
-    Args:
-        path: 原始路径
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def row(self, row: int) -> _Row:
+        return self.texts[row], self.starts[row], self.ends[row], self.translated[row]
+
+    def view(self, row: int) -> "_SegmentView":
+        """第 row 行的分段视图"""
+        views = self.views
+        ref = views.get(row)
+        seg = ref() if ref is not None else None
+        if seg is None:
+            seg = _SegmentView.__new__(_SegmentView)
+            seg._columns = self
+            seg._row = row
+            views[row] = weakref.ref(seg)
+            if len(views) > self.views_limit:
+                self._prune_views()
+        return seg
+
+    def _live_views(self) -> List["_SegmentView"]:
+        return [seg for seg in (ref() for ref in self.views.values()) if seg]
+
+    def _prune_views(self) -> None:
+        """清理已被回收的视图，阈值随存活视图数增长，保证均摊开销为常数"""
+        live = self._live_views()
+        self.views = {seg._row: weakref.ref(seg) for seg in live}
+        self.views_limit = max(_MIN_VIEWS_LIMIT, 2 * len(live))
+
+    def _remap_views(self, start: int, stop: int, delta: int) -> None:
+        """[start, stop) 行的视图转为独立分段，stop 之后的视图行号加 delta"""
+        views = {}
+        for seg in self._live_views():
+            row = seg._row
+            if row < start:
+                views[row] = weakref.ref(seg)
+            elif row < stop:
+                seg._detach()
+            else:
+                seg._row = row + delta
+                views[seg._row] = weakref.ref(seg)
+        self.views = views
 
-    Returns:
-        处理后的路径
-    """
-    # 检查是否是Windows系统
-    if platform.system() == "Windows":
-        # 如果路径长度超过260个字符，添加\\?\前缀
-        if len(path) > 260 and not path.startswith("\\\\?\\"):
-            # 转换为绝对路径
-            abs_path = os.path.abspath(path)
-            return f"\\\\?\\{abs_path}"
-    return path
+    def append(
+        self, text: str, start_time: int, end_time: int, translated_text: str = ""
+    ) -> None:
+        self.starts.append(int(start_time))
+        self.ends.append(int(end_time))
+        self.texts.append(_intern(text))
+        self.translated.append(_intern(translated_text))
+
+    @classmethod
+    def from_lists(
+        cls,
+        texts: List[str],
+        starts: List[int],
+        ends: List[int],
+        translated: Optional[List[str]] = None,
+    ) -> "_SegmentColumns":
+        """由各列的列表批量创建，比逐行 append 快得多"""
+        columns = cls()
+        columns.starts = _int_array(starts)
+        columns.ends = _int_array(ends)
+        columns.texts = _intern_all(texts)
+        columns.translated = (
+            _intern_all(translated)
+            if translated is not None
+            else [""] * len(columns.texts)
+        )
+        return columns
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[_Row]) -> "_SegmentColumns":
+        """由 (text, start_time, end_time, translated_text) 行批量创建"""
+        if isinstance(rows, list):
+            texts, starts, ends, translated = (
+                list(map(operator.itemgetter(i), rows)) for i in range(4)
+            )
+            return cls.from_lists(texts, starts, ends, translated)
+        # 逐行直接写入各列：解析出的行元组和重复的文本随即释放，峰值内存接近最终占用
+        columns = cls()
+        add_text, add_translated = columns.texts.append, columns.translated.append
+        add_start, add_end = columns.starts.append, columns.ends.append
+        intern = sys.intern
+        for text, start_time, end_time, translated_text in rows:
+            try:
+                text, translated_text = intern(text), intern(translated_text)
+            except TypeError:
+                text, translated_text = _intern(text), _intern(translated_text)
+            try:
+                add_start(start_time)
+            except TypeError:
+                # 个别接口返回浮点数毫秒
+                add_start(int(start_time))
+            try:
+                add_end(end_time)
+            except TypeError:
+                add_end(int(end_time))
+            add_text(text)
+            add_translated(translated_text)
+        return columns
+
+    @classmethod
+    def from_segments(cls, segments: Iterable["ASRDataSeg"]) -> "_SegmentColumns":
+        segments = segments if isinstance(segments, list) else list(segments)
+        texts, starts, ends, translated = (
+            list(map(operator.attrgetter(name), segments))
+            for name in ("text", "start_time", "end_time", "translated_text")
+        )
+        return cls.from_lists(texts, starts, ends, translated)
+
+    def take(self, rows: Iterable[int]) -> "_SegmentColumns":
+        """按行号顺序取出若干行，生成新的存储"""
+        rows = list(rows)
+        columns = _SegmentColumns()
+        columns.starts = array("q", [self.starts[i] for i in rows])
+        columns.ends = array("q", [self.ends[i] for i in rows])
+        columns.texts = [self.texts[i] for i in rows]
+        columns.translated = [self.translated[i] for i in rows]
+        return columns
+
+    def set_row(self, row: int, seg: "ASRDataSeg") -> None:
+        """以 seg 替换第 row 行，原有的视图转为独立分段"""
+        text, start_time, end_time, translated_text = _row_values(seg)
+        ref = self.views.pop(row, None)
+        old = ref() if ref is not None else None
+        if old is not None:
+            old._detach()
+        self.texts[row] = _intern(text)
+        self.starts[row] = int(start_time)
+        self.ends[row] = int(end_time)
+        self.translated[row] = _intern(translated_text)
+        self.version += 1
+        self._adopt(row, seg)
+
+    def splice(self, start: int, stop: int, segments: Iterable["ASRDataSeg"]) -> None:
+        """将 [start, stop) 行原地替换为 segments"""
+        segments = list(segments)
+        middle = _SegmentColumns.from_segments(segments)
+        if self.views:
+            self._remap_views(start, stop, len(segments) - (stop - start))
+        self.starts[start:stop] = middle.starts
+        self.ends[start:stop] = middle.ends
+        self.texts[start:stop] = middle.texts
+        self.translated[start:stop] = middle.translated
+        self.version += 1
+        for row, seg in enumerate(segments, start):
+            self._adopt(row, seg)
+
+    def insert(self, row: int, seg: "ASRDataSeg") -> None:
+        """在 row 行之前插入一行"""
+        text, start_time, end_time, translated_text = _row_values(seg)
+        if self.views:
+            self._remap_views(row, row, 1)
+        self.starts.insert(row, int(start_time))
+        self.ends.insert(row, int(end_time))
+        self.texts.insert(row, _intern(text))
+        self.translated.insert(row, _intern(translated_text))
+        self.version += 1
+        self._adopt(row, seg)
+
+    def delete(self, start: int, stop: int) -> None:
+        """删除 [start, stop) 行"""
+        if self.views:
+            self._remap_views(start, stop, start - stop)
+        del self.starts[start:stop]
+        del self.ends[start:stop]
+        del self.texts[start:stop]
+        del self.translated[start:stop]
+        self.version += 1
+
+    def merge(
+        self, start: int, stop: int, text: str, start_time: int, end_time: int
+    ) -> None:
+        """将 [start, stop) 行原地合并为一行（译文为空），原有的视图转为独立分段"""
+        if self.views:
+            self._remap_views(start, stop, start + 1 - stop)
+        # 合并后的文本基本不会重复，不做驻留
+        self.texts[start] = text
+        self.starts[start] = int(start_time)
+        self.ends[start] = int(end_time)
+        self.translated[start] = ""
+        del self.starts[start + 1 : stop]
+        del self.ends[start + 1 : stop]
+        del self.texts[start + 1 : stop]
+        del self.translated[start + 1 : stop]
+        self.version += 1
+
+    def merge_runs(self, runs: List[Tuple[int, int, str]]) -> None:
+        """将若干按行号排列、互不重叠的 [start, stop) 区间各自合并为一行，一次压缩完成
+
+        合并行的文本为 text、译文为空，起止时间取区间首行的开始和末行的结束。
+        """
+        keep: List[int] = []  # 压缩后每行对应的原行号
+        merged: List[Tuple[int, str, int, int]] = []
+        pos = 0
+        for start, stop, text in runs:
+            keep.extend(range(pos, start))
+            merged.append((len(keep), text, self.starts[start], self.ends[stop - 1]))
+            keep.append(start)
+            pos = stop
+        keep.extend(range(pos, len(self)))
+        if self.views:
+            new_rows = {old: new for new, old in enumerate(keep)}
+            for row, *_ in merged:
+                del new_rows[keep[row]]
+            views = {}
+            for seg in self._live_views():
+                row = new_rows.get(seg._row)
+                if row is None:
+                    seg._detach()
+                else:
+                    seg._row = row
+                    views[row] = weakref.ref(seg)
+            self.views = views
+        self.starts[:] = array("q", map(self.starts.__getitem__, keep))
+        self.ends[:] = array("q", map(self.ends.__getitem__, keep))
+        self.texts[:] = list(map(self.texts.__getitem__, keep))
+        self.translated[:] = list(map(self.translated.__getitem__, keep))
+        for row, text, start_time, end_time in merged:
+            self.texts[row] = text
+            self.starts[row] = start_time
+            self.ends[row] = end_time
+            self.translated[row] = ""
+        self.version += 1
+
+    def _adopt(self, row: int, seg: "ASRDataSeg") -> None:
+        """插入的独立分段成为该行的视图，与列表中保存同一对象的行为一致"""
+        if type(seg) is ASRDataSeg:
+            seg._attach(self, row)
+            self.views[row] = weakref.ref(seg)  # type: ignore
+
+    def normalized(self) -> "_SegmentColumns":
+        """去除文本为空的行，并按开始时间稳定排序；无需处理时返回自身"""
+        starts = self.starts
+        is_sorted = all(map(operator.le, starts, islice(starts, 1, None)))
+        try:
+            no_blank = all(map(str.strip, self.texts))
+        except TypeError:
+            no_blank = False
+        if is_sorted and no_blank:
+            return self
+        rows = [i for i, text in enumerate(self.texts) if text and text.strip()]
+        if not is_sorted:
+            rows.sort(key=starts.__getitem__)
+        return self.take(rows)
 
 
 class ASRDataSeg:
+    """字幕分段
+
+    单独创建的分段自行保存字段值；属于 ASRData 的分段是其列式存储中一行的视图
+    （_SegmentView），修改字段直接作用于 ASRData。独立分段插入 ASRData 后成为
+    对应行的视图，视图所在行被删除或替换后转为独立分段，保留原有的值。
+    """
+
+    __slots__ = (
+        "text",
+        "translated_text",
+        "start_time",
+        "end_time",
+        "_columns",
+        "_row",
+        "__weakref__",
+    )
+
     def __init__(
         self, text: str, start_time: int, end_time: int, translated_text: str = ""
     ):
@@ -35,6 +367,14 @@ class ASRDataSeg:
         self.start_time = start_time
         self.end_time = end_time
 
+    def _attach(self, columns: _SegmentColumns, row: int) -> None:
+        """成为 columns 第 row 行的视图"""
+        self.text = self.translated_text = ""
+        self.start_time = self.end_time = 0
+        self.__class__ = _SegmentView
+        self._columns = columns
+        self._row = row
+
     def to_srt_ts(self) -> str:
         """Convert to SRT timestamp format"""
         return f"{self._ms_to_srt_time(self.start_time)} --> {self._ms_to_srt_time(self.end_time)}"
@@ -52,22 +392,8 @@ class ASRDataSeg:
         minutes, seconds = divmod(seconds, 60)
         return f"{int(minutes):02}:{seconds:.2f}"
 
-    @staticmethod
-    def _ms_to_srt_time(ms: int) -> str:
-        """Convert milliseconds to SRT time format (HH:MM:SS,mmm)"""
-        total_seconds, milliseconds = divmod(ms, 1000)
-        minutes, seconds = divmod(total_seconds, 60)
-        hours, minutes = divmod(minutes, 60)
-        return f"{int(hours):02}:{int(minutes):02}:{int(seconds):02},{int(milliseconds):03}"
-
-    @staticmethod
-    def _ms_to_ass_ts(ms: int) -> str:
-        """Convert milliseconds to ASS timestamp format (H:MM:SS.cc)"""
-        total_seconds, milliseconds = divmod(ms, 1000)
-        minutes, seconds = divmod(total_seconds, 60)
-        hours, minutes = divmod(minutes, 60)
-        centiseconds = int(milliseconds / 10)
-        return f"{int(hours):01}:{int(minutes):02}:{int(seconds):02}.{centiseconds:02}"
+    _ms_to_srt_time = staticmethod(ms_to_srt_time)
+    _ms_to_ass_ts = staticmethod(ms_to_ass_time)
 
     @property
     def transcript(self) -> str:
@@ -78,22 +404,220 @@ class ASRDataSeg:
         return f"ASRDataSeg({self.text}, {self.start_time}, {self.end_time})"
 
 
+class _Column:
+    """视图的字段：读写所属存储的对应列"""
+
+    __slots__ = ("column", "is_time")
+
+    def __init__(self, column: str):
+        self.column = column
+        self.is_time = column in ("starts", "ends")
+
+    def __get__(self, seg, owner=None):
+        if seg is None:
+            return self
+        return getattr(seg._columns, self.column)[seg._row]
+
+    def __set__(self, seg, value):
+        columns = seg._columns
+        if self.is_time:
+            getattr(columns, self.column)[seg._row] = int(value)
+            columns.version += 1
+        else:
+            getattr(columns, self.column)[seg._row] = _intern(value)
+
+
+class _SegmentView(ASRDataSeg):
+    """ASRData 列式存储中一行的视图"""
+
+    __slots__ = ()
+
+    text = _Column("texts")  # type: ignore
+    translated_text = _Column("translated")  # type: ignore
+    start_time = _Column("starts")  # type: ignore
+    end_time = _Column("ends")  # type: ignore
+
+    def _detach(self) -> None:
+        """复制当前值，转为独立分段"""
+        text, start_time, end_time, translated_text = self._columns.row(self._row)
+        self.__class__ = ASRDataSeg
+        self._columns = self._row = None
+        self.text = text
+        self.translated_text = translated_text
+        self.start_time = start_time
+        self.end_time = end_time
+
+
+class _SegmentList(MutableSequence):
+    """ASRData.segments：按需生成分段视图的可变序列，增删直接修改列式存储"""
+
+    __slots__ = ("_owner",)
+
+    def __init__(self, owner: "ASRData"):
+        self._owner = owner
+
+    def __len__(self) -> int:
+        return len(self._owner._columns)
+
+    def _index(self, index: int) -> int:
+        length = len(self)
+        if index < 0:
+            index += length
+        if not 0 <= index < length:
+            raise IndexError("segment index out of range")
+        return index
+
+    def __getitem__(self, index):
+        columns = self._owner._columns
+        if isinstance(index, slice):
+            return [columns.view(row) for row in range(*index.indices(len(columns)))]
+        return columns.view(self._index(index))
+
+    def __iter__(self) -> Iterator[ASRDataSeg]:
+        columns = self._owner._columns
+        return map(columns.view, range(len(columns)))
+
+    def __setitem__(self, index, value):
+        columns = self._owner._columns
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(columns))
+            if step == 1:
+                columns.splice(start, max(start, stop), value)
+                return
+            rows = range(start, stop, step)
+            value = list(value)
+            if len(value) != len(rows):
+                raise ValueError(
+                    f"attempt to assign sequence of size {len(value)} "
+                    f"to extended slice of size {len(rows)}"
+                )
+            for row, seg in zip(rows, value):
+                columns.splice(row, row + 1, [seg])
+        else:
+            index = self._index(index)
+            columns.splice(index, index + 1, [value])
+
+    def __delitem__(self, index):
+        columns = self._owner._columns
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(columns))
+            if step == 1:
+                columns.delete(start, max(start, stop))
+                return
+            # 从后向前删除，前面的行号不受影响
+            for row in sorted(range(start, stop, step), reverse=True):
+                columns.delete(row, row + 1)
+        else:
+            index = self._index(index)
+            columns.delete(index, index + 1)
+
+    def insert(self, index: int, value: ASRDataSeg) -> None:
+        index = max(0, min(len(self), index + len(self) if index < 0 else index))
+        self._owner._columns.insert(index, value)
+
+    def append(self, value: ASRDataSeg) -> None:
+        columns = self._owner._columns
+        columns.insert(len(columns), value)
+
+    def extend(self, values: Iterable[ASRDataSeg]) -> None:
+        columns = self._owner._columns
+        columns.splice(len(columns), len(columns), values)
+
+    def __repr__(self) -> str:
+        return f"[{', '.join(str(seg) for seg in self)}]"
+
+
+class _IntervalIndex:
+    """按开始时间排序的区间索引
+
+    starts 为排序后的开始时间，max_ends 为排序后结束时间的前缀最大值（单调不减），
+    两者都可以二分查找：开始时间 <= t 的分段在 bisect_right(starts, t) 之前，
+    结束时间 > t 的分段不会在 bisect_right(max_ends, t) 之前。字幕按开始时间
+    有序时（order 为 None）starts 直接使用存储中的开始时间数组。
+    """
+
+    __slots__ = ("columns", "version", "order", "starts", "max_ends", "hint")
+
+    def __init__(self, columns: _SegmentColumns):
+        self.columns = columns
+        self.version = columns.version
+        starts, ends = columns.starts, columns.ends
+        if all(map(operator.le, starts, islice(starts, 1, None))):
+            self.order: Optional[List[int]] = None
+            self.starts = starts
+        else:
+            self.order = sorted(range(len(starts)), key=starts.__getitem__)
+            self.starts = array("q", [starts[row] for row in self.order])
+            ends = [ends[row] for row in self.order]
+        self.max_ends = array("q", accumulate(ends, max))
+        # 上一次 at() 命中的位置，顺序播放时通常无需二分查找
+        self.hint = 0
+
+    def is_valid(self, columns: _SegmentColumns) -> bool:
+        return self.columns is columns and self.version == columns.version
+
+    def row(self, k: int) -> int:
+        """排序后第 k 个分段在存储中的行号"""
+        return k if self.order is None else self.order[k]
+
+    def end(self, k: int) -> int:
+        return self.columns.ends[self.row(k)]
+
+    def merged(self, columns: _SegmentColumns, start: int, stop: int) -> None:
+        """[start, stop) 行已被原地合并为一行：只重算受影响的前缀最大值"""
+        ends = columns.ends
+        previous = self.max_ends[start - 1] if start else ends[start]
+        max_ends = self.max_ends
+        max_ends[start:stop] = array("q", [max(previous, ends[start])])
+        # 前缀最大值只会变小，某一项与原值相同后，其后各项都不变
+        for k in range(start + 1, len(max_ends)):
+            value = max(max_ends[k - 1], ends[k])
+            if value == max_ends[k]:
+                break
+            max_ends[k] = value
+        self.columns = columns
+        self.version = columns.version
+        self.starts = columns.starts
+
+
 class ASRData:
-    def __init__(self, segments: List[ASRDataSeg]):
-        # 去除 segments.text 为空的
-        filtered_segments = [seg for seg in segments if seg.text and seg.text.strip()]
-        filtered_segments.sort(key=lambda x: x.start_time)
-        self.segments = filtered_segments
+    def __init__(self, segments: Iterable[ASRDataSeg]):
+        # 去除 segments.text 为空的，按开始时间排序
+        self._columns = _SegmentColumns.from_segments(segments).normalized()
+        self._segment_list = _SegmentList(self)
+        self._index: Optional[_IntervalIndex] = None
+
+    @classmethod
+    def _from_columns(cls, columns: _SegmentColumns) -> "ASRData":
+        """由解析器直接填充的列式存储创建实例，不生成中间的分段对象"""
+        asr_data = cls.__new__(cls)
+        asr_data._columns = columns.normalized()
+        asr_data._segment_list = _SegmentList(asr_data)
+        asr_data._index = None
+        return asr_data
+
+    @property
+    def segments(self) -> _SegmentList:
+        return self._segment_list
+
+    @segments.setter
+    def segments(self, segments: Iterable[ASRDataSeg]) -> None:
+        self._columns = _SegmentColumns.from_segments(segments)
 
     def __iter__(self):
         return iter(self.segments)
 
+    def _rows(self) -> Iterator[Tuple[str, str, int, int]]:
+        """按行读取 (原文, 译文, 开始时间, 结束时间)，不创建分段视图"""
+        columns = self._columns
+        return zip(columns.texts, columns.translated, columns.starts, columns.ends)
+
     def __len__(self) -> int:
-        return len(self.segments)
+        return len(self._columns)
 
     def has_data(self) -> bool:
         """Check if there are any utterances"""
-        return len(self.segments) > 0
+        return len(self._columns) > 0
 
     def is_word_timestamp(self) -> bool:
         """
@@ -103,14 +627,15 @@ class ASRData:
         2. 对于中文，每个segment应该只包含一个汉字
         3. 允许20%的误差率
         """
-        if not self.segments:
+        texts = self._columns.texts
+        if not texts:
             return False
 
         valid_segments = 0
-        total_segments = len(self.segments)
+        total_segments = len(texts)
 
-        for seg in self.segments:
-            text = seg.text.strip()
+        for text in texts:
+            text = text.strip()
             # 检查是否只包含一个英文单词或一个汉字
             if (len(text.split()) == 1 and text.isascii()) or len(text.strip()) <= 2:
                 valid_segments += 1
@@ -125,11 +650,13 @@ class ASRData:
             ASRData: 包含分割后字词级别segments的新ASRData实例
         """
         CHARS_PER_PHONEME = 4  # 每个音素包含的字符数
-        new_segments = []
+        columns = self._columns
+        texts, starts, ends = [], [], []
 
-        for seg in self.segments:
-            text = seg.text
-            duration = seg.end_time - seg.start_time
+        for text, seg_start, seg_end in zip(
+            columns.texts, columns.starts, columns.ends
+        ):
+            duration = seg_end - seg_start
 
             # 匹配所有有效字符（包括数字和各种语言）
             pattern = (
@@ -163,7 +690,7 @@ class ASRData:
             )
             time_per_phoneme = duration / max(total_phonemes, 1)  # 防止除零
 
-            current_time = seg.start_time
+            current_time = seg_start
             for word_match in words_list:
                 word = word_match.group()
                 # 计算当前词的音素数
@@ -171,28 +698,28 @@ class ASRData:
                 word_duration = int(time_per_phoneme * word_phonemes)
 
                 # 创建新的字词级segment
-                word_end_time = min(current_time + word_duration, seg.end_time)
-                new_segments.append(
-                    ASRDataSeg(
-                        text=word, start_time=current_time, end_time=word_end_time
-                    )
-                )
+                word_end_time = min(current_time + word_duration, seg_end)
+                texts.append(word)
+                starts.append(current_time)
+                ends.append(word_end_time)
 
                 current_time = word_end_time
 
-        self.segments = new_segments
+        self._columns = _SegmentColumns.from_lists(texts, starts, ends)
         return self
 
     def remove_punctuation(self) -> "ASRData":
         """
         移除字幕中的标点符号(中文逗号、句号)
         """
-        punctuation = r"[，。]"
-        for seg in self.segments:
-            seg.text = re.sub(f"{punctuation}+$", "", seg.text.strip())
-            seg.translated_text = re.sub(
-                f"{punctuation}+$", "", seg.translated_text.strip()
-            )
+        punctuation = re.compile(r"[，。]+$")
+        columns = self._columns
+        columns.texts = [
+            _intern(punctuation.sub("", text.strip())) for text in columns.texts
+        ]
+        columns.translated = [
+            _intern(punctuation.sub("", text.strip())) for text in columns.translated
+        ]
         return self
 
     def save(
@@ -206,76 +733,45 @@ class ASRData:
             ass_style: ASS样式字符串,为空则使用默认样式
             layout: 字幕布局,可选值["原文在上", "译文在上", "仅原文", "仅译文"]
         """
-        # 处理Windows长路径问题
-        save_path = handle_long_path(save_path)
+        if is_subtitle_binary(save_path):
+            self.to_binary(save_path)
+            return
+        self.export([ExportTarget(save_path, layout=layout, ass_style=ass_style)])
 
-        # 创建目录
-        Path(save_path).parent.mkdir(parents=True, exist_ok=True)
+    def export(self, targets: List[ExportTarget]) -> List[ExportStats]:
+        """一次遍历字幕，同时写出多个 (格式, 布局) 目标文件
 
-        if save_path.endswith(".srt"):
-            self.to_srt(save_path=save_path, layout=layout)
-        elif save_path.endswith(".txt"):
-            self.to_txt(save_path=save_path, layout=layout)
-        elif save_path.endswith(".json"):
-            with open(save_path, "w", encoding="utf-8") as f:
-                json.dump(self.to_json(), f, ensure_ascii=False)
-        elif save_path.endswith(".ass"):
-            self.to_ass(save_path=save_path, style_str=ass_style, layout=layout)
-        else:
-            raise ValueError(f"Unsupported file extension: {save_path}")
+        Args:
+            targets: 导出目标列表，格式由文件后缀决定
+
+        Returns:
+            与 targets 一一对应的导出结果（写入字节数和耗时）
+        """
+        return export_rows(self._rows(), targets)
 
     def to_txt(self, save_path=None, layout: str = "原文在上") -> str:
         """Convert to plain text subtitle format (without timestamps)"""
-        result = []
-        for seg in self.segments:
-            # 检查是否有换行符
-            original = seg.text
-            translated = seg.translated_text
-
-            # 根据字幕类型组织文本
-            if layout == "原文在上":
-                text = f"{original}\n{translated}" if translated else original
-            elif layout == "译文在上":
-                text = f"{translated}\n{original}" if translated else original
-            elif layout == "仅原文":
-                text = original
-            elif layout == "仅译文":
-                text = translated if translated else original
-            else:
-                text = seg.transcript
-            result.append(text)
-        text = "\n".join(result)
+        text = "\n".join(
+            layout_text(layout, original, translated)
+            for original, translated, _, _ in self._rows()
+        )
         if save_path:
             # 处理Windows长路径问题
             save_path = handle_long_path(save_path)
 
             with open(save_path, "w", encoding="utf-8") as f:
-                f.write("\n".join(result))
+                f.write(text)
         return text
 
     def to_srt(self, layout: str = "原文在上", save_path=None) -> str:
         """Convert to SRT subtitle format"""
-        srt_lines = []
-        for n, seg in enumerate(self.segments, 1):
-            # 检查是否有换行符
-            original = seg.text
-            translated = seg.translated_text
-
-            # 根据字幕类型组织文本
-            if layout == "原文在上":
-                text = f"{original}\n{translated}" if translated else original
-            elif layout == "译文在上":
-                text = f"{translated}\n{original}" if translated else original
-            elif layout == "仅原文":
-                text = original
-            elif layout == "仅译文":
-                text = translated if translated else original
-            else:
-                text = seg.transcript
-
-            srt_lines.append(f"{n}\n{seg.to_srt_ts()}\n{text}\n")
-
-        srt_text = "\n".join(srt_lines)
+        srt_text = "\n".join(
+            f"{n}\n{ms_to_srt_time(start_time)} --> {ms_to_srt_time(end_time)}\n"
+            f"{layout_text(layout, original, translated)}\n"
+            for n, (original, translated, start_time, end_time) in enumerate(
+                self._rows(), 1
+            )
+        )
         if save_path:
             # 处理Windows长路径问题
             save_path = handle_long_path(save_path)
@@ -284,20 +780,45 @@ class ASRData:
                 f.write(srt_text)
         return srt_text
 
+    def to_binary(
+        self,
+        save_path: str,
+        words: Optional[List[List[Word]]] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+    ) -> int:
+        """保存为二进制字幕（.vcsub），用于在流水线各阶段之间传递字幕
+
+        Args:
+            save_path: 保存路径
+            words: 各分段的字词级子分段 (文本, 开始时间, 结束时间)
+            metadata: 元数据，如转录模型、语言
+
+        Returns:
+            写入的字节数
+        """
+        columns = self._columns
+        return write_subtitle_binary(
+            save_path,
+            columns.texts,
+            columns.starts,
+            columns.ends,
+            columns.translated,
+            words=words,
+            metadata=metadata,
+        )
+
     def to_lrc(self, save_path=None) -> str:
         """Convert to LRC subtitle format"""
         raise NotImplementedError("LRC format is not supported")
 
     def to_json(self) -> dict:
         result_json = {}
-        for i, segment in enumerate(self.segments, 1):
-            # 检查是否有换行符
-            original = segment.text
-            translated = segment.translated_text
-
+        for i, (original, translated, start_time, end_time) in enumerate(
+            self._rows(), 1
+        ):
             result_json[str(i)] = {
-                "start_time": segment.start_time,
-                "end_time": segment.end_time,
+                "start_time": start_time,
+                "end_time": end_time,
                 "original_subtitle": original,
                 "translated_subtitle": translated,
             }
@@ -318,73 +839,17 @@ class ASRData:
         Returns:
             ASS格式字幕内容
         """
-        if not style_str:
-            style_str = (
-                "[V4+ Styles]\n"
-                "Format: Name,Fontname,Fontsize,PrimaryColour,SecondaryColour,OutlineColour,BackColour,"
-                "Bold,Italic,Underline,StrikeOut,ScaleX,ScaleY,Spacing,Angle,BorderStyle,Outline,Shadow,"
-                "Alignment,MarginL,MarginR,MarginV,Encoding\n"
-                "Style: Default,MicrosoftYaHei-Bold,40,&H00FFFFFF,&H000000FF,&H00000000,&H00000000,-1,0,0,0,100,100,"
-                "0,0,1,2,0,2,10,10,15,1\n"
-                "Style: Secondary,MicrosoftYaHei-Bold,30,&H00FFFFFF,&H000000FF,&H00000000,&H00000000,-1,0,0,0,100,100,"
-                "0,0,1,2,0,2,10,10,15,1"
+        ass_content = ass_header(style_str) + "".join(
+            ass_dialogues(
+                layout,
+                ms_to_ass_time(start_time),
+                ms_to_ass_time(end_time),
+                original,
+                translated,
             )
-
-        ass_content = (
-            "[Script Info]\n"
-            "; Script generated by VideoCaptioner\n"
-            "; https://github.com/weifeng2333\n"
-            "ScriptType: v4.00+\n"
-            "PlayResX: 1280\n"
-            "PlayResY: 720\n\n"
-            f"{style_str}\n\n"
-            "[Events]\n"
-            "Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text\n"
+            for original, translated, start_time, end_time in self._rows()
         )
 
-        dialogue_template = "Dialogue: 0,{},{},{},,0,0,0,,{}\n"
-        for seg in self.segments:
-            start_time, end_time = seg.to_ass_ts()
-            original = seg.text
-            translated = seg.translated_text
-
-            # 检查是否有译文
-            has_translation = bool(translated and translated.strip())
-
-            if layout == "译文在上":
-                if has_translation:
-                    ass_content += dialogue_template.format(
-                        start_time, end_time, "Secondary", original
-                    )
-                    ass_content += dialogue_template.format(
-                        start_time, end_time, "Default", translated
-                    )
-                else:
-                    ass_content += dialogue_template.format(
-                        start_time, end_time, "Default", original
-                    )
-            elif layout == "原文在上":
-                if has_translation:
-                    ass_content += dialogue_template.format(
-                        start_time, end_time, "Secondary", translated
-                    )
-                    ass_content += dialogue_template.format(
-                        start_time, end_time, "Default", original
-                    )
-                else:
-                    ass_content += dialogue_template.format(
-                        start_time, end_time, "Default", original
-                    )
-            elif layout == "仅原文":
-                ass_content += dialogue_template.format(
-                    start_time, end_time, "Default", original
-                )
-            elif layout == "仅译文":
-                text = translated if has_translation else original
-                ass_content += dialogue_template.format(
-                    start_time, end_time, "Default", text
-                )
-
         if save_path:
             # 处理Windows长路径问题
             save_path = handle_long_path(save_path)
@@ -432,27 +897,77 @@ class ASRData:
             or start_index > end_index
         ):
             raise IndexError("无效的段索引。")
-        merged_start_time = self.segments[start_index].start_time
-        merged_end_time = self.segments[end_index].end_time
+        columns = self._columns
+        merged_start_time = columns.starts[start_index]
+        merged_end_time = columns.ends[end_index]
         if merged_text is None:
-            merged_text = "".join(
-                seg.text for seg in self.segments[start_index : end_index + 1]
-            )
-        merged_seg = ASRDataSeg(merged_text, merged_start_time, merged_end_time)
-        # 替换 segments[start_index:end_index+1] 为 merged_seg
-        self.segments[start_index : end_index + 1] = [merged_seg]
+            merged_text = "".join(columns.texts[start_index : end_index + 1])
+        # 替换 segments[start_index:end_index+1] 为合并后的段
+        self._merge_rows(
+            start_index, end_index + 1, merged_text, merged_start_time, merged_end_time
+        )
 
     def merge_with_next_segment(self, index: int) -> None:
         """合并指定索引的段与下一个段。"""
         if index < 0 or index >= len(self.segments) - 1:
             raise IndexError("索引超出范围或没有下一个段可合并。")
-        current_seg = self.segments[index]
-        next_seg = self.segments[index + 1]
-        merged_text = f"{current_seg.text} {next_seg.text}"
-        merged_seg = ASRDataSeg(merged_text, current_seg.start_time, next_seg.end_time)
-        self.segments[index] = merged_seg
-        # 删除下一个段
-        del self.segments[index + 1]
+        columns = self._columns
+        merged_text = f"{columns.texts[index]} {columns.texts[index + 1]}"
+        # 以合并后的段替换当前段和下一个段
+        self._merge_rows(
+            index,
+            index + 2,
+            merged_text,
+            columns.starts[index],
+            columns.ends[index + 1],
+        )
+
+    def merge_segment_runs(self, runs: List[Tuple[int, int]]) -> None:
+        """批量合并若干段区间，结果与从后往前逐个 merge_with_next_segment 相同
+
+        逐个合并每次都要移动之后的所有行，合并多处时整体为 O(n²)；
+        这里一次压缩完成，适合一轮中合并大量相邻段的场景。
+
+        Args:
+            runs: 按索引升序、互不重叠的 (start_index, end_index) 列表（均包含），
+                每个区间合并为一段，文本以空格连接
+        """
+        texts = self._columns.texts
+        last = -1
+        for start_index, end_index in runs:
+            if (
+                start_index <= last
+                or end_index >= len(texts)
+                or start_index > end_index
+            ):
+                raise IndexError("无效的段索引。")
+            last = end_index
+        self._columns.merge_runs(
+            [
+                (start, end + 1, " ".join(texts[start : end + 1]))
+                for start, end in runs
+                if end > start
+            ]
+        )
+        self._index = None
+
+    def _merge_rows(
+        self, start: int, stop: int, text: str, start_time: int, end_time: int
+    ) -> None:
+        """将 [start, stop) 行原地合并为一行，并增量更新区间索引"""
+        index = self._index
+        # 合并后的开始时间取自第一行时，有序的索引合并后仍然有序
+        keep_index = (
+            index is not None
+            and index.order is None
+            and index.is_valid(self._columns)
+            and start_time == index.starts[start]
+        )
+        self._columns.merge(start, stop, text, start_time, end_time)
+        if keep_index:
+            index.merged(self._columns, start, stop)
+        else:
+            self._index = None
 
     def optimize_timing(self, threshold_ms: int = 1000) -> "ASRData":
         """优化字幕显示时间，如果相邻字幕段之间的时间间隔小于阈值，
@@ -467,35 +982,130 @@ class ASRData:
         if self.is_word_timestamp():
             return self
 
-        if not self.segments:
+        if not self.has_data():
             return self
 
-        for i in range(len(self.segments) - 1):
-            current_seg = self.segments[i]
-            next_seg = self.segments[i + 1]
-
+        starts, ends = self._columns.starts, self._columns.ends
+        changed = False
+        for i in range(len(starts) - 1):
             # 计算时间间隔
-            time_gap = next_seg.start_time - current_seg.end_time
+            time_gap = starts[i + 1] - ends[i]
 
             # 如果间隔小于阈值，将交界点设置为 3/4 时间点
             if time_gap < threshold_ms:
-                mid_time = (
-                    current_seg.end_time + next_seg.start_time
-                ) // 2 + time_gap // 4
-                current_seg.end_time = mid_time
-                next_seg.start_time = mid_time
-
+                mid_time = (ends[i] + starts[i + 1]) // 2 + time_gap // 4
+                ends[i] = mid_time
+                starts[i + 1] = mid_time
+                changed = True
+
+        # 有序的索引与存储共用开始时间数组，只需确认仍然有序并重算结束时间的前缀最大值
+        index = self._index
+        if changed and index is not None:
+            if (
+                index.order is None
+                and index.is_valid(self._columns)
+                and all(map(operator.le, starts, islice(starts, 1, None)))
+            ):
+                index.max_ends = array("q", accumulate(ends, max))
+            else:
+                self._index = None
         return self
 
+    def _interval_index(self) -> _IntervalIndex:
+        """取得区间索引，存储发生结构变化或时间被修改后重新建立"""
+        index = self._index
+        if index is None or not index.is_valid(self._columns):
+            index = self._index = _IntervalIndex(self._columns)
+        return index
+
+    def at(self, time_ms: int) -> Optional[ASRDataSeg]:
+        """查找 time_ms 时刻正在显示的字幕（开始时间 <= time_ms < 结束时间）
+
+        有多条字幕重叠时返回开始时间最晚的一条。连续播放时先检查上一次命中的
+        字幕及其下一条，通常无需二分查找。
+
+        Args:
+            time_ms: 时间（毫秒）
+
+        Returns:
+            字幕分段视图，该时刻没有字幕时返回 None
+        """
+        index = self._interval_index()
+        starts = index.starts
+        count = len(starts)
+        for k in (index.hint, index.hint + 1):
+            if (
+                k < count
+                and starts[k] <= time_ms < index.end(k)
+                and (k + 1 == count or starts[k + 1] > time_ms)
+            ):
+                index.hint = k
+                return self._columns.view(index.row(k))
+
+        low = bisect_right(index.max_ends, time_ms)
+        for k in range(bisect_right(starts, time_ms) - 1, low - 1, -1):
+            if index.end(k) > time_ms:
+                index.hint = k
+                return self._columns.view(index.row(k))
+        return None
+
+    def overlapping(self, start_ms: int, end_ms: int) -> List[ASRDataSeg]:
+        """查找与 [start_ms, end_ms) 有重叠的字幕，按开始时间排序
+
+        start_ms == end_ms 时按时间点查找，等同于返回该时刻显示的所有字幕。
+
+        Args:
+            start_ms: 区间开始时间（毫秒）
+            end_ms: 区间结束时间（毫秒）
+
+        Returns:
+            字幕分段视图列表
+        """
+        index = self._interval_index()
+        if end_ms > start_ms:
+            high = bisect_left(index.starts, end_ms)
+        else:
+            high = bisect_right(index.starts, start_ms)
+        low = bisect_right(index.max_ends, start_ms)
+        return [
+            self._columns.view(index.row(k))
+            for k in range(low, high)
+            if index.end(k) > start_ms
+        ]
+
+    def gaps(self, min_ms: int = 1) -> List[Tuple[int, int]]:
+        """查找相邻字幕之间没有任何字幕显示的空隙
+
+        Args:
+            min_ms: 空隙的最小时长（毫秒），小于 1 时按 1 处理
+
+        Returns:
+            [(空隙开始时间, 空隙结束时间), ...]，按时间排序
+        """
+        index = self._interval_index()
+        min_ms = max(min_ms, 1)
+        return [
+            (end, start)
+            for end, start in zip(index.max_ends, islice(index.starts, 1, None))
+            if start - end >= min_ms
+        ]
+
     def __str__(self):
         return self.to_txt()
 
+    @staticmethod
+    def _from_rows(rows: Iterable[SubtitleRow]) -> "ASRData":
+        """由解析器产出的字幕行批量创建实例"""
+        return ASRData._from_columns(_SegmentColumns.from_rows(rows))
+
     @staticmethod
     def from_subtitle_file(file_path: str) -> "ASRData":
         """从文件路径加载ASRData实例
 
+        文件按块读取并增量解析，不需要一次读入整个文件。
+
         Args:
-            file_path: 字幕文件路径，支持.srt、.vtt、.ass、.json格式
+            file_path: 字幕文件路径，支持.srt、.vtt、.ass、.json、.vcsub格式
 
         Returns:
             ASRData: 解析后的ASRData实例
@@ -503,44 +1113,28 @@ class ASRData:
         Raises:
             ValueError: 不支持的文件格式或文件读取错误
         """
-        file_path_obj = Path(file_path)
-        if not file_path_obj.exists():
-            raise FileNotFoundError(f"文件不存在: {file_path_obj}")
+        if is_subtitle_binary(file_path):
+            return ASRData.from_binary(file_path)
+        return ASRData._from_rows(iter_file_rows(file_path))
 
-        try:
-            content = file_path_obj.read_text(encoding="utf-8")
-        except UnicodeDecodeError:
-            content = file_path_obj.read_text(encoding="gbk")
-
-        suffix = file_path_obj.suffix.lower()
-
-        if suffix == ".srt":
-            return ASRData.from_srt(content)
-        elif suffix == ".vtt":
-            if "<c>" in content:  # YouTube VTT格式包含字级时间戳
-                return ASRData.from_youtube_vtt(content)
-            return ASRData.from_vtt(content)
-        elif suffix == ".ass":
-            return ASRData.from_ass(content)
-        elif suffix == ".json":
-            return ASRData.from_json(json.loads(content))
-        else:
-            raise ValueError(f"不支持的文件格式: {suffix}")
+    @staticmethod
+    def from_binary(file_path: str) -> "ASRData":
+        """从二进制字幕（.vcsub）加载ASRData实例
+
+        时间列整块复制，去重的字符串表一次解码，不逐条解析。文件中相同的文本
+        已经共用同一个字符串，无需再驻留。
+        """
+        with SubtitleBinary(file_path) as subtitle:
+            columns = _SegmentColumns()
+            columns.starts, columns.ends = subtitle.time_arrays()
+            columns.texts = subtitle.texts()
+            columns.translated = subtitle.translated_texts()
+        return ASRData._from_columns(columns)
 
     @staticmethod
     def from_json(json_data: dict) -> "ASRData":
         """从JSON数据创建ASRData实例"""
-        segments = []
-        for i in sorted(json_data.keys(), key=int):
-            segment_data = json_data[i]
-            segment = ASRDataSeg(
-                text=segment_data["original_subtitle"],
-                translated_text=segment_data["translated_subtitle"],
-                start_time=segment_data["start_time"],
-                end_time=segment_data["end_time"],
-            )
-            segments.append(segment)
-        return ASRData(segments)
+        return ASRData._from_rows(iter_json_rows(json_data))
 
     @staticmethod
     def from_srt(srt_str: str) -> "ASRData":
@@ -550,65 +1144,7 @@ class ASRData:
         :param srt_str: 包含SRT格式字幕的字符串。
         :return: 解析后的ASRData实例。
         """
-        segments = []
-        srt_time_pattern = re.compile(
-            r"(\d{2}):(\d{2}):(\d{1,2})[.,](\d{3})\s-->\s(\d{2}):(\d{2}):(\d{1,2})[.,](\d{3})"
-        )
-        blocks = re.split(r"\n\s*\n", srt_str.strip())
-
-        # 如果超过96%的块都超过4行，说明可能包含翻译文本
-        blocks_lines_count = [len(block.splitlines()) for block in blocks]
-        if (
-            len(blocks_lines_count) > 0
-            and all(count <= 4 for count in blocks_lines_count)
-            and sum(count == 4 for count in blocks_lines_count)
-            / len(blocks_lines_count)
-            >= 0.98
-        ):
-            has_translated_subtitle = True
-        else:
-            has_translated_subtitle = False
-
-        for block in blocks:
-            lines = block.splitlines()
-            if len(lines) < 3:  # 至少需要3行：序号、时间戳和文本
-                continue
-
-            match = srt_time_pattern.match(lines[1])
-            if not match:
-                continue
-
-            time_parts = list(map(int, match.groups()))
-            start_time = sum(
-                [
-                    time_parts[0] * 3600000,
-                    time_parts[1] * 60000,
-                    time_parts[2] * 1000,
-                    time_parts[3],
-                ]
-            )
-            end_time = sum(
-                [
-                    time_parts[4] * 3600000,
-                    time_parts[5] * 60000,
-                    time_parts[6] * 1000,
-                    time_parts[7],
-                ]
-            )
-
-            if has_translated_subtitle and len(lines) >= 4:
-                text = lines[2]
-                translated_text = lines[3]
-                segments.append(
-                    ASRDataSeg(
-                        text, start_time, end_time, translated_text=translated_text
-                    )
-                )
-            else:
-                text = lines[2]
-                segments.append(ASRDataSeg(text, start_time, end_time))
-
-        return ASRData(segments)
+        return ASRData._from_rows(srt_rows(srt_str))
 
     @staticmethod
     def from_vtt(vtt_str: str) -> "ASRData":
@@ -618,54 +1154,7 @@ class ASRData:
         :param vtt_str: VTT格式的字幕字符串
         :return: ASRData实例
         """
-        segments = []
-        # 跳过头部元数据
-        content = vtt_str.split("\n\n")[2:]
-
-        timestamp_pattern = re.compile(
-            r"(\d{2}):(\d{2}):(\d{2})\.(\d{3})\s*-->\s*(\d{2}):(\d{2}):(\d{2})\.(\d{3})"
-        )
-
-        for block in content:
-            lines = block.strip().split("\n")
-            if len(lines) < 2:
-                continue
-
-            # 解析时间戳行
-            timestamp_line = lines[1]
-            match = timestamp_pattern.match(timestamp_line)
-            if not match:
-                continue
-
-            # 提取开始和结束时间
-            time_parts = list(map(int, match.groups()))
-            start_time = sum(
-                [
-                    time_parts[0] * 3600000,
-                    time_parts[1] * 60000,
-                    time_parts[2] * 1000,
-                    time_parts[3],
-                ]
-            )
-            end_time = sum(
-                [
-                    time_parts[4] * 3600000,
-                    time_parts[5] * 60000,
-                    time_parts[6] * 1000,
-                    time_parts[7],
-                ]
-            )
-
-            # 处理文本内容
-            text_line = " ".join(lines[2:])
-            cleaned_text = re.sub(r"<\d{2}:\d{2}:\d{2}\.\d{3}>", "", text_line)
-            cleaned_text = re.sub(r"</?c>", "", cleaned_text)
-            cleaned_text = cleaned_text.strip()
-
-            if cleaned_text and cleaned_text != " ":
-                segments.append(ASRDataSeg(cleaned_text, start_time, end_time))
-
-        return ASRData(segments)
+        return ASRData._from_rows(vtt_rows(vtt_str))
 
     @staticmethod
     def from_youtube_vtt(vtt_str: str) -> "ASRData":
@@ -675,65 +1164,7 @@ class ASRData:
         :param vtt_str: 包含VTT格式字幕的字符串
         :return: 解析后的ASRData实例
         """
-
-        def parse_timestamp(ts: str) -> int:
-            """将时间戳字符串转换为毫秒"""
-            h, m, s = ts.split(":")
-            return int(float(h) * 3600000 + float(m) * 60000 + float(s) * 1000)
-
-        def split_timestamped_text(text: str) -> List[ASRDataSeg]:
-            """分离带时间戳的文本为单词段"""
-            pattern = re.compile(r"<(\d{2}:\d{2}:\d{2}\.\d{3})>([^<]*)")
-            matches = list(pattern.finditer(text))
-            word_segments = []
-
-            for i in range(len(matches) - 1):
-                current_match = matches[i]
-                next_match = matches[i + 1]
-
-                start_time = parse_timestamp(current_match.group(1))
-                end_time = parse_timestamp(next_match.group(1))
-                word = current_match.group(2).strip()
-
-                if word:
-                    word_segments.append(ASRDataSeg(word, start_time, end_time))
-
-            return word_segments
-
-        segments = []
-        blocks = re.split(r"\n\n+", vtt_str.strip())
-
-        timestamp_pattern = re.compile(
-            r"(\d{2}):(\d{2}):(\d{2}\.\d{3})\s*-->\s*(\d{2}):(\d{2}):(\d{2}\.\d{3})"
-        )
-        for block in blocks:
-            lines = block.strip().split("\n")
-            if not lines:
-                continue
-
-            match = timestamp_pattern.match(lines[0])
-            if not match:
-                continue
-
-            # 获取文本内容
-            text = "\n".join(lines)
-
-            timestamp_row = re.search(r"\n(.*?<c>.*?</c>.*)", block)
-            if timestamp_row:
-                text = re.sub(r"<c>|</c>", "", timestamp_row.group(1))
-                block_start_time_string = (
-                    f"{match.group(1)}:{match.group(2)}:{match.group(3)}"
-                )
-                block_end_time_string = (
-                    f"{match.group(4)}:{match.group(5)}:{match.group(6)}"
-                )
-                text = f"<{block_start_time_string}>{text}<{block_end_time_string}>"
-
-                # 分离每个带时间戳的单词
-                word_segments = split_timestamped_text(text)
-                segments.extend(word_segments)
-
-        return ASRData(segments)
+        return ASRData._from_rows(youtube_vtt_rows(vtt_str))
 
     @staticmethod
     def from_ass(ass_str: str) -> "ASRData":
@@ -743,75 +1174,31 @@ class ASRData:
         :param ass_str: 包含ASS格式字幕的字符串
         :return: ASRData实例
         """
-        segments = []
-        ass_time_pattern = re.compile(
-            r"Dialogue: \d+,(\d+:\d{2}:\d{2}\.\d{2}),(\d+:\d{2}:\d{2}\.\d{2}),(.*?),.*?,\d+,\d+,\d+,.*?,(.*?)$"
-        )
+        return ASRData._from_rows(ass_rows(ass_str))
 
-        def parse_ass_time(time_str: str) -> int:
-            """将ASS时间戳转换为毫秒"""
-            hours, minutes, seconds = time_str.split(":")
-            seconds, centiseconds = seconds.split(".")
-            return (
-                int(hours) * 3600000
-                + int(minutes) * 60000
-                + int(seconds) * 1000
-                + int(centiseconds) * 10
-            )
 
-        # 检查是否是VideoCaptioner生成的字幕
-        has_translation = "Script generated by VideoCaptioner" in ass_str
-
-        # 用于临时存储相同时间戳的字幕
-        temp_segments = {}
-
-        # 按行处理ASS文件
-        for line in ass_str.splitlines():
-            if line.startswith("Dialogue:"):
-                match = ass_time_pattern.match(line)
-                if match:
-                    start_time = parse_ass_time(match.group(1))
-                    end_time = parse_ass_time(match.group(2))
-                    style = match.group(3).strip()
-                    text = match.group(4)
-
-                    text = re.sub(r"\{[^}]*\}", "", text)
-                    text = text.replace("\\N", "\n")
-                    text = text.strip()
-
-                    if not text:
-                        continue
-
-                    if has_translation:
-                        # 使用时间戳作为键
-                        time_key = f"{start_time}-{end_time}"
-                        if time_key in temp_segments:
-                            # 如果已存在相同时间戳的字幕，合并原文和译文
-                            if style == "Default":
-                                temp_segments[time_key].translated_text = text
-                            else:
-                                temp_segments[time_key].text = text
-                            # 创建新的字幕段并清除临时存储
-                            segments.append(temp_segments[time_key])
-                            del temp_segments[time_key]
-                        else:
-                            # 创建新的字幕段并存储
-                            segment = ASRDataSeg(
-                                text="", start_time=start_time, end_time=end_time
-                            )
-                            if style == "Default":
-                                segment.translated_text = text
-                            else:
-                                segment.text = text
-                            temp_segments[time_key] = segment
-                    else:
-                        segments.append(ASRDataSeg(text, start_time, end_time))
-
-        # 处理剩余的未配对字幕
-        for segment in temp_segments.values():
-            segments.append(segment)
-
-        return ASRData(segments)
+def iter_segments(file_path: str) -> Iterator[ASRDataSeg]:
+    """逐条读取字幕文件中的分段，边解析边产出
+
+    文件按块读取，内存占用与文件大小无关，后续处理可以在解析完成前开始。
+    与 ASRData.from_subtitle_file 相同，文本为空的分段会被跳过；分段按文件中的
+    顺序产出，不重新排序。
+
+    Args:
+        file_path: 字幕文件路径，支持.srt、.vtt、.ass、.json、.vcsub格式
+    """
+    for text, start_time, end_time, translated_text in iter_file_rows(file_path):
+        if text and text.strip():
+            yield ASRDataSeg(text, start_time, end_time, translated_text)
+
+
+def is_layout_neutral(file_path: str) -> bool:
+    """字幕文件是否分别保存原文和译文（二进制字幕 .vcsub、JSON），可按任意布局重新生成
+
+    SRT、VTT、ASS 中的双语字幕已经按某种布局排好，解析出的原文、译文只对应行的位置，
+    再按布局生成一次会重复排布（如“译文在上”的字幕被上下颠倒）。
+    """
+    return is_subtitle_binary(file_path) or Path(file_path).suffix.lower() == ".json"
 
 
 if __name__ == "__main__":
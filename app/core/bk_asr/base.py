@@ -1,66 +1,188 @@
+import asyncio
+import mmap
 import os
+import shutil
 import threading
 import zlib
-from typing import Optional, Union
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Iterator, Optional, Union
 
 from app.config import CACHE_PATH
 from app.core.storage.cache_manager import CacheManager
+from app.core.utils.async_http import run_sync
+from app.core.utils.audio_source import AudioSource
 
+from . import timing
 from .asr_data import ASRData, ASRDataSeg
 
 
 class BaseASR:
     SUPPORTED_SOUND_FORMAT = ["flac", "m4a", "mp3", "wav"]
+    # 流式计算哈希时每次读取的块大小
+    HASH_BLOCK_SIZE = 1024 * 1024
+    # 是否必须以音频文件路径作为输入（如需按WAV切分或编码），否则可直接使用内存中的音频
+    NEEDS_FILE_PATH = False
     _lock = threading.Lock()
 
     def __init__(
         self,
-        audio_path: Optional[Union[str, bytes]] = None,
+        audio_path: Optional[Union[str, bytes, AudioSource]] = None,
         use_cache: bool = False,
         need_word_time_stamp: bool = False,
     ):
         self.audio_path = audio_path
-        self.file_binary = None
+        self._file_binary: Optional[bytes] = None
+        self.file_size = 0
         self.use_cache = use_cache
-        self._set_data()
-        self.cache_manager = CacheManager(str(CACHE_PATH))
+        self.crc32_hex = ""
+        with self._track("hash") as event:
+            self._set_data()
+            event.bytes = self.file_size
+            event.audio_key = self.crc32_hex
+        # 并行转录时多个实例可能同时初始化数据库
+        with self._lock:
+            self.cache_manager = CacheManager(str(CACHE_PATH))
 
     def _set_data(self):
+        if isinstance(self.audio_path, AudioSource):
+            # 哈希已在提取音频时计算
+            source = self.audio_path
+            self.file_size = source.size
+            self.crc32_hex = source.crc32_hex
+            if source.path:
+                # 音频已在磁盘上（如提取缓存），按文件使用，避免整段读入内存
+                self.audio_path = source.path
+            else:
+                self._file_binary = source.data
+            return
         if isinstance(self.audio_path, bytes):
-            self.file_binary = self.audio_path
+            self._file_binary = self.audio_path
+            self.file_size = len(self.audio_path)
+            crc32_value = zlib.crc32(self.audio_path)
         elif isinstance(self.audio_path, str):
             ext = self.audio_path.split(".")[-1].lower()
             assert ext in self.SUPPORTED_SOUND_FORMAT, (
                 f"Unsupported sound format: {ext}"
             )
             assert os.path.exists(self.audio_path), f"File not found: {self.audio_path}"
+            self.file_size = os.path.getsize(self.audio_path)
+            # 分块计算CRC32，避免将整个音频读入内存
+            crc32_value = 0
             with open(self.audio_path, "rb") as f:
-                self.file_binary = f.read()
+                while block := f.read(self.HASH_BLOCK_SIZE):
+                    crc32_value = zlib.crc32(block, crc32_value)
         else:
             raise ValueError("audio_path must be provided as string or bytes")
-        crc32_value = zlib.crc32(self.file_binary) & 0xFFFFFFFF
-        self.crc32_hex = format(crc32_value, "08x")
+        self.crc32_hex = format(crc32_value & 0xFFFFFFFF, "08x")
+
+    @property
+    def file_binary(self) -> Optional[bytes]:
+        """音频原始数据，仅在后端确实需要完整字节时才从磁盘读取"""
+        if self._file_binary is None and isinstance(self.audio_path, str):
+            with open(self.audio_path, "rb") as f:
+                self._file_binary = f.read()
+        return self._file_binary
+
+    def _link_audio(self, dst: Path) -> None:
+        """将音频放到 dst 供外部程序读取：优先硬链接或符号链接，失败时才复制"""
+        if not isinstance(self.audio_path, str):
+            if not self.file_binary:
+                raise ValueError("No audio data available")
+            dst.write_bytes(self.file_binary)
+            return
+        src = os.path.abspath(self.audio_path)
+        try:
+            os.link(src, dst)
+        except OSError:
+            try:
+                os.symlink(src, dst)
+            except OSError:
+                shutil.copy2(src, dst)
+
+    @contextmanager
+    def audio_view(self) -> Iterator[memoryview]:
+        """以零拷贝的 memoryview 访问音频数据
+
+        文件输入通过 mmap 映射，切片不会复制数据；退出上下文后视图失效。
+        """
+        if self._file_binary is not None or not isinstance(self.audio_path, str):
+            view = memoryview(self._file_binary or b"")
+            try:
+                yield view
+            finally:
+                view.release()
+            return
+
+        if self.file_size == 0:
+            # 空文件无法 mmap
+            yield memoryview(b"")
+            return
+
+        with open(self.audio_path, "rb") as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(mm)
+        try:
+            yield view
+        finally:
+            view.release()
+            try:
+                mm.close()
+            except BufferError:
+                # 仍有切片被引用（如异常回溯中），交由垃圾回收释放映射
+                pass
 
     def run(self, callback=None, **kwargs) -> ASRData:
-        if self.use_cache:
-            cached_result = self.cache_manager.get_asr_result(
-                self._get_key(), self.__class__.__name__
-            )
+        """同步运行ASR；实现了 _arun 的网络后端在事件循环中运行"""
+        if type(self)._arun is not BaseASR._arun:
+            return run_sync(self.arun(callback, **kwargs))
+
+        with self._track("total", bytes=self.file_size):
+            cached_result = self._get_cached_result()
             if cached_result:
-                segments = self._make_segments(cached_result)
+                return self._parse_result(cached_result)
 
-                return ASRData(segments)
+            resp_data = self._run(callback, **kwargs)
+            self._set_cached_result(resp_data)
+            return self._parse_result(resp_data)
 
-        resp_data = self._run(callback, **kwargs)
+    async def arun(self, callback=None, **kwargs) -> ASRData:
+        """异步运行ASR，多个实例可在同一事件循环中并发执行"""
+        with self._track("total", bytes=self.file_size):
+            cached_result = self._get_cached_result()
+            if cached_result:
+                return self._parse_result(cached_result)
+
+            resp_data = await self._arun(callback, **kwargs)
+            self._set_cached_result(resp_data)
+            return self._parse_result(resp_data)
+
+    def _track(self, phase: str, bytes: int = 0, **extra: Any):
+        """记录当前后端某个阶段的耗时事件"""
+        return timing.track(
+            self.__class__.__name__, phase, self.crc32_hex, bytes=bytes, **extra
+        )
+
+    def _parse_result(self, resp_data) -> ASRData:
+        with self._track("parse"):
+            return ASRData(self._make_segments(resp_data))
 
+    def _get_cached_result(self):
+        if not self.use_cache:
+            return None
+        with self._track("cache") as event:
+            cached_result = self.cache_manager.get_asr_result(
+                self._get_key(), self.__class__.__name__
+            )
+            event.cache_hit = bool(cached_result)
+        return cached_result
+
+    def _set_cached_result(self, resp_data):
         if self.use_cache:
             self.cache_manager.set_asr_result(
                 self._get_key(), self.__class__.__name__, resp_data
             )
 
-        segments = self._make_segments(resp_data)
-        return ASRData(segments)
-
     def _get_key(self):
         """获取缓存key"""
         return self.crc32_hex
@@ -74,3 +196,7 @@ class BaseASR:
     def _run(self, callback=None, **kwargs) -> dict:
         """运行ASR服务并返回响应数据"""
         raise NotImplementedError("_run method must be implemented in subclass")
+
+    async def _arun(self, callback=None, **kwargs) -> dict:
+        """异步运行ASR服务，默认在线程中执行同步的 _run"""
+        return await asyncio.to_thread(self._run, callback, **kwargs)
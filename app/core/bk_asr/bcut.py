@@ -1,9 +1,9 @@
+import asyncio
 import json
 import time
 from typing import Optional, Union, List, Callable, Any
 
-import requests
-
+from ..utils.async_http import MemoryViewStream, get_async_client
 from ..utils.logger import setup_logger
 from .asr_data import ASRDataSeg
 from .base import BaseASR
@@ -21,6 +21,19 @@ API_CREATE_TASK = API_BASE_URL + "/task"
 # 查询结果
 API_QUERY_RESULT = API_BASE_URL + "/task/result"
 
+# 分片并发上传数
+UPLOAD_WORKERS = 4
+# 轮询间隔：从较短间隔开始，逐步退避到上限
+POLL_INTERVAL_MIN = 0.5
+POLL_INTERVAL_MAX = 3.0
+POLL_BACKOFF = 1.5
+# 等待转录结果的最长时间（秒）
+POLL_TIMEOUT = 600
+
+# 任务状态
+TASK_STATE_ERROR = 3
+TASK_STATE_COMPLETE = 4
+
 
 class BcutASR(BaseASR):
     """必剪 语音识别接口"""
@@ -35,9 +48,10 @@ class BcutASR(BaseASR):
         audio_path: Union[str, bytes],
         use_cache: bool = True,
         need_word_time_stamp: bool = False,
+        api_base_url: str = API_BASE_URL,
     ):
         super().__init__(audio_path, use_cache=use_cache)
-        self.session = requests.Session()
+        self.api_base_url = api_base_url.rstrip("/")
         self.task_id: Optional[str] = None
         self.__etags: List[str] = []
 
@@ -53,21 +67,27 @@ class BcutASR(BaseASR):
 
         self.need_word_time_stamp = need_word_time_stamp
 
-    def upload(self) -> None:
+    def _api_url(self, url: str) -> str:
+        """将接口地址替换为实例配置的服务地址"""
+        return self.api_base_url + url[len(API_BASE_URL) :]
+
+    async def upload(self) -> None:
         """申请上传"""
-        if not self.file_binary:
+        if not self.file_size:
             raise ValueError("none set data")
         payload = json.dumps(
             {
                 "type": 2,
                 "name": "audio.mp3",
-                "size": len(self.file_binary),
+                "size": self.file_size,
                 "ResourceFileType": "mp3",
                 "model_id": "8",
             }
         )
 
-        resp = requests.post(API_REQ_UPLOAD, data=payload, headers=self.headers)
+        resp = await get_async_client().post(
+            self._api_url(API_REQ_UPLOAD), content=payload, headers=self.headers
+        )
         resp.raise_for_status()
         resp = resp.json()
         resp_data = resp["data"]
@@ -82,35 +102,55 @@ class BcutASR(BaseASR):
         logger.info(
             f"申请上传成功, 总计大小{resp_data['size'] // 1024}KB, {self.__clips}分片, 分片大小{resp_data['per_size'] // 1024}KB: {self.__in_boss_key}"
         )
-        self.__upload_part()
-        self.__commit_upload()
+        await self.__upload_part()
+        await self.__commit_upload()
 
-    def __upload_part(self) -> None:
+    async def __upload_part(self) -> None:
         """上传音频数据"""
         if (
             self.__clips is None
             or self.__per_size is None
             or self.__upload_urls is None
-            or self.file_binary is None
         ):
             raise ValueError("Upload parameters not initialized")
 
-        for clip in range(self.__clips):
-            start_range = clip * self.__per_size
-            end_range = (clip + 1) * self.__per_size
-            logger.info(f"开始上传分片{clip}: {start_range}-{end_range}")
-            resp = requests.put(
-                self.__upload_urls[clip],
-                data=self.file_binary[start_range:end_range],
-                headers=self.headers,
+        per_size = self.__per_size
+        upload_urls = self.__upload_urls
+        client = get_async_client()
+        semaphore = asyncio.Semaphore(UPLOAD_WORKERS)
+
+        with self.audio_view() as view:
+
+            async def upload_clip(clip: int) -> Optional[str]:
+                start_range = clip * per_size
+                end_range = (clip + 1) * per_size
+                async with semaphore:
+                    logger.info(f"开始上传分片{clip}: {start_range}-{end_range}")
+                    # 直接发送分片的内存视图，不复制分片数据；上传后立即释放切片
+                    with MemoryViewStream(view[start_range:end_range]) as body:
+                        resp = await client.put(
+                            upload_urls[clip],
+                            content=body,
+                            headers={**self.headers, **body.headers()},
+                        )
+                resp.raise_for_status()
+                etag = resp.headers.get("Etag")
+                logger.info(f"分片{clip}上传成功: {etag}")
+                return etag
+
+            # 分片并发上传，Etag 按分片顺序提交
+            start_time = time.time()
+            etags = await asyncio.gather(
+                *(upload_clip(clip) for clip in range(self.__clips))
+            )
+            self.__etags = [etag for etag in etags if etag is not None]
+            elapsed = time.time() - start_time
+            logger.info(
+                f"分片上传完成, 耗时 {elapsed:.2f}s, "
+                f"{self.file_size / 1024 / 1024 / max(elapsed, 1e-6):.2f}MB/s"
             )
-            resp.raise_for_status()
-            etag = resp.headers.get("Etag")
-            if etag is not None:
-                self.__etags.append(etag)
-            logger.info(f"分片{clip}上传成功: {etag}")
 
-    def __commit_upload(self) -> None:
+    async def __commit_upload(self) -> None:
         """提交上传数据"""
         data = json.dumps(
             {
@@ -121,16 +161,18 @@ class BcutASR(BaseASR):
                 "model_id": "8",
             }
         )
-        resp = requests.post(API_COMMIT_UPLOAD, data=data, headers=self.headers)
+        resp = await get_async_client().post(
+            self._api_url(API_COMMIT_UPLOAD), content=data, headers=self.headers
+        )
         resp.raise_for_status()
         resp = resp.json()
         self.__download_url = resp["data"]["download_url"]
         logger.info("提交成功")
 
-    def create_task(self) -> str:
+    async def create_task(self) -> str:
         """开始创建转换任务"""
-        resp = requests.post(
-            API_CREATE_TASK,
+        resp = await get_async_client().post(
+            self._api_url(API_CREATE_TASK),
             json={"resource": self.__download_url, "model_id": "8"},
             headers=self.headers,
         )
@@ -140,10 +182,10 @@ class BcutASR(BaseASR):
         logger.info(f"任务已创建: {self.task_id}")
         return self.task_id or ""
 
-    def result(self, task_id: Optional[str] = None):
+    async def result(self, task_id: Optional[str] = None):
         """查询转换结果"""
-        resp = requests.get(
-            API_QUERY_RESULT,
+        resp = await get_async_client().get(
+            self._api_url(API_QUERY_RESULT),
             params={"model_id": 7, "task_id": task_id or self.task_id},
             headers=self.headers,
         )
@@ -151,7 +193,7 @@ class BcutASR(BaseASR):
         resp = resp.json()
         return resp["data"]
 
-    def _run(
+    async def _arun(
         self, callback: Optional[Callable[[int, str], None]] = None, **kwargs: Any
     ) -> dict:
         def _default_callback(x, y):
@@ -161,26 +203,40 @@ class BcutASR(BaseASR):
             callback = _default_callback
 
         callback(0, "上传中")
-        self.upload()
+        with self._track("upload", bytes=self.file_size):
+            await self.upload()
 
         callback(40, "创建任务中")
 
-        self.create_task()
+        with self._track("submit"):
+            await self.create_task()
 
         callback(60, "正在转录")
 
-        # 轮询检查任务状态
-        for _ in range(500):
-            task_resp = self.result()
-            if task_resp["state"] == 4:
-                break
-            time.sleep(1)
+        with self._track("wait"):
+            task_resp = await self._wait_result()
 
         callback(100, "转录成功")
 
         logger.info("转换成功")
         return json.loads(task_resp["result"])
 
+    async def _wait_result(self) -> dict:
+        """轮询任务状态直到完成，轮询间隔指数退避"""
+        interval = POLL_INTERVAL_MIN
+        deadline = time.time() + POLL_TIMEOUT
+        while True:
+            task_resp = await self.result()
+            state = task_resp["state"]
+            if state == TASK_STATE_COMPLETE:
+                return task_resp
+            if state == TASK_STATE_ERROR:
+                raise RuntimeError(f"必剪转录任务失败: {task_resp.get('remark')}")
+            if time.time() + interval > deadline:
+                raise TimeoutError(f"等待必剪转录结果超时: {self.task_id}")
+            await asyncio.sleep(interval)
+            interval = min(interval * POLL_BACKOFF, POLL_INTERVAL_MAX)
+
     def _make_segments(self, resp_data: dict) -> List[ASRDataSeg]:
         if self.need_word_time_stamp:
             return [
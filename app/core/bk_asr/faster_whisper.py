@@ -5,7 +5,7 @@ import shutil
 import subprocess
 import tempfile
 from pathlib import Path
-from typing import List, Optional, Callable, Any
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 
 from ..utils.logger import setup_logger
 from ..utils.subprocess_helper import StreamReader
@@ -103,8 +103,13 @@ class FasterWhisperASR(BaseASR):
                 )
             self.faster_whisper_program = "faster-whisper-xxl"
 
-    def _build_command(self, audio_path: str) -> List[str]:
-        """构建命令行参数"""
+    def _build_command(self, audio_path: Union[str, List[str]]) -> List[str]:
+        """构建命令行参数
+
+        Args:
+            audio_path: 音频文件路径，传入列表时一次调用处理多个文件
+        """
+        audio_paths = [audio_path] if isinstance(audio_path, str) else audio_path
 
         cmd = [
             str(self.faster_whisper_program),
@@ -119,9 +124,9 @@ class FasterWhisperASR(BaseASR):
             cmd.extend(["--model_dir", str(self.model_dir)])
 
         # 基本参数
+        cmd.extend([str(path) for path in audio_paths])
         cmd.extend(
             [
-                str(audio_path),
                 "-l",
                 self.language,
                 "-d",
@@ -214,91 +219,225 @@ class FasterWhisperASR(BaseASR):
         if callback is None:
             callback = _default_callback
 
-        with tempfile.TemporaryDirectory() as temp_path:
-            temp_dir = Path(temp_path)
-            wav_path = temp_dir / "audio.wav"
-            output_path = wav_path.with_suffix(".srt")
+        # 单个文件没有输出时 _transcribe_files 直接抛出异常
+        return self._transcribe_files([self], callback)[0]  # type: ignore
 
-            if isinstance(self.audio_path, str):
-                shutil.copy2(self.audio_path, wav_path)
-            else:
-                if self.file_binary:
-                    wav_path.write_bytes(self.file_binary)
-                else:
-                    raise ValueError("No audio data available")
+    @classmethod
+    def run_batch(
+        cls,
+        asr_list: List["FasterWhisperASR"],
+        callback: Optional[Callable[[int, str], None]] = None,
+        on_result: Optional[Callable[[int, Union[ASRData, Exception]], None]] = None,
+    ) -> List[Union[ASRData, Exception]]:
+        """批量转录多个音频，命令参数相同的音频合并为一次程序调用，只加载一次模型
 
-            cmd = self._build_command(str(wav_path))
+        单个音频失败不影响同组的其他音频；每个音频的结果写出后立即回调，
+        无需等待整组完成。
 
-            logger.info("Faster Whisper 执行命令: %s", " ".join(cmd))
-            callback(5, "Whisper识别")
+        Args:
+            asr_list: 待转录的 FasterWhisperASR 实例列表
+            callback: 整体进度回调函数
+            on_result: 每个音频完成或失败时回调 (序号, 转录结果或异常)
 
-            self.process = subprocess.Popen(
-                cmd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-                text=True,
-                encoding="utf-8",
-                errors="ignore",
-                creationflags=subprocess.CREATE_NO_WINDOW if os.name == "nt" else 0,
-            )
+        Returns:
+            与 asr_list 顺序一致的列表，失败的音频为对应的异常
+        """
+
+        def _default_callback(x, y):
+            pass
+
+        if callback is None:
+            callback = _default_callback
+
+        results: List[Optional[Union[ASRData, Exception]]] = [None] * len(asr_list)
 
-            # 使用 StreamReader 处理输出
-            reader = StreamReader(self.process)
-            reader.start_reading()
+        def set_result(i: int, result: Union[ASRData, Exception]):
+            results[i] = result
+            if on_result:
+                on_result(i, result)
 
-            is_finish = False
-            error_msg = ""
+        # 先读取缓存，再按命令参数分组
+        groups: Dict[Tuple[str, ...], List[int]] = {}
+        for i, asr in enumerate(asr_list):
+            if asr.use_cache:
+                cached_result = asr.cache_manager.get_asr_result(
+                    asr._get_key(), cls.__name__
+                )
+                if cached_result:
+                    set_result(i, ASRData(asr._make_segments(cached_result)))
+                    continue
+            groups.setdefault(tuple(asr._build_command("")), []).append(i)
+        logger.info(
+            f"Faster Whisper 批量转录: {len(asr_list)} 个文件, "
+            f"缓存命中 {sum(r is not None for r in results)}, 分为 {len(groups)} 组"
+        )
+
+        done_count = len(asr_list) - sum(len(indexes) for indexes in groups.values())
+        for indexes in groups.values():
+
+            def group_callback(progress: int, message: str, count=len(indexes)):
+                finished = done_count + progress / 100 * count
+                total = int(finished * 100 / len(asr_list))
+                callback(total, f"{total} %")
+
+            def on_file(k: int, srt_text: str, indexes=indexes):
+                i = indexes[k]
+                asr = asr_list[i]
+                if asr.use_cache:
+                    asr.cache_manager.set_asr_result(
+                        asr._get_key(), cls.__name__, srt_text
+                    )
+                set_result(i, ASRData(asr._make_segments(srt_text)))
+
+            try:
+                cls._transcribe_files(
+                    [asr_list[i] for i in indexes], group_callback, on_file
+                )
+            except Exception as e:
+                logger.error(f"Faster Whisper 批量转录失败: {e}")
+                error: Exception = e
+            else:
+                error = RuntimeError("Faster Whisper 没有输出该音频的字幕")
+            for i in indexes:
+                if results[i] is None:
+                    set_result(i, error)
+            done_count += len(indexes)
+
+        callback(100, "识别完成")
+        return results  # type: ignore
+
+    @staticmethod
+    def _transcribe_files(
+        asr_list: List["FasterWhisperASR"],
+        callback: Callable[[int, str], None],
+        on_file: Optional[Callable[[int, str], None]] = None,
+    ) -> List[Optional[str]]:
+        """使用一次程序调用转录多个音频（命令参数须相同）
+
+        Args:
+            on_file: 每个音频的字幕写出后立即回调 (序号, SRT文本)
+
+        Returns:
+            与 asr_list 顺序一致的SRT文本列表，没有输出字幕的音频为 None
+
+        Raises:
+            RuntimeError: 所有音频都没有输出字幕
+        """
+        with tempfile.TemporaryDirectory() as temp_path:
+            temp_dir = Path(temp_path)
+            wav_paths = []
+            owner = asr_list[0]
+            with owner._track("convert", bytes=sum(asr.file_size for asr in asr_list)):
+                for i, asr in enumerate(asr_list):
+                    suffix = (
+                        Path(asr.audio_path).suffix
+                        if isinstance(asr.audio_path, str)
+                        else ".wav"
+                    )
+                    wav_path = temp_dir / f"audio_{i:04d}{suffix}"
+                    asr._link_audio(wav_path)
+                    wav_paths.append(wav_path)
+            output_paths = [wav_path.with_suffix(".srt") for wav_path in wav_paths]
+            srt_texts: List[Optional[str]] = [None] * len(output_paths)
+
+            def collect_outputs():
+                """读取新写出的字幕文件"""
+                for k, path in enumerate(output_paths):
+                    if srt_texts[k] is None and path.exists():
+                        srt_texts[k] = path.read_text(encoding="utf-8")
+                        if on_file:
+                            on_file(k, srt_texts[k])  # type: ignore
+
+            cmd = owner._build_command([str(wav_path) for wav_path in wav_paths])
 
-            # 实时处理输出
-            while True:
-                # 检查进程状态
-                if self.process.poll() is not None:
-                    # 进程已结束，读取剩余输出
-                    for stream_name, line in reader.get_remaining_output():
+            logger.info("Faster Whisper 执行命令: %s", " ".join(cmd))
+            callback(5, "Whisper识别")
+
+            with owner._track("inference", files=len(asr_list)):
+                process = subprocess.Popen(
+                    cmd,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.STDOUT,
+                    text=True,
+                    encoding="utf-8",
+                    errors="ignore",
+                    creationflags=subprocess.CREATE_NO_WINDOW if os.name == "nt" else 0,
+                )
+                for asr in asr_list:
+                    asr.process = process
+
+                # 使用 StreamReader 处理输出
+                reader = StreamReader(process)
+                reader.start_reading()
+
+                is_finish = False
+                error_msg = ""
+                # 多文件时按已完成的文件数换算整体进度
+                finished_count = 0
+                file_count = len(asr_list)
+
+                # 实时处理输出
+                while True:
+                    # 检查进程状态
+                    if process.poll() is not None:
+                        # 进程已结束，读取剩余输出
+                        for stream_name, line in reader.get_remaining_output():
+                            line = line.strip()
+                            if line:
+                                if "error" in line:
+                                    error_msg += line
+                                else:
+                                    logger.info(line)
+                        break
+
+                    # 读取输出
+                    output = reader.get_output(timeout=0.1)
+                    if output:
+                        stream_name, line = output
                         line = line.strip()
                         if line:
+                            # 解析进度百分比
+                            if match := re.search(r"(\d+)%", line):
+                                progress = int(match.group(1))
+                                if progress == 100 and finished_count + 1 >= file_count:
+                                    is_finish = True
+                                overall = (finished_count * 100 + progress) / file_count
+                                mapped_progress = int(5 + (overall * 0.9))
+                                callback(mapped_progress, f"{mapped_progress} %")
+                            if "Subtitles are written to" in line:
+                                collect_outputs()
+                                finished_count += 1
+                                if finished_count >= file_count:
+                                    is_finish = True
+                                    callback(100, "识别完成")
                             if "error" in line:
                                 error_msg += line
+                                logger.error(line)
                             else:
                                 logger.info(line)
-                    break
-
-                # 读取输出
-                output = reader.get_output(timeout=0.1)
-                if output:
-                    stream_name, line = output
-                    line = line.strip()
-                    if line:
-                        # 解析进度百分比
-                        if match := re.search(r"(\d+)%", line):
-                            progress = int(match.group(1))
-                            if progress == 100:
-                                is_finish = True
-                            mapped_progress = int(5 + (progress * 0.9))
-                            callback(mapped_progress, f"{mapped_progress} %")
-                        if "Subtitles are written to" in line:
-                            is_finish = True
-                            callback(100, "识别完成")
-                        if "error" in line:
-                            error_msg += line
-                            logger.error(line)
-                        else:
-                            logger.info(line)
-
-            logger.info("Faster Whisper 返回值: %s", self.process.returncode)
-            if not is_finish:
-                logger.error("Faster Whisper 错误: %s", error_msg)
-                raise RuntimeError(error_msg)
+
+            logger.info("Faster Whisper 返回值: %s", process.returncode)
+            collect_outputs()
+            if not any(text is not None for text in srt_texts):
+                if not is_finish:
+                    logger.error("Faster Whisper 错误: %s", error_msg)
+                    raise RuntimeError(error_msg)
+                raise RuntimeError(
+                    f"Faster Whisper 输出文件不存在: {[str(p) for p in output_paths]}"
+                )
 
             # 判断是否识别成功
-            if not output_path.exists():
-                raise RuntimeError(f"Faster Whisper 输出文件不存在: {output_path}")
+            missing = [
+                str(path) for path, text in zip(output_paths, srt_texts) if text is None
+            ]
+            if missing:
+                logger.error(f"Faster Whisper 输出文件不存在: {missing} {error_msg}")
 
             logger.info("Faster Whisper 识别完成")
 
             callback(100, "识别完成")
 
-            return output_path.read_text(encoding="utf-8")
+            return srt_texts
 
     def _get_key(self):
         """获取缓存key"""
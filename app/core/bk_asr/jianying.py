@@ -2,21 +2,98 @@ import datetime
 import hashlib
 import hmac
 import json
-import os
+import threading
 import time
 import uuid
+import zlib
 from typing import Dict, Tuple, Union, Optional, Callable, Any, List
 
-import requests
+import httpx
 
 from app.config import VERSION
 
+from ..utils.async_http import MemoryViewStream, get_async_client
 from ..utils.logger import setup_logger
 from .asr_data import ASRDataSeg
 from .base import BaseASR
 
 logger = setup_logger("jianying_asr")
 
+API_BASE_URL = "https://lv-pc-api-sinfonlinec.ulikecam.com"
+SIGN_URL = "https://asrtools-update.bkfeng.top/sign"
+# 申请上传地址的 VOD 接口
+VOD_API_URL = "https://vod.bytedanceapi.com/"
+# 上传主机的协议
+UPLOAD_URL_SCHEME = "https"
+# 签名结果与设备时间绑定，短时间内可复用
+SIGN_TTL = 60
+# 上传凭证（STS临时密钥）的复用时长
+UPLOAD_TOKEN_TTL = 600
+# 分片上传的分片大小
+UPLOAD_PART_SIZE = 5 * 1024 * 1024
+# 签名或令牌失效时的 HTTP 状态码及错误信息关键字，仅这类错误刷新凭据后重试
+CREDENTIAL_ERROR_STATUS = (401, 403)
+CREDENTIAL_ERROR_KEYWORDS = ("sign", "token", "expire", "签名", "过期")
+# VOD 接口中表示上传凭证（STS临时密钥）无效或过期的错误码
+UPLOAD_CREDENTIAL_ERROR_CODES = (
+    "InvalidAccessKey",
+    "InvalidCredential",
+    "InvalidAuthorization",
+    "InvalidSecurityToken",
+    "ExpiredSecurityToken",
+    "SignatureDoesNotMatch",
+    "MissingAuthenticationToken",
+)
+
+
+class UploadCredentialError(Exception):
+    """VOD 接口拒绝上传凭证，刷新凭证后可重试"""
+
+
+class CredentialCache:
+    """线程安全的签名与上传凭证缓存，所有 JianYingASR 实例共享"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._signs: Dict[Tuple[str, str], Tuple[str, str, float]] = {}
+        self._upload_token: Optional[Tuple[str, str, str, float]] = None
+
+    def get_sign(self, url: str, tdid: str) -> Optional[Tuple[str, str]]:
+        with self._lock:
+            cached = self._signs.get((url, tdid))
+            if cached and cached[2] > time.time():
+                return cached[0], cached[1]
+            return None
+
+    def set_sign(self, url: str, tdid: str, sign: str, device_time: str):
+        with self._lock:
+            self._signs[(url, tdid)] = (sign, device_time, time.time() + SIGN_TTL)
+
+    def get_upload_token(self) -> Optional[Tuple[str, str, str]]:
+        with self._lock:
+            token = self._upload_token
+            if token and token[3] > time.time():
+                return token[0], token[1], token[2]
+            return None
+
+    def set_upload_token(self, access_key: str, secret_key: str, session_token: str):
+        with self._lock:
+            self._upload_token = (
+                access_key,
+                secret_key,
+                session_token,
+                time.time() + UPLOAD_TOKEN_TTL,
+            )
+
+    def invalidate(self):
+        """服务端拒绝时清空缓存，下次重新获取"""
+        with self._lock:
+            self._signs.clear()
+            self._upload_token = None
+
+
+credential_cache = CredentialCache()
+
 
 class JianYingASR(BaseASR):
     def __init__(
@@ -46,10 +123,40 @@ class JianYingASR(BaseASR):
 
         self.need_word_time_stamp = need_word_time_stamp
         self.tdid = self._get_tid()
+        # 各分片的 CRC32，提交上传时使用
+        self.part_crcs: List[str] = []
 
-    def submit(self) -> str:
+    async def _signed_post(
+        self, path: str, raise_for_status: bool = False, **kwargs: Any
+    ) -> dict:
+        """携带签名请求剪映接口，签名或令牌失效时刷新后重试一次
+
+        Args:
+            path: 接口路径
+            raise_for_status: 是否在 HTTP 状态码错误时抛出异常
+        """
+        for attempt in range(2):
+            sign, device_time = await self._generate_sign_parameters(
+                url=path, pf="4", appvr="6.6.0", tdid=self.tdid
+            )
+            headers = self._build_headers(device_time, sign)
+            response = await get_async_client().post(
+                API_BASE_URL + path, headers=headers, **kwargs
+            )
+            if not attempt and _is_credential_error(response):
+                logger.info(
+                    f"签名或令牌失效(HTTP {response.status_code}: {response.text[:200]})，"
+                    "刷新凭据后重试"
+                )
+                credential_cache.invalidate()
+                continue
+            if raise_for_status:
+                response.raise_for_status()
+            return response.json()
+        return response.json()
+
+    async def submit(self) -> str:
         """Submit the task"""
-        url = "https://lv-pc-api-sinfonlinec.ulikecam.com/lv/v1/audio_subtitle/submit"
         payload = {
             "adjust_endtime": 200,
             "audio": self.store_uri,
@@ -62,12 +169,9 @@ class JianYingASR(BaseASR):
             "words_per_line": 16,
         }
 
-        sign, device_time = self._generate_sign_parameters(
-            url="/lv/v1/audio_subtitle/submit", pf="4", appvr="6.6.0", tdid=self.tdid
+        resp_data = await self._signed_post(
+            "/lv/v1/audio_subtitle/submit", json=payload
         )
-        headers = self._build_headers(device_time, sign)
-        response = requests.post(url, json=payload, headers=headers)
-        resp_data = response.json()
 
         if resp_data.get("ret") != "0":
             error_msg = f"API Error: {resp_data.get('errmsg', 'Unknown error')} (ret: {resp_data.get('ret')})"
@@ -77,25 +181,28 @@ class JianYingASR(BaseASR):
         query_id = resp_data["data"]["id"]
         return query_id
 
-    def upload(self):
+    async def upload(self):
         """Upload the file"""
-        self._upload_sign()
-        self._upload_auth()
-        self._upload_file()
-        self._upload_check()
-        uri = self._upload_commit()
-        return uri
-
-    def query(self, query_id: str):
+        with self._track("auth"):
+            await self._upload_sign()
+            try:
+                await self._upload_auth()
+            except UploadCredentialError as e:
+                # 缓存的上传凭证已失效，重新获取后重试
+                logger.info(f"上传凭证无效({e})，刷新上传凭证后重试")
+                credential_cache.invalidate()
+                await self._upload_sign()
+                await self._upload_auth()
+        with self._track("upload", bytes=self.file_size):
+            await self._upload_file()
+            # 分片在 _upload_check 中合并提交，完成后即可用 store_uri 提交任务
+            await self._upload_check()
+        return self.store_uri
+
+    async def query(self, query_id: str):
         """Query the task"""
-        url = "https://lv-pc-api-sinfonlinec.ulikecam.com/lv/v1/audio_subtitle/query"
         payload = {"id": query_id, "pack_options": {"need_attribute": True}}
-        sign, device_time = self._generate_sign_parameters(
-            url="/lv/v1/audio_subtitle/query", pf="4", appvr="6.6.0", tdid=self.tdid
-        )
-        headers = self._build_headers(device_time, sign)
-        response = requests.post(url, json=payload, headers=headers)
-        resp_data = response.json()
+        resp_data = await self._signed_post("/lv/v1/audio_subtitle/query", json=payload)
 
         if resp_data.get("ret") != "0":
             error_msg = f"API Error: {resp_data.get('errmsg', 'Unknown error')} (ret: {resp_data.get('ret')})"
@@ -104,23 +211,25 @@ class JianYingASR(BaseASR):
 
         return resp_data
 
-    def _run(
+    async def _arun(
         self, callback: Optional[Callable[[int, str], None]] = None, **kwargs: Any
     ) -> dict:
         if callback:
             callback(20, "正在上传...")
         logger.info("正在上传文件...")
-        self.upload()
+        await self.upload()
 
         if callback:
             callback(50, "提交任务...")
         logger.info("提交任务...")
-        query_id = self.submit()
+        with self._track("submit"):
+            query_id = await self.submit()
 
         if callback:
             callback(60, "获取结果...")
         logger.info("获取结果...")
-        resp_data = self.query(query_id)
+        with self._track("wait"):
+            resp_data = await self.query(query_id)
 
         if callback:
             callback(100, "转录完成")
@@ -150,10 +259,13 @@ class JianYingASR(BaseASR):
         ed = "3278516897751" if int(i) % 2 != 0 else f"{uuid.getnode():013d}"
         return f"{fr}{ed}"
 
-    def _generate_sign_parameters(
+    async def _generate_sign_parameters(
         self, url: str, pf: str = "4", appvr: str = "6.6.0", tdid=""
     ) -> Tuple[str, str]:
         """Generate signature and timestamp via an HTTP request"""
+        cached = credential_cache.get_sign(url, self.tdid)
+        if cached:
+            return cached
         current_time = str(int(time.time()))
         data = {
             "url": url,
@@ -167,19 +279,20 @@ class JianYingASR(BaseASR):
             "tdid": self.tdid,
             "t": current_time,
         }
-        # Replace with your actual endpoint URL
-        get_sign_url = "https://asrtools-update.bkfeng.top/sign"
         try:
-            response = requests.post(get_sign_url, json=data, headers=headers)
+            response = await get_async_client().post(
+                SIGN_URL, json=data, headers=headers
+            )
             response.raise_for_status()
             response_data = response.json()
             sign = response_data.get("sign")
             if not sign:
                 raise ValueError("No 'sign' in response")
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             raise SystemExit(f"HTTP Request failed: {e}")
         except ValueError as ve:
             raise SystemExit(f"Invalid response: {ve}")
+        credential_cache.set_sign(url, self.tdid, sign.lower(), current_time)
         return sign.lower(), current_time
 
     def _build_headers(self, device_time: str, sign: str) -> Dict[str, str]:
@@ -194,37 +307,35 @@ class JianYingASR(BaseASR):
             "tdid": self.tdid,
         }
 
-    def _uplosd_headers(self):
+    def _uplosd_headers(self, crc32_hex: Optional[str] = None):
         headers = {
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/81.0.4044.138 Safari/537.36 Thea/1.0.1",
             "Authorization": self.auth,
-            "Content-CRC32": self.crc32_hex,
+            "Content-CRC32": crc32_hex or self.crc32_hex,
         }
         return headers
 
-    def _upload_sign(self):
+    async def _upload_sign(self):
         """Get upload sign"""
-        url = "https://lv-pc-api-sinfonlinec.ulikecam.com/lv/v1/upload_sign"
+        token = credential_cache.get_upload_token()
+        if token:
+            self.access_key, self.secret_key, self.session_token = token
+            return token
         payload = json.dumps({"biz": "pc-recognition"})
-        sign, device_time = self._generate_sign_parameters(
-            url="/lv/v1/upload_sign", pf="4", appvr="6.6.0", tdid=self.tdid
+        login_data = await self._signed_post(
+            "/lv/v1/upload_sign", raise_for_status=True, content=payload
         )
-        headers = self._build_headers(device_time, sign)
-        response = requests.post(url, data=payload, headers=headers)
-        response.raise_for_status()
-        login_data = response.json()
         self.access_key = login_data["data"]["access_key_id"]
         self.secret_key = login_data["data"]["secret_access_key"]
         self.session_token = login_data["data"]["session_token"]
+        credential_cache.set_upload_token(
+            self.access_key, self.secret_key, self.session_token
+        )
         return self.access_key, self.secret_key, self.session_token
 
-    def _upload_auth(self):
+    async def _upload_auth(self):
         """Get upload authorization"""
-        if isinstance(self.audio_path, bytes):
-            file_size = len(self.audio_path)
-        else:
-            file_size = os.path.getsize(self.audio_path)
-        request_parameters = f"Action=ApplyUploadInner&FileSize={file_size}&FileType=object&IsInner=1&SpaceName=lv-mac-recognition&Version=2020-11-19&s=5y0udbjapi"
+        request_parameters = f"Action=ApplyUploadInner&FileSize={self.file_size}&FileType=object&IsInner=1&SpaceName=lv-mac-recognition&Version=2020-11-19&s=5y0udbjapi"
 
         t = datetime.datetime.utcnow()
         amz_date = t.strftime("%Y%m%dT%H%M%SZ")
@@ -237,10 +348,16 @@ class JianYingASR(BaseASR):
         )
         authorization = f"AWS4-HMAC-SHA256 Credential={self.access_key}/{datestamp}/cn/vod/aws4_request, SignedHeaders=x-amz-date;x-amz-security-token, Signature={signature}"
         headers["authorization"] = authorization
-        response = requests.get(
-            f"https://vod.bytedanceapi.com/?{request_parameters}", headers=headers
+        response = await get_async_client().get(
+            f"{VOD_API_URL}?{request_parameters}", headers=headers
         )
         store_infos = response.json()
+        error = store_infos.get("ResponseMetadata", {}).get("Error")
+        if error:
+            message = f"{error.get('Code')}: {error.get('Message')}"
+            if error.get("Code") in UPLOAD_CREDENTIAL_ERROR_CODES:
+                raise UploadCredentialError(message)
+            raise RuntimeError(f"申请上传失败: {message}")
 
         self.store_uri = store_infos["Result"]["UploadAddress"]["StoreInfos"][0][
             "StoreUri"
@@ -256,30 +373,57 @@ class JianYingASR(BaseASR):
         ]
         return store_infos
 
-    def _upload_file(self):
-        """Upload the file"""
-        url = f"https://{self.upload_hosts}/{self.store_uri}?partNumber=1&uploadID={self.upload_id}"
-        headers = self._uplosd_headers()
-        response = requests.put(url, data=self.file_binary, headers=headers)
-        resp_data = response.json()
-        assert resp_data["success"] == 0, f"File upload failed: {response.text}"
+    async def _upload_file(self):
+        """Upload the file in parts"""
+        base_url = f"{UPLOAD_URL_SCHEME}://{self.upload_hosts}/{self.store_uri}"
+        self.part_crcs = []
+        resp_data: dict = {}
+        client = get_async_client()
+        with self.audio_view() as view:
+            # 按分片流式上传，直接发送分片的内存视图，不复制分片数据
+            for offset in range(0, max(len(view), 1), UPLOAD_PART_SIZE):
+                part_number = len(self.part_crcs) + 1
+                url = f"{base_url}?partNumber={part_number}&uploadID={self.upload_id}"
+                with MemoryViewStream(view[offset : offset + UPLOAD_PART_SIZE]) as body:
+                    crc32_hex = format(zlib.crc32(body.view) & 0xFFFFFFFF, "08x")
+                    response = await client.put(
+                        url,
+                        content=body,
+                        headers={**self._uplosd_headers(crc32_hex), **body.headers()},
+                    )
+                resp_data = response.json()
+                assert resp_data["success"] == 0, f"File upload failed: {response.text}"
+                self.part_crcs.append(crc32_hex)
+        logger.info(f"文件上传完成, 共 {len(self.part_crcs)} 个分片")
         return resp_data
 
-    def _upload_check(self):
+    async def _upload_check(self):
         """Check upload result"""
-        url = f"https://{self.upload_hosts}/{self.store_uri}?uploadID={self.upload_id}"
-        payload = f"1:{self.crc32_hex}"
+        url = (
+            f"{UPLOAD_URL_SCHEME}://{self.upload_hosts}/{self.store_uri}"
+            f"?uploadID={self.upload_id}"
+        )
+        payload = ",".join(
+            f"{i}:{crc32_hex}" for i, crc32_hex in enumerate(self.part_crcs, start=1)
+        )
         headers = self._uplosd_headers()
-        response = requests.post(url, data=payload, headers=headers)
+        response = await get_async_client().post(url, content=payload, headers=headers)
         resp_data = response.json()
         return resp_data
 
-    def _upload_commit(self):
-        """Commit the uploaded file"""
-        url = f"https://{self.upload_hosts}/{self.store_uri}?uploadID={self.upload_id}&partNumber=1&x-amz-security-token={self.session_token}"
-        headers = self._uplosd_headers()
-        requests.put(url, data=self.file_binary, headers=headers)
-        return self.store_uri
+
+def _is_credential_error(response: httpx.Response) -> bool:
+    """判断接口错误是否由签名或令牌失效引起，其他错误重试无意义"""
+    if response.status_code in CREDENTIAL_ERROR_STATUS:
+        return True
+    try:
+        resp_data = response.json()
+    except ValueError:
+        return False
+    if not isinstance(resp_data, dict) or resp_data.get("ret") in (None, "0"):
+        return False
+    errmsg = str(resp_data.get("errmsg", "")).lower()
+    return any(keyword in errmsg for keyword in CREDENTIAL_ERROR_KEYWORDS)
 
 
 def sign(key: bytes, msg: str) -> bytes:
@@ -0,0 +1,329 @@
+"""二进制字幕容器（.vcsub）：流水线各阶段之间传递字幕的中间格式
+
+文件布局（小端序，各段按 8 字节对齐）：
+
+    文件头   magic(4s) version(H) flags(H) 分段数(Q) 字词数(Q)
+    段目录   11 个 (偏移, 长度)，依次为：
+             元数据(JSON)、开始时间(q)、结束时间(q)、原文编号(I)、译文编号(I)、
+             字符串偏移(Q)、字符串表、分段字词范围(Q)、字词开始时间(q)、
+             字词结束时间(q)、字词文本编号(I)
+
+原文、译文和字词文本共用一张去重的字符串表，各列只保存字符串编号。字符串表为
+UTF-8 编码、以 \\0 结尾的字符串依次拼接，偏移数组比字符串多一项。
+读取时通过 mmap 映射文件，时间列直接以内存视图访问，文本在用到时才解码。
+"""
+
+import json
+import mmap
+import struct
+import sys
+from array import array
+from itertools import accumulate, chain
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from .subtitle_export import handle_long_path
+
+SUBTITLE_BINARY_SUFFIX = ".vcsub"
+
+MAGIC = b"VCSB"
+VERSION = 1
+# 文件中包含字词级子分段
+FLAG_WORDS = 1
+
+_HEADER = struct.Struct("<4sHHQQ")
+_SECTION = struct.Struct("<QQ")
+_SECTIONS = (
+    "metadata",
+    "starts",
+    "ends",
+    "text_ids",
+    "translated_ids",
+    "string_offsets",
+    "strings",
+    "word_index",
+    "word_starts",
+    "word_ends",
+    "word_text_ids",
+)
+_DATA_START = _HEADER.size + _SECTION.size * len(_SECTIONS)
+_LITTLE_ENDIAN = sys.byteorder == "little"
+
+# 字词级子分段：(文本, 开始时间, 结束时间)
+Word = Tuple[str, int, int]
+
+
+def _pad(size: int) -> int:
+    return -size % 8
+
+
+def _int_bytes(typecode: str, values) -> bytes:
+    data = array(typecode, values)
+    if not _LITTLE_ENDIAN:
+        data.byteswap()
+    return data.tobytes()
+
+
+def _string_sections(strings: Iterable[str]) -> Tuple[bytes, bytes]:
+    """编码字符串表，返回 (偏移数组, 字符串)；字符串中的 \\0 会被去除"""
+    encoded = [text.replace("\0", "").encode("utf-8") for text in strings]
+    blob = b"\0".join(encoded) + b"\0" if encoded else b""
+    offsets = accumulate(chain([0], (len(e) + 1 for e in encoded)))
+    return _int_bytes("Q", offsets), blob
+
+
+def write_subtitle_binary(
+    save_path: str,
+    texts: Sequence[str],
+    starts: Sequence[int],
+    ends: Sequence[int],
+    translated: Optional[Sequence[str]] = None,
+    words: Optional[Sequence[Sequence[Word]]] = None,
+    metadata: Optional[Dict[str, Any]] = None,
+) -> int:
+    """写出二进制字幕文件
+
+    Args:
+        save_path: 保存路径
+        texts: 各分段原文
+        starts: 各分段开始时间（毫秒）
+        ends: 各分段结束时间（毫秒）
+        translated: 各分段译文，为空时译文均为空字符串
+        words: 各分段的字词级子分段列表，为空时不写入字词
+        metadata: 元数据（需可 JSON 序列化）
+
+    Returns:
+        写入的字节数
+    """
+    count = len(texts)
+    if translated is None:
+        translated = [""] * count
+    if not (len(starts) == len(ends) == len(translated) == count):
+        raise ValueError("字幕各列长度不一致")
+    if words is not None and len(words) != count:
+        raise ValueError("字词列表与分段数量不一致")
+
+    # 字符串编号按首次出现的顺序分配，重复的文本（空译文、字词）只保存一次
+    string_ids: Dict[str, int] = {}
+    sections = {
+        "metadata": json.dumps(metadata or {}, ensure_ascii=False).encode("utf-8"),
+        "starts": _int_bytes("q", starts),
+        "ends": _int_bytes("q", ends),
+        "text_ids": _int_bytes(
+            "I", [string_ids.setdefault(t, len(string_ids)) for t in texts]
+        ),
+        "translated_ids": _int_bytes(
+            "I", [string_ids.setdefault(t, len(string_ids)) for t in translated]
+        ),
+    }
+    word_count = 0
+    if words is not None:
+        flat = [word for segment_words in words for word in segment_words]
+        word_count = len(flat)
+        sections.update(
+            word_index=_int_bytes("Q", accumulate(chain([0], (len(w) for w in words)))),
+            word_starts=_int_bytes("q", (w[1] for w in flat)),
+            word_ends=_int_bytes("q", (w[2] for w in flat)),
+            word_text_ids=_int_bytes(
+                "I", [string_ids.setdefault(w[0], len(string_ids)) for w in flat]
+            ),
+        )
+    sections["string_offsets"], sections["strings"] = _string_sections(string_ids)
+
+    directory = []
+    position = _DATA_START
+    for name in _SECTIONS:
+        data = sections.get(name, b"")
+        directory.append(_SECTION.pack(position, len(data)))
+        position += len(data) + _pad(len(data))
+
+    save_path = handle_long_path(save_path)
+    Path(save_path).parent.mkdir(parents=True, exist_ok=True)
+    with open(save_path, "wb") as f:
+        flags = FLAG_WORDS if words is not None else 0
+        f.write(_HEADER.pack(MAGIC, VERSION, flags, count, word_count))
+        f.write(b"".join(directory))
+        for name in _SECTIONS:
+            data = sections.get(name, b"")
+            f.write(data)
+            f.write(b"\0" * _pad(len(data)))
+    return position
+
+
+class SubtitleBinary:
+    """以 mmap 方式打开的二进制字幕文件
+
+    打开文件只读取文件头，时间列为指向映射内存的视图，文本和元数据在访问时才解码。
+    关闭后不能再访问；取得的视图在关闭时一并释放。
+
+    用法:
+        with SubtitleBinary(path) as subtitle:
+            for i in range(len(subtitle)):
+                print(subtitle.starts[i], subtitle.text(i))
+    """
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+        self._file = open(handle_long_path(file_path), "rb")
+        try:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # 空文件无法映射
+            self._file.close()
+            raise ValueError(f"不是有效的二进制字幕文件: {file_path}")
+        self._views: List[memoryview] = []
+        self._metadata: Optional[Dict[str, Any]] = None
+        self._strings: Optional[List[str]] = None
+        try:
+            self._parse_header()
+        except Exception:
+            self.close()
+            raise
+
+    def _parse_header(self) -> None:
+        if len(self._mmap) < _DATA_START:
+            raise ValueError(f"不是有效的二进制字幕文件: {self.file_path}")
+        magic, version, flags, count, word_count = _HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            raise ValueError(f"不是有效的二进制字幕文件: {self.file_path}")
+        if version > VERSION:
+            raise ValueError(f"不支持的二进制字幕版本: {version}")
+        self.flags = flags
+        self._count = count
+        self.word_count = word_count
+        self._sections: Dict[str, Tuple[int, int]] = {}
+        for i, name in enumerate(_SECTIONS):
+            offset, length = _SECTION.unpack_from(
+                self._mmap, _HEADER.size + i * _SECTION.size
+            )
+            if offset + length > len(self._mmap):
+                raise ValueError(f"二进制字幕文件已损坏: {self.file_path}")
+            self._sections[name] = (offset, length)
+
+        self.starts = self._int_column("starts", "q")
+        self.ends = self._int_column("ends", "q")
+        self._text_ids = self._int_column("text_ids", "I")
+        self._translated_ids = self._int_column("translated_ids", "I")
+        self._string_offsets = self._int_column("string_offsets", "Q")
+        if self.has_words:
+            self._word_index = self._int_column("word_index", "Q")
+            self._word_starts = self._int_column("word_starts", "q")
+            self._word_ends = self._int_column("word_ends", "q")
+            self._word_text_ids = self._int_column("word_text_ids", "I")
+
+    def _bytes(self, name: str) -> memoryview:
+        offset, length = self._sections[name]
+        view = memoryview(self._mmap)[offset : offset + length]
+        self._views.append(view)
+        return view
+
+    def _int_column(self, name: str, typecode: str) -> Sequence[int]:
+        if _LITTLE_ENDIAN:
+            column = self._bytes(name).cast(typecode)
+            self._views.append(column)
+            return column
+        # 大端序平台需要转换字节序，无法直接使用映射内存
+        return self._int_array(name, typecode)
+
+    def _int_array(self, name: str, typecode: str) -> array:
+        data = array(typecode)
+        data.frombytes(self._bytes(name))
+        if not _LITTLE_ENDIAN:
+            data.byteswap()
+        return data
+
+    def time_arrays(self) -> Tuple[array, array]:
+        """复制出 (开始时间, 结束时间) 数组，关闭文件后仍可使用"""
+        return self._int_array("starts", "q"), self._int_array("ends", "q")
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __enter__(self) -> "SubtitleBinary":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        for view in reversed(self._views):
+            view.release()
+        self._views.clear()
+        if not self._mmap.closed:
+            self._mmap.close()
+        self._file.close()
+
+    @property
+    def has_words(self) -> bool:
+        """是否包含字词级子分段"""
+        return bool(self.flags & FLAG_WORDS)
+
+    @property
+    def metadata(self) -> Dict[str, Any]:
+        if self._metadata is None:
+            offset, length = self._sections["metadata"]
+            raw = self._mmap[offset : offset + length]
+            self._metadata = json.loads(raw.decode("utf-8")) if raw else {}
+        return self._metadata
+
+    def _string(self, string_id: int) -> str:
+        """按编号解码字符串表中的一项"""
+        if self._strings is not None:
+            return self._strings[string_id]
+        base = self._sections["strings"][0]
+        offsets = self._string_offsets
+        return self._mmap[
+            base + offsets[string_id] : base + offsets[string_id + 1] - 1
+        ].decode("utf-8")
+
+    def strings(self) -> List[str]:
+        """整个字符串表，一次解码后缓存；之后的文本访问直接查表"""
+        if self._strings is None:
+            offset, length = self._sections["strings"]
+            strings = (
+                self._mmap[offset : offset + length].decode("utf-8").split("\0")
+                if length
+                else [""]
+            )
+            strings.pop()  # 最后一个 \0 之后的空字符串
+            self._strings = strings
+        return self._strings
+
+    def text(self, index: int) -> str:
+        """第 index 个分段的原文"""
+        return self._string(self._text_ids[index])
+
+    def translated(self, index: int) -> str:
+        """第 index 个分段的译文"""
+        return self._string(self._translated_ids[index])
+
+    def texts(self) -> List[str]:
+        """全部原文，相同的文本为同一个字符串对象"""
+        return list(map(self.strings().__getitem__, self._text_ids))
+
+    def translated_texts(self) -> List[str]:
+        """全部译文，相同的文本为同一个字符串对象"""
+        return list(map(self.strings().__getitem__, self._translated_ids))
+
+    def words(self, index: int) -> List[Word]:
+        """第 index 个分段的字词级子分段，文件不含字词时返回空列表"""
+        if not self.has_words:
+            return []
+        return [
+            (
+                self._string(self._word_text_ids[i]),
+                self._word_starts[i],
+                self._word_ends[i],
+            )
+            for i in range(self._word_index[index], self._word_index[index + 1])
+        ]
+
+    def rows(self) -> Iterator[Tuple[str, int, int, str]]:
+        """逐条产出 (原文, 开始时间, 结束时间, 译文)，文本逐条解码"""
+        for i in range(self._count):
+            yield self.text(i), self.starts[i], self.ends[i], self.translated(i)
+
+
+def is_subtitle_binary(file_path: str) -> bool:
+    """按后缀判断是否为二进制字幕文件"""
+    return Path(file_path).suffix.lower() == SUBTITLE_BINARY_SUFFIX
@@ -0,0 +1,256 @@
+"""字幕导出引擎：一次遍历字幕，同时写出多个 (格式, 布局) 目标文件
+
+每条字幕的时间戳和各布局的文本只格式化一次，再分别写入各目标文件的缓冲区。
+"""
+
+import json
+import os
+import platform
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import IO, Iterable, List, Optional, Tuple
+
+# 原文, 译文, 开始时间(毫秒), 结束时间(毫秒)
+ExportRow = Tuple[str, str, int, int]
+
+LAYOUTS = ["原文在上", "译文在上", "仅原文", "仅译文"]
+EXPORT_FORMATS = (".srt", ".txt", ".json", ".ass")
+# 每个目标文件的写缓冲区大小
+EXPORT_BUFFER_SIZE = 1024 * 1024
+
+DEFAULT_ASS_STYLE = (
+    "[V4+ Styles]\n"
+    "Format: Name,Fontname,Fontsize,PrimaryColour,SecondaryColour,OutlineColour,BackColour,"
+    "Bold,Italic,Underline,StrikeOut,ScaleX,ScaleY,Spacing,Angle,BorderStyle,Outline,Shadow,"
+    "Alignment,MarginL,MarginR,MarginV,Encoding\n"
+    "Style: Default,MicrosoftYaHei-Bold,40,&H00FFFFFF,&H000000FF,&H00000000,&H00000000,-1,0,0,0,100,100,"
+    "0,0,1,2,0,2,10,10,15,1\n"
+    "Style: Secondary,MicrosoftYaHei-Bold,30,&H00FFFFFF,&H000000FF,&H00000000,&H00000000,-1,0,0,0,100,100,"
+    "0,0,1,2,0,2,10,10,15,1"
+)
+
+_DIALOGUE_TEMPLATE = "Dialogue: 0,{},{},{},,0,0,0,,{}\n"
+
+
+def handle_long_path(path: str) -> str:
+    """处理Windows系统中的长路径问题
+
+    Args:
+        path: 原始路径
+
+    Returns:
+        处理后的路径
+    """
+    # 检查是否是Windows系统
+    if platform.system() == "Windows":
+        # 如果路径长度超过260个字符，添加\\?\前缀
+        if len(path) > 260 and not path.startswith("\\\\?\\"):
+            # 转换为绝对路径
+            abs_path = os.path.abspath(path)
+            return f"\\\\?\\{abs_path}"
+    return path
+
+
+def ms_to_srt_time(ms: int) -> str:
+    """Convert milliseconds to SRT time format (HH:MM:SS,mmm)"""
+    total_seconds, milliseconds = divmod(ms, 1000)
+    minutes, seconds = divmod(total_seconds, 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{int(hours):02}:{int(minutes):02}:{int(seconds):02},{int(milliseconds):03}"
+
+
+def ms_to_ass_time(ms: int) -> str:
+    """Convert milliseconds to ASS timestamp format (H:MM:SS.cc)"""
+    total_seconds, milliseconds = divmod(ms, 1000)
+    minutes, seconds = divmod(total_seconds, 60)
+    hours, minutes = divmod(minutes, 60)
+    centiseconds = int(milliseconds / 10)
+    return f"{int(hours):01}:{int(minutes):02}:{int(seconds):02}.{centiseconds:02}"
+
+
+def layout_text(layout: str, original: str, translated: str) -> str:
+    """按布局组织 SRT / TXT 中一条字幕的文本"""
+    if layout == "原文在上":
+        return f"{original}\n{translated}" if translated else original
+    if layout == "译文在上":
+        return f"{translated}\n{original}" if translated else original
+    if layout == "仅原文":
+        return original
+    if layout == "仅译文":
+        return translated if translated else original
+    return original
+
+
+def ass_dialogues(
+    layout: str, start_time: str, end_time: str, original: str, translated: str
+) -> str:
+    """按布局生成一条字幕的 ASS Dialogue 行，双语时副字幕使用 Secondary 样式"""
+    # 检查是否有译文
+    has_translation = bool(translated and translated.strip())
+
+    if layout == "译文在上" and has_translation:
+        return _DIALOGUE_TEMPLATE.format(
+            start_time, end_time, "Secondary", original
+        ) + _DIALOGUE_TEMPLATE.format(start_time, end_time, "Default", translated)
+    if layout == "原文在上" and has_translation:
+        return _DIALOGUE_TEMPLATE.format(
+            start_time, end_time, "Secondary", translated
+        ) + _DIALOGUE_TEMPLATE.format(start_time, end_time, "Default", original)
+    if layout in ("译文在上", "原文在上", "仅原文"):
+        return _DIALOGUE_TEMPLATE.format(start_time, end_time, "Default", original)
+    if layout == "仅译文":
+        text = translated if has_translation else original
+        return _DIALOGUE_TEMPLATE.format(start_time, end_time, "Default", text)
+    return ""
+
+
+def ass_header(style_str: Optional[str] = None) -> str:
+    """ASS 文件头，style_str 为空时使用默认样式"""
+    return (
+        "[Script Info]\n"
+        "; Script generated by VideoCaptioner\n"
+        "; https://github.com/weifeng2333\n"
+        "ScriptType: v4.00+\n"
+        "PlayResX: 1280\n"
+        "PlayResY: 720\n\n"
+        f"{style_str or DEFAULT_ASS_STYLE}\n\n"
+        "[Events]\n"
+        "Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text\n"
+    )
+
+
+def json_entry(index: int, original: str, translated: str, start: int, end: int) -> str:
+    """JSON 字幕中一条字幕的键值，格式与 json.dump 的默认输出一致"""
+    value = {
+        "start_time": start,
+        "end_time": end,
+        "original_subtitle": original,
+        "translated_subtitle": translated,
+    }
+    return f'"{index}": {json.dumps(value, ensure_ascii=False)}'
+
+
+@dataclass
+class ExportTarget:
+    """导出目标：格式由文件后缀决定（.srt / .txt / .json / .ass）"""
+
+    path: str
+    layout: str = "原文在上"
+    # 仅 ASS 使用，为空时使用默认样式
+    ass_style: Optional[str] = None
+
+    @property
+    def format(self) -> str:
+        for suffix in EXPORT_FORMATS:
+            if self.path.endswith(suffix):
+                return suffix[1:]
+        raise ValueError(f"Unsupported file extension: {self.path}")
+
+
+@dataclass
+class ExportStats:
+    """单个目标的导出结果"""
+
+    path: str
+    format: str
+    layout: str
+    bytes_written: int
+    # 写入该目标（含文件头尾、刷新和关闭）所用的时间，共享的格式化耗时不计入
+    seconds: float
+
+
+def export_rows(
+    rows: Iterable[ExportRow], targets: List[ExportTarget]
+) -> List[ExportStats]:
+    """一次遍历字幕行，写出所有目标文件
+
+    Args:
+        rows: (原文, 译文, 开始毫秒, 结束毫秒) 序列
+        targets: 导出目标列表
+
+    Returns:
+        与 targets 一一对应的导出结果
+
+    Raises:
+        ValueError: 存在不支持的文件格式（此时不会创建任何文件）
+    """
+    formats = [target.format for target in targets]
+    paths = [handle_long_path(target.path) for target in targets]
+    text_layouts = {
+        t.layout for t, fmt in zip(targets, formats) if fmt in ("srt", "txt")
+    }
+    ass_layouts = {t.layout for t, fmt in zip(targets, formats) if fmt == "ass"}
+    need_srt_time = "srt" in formats
+    need_json = "json" in formats
+    elapsed = [0.0] * len(targets)
+
+    files: List[IO[str]] = []
+    try:
+        for i, (target, fmt, path) in enumerate(zip(targets, formats, paths)):
+            started = time.perf_counter()
+            # 创建目录
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            f = open(path, "w", encoding="utf-8", buffering=EXPORT_BUFFER_SIZE)
+            files.append(f)
+            if fmt == "ass":
+                f.write(ass_header(target.ass_style))
+            elif fmt == "json":
+                f.write("{")
+            elapsed[i] += time.perf_counter() - started
+
+        writers = list(zip(range(len(targets)), files, formats, targets))
+        for n, (original, translated, start, end) in enumerate(rows, 1):
+            # 每条字幕的时间戳和文本只格式化一次，由所有目标共享
+            separator = "\n" if n > 1 else ""
+            srt_time = (
+                f"{ms_to_srt_time(start)} --> {ms_to_srt_time(end)}"
+                if need_srt_time
+                else ""
+            )
+            texts = {
+                layout: layout_text(layout, original, translated)
+                for layout in text_layouts
+            }
+            if ass_layouts:
+                ass_start, ass_end = ms_to_ass_time(start), ms_to_ass_time(end)
+                dialogues = {
+                    layout: ass_dialogues(
+                        layout, ass_start, ass_end, original, translated
+                    )
+                    for layout in ass_layouts
+                }
+            entry = json_entry(n, original, translated, start, end) if need_json else ""
+
+            for i, f, fmt, target in writers:
+                started = time.perf_counter()
+                if fmt == "srt":
+                    f.write(f"{separator}{n}\n{srt_time}\n{texts[target.layout]}\n")
+                elif fmt == "txt":
+                    f.write(f"{separator}{texts[target.layout]}")
+                elif fmt == "ass":
+                    f.write(dialogues[target.layout])
+                else:
+                    f.write(f"{', ' if n > 1 else ''}{entry}")
+                elapsed[i] += time.perf_counter() - started
+
+        for i, (f, fmt) in enumerate(zip(files, formats)):
+            started = time.perf_counter()
+            if fmt == "json":
+                f.write("}")
+            f.close()
+            elapsed[i] += time.perf_counter() - started
+    finally:
+        for f in files:
+            f.close()
+
+    return [
+        ExportStats(
+            path=target.path,
+            format=fmt,
+            layout=target.layout,
+            bytes_written=os.path.getsize(path),
+            seconds=seconds,
+        )
+        for target, fmt, path, seconds in zip(targets, formats, paths, elapsed)
+    ]
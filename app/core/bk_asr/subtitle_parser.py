@@ -0,0 +1,377 @@
+"""字幕文件的增量解析：按块读取文件，逐条产出字幕行，内存占用与文件大小无关
+
+每条字幕行为 (text, start_time, end_time, translated_text)，时间单位为毫秒。
+"""
+
+import codecs
+import json
+import re
+from itertools import chain, islice
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, TextIO, Tuple
+
+from .subtitle_binary import SUBTITLE_BINARY_SUFFIX, SubtitleBinary
+
+SubtitleRow = Tuple[str, int, int, str]
+
+# 每次读取的字符数
+CHUNK_SIZE = 64 * 1024
+# 检测编码和 YouTube VTT 格式时读取的文件前缀大小（字节/字符）
+PREFIX_SIZE = 64 * 1024
+# 判断 SRT 是否为双语字幕时参考的字幕块数
+SRT_SAMPLE_BLOCKS = 200
+
+_NON_SPACE = re.compile(r"\S")
+_SRT_SEPARATOR = re.compile(r"\n\s*\n")
+_VTT_SEPARATOR = re.compile(re.escape("\n\n"))
+_YOUTUBE_VTT_SEPARATOR = re.compile(r"\n\n+")
+
+_SRT_TIME_PATTERN = re.compile(
+    r"(\d{2}):(\d{2}):(\d{1,2})[.,](\d{3})\s-->\s(\d{2}):(\d{2}):(\d{1,2})[.,](\d{3})"
+)
+_VTT_TIME_PATTERN = re.compile(
+    r"(\d{2}):(\d{2}):(\d{2})\.(\d{3})\s*-->\s*(\d{2}):(\d{2}):(\d{2})\.(\d{3})"
+)
+_YOUTUBE_TIME_PATTERN = re.compile(
+    r"(\d{2}):(\d{2}):(\d{2}\.\d{3})\s*-->\s*(\d{2}):(\d{2}):(\d{2}\.\d{3})"
+)
+_YOUTUBE_WORD_PATTERN = re.compile(r"<(\d{2}:\d{2}:\d{2}\.\d{3})>([^<]*)")
+_ASS_DIALOGUE_PATTERN = re.compile(
+    r"Dialogue: \d+,(\d+:\d{2}:\d{2}\.\d{2}),(\d+:\d{2}:\d{2}\.\d{2}),(.*?),.*?,\d+,\d+,\d+,.*?,(.*?)$"
+)
+_ASS_MARKER = "Script generated by VideoCaptioner"
+
+
+def detect_encoding(file_path: str, prefix_size: int = PREFIX_SIZE) -> str:
+    """根据文件前缀检测编码：带 BOM 的 UTF-8/UTF-16，能按 UTF-8 解码则为 UTF-8，否则为 GBK"""
+    with open(file_path, "rb") as f:
+        prefix = f.read(prefix_size)
+    if prefix.startswith(codecs.BOM_UTF8):
+        return "utf-8-sig"
+    if prefix.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        return "utf-16"
+    try:
+        # 前缀末尾可能截断多字节字符，未读完文件时不要求完整解码
+        codecs.getincrementaldecoder("utf-8")().decode(
+            prefix, final=len(prefix) < prefix_size
+        )
+        return "utf-8"
+    except UnicodeDecodeError:
+        return "gbk"
+
+
+def open_subtitle(file_path: str, encoding: Optional[str] = None) -> TextIO:
+    """以指定编码（默认为按文件前缀检测到的编码）打开字幕文件，解码出错时抛出异常
+
+    前缀之后仍可能出现无法按 UTF-8 解码的内容，调用方需在读取时处理
+    UnicodeDecodeError，参见 iter_file_rows。
+    """
+    return open(file_path, encoding=encoding or detect_encoding(file_path))
+
+
+def _iter_chunks(f: TextIO) -> Iterator[str]:
+    return iter(lambda: f.read(CHUNK_SIZE), "")
+
+
+def split_blocks(
+    chunks: Iterable[str], separator: re.Pattern, strip: bool = False
+) -> Iterator[str]:
+    """按分隔符增量切分文本，结果与对完整文本执行 separator.split 相同
+
+    分隔符只由空白字符组成，其后出现非空白字符时不会再延伸，此时才产出前面的块，
+    因此缓冲区只保留最后一个未完成的块。
+
+    Args:
+        chunks: 文本块
+        separator: 分隔符正则
+        strip: 是否先去除整个文本首尾的空白，等同于 text.strip() 后再切分
+    """
+    buffer = ""
+    started = not strip
+    for chunk in chunks:
+        if not started:
+            chunk = chunk.lstrip()
+            started = bool(chunk)
+        buffer += chunk
+        pos = 0
+        for match in separator.finditer(buffer):
+            if not _NON_SPACE.search(buffer, match.end()):
+                break
+            yield buffer[pos : match.start()]
+            pos = match.end()
+        buffer = buffer[pos:]
+    if strip:
+        buffer = buffer.rstrip()
+    if buffer or not strip:
+        yield from separator.split(buffer)
+
+
+def _hms_to_ms(parts: List[int]) -> int:
+    hours, minutes, seconds, milliseconds = parts
+    return hours * 3600000 + minutes * 60000 + seconds * 1000 + milliseconds
+
+
+def iter_srt_rows(
+    blocks: Iterable[str], sample_blocks: Optional[int] = SRT_SAMPLE_BLOCKS
+) -> Iterator[SubtitleRow]:
+    """解析 SRT 字幕块
+
+    Args:
+        blocks: 以空行切分的字幕块
+        sample_blocks: 判断是否为双语字幕时参考的前若干块，None 表示参考全部字幕块
+    """
+    blocks = iter(blocks)
+    sample = list(blocks if sample_blocks is None else islice(blocks, sample_blocks))
+
+    # 如果超过98%的块都是4行，说明可能包含翻译文本
+    blocks_lines_count = [len(block.splitlines()) for block in sample]
+    has_translated_subtitle = (
+        len(blocks_lines_count) > 0
+        and all(count <= 4 for count in blocks_lines_count)
+        and sum(count == 4 for count in blocks_lines_count) / len(blocks_lines_count)
+        >= 0.98
+    )
+
+    for block in chain(sample, blocks):
+        lines = block.splitlines()
+        if len(lines) < 3:  # 至少需要3行：序号、时间戳和文本
+            continue
+
+        match = _SRT_TIME_PATTERN.match(lines[1])
+        if not match:
+            continue
+
+        time_parts = list(map(int, match.groups()))
+        translated_text = (
+            lines[3] if has_translated_subtitle and len(lines) >= 4 else ""
+        )
+        yield (
+            lines[2],
+            _hms_to_ms(time_parts[:4]),
+            _hms_to_ms(time_parts[4:]),
+            translated_text,
+        )
+
+
+def iter_vtt_rows(blocks: Iterable[str]) -> Iterator[SubtitleRow]:
+    """解析 VTT 字幕块（以 "\\n\\n" 切分）"""
+    # 跳过头部元数据
+    for block in islice(blocks, 2, None):
+        lines = block.strip().split("\n")
+        if len(lines) < 2:
+            continue
+
+        # 解析时间戳行
+        match = _VTT_TIME_PATTERN.match(lines[1])
+        if not match:
+            continue
+
+        time_parts = list(map(int, match.groups()))
+
+        # 处理文本内容
+        text_line = " ".join(lines[2:])
+        cleaned_text = re.sub(r"<\d{2}:\d{2}:\d{2}\.\d{3}>", "", text_line)
+        cleaned_text = re.sub(r"</?c>", "", cleaned_text)
+        cleaned_text = cleaned_text.strip()
+
+        if cleaned_text and cleaned_text != " ":
+            yield (
+                cleaned_text,
+                _hms_to_ms(time_parts[:4]),
+                _hms_to_ms(time_parts[4:]),
+                "",
+            )
+
+
+def _parse_timestamp(ts: str) -> int:
+    """将时间戳字符串转换为毫秒"""
+    h, m, s = ts.split(":")
+    return int(float(h) * 3600000 + float(m) * 60000 + float(s) * 1000)
+
+
+def iter_youtube_vtt_rows(blocks: Iterable[str]) -> Iterator[SubtitleRow]:
+    """解析 YouTube VTT 字幕块，提取字级时间戳"""
+    for block in blocks:
+        lines = block.strip().split("\n")
+        if not lines:
+            continue
+
+        match = _YOUTUBE_TIME_PATTERN.match(lines[0])
+        if not match:
+            continue
+
+        timestamp_row = re.search(r"\n(.*?<c>.*?</c>.*)", block)
+        if not timestamp_row:
+            continue
+        text = re.sub(r"<c>|</c>", "", timestamp_row.group(1))
+        block_start = f"{match.group(1)}:{match.group(2)}:{match.group(3)}"
+        block_end = f"{match.group(4)}:{match.group(5)}:{match.group(6)}"
+        text = f"<{block_start}>{text}<{block_end}>"
+
+        # 分离每个带时间戳的单词
+        matches = list(_YOUTUBE_WORD_PATTERN.finditer(text))
+        for current_match, next_match in zip(matches, matches[1:]):
+            word = current_match.group(2).strip()
+            if word:
+                yield (
+                    word,
+                    _parse_timestamp(current_match.group(1)),
+                    _parse_timestamp(next_match.group(1)),
+                    "",
+                )
+
+
+def _parse_ass_time(time_str: str) -> int:
+    """将ASS时间戳转换为毫秒"""
+    hours, minutes, seconds = time_str.split(":")
+    seconds, centiseconds = seconds.split(".")
+    return (
+        int(hours) * 3600000
+        + int(minutes) * 60000
+        + int(seconds) * 1000
+        + int(centiseconds) * 10
+    )
+
+
+def iter_ass_rows(lines: Iterable[str]) -> Iterator[SubtitleRow]:
+    """逐行解析 ASS 字幕
+
+    VideoCaptioner 生成的字幕中，相同时间戳的两行分别为原文和译文，配对后产出；
+    未配对的字幕在最后产出。
+    """
+    # 检查是否是VideoCaptioner生成的字幕，标记位于 [Events] 之前的头部
+    has_translation = False
+    # 相同时间戳的字幕：{(开始, 结束): [原文, 译文]}
+    temp_segments = {}
+
+    for line in lines:
+        if not line.startswith("Dialogue:"):
+            if _ASS_MARKER in line:
+                has_translation = True
+            continue
+        match = _ASS_DIALOGUE_PATTERN.match(line.rstrip("\r\n"))
+        if not match:
+            continue
+        start_time = _parse_ass_time(match.group(1))
+        end_time = _parse_ass_time(match.group(2))
+        style = match.group(3).strip()
+        text = re.sub(r"\{[^}]*\}", "", match.group(4))
+        text = text.replace("\\N", "\n").strip()
+
+        if not text:
+            continue
+
+        if not has_translation:
+            yield text, start_time, end_time, ""
+            continue
+
+        # 使用时间戳作为键
+        time_key = (start_time, end_time)
+        pair = temp_segments.pop(time_key, None)
+        is_new = pair is None
+        if is_new:
+            pair = ["", ""]
+        if style == "Default":
+            pair[1] = text
+        else:
+            pair[0] = text
+        if is_new:
+            temp_segments[time_key] = pair
+        else:
+            # 已存在相同时间戳的字幕，合并原文和译文
+            yield pair[0], start_time, end_time, pair[1]
+
+    # 处理剩余的未配对字幕
+    for (start_time, end_time), (text, translated_text) in temp_segments.items():
+        yield text, start_time, end_time, translated_text
+
+
+def iter_json_rows(json_data: dict) -> Iterator[SubtitleRow]:
+    """解析 VideoCaptioner 的 JSON 字幕数据"""
+    for i in sorted(json_data.keys(), key=int):
+        segment_data = json_data[i]
+        yield (
+            segment_data["original_subtitle"],
+            segment_data["start_time"],
+            segment_data["end_time"],
+            segment_data["translated_subtitle"],
+        )
+
+
+def iter_file_rows(file_path: str) -> Iterator[SubtitleRow]:
+    """增量解析字幕文件，支持 .srt、.vtt、.ass、.json 和二进制字幕 .vcsub
+
+    除 JSON 外，文件按块读取（二进制字幕按 mmap 逐条读取），解析出的字幕行立即产出。
+
+    Raises:
+        FileNotFoundError: 文件不存在
+        ValueError: 不支持的文件格式
+    """
+    path = Path(file_path)
+    if not path.exists():
+        raise FileNotFoundError(f"文件不存在: {path}")
+    suffix = path.suffix.lower()
+    if suffix == SUBTITLE_BINARY_SUFFIX:
+        with SubtitleBinary(str(path)) as subtitle:
+            yield from subtitle.rows()
+        return
+    if suffix not in (".srt", ".vtt", ".ass", ".json"):
+        raise ValueError(f"不支持的文件格式: {suffix}")
+
+    # 编码只按前缀检测，前缀之后出现无法按 UTF-8 解码的内容时改用 GBK 重新读取，
+    # 跳过已产出的字幕行（两种编码下 ASCII 内容相同，切分出的字幕块一致）
+    encoding = detect_encoding(str(path))
+    produced = 0
+    try:
+        with open_subtitle(str(path), encoding) as f:
+            for row in _iter_text_rows(f, suffix):
+                yield row
+                produced += 1
+        return
+    except UnicodeDecodeError:
+        if encoding != "utf-8":
+            raise
+    with open_subtitle(str(path), "gbk") as f:
+        yield from islice(_iter_text_rows(f, suffix), produced, None)
+
+
+def _iter_text_rows(f: TextIO, suffix: str) -> Iterator[SubtitleRow]:
+    """按文件格式解析已打开的文本字幕文件"""
+    if suffix == ".json":
+        yield from iter_json_rows(json.load(f))
+    elif suffix == ".ass":
+        yield from iter_ass_rows(f)
+    elif suffix == ".srt":
+        yield from iter_srt_rows(
+            split_blocks(_iter_chunks(f), _SRT_SEPARATOR, strip=True)
+        )
+    else:
+        prefix = f.read(PREFIX_SIZE)
+        chunks = chain([prefix], _iter_chunks(f))
+        if "<c>" in prefix:  # YouTube VTT格式包含字级时间戳
+            yield from iter_youtube_vtt_rows(
+                split_blocks(chunks, _YOUTUBE_VTT_SEPARATOR, strip=True)
+            )
+        else:
+            yield from iter_vtt_rows(split_blocks(chunks, _VTT_SEPARATOR))
+
+
+def srt_rows(srt_str: str) -> Iterator[SubtitleRow]:
+    """解析 SRT 字符串，双语判断参考全部字幕块"""
+    return iter_srt_rows(
+        split_blocks([srt_str], _SRT_SEPARATOR, strip=True), sample_blocks=None
+    )
+
+
+def vtt_rows(vtt_str: str) -> Iterator[SubtitleRow]:
+    return iter_vtt_rows(split_blocks([vtt_str], _VTT_SEPARATOR))
+
+
+def youtube_vtt_rows(vtt_str: str) -> Iterator[SubtitleRow]:
+    return iter_youtube_vtt_rows(
+        split_blocks([vtt_str], _YOUTUBE_VTT_SEPARATOR, strip=True)
+    )
+
+
+def ass_rows(ass_str: str) -> Iterator[SubtitleRow]:
+    return iter_ass_rows(ass_str.splitlines())
@@ -0,0 +1,121 @@
+"""ASR 各阶段耗时事件：记录起止时间、传输字节数和缓存命中情况，写入本次转录的 JSONL 文件"""
+
+import json
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+
+from ..utils.logger import setup_logger
+
+logger = setup_logger("asr_timing")
+
+
+@dataclass
+class TimingEvent:
+    """单个ASR阶段的耗时事件
+
+    phase 取值: hash(音频哈希)、cache(缓存查询)、convert(格式转换)、auth(鉴权)、
+    upload(上传)、submit(提交任务)、wait(排队及服务端推理)、
+    request(上传与服务端推理在同一请求中)、inference(本地推理)、
+    parse(结果解析)、total(整体)
+    """
+
+    backend: str
+    phase: str
+    start: float
+    end: float = 0.0
+    bytes: int = 0
+    cache_hit: Optional[bool] = None
+    audio_key: str = ""
+    extra: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data["duration"] = round(self.duration, 6)
+        return data
+
+
+class JsonlSink:
+    """逐行追加写入 JSONL 文件"""
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def emit(self, event: TimingEvent) -> None:
+        line = json.dumps(event.to_dict(), ensure_ascii=False)
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+
+# 当前转录的输出端，随上下文传递：并发的转录任务各自独立，未启用的任务不会写入
+_current_sink: ContextVar[Optional[JsonlSink]] = ContextVar(
+    "asr_timing_sink", default=None
+)
+# 同一文件共用一个输出端，并发写入时逐行串行
+_jsonl_sinks: Dict[Path, JsonlSink] = {}
+_jsonl_sinks_lock = threading.Lock()
+
+
+@contextmanager
+def jsonl_log(path: str, enabled: bool = True) -> Iterator[Optional[JsonlSink]]:
+    """在当前上下文（一次转录）中启用 JSONL 文件输出，退出时恢复
+
+    enabled 为 False 时在上下文中关闭输出，便于直接传入配置项；
+    在其他线程中执行的阶段需通过 contextvars.copy_context() 传递上下文。
+    """
+    sink = None
+    if enabled:
+        key = Path(path)
+        with _jsonl_sinks_lock:
+            sink = _jsonl_sinks.get(key)
+            if sink is None:
+                sink = _jsonl_sinks[key] = JsonlSink(path)
+    token = _current_sink.set(sink)
+    try:
+        yield sink
+    finally:
+        _current_sink.reset(token)
+
+
+def emit(event: TimingEvent):
+    """写入当前转录的输出端，写入失败不影响转录"""
+    sink = _current_sink.get()
+    if sink is None:
+        return
+    try:
+        sink.emit(event)
+    except Exception as e:
+        logger.warning(f"输出耗时事件失败: {e}")
+
+
+@contextmanager
+def track(
+    backend: str, phase: str, audio_key: str = "", bytes: int = 0, **extra: Any
+) -> Iterator[TimingEvent]:
+    """记录一个阶段的耗时，可在上下文中更新 bytes、cache_hit 等字段"""
+    event = TimingEvent(
+        backend=backend,
+        phase=phase,
+        start=time.time(),
+        bytes=bytes,
+        audio_key=audio_key,
+        extra=dict(extra),
+    )
+    try:
+        yield event
+    except BaseException as e:
+        event.extra["error"] = type(e).__name__
+        raise
+    finally:
+        event.end = time.time()
+        emit(event)
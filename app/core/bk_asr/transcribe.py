@@ -1,19 +1,51 @@
-from typing import Any, Dict
-from app.core.bk_asr.asr_data import ASRData
+import contextvars
+import tempfile
+import threading
+import wave
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type, Union
+
+from app.config import CACHE_PATH, LOG_PATH
+from app.core.bk_asr import timing
+from app.core.bk_asr.asr_data import ASRData, ASRDataSeg
+from app.core.bk_asr.base import BaseASR
 from app.core.bk_asr.bcut import BcutASR
 from app.core.bk_asr.faster_whisper import FasterWhisperASR
 from app.core.bk_asr.jianying import JianYingASR
 from app.core.bk_asr.whisper_api import WhisperAPI
 from app.core.bk_asr.whisper_cpp import WhisperCppASR
 from app.core.entities import TranscribeConfig, TranscribeModelEnum
+from app.core.storage.cache_manager import CacheManager
+from app.core.utils.audio_source import (
+    EXTRACT_PARAMS,
+    AudioSource,
+    media_fingerprint,
+)
+from app.core.utils.audio_utils import (
+    compute_cut_points,
+    detect_silences,
+    get_wav_duration_ms,
+    pcm_fingerprint,
+    split_wav,
+)
+from app.core.utils.logger import setup_logger
+
+logger = setup_logger("transcribe")
+
+# 相邻分块之间的重叠时长（毫秒），用于避免切分点处丢词
+CHUNK_OVERLAP_MS = 1000
+# 各阶段耗时事件输出文件
+TIMING_LOG_FILE = LOG_PATH / "asr_timing.jsonl"
 
 
-def transcribe(audio_path: str, config: TranscribeConfig, callback=None) -> ASRData:
+def transcribe(
+    audio_path: Union[str, AudioSource], config: TranscribeConfig, callback=None
+) -> ASRData:
     """
     使用指定的转录配置对音频文件进行转录
 
     Args:
-        audio_path: 音频文件路径
+        audio_path: 音频文件路径，或内存中的音频（仅在需要时写出为文件）
         config: 转录配置
         callback: 进度回调函数,接收两个参数(progress: int, message: str)
 
@@ -27,7 +59,203 @@ def transcribe(audio_path: str, config: TranscribeConfig, callback=None) -> ASRD
     if callback is None:
         callback = _default_callback
 
-    # 获取ASR模型类
+    with timing.jsonl_log(str(TIMING_LOG_FILE), config.need_timing_log):
+        asr_class = _get_asr_class(config)
+        asr_args = _build_asr_args(config)
+
+        # 分块转录和部分后端需要按WAV文件切分，此时才将内存中的音频写出
+        if isinstance(audio_path, AudioSource) and (
+            config.need_chunked_transcribe or asr_class.NEEDS_FILE_PATH
+        ):
+            audio_path = audio_path.materialize()
+
+        if (
+            config.need_chunked_transcribe
+            and isinstance(audio_path, str)
+            and audio_path.lower().endswith(".wav")
+        ):
+            asr_data = _transcribe_chunked(
+                audio_path, asr_class, asr_args, config, callback
+            )
+        else:
+            # 创建ASR实例并运行
+            asr = asr_class(audio_path, **asr_args)
+            asr_data = asr.run(callback=callback)
+
+        # 优化字幕显示时间 #161
+        if not config.need_word_time_stamp:
+            asr_data.optimize_timing()
+
+        return asr_data
+
+
+def transcribe_batch(
+    jobs: List[Tuple[Union[str, AudioSource], TranscribeConfig]],
+    callback=None,
+    on_result: Optional[Callable[[int, Union[ASRData, Exception]], None]] = None,
+) -> List[Union[ASRData, Exception]]:
+    """批量转录多个音频文件
+
+    FasterWhisper 任务中命令参数相同的文件合并为一次程序调用，只加载一次模型；
+    其他模型逐个转录。单个文件失败不影响其他文件。
+
+    Args:
+        jobs: (音频文件路径或 AudioSource, 转录配置) 列表
+        callback: 整体进度回调函数,接收两个参数(progress: int, message: str)
+        on_result: 每个文件完成或失败时立即回调 (jobs 中的序号, 转录结果或异常)，
+            可据此逐个保存结果，不必等待整批完成
+
+    Returns:
+        与 jobs 顺序一致的列表，失败的文件为对应的异常
+    """
+
+    def _default_callback(x, y):
+        pass
+
+    if callback is None:
+        callback = _default_callback
+
+    need_timing_log = any(config.need_timing_log for _, config in jobs)
+    with timing.jsonl_log(str(TIMING_LOG_FILE), need_timing_log):
+        results: List[Optional[Union[ASRData, Exception]]] = [None] * len(jobs)
+
+        def set_result(i: int, result: Union[ASRData, Exception]):
+            results[i] = result
+            if on_result:
+                on_result(i, result)
+
+        batch_indexes = [
+            i
+            for i, (_, config) in enumerate(jobs)
+            if config.transcribe_model == TranscribeModelEnum.FASTER_WHISPER
+        ]
+        other_indexes = [i for i in range(len(jobs)) if i not in batch_indexes]
+
+        def make_callback(done: int, count: int):
+            def _callback(progress: int, message: str):
+                total = int((done + progress / 100 * count) * 100 / len(jobs))
+                callback(total, message)
+
+            return _callback
+
+        if batch_indexes:
+            asr_list: List[FasterWhisperASR] = []
+            asr_indexes: List[int] = []
+            for i in batch_indexes:
+                try:
+                    asr = FasterWhisperASR(jobs[i][0], **_build_asr_args(jobs[i][1]))
+                except Exception as e:
+                    logger.error(f"批量转录中的文件读取失败: {e}")
+                    set_result(i, e)
+                    continue
+                asr_list.append(asr)
+                asr_indexes.append(i)
+
+            def on_batch_result(k: int, result: Union[ASRData, Exception]):
+                i = asr_indexes[k]
+                # 优化字幕显示时间 #161
+                if isinstance(result, ASRData) and not jobs[i][1].need_word_time_stamp:
+                    result.optimize_timing()
+                set_result(i, result)
+
+            FasterWhisperASR.run_batch(
+                asr_list, make_callback(0, len(batch_indexes)), on_batch_result
+            )
+        for done, i in enumerate(other_indexes, start=len(batch_indexes)):
+            audio_path, config = jobs[i]
+            try:
+                asr_data = transcribe(audio_path, config, make_callback(done, 1))
+            except Exception as e:
+                logger.error(f"批量转录中的文件转录失败: {e}")
+                set_result(i, e)
+            else:
+                set_result(i, asr_data)
+
+        callback(100, "批量转录完成")
+        return results  # type: ignore
+
+
+def get_cached_transcription(
+    media_path: str, config: TranscribeConfig
+) -> Optional[ASRData]:
+    """按源媒体文件查询转录缓存，命中时无需提取音频
+
+    Args:
+        media_path: 音视频文件路径
+        config: 转录配置
+
+    Returns:
+        缓存的转录结果，未启用缓存或未命中时返回 None
+    """
+    if not config.use_asr_cache:
+        return None
+    # 缓存查询在转录之前，需单独启用耗时日志
+    with timing.jsonl_log(str(TIMING_LOG_FILE), config.need_timing_log):
+        try:
+            asr_class = _get_asr_class(config)
+            fingerprint = media_fingerprint(media_path)
+            with timing.track(
+                asr_class.__name__, "cache", fingerprint, level="media"
+            ) as event:
+                result = CacheManager(str(CACHE_PATH)).get_media_asr_result(
+                    fingerprint,
+                    asr_class.__name__,
+                    **_media_cache_params(config),
+                )
+                event.cache_hit = bool(result)
+        except (OSError, ValueError) as e:
+            logger.warning(f"查询转录缓存失败: {e}")
+            return None
+    if not result:
+        return None
+    logger.info(f"命中转录缓存: {media_path}")
+    return ASRData.from_json(result)
+
+
+def cache_transcription(media_path: str, config: TranscribeConfig, asr_data: ASRData):
+    """按源媒体文件缓存转录结果，供 get_cached_transcription 查询"""
+    if not config.use_asr_cache or not asr_data.has_data():
+        return
+    try:
+        CacheManager(str(CACHE_PATH)).set_media_asr_result(
+            media_fingerprint(media_path),
+            _get_asr_class(config).__name__,
+            asr_data.to_json(),
+            **_media_cache_params(config),
+        )
+    except Exception as e:
+        logger.warning(f"写入转录缓存失败: {e}")
+
+
+def _media_cache_params(config: TranscribeConfig) -> Dict[str, Any]:
+    """媒体级转录缓存的参数
+
+    包含音频提取参数、各后端 _get_key 覆盖的识别参数（即构建后端的参数），
+    以及影响最终结果的分块配置；API密钥等不影响结果的参数不参与。
+    """
+    params: Dict[str, Any] = {
+        **EXTRACT_PARAMS,
+        **_asr_cache_params(_build_asr_args(config)),
+    }
+    if config.need_chunked_transcribe:
+        params["chunk_length_seconds"] = config.chunk_length_seconds
+    return params
+
+
+def _asr_cache_params(asr_args: Dict[str, Any]) -> Dict[str, Any]:
+    """后端参数中参与缓存键的部分：去掉缓存开关和API密钥，值转为可序列化类型"""
+    params: Dict[str, Any] = {}
+    for key, value in asr_args.items():
+        if key in ("use_cache", "api_key"):
+            continue
+        if not isinstance(value, (str, int, float, bool, type(None))):
+            value = str(value)
+        params[key] = value
+    return params
+
+
+def _get_asr_class(config: TranscribeConfig) -> Type[BaseASR]:
+    """根据转录配置获取ASR模型类"""
     ASR_MODELS = {
         TranscribeModelEnum.JIANYING: JianYingASR,
         # TranscribeModelEnum.KUAISHOU: KuaiShouASR,
@@ -43,7 +271,11 @@ def transcribe(audio_path: str, config: TranscribeConfig, callback=None) -> ASRD
     if not asr_class:
         raise ValueError(f"无效的转录模型: {config.transcribe_model}")
 
-    # 构建ASR参数
+    return asr_class
+
+
+def _build_asr_args(config: TranscribeConfig) -> Dict[str, Any]:
+    """根据转录配置构建ASR参数"""
     asr_args: Dict[str, Any] = {
         "use_cache": config.use_asr_cache,
         "need_word_time_stamp": config.need_word_time_stamp,
@@ -55,12 +287,16 @@ def transcribe(audio_path: str, config: TranscribeConfig, callback=None) -> ASRD
         asr_args["whisper_model"] = (
             config.whisper_model.value if config.whisper_model else None
         )
+        asr_args["use_server"] = config.whisper_cpp_use_server
+        asr_args["server_url"] = config.whisper_cpp_server_url or None
+        asr_args["use_gpu"] = config.whisper_cpp_use_gpu
     elif config.transcribe_model == TranscribeModelEnum.WHISPER_API:
         asr_args["language"] = config.transcribe_language
         asr_args["whisper_model"] = config.whisper_api_model
         asr_args["api_key"] = config.whisper_api_key
         asr_args["base_url"] = config.whisper_api_base
         asr_args["prompt"] = config.whisper_api_prompt
+        asr_args["max_upload_mb"] = config.whisper_api_max_upload_mb
     elif config.transcribe_model == TranscribeModelEnum.FASTER_WHISPER:
         asr_args["faster_whisper_program"] = config.faster_whisper_program
         asr_args["language"] = config.transcribe_language
@@ -80,16 +316,140 @@ def transcribe(audio_path: str, config: TranscribeConfig, callback=None) -> ASRD
         asr_args["one_word"] = config.faster_whisper_one_word
         asr_args["prompt"] = config.faster_whisper_prompt
 
-    # 创建ASR实例并运行
-    asr = asr_class(audio_path, **asr_args)
+    return asr_args
+
+
+def _transcribe_chunked(
+    audio_path: str,
+    asr_class: Type[BaseASR],
+    asr_args: Dict[str, Any],
+    config: TranscribeConfig,
+    callback: Callable[[int, str], None],
+) -> ASRData:
+    """在静音处切分长音频，多线程并行转录后拼接结果"""
+    try:
+        duration_ms = get_wav_duration_ms(audio_path)
+        silences = detect_silences(audio_path)
+    except (ValueError, EOFError, wave.Error) as e:
+        logger.warning(f"无法分析音频静音，改为整体转录: {e}")
+        return asr_class(audio_path, **asr_args).run(callback=callback)
+    cut_points = compute_cut_points(
+        duration_ms, silences, config.chunk_length_seconds * 1000
+    )
+    if len(cut_points) <= 2:
+        # 音频较短，无需切分
+        return asr_class(audio_path, **asr_args).run(callback=callback)
+
+    ranges = [
+        (max(0, start - CHUNK_OVERLAP_MS), min(duration_ms, end + CHUNK_OVERLAP_MS))
+        for start, end in zip(cut_points, cut_points[1:])
+    ]
+    logger.info(
+        f"分块转录: 共 {len(ranges)} 块, 并行数 {config.chunk_workers}, "
+        f"切分点 {cut_points[1:-1]}"
+    )
+
+    # 分块级缓存：以分块PCM内容哈希为键，只转录未命中的分块
+    results: List[Optional[ASRData]] = [None] * len(ranges)
+    fingerprints: List[Tuple[str, int]] = []
+    cache_manager = CacheManager(str(CACHE_PATH)) if config.use_asr_cache else None
+    cache_type = f"{asr_class.__name__}Chunk"
+    cache_params = _asr_cache_params(asr_args)
+    # 未启用缓存时无需计算分块指纹
+    if cache_manager:
+        for i, (start, end) in enumerate(zip(cut_points, cut_points[1:])):
+            fingerprint, anchor_ms = pcm_fingerprint(audio_path, start, end)
+            fingerprints.append((fingerprint, anchor_ms))
+            with timing.track(
+                asr_class.__name__, "cache", fingerprint, level="chunk", chunk=i
+            ) as event:
+                cached = cache_manager.get_asr_chunk_result(
+                    fingerprint, cache_type, **cache_params
+                )
+                event.cache_hit = bool(cached)
+            if cached:
+                results[i] = ASRData(
+                    [
+                        ASRDataSeg(text, start_time + anchor_ms, end_time + anchor_ms)
+                        for text, start_time, end_time in cached["segments"]
+                    ]
+                )
+    missing = [i for i, result in enumerate(results) if result is None]
+    logger.info(f"分块缓存命中 {len(ranges) - len(missing)}/{len(ranges)}")
 
-    asr_data = asr.run(callback=callback)
+    chunk_progress = [0 if i in missing else 100 for i in range(len(ranges))]
+    progress_lock = threading.Lock()
+    cache_lock = threading.Lock()
+    # 分块结果由分块缓存管理，避免再按分块文件重复缓存
+    chunk_asr_args = {**asr_args, "use_cache": False}
 
-    # 优化字幕显示时间 #161
-    if not config.need_word_time_stamp:
-        asr_data.optimize_timing()
+    def run_chunk(index: int, chunk_path: str) -> ASRData:
+        def chunk_callback(progress: int, message: str):
+            with progress_lock:
+                chunk_progress[index] = int(progress)
+                total = sum(chunk_progress) // len(chunk_progress)
+            callback(total, f"{total}% ({len(ranges)} 块并行转录)")
 
-    return asr_data
+        asr_data = asr_class(chunk_path, **chunk_asr_args).run(callback=chunk_callback)
+        offset = ranges[index][0]
+        asr_data = ASRData(
+            [
+                ASRDataSeg(seg.text, seg.start_time + offset, seg.end_time + offset)
+                for seg in asr_data.segments
+            ]
+        )
+        if cache_manager:
+            fingerprint, anchor_ms = fingerprints[index]
+            result_data = {
+                "segments": [
+                    [seg.text, seg.start_time - anchor_ms, seg.end_time - anchor_ms]
+                    for seg in asr_data.segments
+                ]
+            }
+            # 内容相同的分块会并发写入同一缓存键，串行写入且失败不影响转录
+            try:
+                with cache_lock:
+                    cache_manager.set_asr_chunk_result(
+                        fingerprint, cache_type, result_data, **cache_params
+                    )
+            except Exception as e:
+                logger.warning(f"写入分块缓存失败: {e}")
+        return asr_data
+
+    if missing:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            chunk_paths = split_wav(audio_path, [ranges[i] for i in missing], temp_dir)
+            with ThreadPoolExecutor(max_workers=config.chunk_workers) as executor:
+                # 各分块在当前上下文的副本中运行，耗时事件写入本次转录的日志
+                futures = {
+                    executor.submit(
+                        contextvars.copy_context().run, run_chunk, i, path
+                    ): i
+                    for i, path in zip(missing, chunk_paths)
+                }
+                for future in as_completed(futures):
+                    results[futures[future]] = future.result()
+
+    callback(100, "分块转录完成")
+    return _merge_chunk_results(
+        [result or ASRData([]) for result in results], cut_points
+    )
+
+
+def _merge_chunk_results(results: List[ASRData], cut_points: List[int]) -> ASRData:
+    """合并各分块结果（已为绝对时间），并去除重叠区域中的重复片段
+
+    每个分块只保留中点落在其切分区间 [cut_points[i], cut_points[i + 1]) 内的片段。
+    """
+    segments = []
+    for i, asr_data in enumerate(results):
+        own_start, own_end = cut_points[i], cut_points[i + 1]
+        is_last = i == len(results) - 1
+        for seg in asr_data.segments:
+            mid_time = (seg.start_time + seg.end_time) // 2
+            if own_start <= mid_time and (mid_time < own_end or is_last):
+                segments.append(seg)
+    return ASRData(segments)
 
 
 if __name__ == "__main__":
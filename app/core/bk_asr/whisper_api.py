@@ -1,15 +1,47 @@
-from typing import Optional, Callable, Any, List
+import asyncio
+import os
+import tempfile
+import wave
+from pathlib import Path
+from typing import Optional, Callable, Any, Dict, List
 
-from openai import OpenAI
+from openai import AsyncOpenAI
 
+from ..utils.async_http import get_async_client
+from ..utils.audio_utils import (
+    compute_cut_points,
+    detect_silences,
+    encode_audio,
+    get_wav_duration_ms,
+    split_wav,
+)
+from ..utils.ffmpeg_capabilities import get_capabilities
 from ..utils.logger import setup_logger
 from .asr_data import ASRDataSeg
 from .base import BaseASR
 
 logger = setup_logger("whisper_api")
 
+# 单次上传的默认大小上限（MB），OpenAI 接口限制为 25MB
+DEFAULT_MAX_UPLOAD_MB = 24
+# 上传前压缩编码的码率，及其对应的每毫秒字节数
+ENCODE_BITRATE = "48k"
+ENCODE_BYTES_PER_MS = 48_000 / 8 / 1000
+# 分段并发转录数
+MAX_WORKERS = 4
+
+AUDIO_MIME_TYPES = {
+    "mp3": "audio/mpeg",
+    "wav": "audio/wav",
+    "flac": "audio/flac",
+    "m4a": "audio/mp4",
+}
+
 
 class WhisperAPI(BaseASR):
+    # WAV 输入需要切分并压缩编码后上传
+    NEEDS_FILE_PATH = True
+
     def __init__(
         self,
         audio_path: str,
@@ -20,6 +52,8 @@ class WhisperAPI(BaseASR):
         base_url: Optional[str] = None,
         api_key: Optional[str] = None,
         use_cache: bool = False,
+        max_upload_mb: int = DEFAULT_MAX_UPLOAD_MB,
+        max_workers: int = MAX_WORKERS,
     ):
         """
         初始化 Whisper API
@@ -32,6 +66,8 @@ class WhisperAPI(BaseASR):
             base_url: API基础URL,可选
             api_key: API密钥,可选
             use_cache: 是否使用缓存
+            max_upload_mb: 单次上传的大小上限(MB)，超过时在静音处切分
+            max_workers: 分段并发转录数
         """
         super().__init__(audio_path, use_cache)
 
@@ -45,21 +81,171 @@ class WhisperAPI(BaseASR):
         self.model = whisper_model
         self.language = language
         self.prompt = prompt
+        if self.language == "zh" and not self.prompt:
+            self.prompt = "你好，我们需要使用简体中文，以下是普通话的句子。"
         self.need_word_time_stamp = need_word_time_stamp
+        self.max_upload_bytes = max_upload_mb * 1024 * 1024
+        self.max_workers = max_workers
 
         logger.info(
             f"初始化 WhisperCppASR: model={whisper_model}, language={language}, prompt={prompt}"
         )
-        self.client = OpenAI(base_url=self.base_url, api_key=self.api_key)
 
-    def _run(
+    def _get_client(self) -> AsyncOpenAI:
+        """使用当前事件循环共享的HTTP连接池创建客户端"""
+        return AsyncOpenAI(
+            base_url=self.base_url, api_key=self.api_key, http_client=get_async_client()
+        )
+
+    async def _arun(
         self, callback: Optional[Callable[[int, str], None]] = None, **kwargs: Any
     ) -> dict:
         """执行语音识别"""
-        return self._submit()
+
+        def _default_callback(x, y):
+            pass
+
+        if callback is None:
+            callback = _default_callback
+
+        if isinstance(self.audio_path, str) and self.audio_path.lower().endswith(
+            ".wav"
+        ):
+            return await self._run_pieces(callback)
+
+        file_name = (
+            os.path.basename(self.audio_path)
+            if isinstance(self.audio_path, str)
+            else "audio.mp3"
+        )
+        return await self._submit(self.file_binary or b"", file_name)
+
+    async def _run_pieces(self, callback: Callable[[int, str], None]) -> dict:
+        """压缩编码后上传；超过大小上限时在静音处切分，并发转录后合并"""
+        assert isinstance(self.audio_path, str)
+        wav_path = self.audio_path
+        if self.file_size <= self.max_upload_bytes:
+            # 未超过上限时直接上传 WAV，省去编码耗时
+            callback(5, "正在转录")
+            with self._track("request", bytes=self.file_size):
+                result = await self._submit(self.file_binary or b"", "audio.wav")
+            callback(100, "转录完成")
+            return result
+        try:
+            duration_ms = get_wav_duration_ms(wav_path)
+        except (EOFError, wave.Error) as e:
+            logger.warning(f"无法读取WAV信息，直接上传: {e}")
+            return await self._submit(self.file_binary or b"", "audio.wav")
+
+        # ffmpeg 不可用或不支持 MP3 编码时直接上传 WAV 分段，按 WAV 码率估算分段时长
+        capabilities = get_capabilities()
+        can_encode = bool(capabilities and capabilities.has_encoder("libmp3lame"))
+        bytes_per_ms = (
+            ENCODE_BYTES_PER_MS if can_encode else self.file_size / max(duration_ms, 1)
+        )
+        # 预留 10% 余量，避免编码码率波动导致超限
+        max_piece_ms = max(1000, int(self.max_upload_bytes * 0.9 / bytes_per_ms))
+        cut_points = [0, duration_ms]
+        if duration_ms > max_piece_ms:
+            search_ms = min(30_000, max_piece_ms // 4)
+            try:
+                silences = await asyncio.to_thread(detect_silences, wav_path)
+            except ValueError as e:
+                logger.warning(f"无法分析音频静音，按固定时长切分: {e}")
+                silences = []
+            cut_points = compute_cut_points(
+                duration_ms, silences, max_piece_ms - search_ms, search_ms
+            )
+        ranges = list(zip(cut_points, cut_points[1:]))
+        logger.info(
+            f"音频时长 {duration_ms / 1000:.1f}s, 分为 {len(ranges)} 段上传"
+            f"{'(压缩编码)' if can_encode else ''}"
+        )
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            piece_paths = (
+                await asyncio.to_thread(split_wav, wav_path, ranges, temp_dir)
+                if len(ranges) > 1
+                else [wav_path]
+            )
+            semaphore = asyncio.Semaphore(max(1, self.max_workers))
+            done_count = 0
+
+            async def transcribe_piece(index: int) -> dict:
+                nonlocal done_count
+                async with semaphore:
+                    piece_path = piece_paths[index]
+                    if can_encode:
+                        mp3_path = os.path.join(temp_dir, f"piece_{index:04d}.mp3")
+                        with self._track("convert", piece=index):
+                            if await asyncio.to_thread(
+                                encode_audio, piece_path, mp3_path, ENCODE_BITRATE
+                            ):
+                                piece_path = mp3_path
+                    data = await asyncio.to_thread(Path(piece_path).read_bytes)
+                    if len(data) > self.max_upload_bytes:
+                        logger.warning(
+                            f"分段 {index} 大小 {len(data) / 1024 / 1024:.1f}MB 超过上限"
+                        )
+                    # 上传与服务端推理在同一个请求中完成
+                    with self._track("request", bytes=len(data), piece=index):
+                        result = await self._submit(data, os.path.basename(piece_path))
+                done_count += 1
+                progress = 5 + int(done_count / len(ranges) * 95)
+                callback(progress, f"{progress}%")
+                return result
+
+            callback(5, f"正在转录 {len(ranges)} 段音频")
+            results = await asyncio.gather(
+                *(transcribe_piece(i) for i in range(len(ranges)))
+            )
+
+        return self._merge_results(list(results), [start for start, _ in ranges])
+
+    @staticmethod
+    def _merge_results(results: List[dict], offsets_ms: List[int]) -> dict:
+        """合并各分段的 verbose_json 结果，时间戳加上分段起点偏移"""
+        if len(results) == 1 and offsets_ms[0] == 0:
+            return results[0]
+
+        merged: Dict[str, Any] = {"text": "", "segments": [], "words": []}
+        texts = []
+        for result, offset_ms in zip(results, offsets_ms):
+            offset = offset_ms / 1000
+            texts.append(result.get("text", "").strip())
+            for seg in result.get("segments") or []:
+                merged["segments"].append(
+                    {
+                        **seg,
+                        "id": len(merged["segments"]),
+                        "start": float(seg["start"]) + offset,
+                        "end": float(seg["end"]) + offset,
+                    }
+                )
+            for word in result.get("words") or []:
+                merged["words"].append(
+                    {
+                        **word,
+                        "start": float(word["start"]) + offset,
+                        "end": float(word["end"]) + offset,
+                    }
+                )
+        merged["text"] = " ".join(text for text in texts if text)
+        if results:
+            merged["language"] = results[0].get("language")
+        return merged
 
     def _make_segments(self, resp_data: dict) -> List[ASRDataSeg]:
         """从响应数据构建语音片段"""
+        if self.need_word_time_stamp and resp_data.get("words"):
+            return [
+                ASRDataSeg(
+                    text=word["word"].strip(),
+                    start_time=int(float(word["start"]) * 1000),
+                    end_time=int(float(word["end"]) * 1000),
+                )
+                for word in resp_data["words"]
+            ]
         segments = []
         for seg in resp_data["segments"]:
             segments.append(
@@ -75,11 +261,14 @@ class WhisperAPI(BaseASR):
         """获取缓存键值"""
         return f"{self.crc32_hex}-{self.model}-{self.language}-{self.prompt}"
 
-    def _submit(self) -> dict:
-        """提交音频进行识别"""
+    async def _submit(self, data: bytes, file_name: str = "audio.mp3") -> dict:
+        """提交音频进行识别
+
+        Args:
+            data: 音频数据
+            file_name: 上传的文件名，其扩展名决定音频格式
+        """
         try:
-            if self.language == "zh" and not self.prompt:
-                self.prompt = "你好，我们需要使用简体中文，以下是普通话的句子。"
             args = {}
             if (
                 self.need_word_time_stamp
@@ -93,7 +282,11 @@ class WhisperAPI(BaseASR):
                 "model": self.model,
                 "temperature": 0,
                 "response_format": "verbose_json",
-                "file": ("audio.mp3", self.file_binary or b"", "audio/mp3"),
+                "file": (
+                    file_name,
+                    data,
+                    AUDIO_MIME_TYPES.get(file_name.rsplit(".", 1)[-1], "audio/mpeg"),
+                ),
                 "prompt": self.prompt,
                 **args,
             }
@@ -101,7 +294,9 @@ class WhisperAPI(BaseASR):
             if self.language and isinstance(self.language, str):
                 create_args["language"] = self.language
 
-            completion = self.client.audio.transcriptions.create(**create_args)
+            completion = await self._get_client().audio.transcriptions.create(
+                **create_args
+            )
             logger.info("音频识别完成")
             return completion.to_dict()
         except Exception as e:
@@ -4,18 +4,32 @@ import shutil
 import time
 import subprocess
 import tempfile
+import wave
 from pathlib import Path
 from typing import List, Optional, Callable, Any
 
 from ...config import MODEL_PATH
+from ..utils.audio_utils import get_wav_duration_ms
 from ..utils.logger import setup_logger
 from ..utils.subprocess_helper import StreamReader
 from .asr_data import ASRData, ASRDataSeg
 from .base import BaseASR
+from .whisper_cpp_server import get_whisper_server
 
 logger = setup_logger("whisper_asr")
 
 
+def _default_server_path(whisper_cpp_path: str) -> str:
+    """whisper-server 与 whisper-cpp 程序位于同一目录，未找到时按 PATH 查找"""
+    program = shutil.which(whisper_cpp_path)
+    if program:
+        name = "whisper-server.exe" if os.name == "nt" else "whisper-server"
+        server_path = Path(program).parent / name
+        if server_path.is_file():
+            return str(server_path)
+    return "whisper-server"
+
+
 class WhisperCppASR(BaseASR):
     def __init__(
         self,
@@ -25,10 +39,15 @@ class WhisperCppASR(BaseASR):
         whisper_model=None,
         use_cache: bool = False,
         need_word_time_stamp: bool = False,
+        use_server: bool = False,
+        server_path: Optional[str] = None,
+        server_url: Optional[str] = None,
+        use_gpu: bool = False,
     ):
         super().__init__(audio_path, False)
-        assert os.path.exists(audio_path), f"音频文件 {audio_path} 不存在"
-        assert audio_path.endswith(".wav"), f"音频文件 {audio_path} 必须是WAV格式"
+        if isinstance(audio_path, str):
+            assert os.path.exists(audio_path), f"音频文件 {audio_path} 不存在"
+            assert audio_path.endswith(".wav"), f"音频文件 {audio_path} 必须是WAV格式"
 
         # 如果指定了 whisper_model，则在 models 目录下查找对应模型
         if whisper_model:
@@ -47,6 +66,11 @@ class WhisperCppASR(BaseASR):
         self.whisper_cpp_path = Path(whisper_cpp_path)
         self.need_word_time_stamp = need_word_time_stamp
         self.language = language
+        # 常驻服务模式：模型只加载一次，多个音频复用同一进程
+        self.use_server = use_server or bool(server_url)
+        self.server_path = server_path or _default_server_path(whisper_cpp_path)
+        self.server_url = server_url
+        self.use_gpu = use_gpu
 
         self.process = None
 
@@ -93,18 +117,45 @@ class WhisperCppASR(BaseASR):
 
         # 根据版本添加额外参数
         if not is_const_me_version:
-            whisper_params.extend(
-                ["--no-gpu", "--output-file", str(output_path.with_suffix(""))]
-            )
+            whisper_params.extend(["--output-file", str(output_path.with_suffix(""))])
+            if not self.use_gpu:
+                whisper_params.append("--no-gpu")
 
         # 中文模式下添加提示语
-        if self.language == "zh":
-            whisper_params.extend(
-                ["--prompt", "你好，我们需要使用简体中文，以下是普通话的句子。"]
-            )
+        prompt = self._get_prompt()
+        if prompt:
+            whisper_params.extend(["--prompt", prompt])
 
         return whisper_params
 
+    def _get_prompt(self) -> Optional[str]:
+        """中文模式下的提示语"""
+        if self.language == "zh":
+            return "你好，我们需要使用简体中文，以下是普通话的句子。"
+        return None
+
+    def _run_server(self, callback: Callable[[int, str], None]) -> str:
+        """通过常驻的 whisper.cpp 服务转录，无需复制音频和重新加载模型"""
+        server = get_whisper_server(
+            server_path=self.server_path,
+            model_path=self.model_path,
+            use_gpu=self.use_gpu,
+            server_url=self.server_url,
+        )
+        callback(5, "等待 whisper-server 就绪")
+        # 文件输入按块读取上传，不读入内存
+        audio = (
+            self.audio_path if isinstance(self.audio_path, str) else self.file_binary
+        )
+        if not audio:
+            raise ValueError("No audio data available")
+        callback(10, "正在转录")
+        with self._track("request", bytes=self.file_size):
+            srt_text = server.inference(audio, self.language, self._get_prompt())
+        callback(100, "转换完成")
+        logger.info("whisper-server 处理完成")
+        return srt_text
+
     def _run(
         self, callback: Optional[Callable[[int, str], None]] = None, **kwargs: Any
     ) -> str:
@@ -114,6 +165,9 @@ class WhisperCppASR(BaseASR):
         if callback is None:
             callback = _default_callback
 
+        if self.use_server:
+            return self._run_server(callback)
+
         is_const_me_version = True if os.name == "nt" else False
 
         with tempfile.TemporaryDirectory() as temp_path:
@@ -122,14 +176,9 @@ class WhisperCppASR(BaseASR):
             output_path = wav_path.with_suffix(".srt")
 
             try:
-                # 复制音频文件
-                if isinstance(self.audio_path, str):
-                    shutil.copy2(self.audio_path, wav_path)
-                else:
-                    if self.file_binary:
-                        wav_path.write_bytes(self.file_binary)
-                    else:
-                        raise ValueError("No audio data available")
+                with self._track("convert", bytes=self.file_size):
+                    # 链接音频文件（const_me 版本将结果写在音频旁边，须放入临时目录）
+                    self._link_audio(wav_path)
 
                 # 构建命令
                 whisper_params = self._build_command(
@@ -141,68 +190,74 @@ class WhisperCppASR(BaseASR):
                 if isinstance(self.audio_path, str):
                     total_duration = self.get_audio_duration(self.audio_path)
                 else:
-                    total_duration = 600
+                    try:
+                        total_duration = get_wav_duration_ms(str(wav_path)) // 1000
+                    except (EOFError, wave.Error):
+                        total_duration = 600
                 logger.info("音频总时长: %d 秒", total_duration)
 
-                # 启动进程
-                self.process = subprocess.Popen(
-                    whisper_params,
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
-                    text=True,
-                    encoding="utf-8",
-                    bufsize=1,  # 行缓冲
-                )
-
-                logger.info(f"whisper-cpp 进程已启动，PID: {self.process.pid}")
-
-                # 使用 StreamReader 处理输出流
-                reader = StreamReader(self.process)
-                reader.start_reading()
-
-                # 处理输出
-                last_progress = 0
+                with self._track("inference"):
+                    # 启动进程
+                    self.process = subprocess.Popen(
+                        whisper_params,
+                        stdout=subprocess.PIPE,
+                        stderr=subprocess.PIPE,
+                        text=True,
+                        encoding="utf-8",
+                        bufsize=1,  # 行缓冲
+                    )
 
-                while True:
-                    # 检查进程状态
-                    if self.process.poll() is not None:
-                        # 进程已结束，读取剩余输出
-                        time.sleep(0.2)
-                        for stream_name, line in reader.get_remaining_output():
-                            if stream_name == "stderr":
+                    logger.info(f"whisper-cpp 进程已启动，PID: {self.process.pid}")
+
+                    # 使用 StreamReader 处理输出流
+                    reader = StreamReader(self.process)
+                    reader.start_reading()
+
+                    # 处理输出
+                    last_progress = 0
+
+                    while True:
+                        # 检查进程状态
+                        if self.process.poll() is not None:
+                            # 进程已结束，读取剩余输出
+                            time.sleep(0.2)
+                            for stream_name, line in reader.get_remaining_output():
+                                if stream_name == "stderr":
+                                    logger.debug(f"[stderr] {line.strip()}")
+                            break
+
+                        # 非阻塞读取输出
+                        output = reader.get_output(timeout=0.1)
+                        if output:
+                            stream_name, line = output
+
+                            if stream_name == "stdout":
+                                logger.debug(f"[stdout] {line.strip()}")
+
+                                # 解析进度
+                                if " --> " in line and "[" in line:
+                                    try:
+                                        time_str = (
+                                            line.split("[")[1].split(" -->")[0].strip()
+                                        )
+                                        parts = time_str.split(":")
+                                        current_time = sum(
+                                            float(x) * y
+                                            for x, y in zip(
+                                                reversed(parts), [1, 60, 3600]
+                                            )
+                                        )
+                                        progress = int(
+                                            min(current_time / total_duration * 100, 98)
+                                        )
+
+                                        if progress > last_progress:
+                                            last_progress = progress
+                                            callback(progress, f"{progress}%")
+                                    except (ValueError, IndexError) as e:
+                                        logger.debug(f"解析进度失败: {e}")
+                            else:
                                 logger.debug(f"[stderr] {line.strip()}")
-                        break
-
-                    # 非阻塞读取输出
-                    output = reader.get_output(timeout=0.1)
-                    if output:
-                        stream_name, line = output
-
-                        if stream_name == "stdout":
-                            logger.debug(f"[stdout] {line.strip()}")
-
-                            # 解析进度
-                            if " --> " in line and "[" in line:
-                                try:
-                                    time_str = (
-                                        line.split("[")[1].split(" -->")[0].strip()
-                                    )
-                                    parts = time_str.split(":")
-                                    current_time = sum(
-                                        float(x) * y
-                                        for x, y in zip(reversed(parts), [1, 60, 3600])
-                                    )
-                                    progress = int(
-                                        min(current_time / total_duration * 100, 98)
-                                    )
-
-                                    if progress > last_progress:
-                                        last_progress = progress
-                                        callback(progress, f"{progress}%")
-                                except (ValueError, IndexError) as e:
-                                    logger.debug(f"解析进度失败: {e}")
-                        else:
-                            logger.debug(f"[stderr] {line.strip()}")
 
                 # 检查返回码
                 if self.process.returncode != 0:
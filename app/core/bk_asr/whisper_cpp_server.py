@@ -0,0 +1,297 @@
+"""whisper.cpp 常驻服务：模型只加载一次，通过本地 HTTP 接口处理多个音频"""
+
+import atexit
+import io
+import os
+import socket
+import subprocess
+import threading
+import time
+import uuid
+from typing import BinaryIO, Dict, IO, Iterator, List, Optional, Tuple, Union
+
+import requests
+
+from ...config import LOG_PATH
+from ..utils.logger import setup_logger
+
+logger = setup_logger("whisper_cpp_server")
+
+# 等待服务加载模型并开始监听的最长时间（秒）
+SERVER_START_TIMEOUT = 120
+# 单次推理请求的超时时间（秒）
+INFERENCE_TIMEOUT = 3600
+# 上传音频时每次从文件读取的字节数
+UPLOAD_BLOCK_SIZE = 1024 * 1024
+
+
+class MultipartFileBody:
+    """multipart/form-data 请求体，音频文件按块读取上传，不整体读入内存
+
+    表单字段和分隔符在内存中，文件部分直接从磁盘读取；长度已知，
+    requests 以 Content-Length 发送而不是分块编码。
+    """
+
+    def __init__(
+        self,
+        fields: Dict[str, str],
+        file_field: str,
+        file_name: str,
+        audio: Union[bytes, str],
+        content_type: str = "application/octet-stream",
+    ):
+        boundary = uuid.uuid4().hex
+        self.content_type = f"multipart/form-data; boundary={boundary}"
+        head = b"".join(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n'
+            f"{value}\r\n".encode()
+            for name, value in fields.items()
+        )
+        head += (
+            f"--{boundary}\r\n"
+            f'Content-Disposition: form-data; name="{file_field}"; '
+            f'filename="{file_name}"\r\n'
+            f"Content-Type: {content_type}\r\n\r\n"
+        ).encode()
+        tail = f"\r\n--{boundary}--\r\n".encode()
+        if isinstance(audio, str):
+            audio_file: BinaryIO = open(audio, "rb")
+            audio_size = os.path.getsize(audio)
+        else:
+            audio_file = io.BytesIO(audio)
+            audio_size = len(audio)
+        self._parts: List[BinaryIO] = [io.BytesIO(head), audio_file, io.BytesIO(tail)]
+        self._length = len(head) + audio_size + len(tail)
+
+    def __len__(self) -> int:
+        return self._length
+
+    def read(self, size: int = -1) -> bytes:
+        if size is None or size < 0:
+            return b"".join(part.read() for part in self._parts)
+        chunks = []
+        for part in self._parts:
+            while size > 0 and (chunk := part.read(size)):
+                chunks.append(chunk)
+                size -= len(chunk)
+        return b"".join(chunks)
+
+    def __iter__(self) -> Iterator[bytes]:
+        while chunk := self.read(UPLOAD_BLOCK_SIZE):
+            yield chunk
+
+    def close(self):
+        for part in self._parts:
+            part.close()
+
+    def __enter__(self) -> "MultipartFileBody":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class WhisperCppServer:
+    """whisper.cpp server 进程封装
+
+    启动 whisper-server 并通过其 /inference 接口转录音频。
+    指定 server_url 时直接连接已有服务（不管理进程），便于对接外部服务或本地模拟服务。
+    """
+
+    def __init__(
+        self,
+        server_path: str = "whisper-server",
+        model_path: Optional[str] = None,
+        use_gpu: bool = False,
+        server_url: Optional[str] = None,
+    ):
+        """
+        Args:
+            server_path: whisper-server 程序路径
+            model_path: 模型文件路径
+            use_gpu: 是否使用GPU
+            server_url: 已有服务地址，如 http://127.0.0.1:8080
+        """
+        self.server_path = server_path
+        self.model_path = model_path
+        self.use_gpu = use_gpu
+        self.external_url = server_url.rstrip("/") if server_url else None
+        self.base_url = self.external_url
+        self.process: Optional[subprocess.Popen] = None
+        self._log_file: Optional[IO] = None
+        self._lock = threading.Lock()
+        self.session = requests.Session()
+
+    def is_alive(self) -> bool:
+        """服务进程是否仍在运行"""
+        if self.external_url:
+            return True
+        return self.process is not None and self.process.poll() is None
+
+    def ensure_started(self) -> str:
+        """确保服务可用，进程未启动或已退出时（重新）启动
+
+        Returns:
+            服务地址
+        """
+        with self._lock:
+            if not self.is_alive():
+                if self.process is not None:
+                    logger.warning(
+                        f"whisper-server 已退出(返回码 {self.process.returncode})，正在重启"
+                    )
+                self._start()
+            assert self.base_url
+            return self.base_url
+
+    def _start(self):
+        """启动服务进程并等待其开始监听"""
+        if not self.model_path:
+            raise ValueError("model_path 不能为空")
+        port = _find_free_port()
+        cmd = [
+            self.server_path,
+            "-m",
+            str(self.model_path),
+            "--host",
+            "127.0.0.1",
+            "--port",
+            str(port),
+        ]
+        if not self.use_gpu:
+            cmd.append("--no-gpu")
+        logger.info("启动 whisper-server: %s", " ".join(cmd))
+
+        self._close_log()
+        # 输出写入日志文件，避免管道写满阻塞服务进程
+        self._log_file = open(LOG_PATH / "whisper_server.log", "a", encoding="utf-8")
+        self.process = subprocess.Popen(
+            cmd,
+            stdout=self._log_file,
+            stderr=subprocess.STDOUT,
+            creationflags=subprocess.CREATE_NO_WINDOW if os.name == "nt" else 0,
+        )
+        self.base_url = f"http://127.0.0.1:{port}"
+
+        # 模型加载完成后服务才会开始监听
+        deadline = time.time() + SERVER_START_TIMEOUT
+        while time.time() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError(
+                    f"whisper-server 启动失败，返回码: {self.process.returncode}"
+                )
+            try:
+                self.session.get(self.base_url, timeout=1)
+                logger.info(f"whisper-server 已就绪，PID: {self.process.pid}")
+                return
+            except requests.exceptions.RequestException:
+                time.sleep(0.2)
+        self.stop()
+        raise RuntimeError("等待 whisper-server 启动超时")
+
+    def inference(
+        self,
+        audio: Union[bytes, str],
+        language: str = "auto",
+        prompt: Optional[str] = None,
+    ) -> str:
+        """转录音频，服务崩溃时自动重启并重试一次
+
+        Args:
+            audio: WAV文件路径（按块读取上传）或WAV音频数据
+            language: 语言代码
+            prompt: 提示语
+
+        Returns:
+            SRT格式的转录结果
+        """
+        data = {"response_format": "srt", "language": language or "auto"}
+        if prompt:
+            data["prompt"] = prompt
+
+        for attempt in range(2):
+            base_url = self.ensure_started()
+            try:
+                with MultipartFileBody(
+                    data, "file", "audio.wav", audio, "audio/wav"
+                ) as body:
+                    response = self.session.post(
+                        f"{base_url}/inference",
+                        data=body,
+                        headers={"Content-Type": body.content_type},
+                        timeout=INFERENCE_TIMEOUT,
+                    )
+                response.raise_for_status()
+                response.encoding = "utf-8"
+                return response.text
+            except requests.exceptions.ConnectionError:
+                # 进程在推理过程中崩溃，重启后重试
+                if attempt or self.is_alive():
+                    raise
+                logger.warning("whisper-server 连接中断，重启后重试")
+        raise RuntimeError("whisper-server 转录失败")
+
+    def stop(self):
+        """终止服务进程"""
+        if self.process and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+                self.process.wait()
+            logger.info("whisper-server 已停止")
+        self._close_log()
+
+    def _close_log(self):
+        if self._log_file:
+            self._log_file.close()
+            self._log_file = None
+
+
+_servers: Dict[Tuple, WhisperCppServer] = {}
+_servers_lock = threading.Lock()
+
+
+def get_whisper_server(
+    server_path: str = "whisper-server",
+    model_path: Optional[str] = None,
+    use_gpu: bool = False,
+    server_url: Optional[str] = None,
+) -> WhisperCppServer:
+    """获取（或创建）共享的 whisper.cpp 服务，相同程序和模型复用同一进程
+
+    Args:
+        server_path: whisper-server 程序路径
+        model_path: 模型文件路径
+        use_gpu: 是否使用GPU
+        server_url: 已有服务地址，指定时不启动本地进程
+
+    Returns:
+        WhisperCppServer 实例
+    """
+    key = (server_url,) if server_url else (server_path, model_path, use_gpu)
+    with _servers_lock:
+        server = _servers.get(key)
+        if server is None:
+            server = WhisperCppServer(server_path, model_path, use_gpu, server_url)
+            _servers[key] = server
+        return server
+
+
+def stop_all_servers():
+    """停止所有常驻服务进程"""
+    with _servers_lock:
+        for server in _servers.values():
+            server.stop()
+        _servers.clear()
+
+
+atexit.register(stop_all_servers)
+
+
+def _find_free_port() -> int:
+    """获取一个空闲的本地端口"""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
@@ -1,7 +1,7 @@
 import datetime
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from enum import Enum
-from typing import Optional
+from typing import List, Optional
 
 
 class SupportedAudioFormats(Enum):
@@ -504,13 +504,26 @@ class TranscribeConfig:
     transcribe_language: str = ""
     use_asr_cache: bool = True
     need_word_time_stamp: bool = True
+    # 将各阶段耗时写入 logs/asr_timing.jsonl
+    need_timing_log: bool = False
+    # 提取音频缓存配置
+    use_audio_cache: bool = True
+    audio_cache_size_gb: int = 5
+    # 分块并行转录配置
+    need_chunked_transcribe: bool = False
+    chunk_length_seconds: int = 600
+    chunk_workers: int = 4
     # Whisper Cpp 配置
     whisper_model: Optional[WhisperModelEnum] = None
+    whisper_cpp_use_server: bool = False
+    whisper_cpp_server_url: Optional[str] = None
+    whisper_cpp_use_gpu: bool = False
     # Whisper API 配置
     whisper_api_key: Optional[str] = None
     whisper_api_base: Optional[str] = None
     whisper_api_model: Optional[str] = None
     whisper_api_prompt: Optional[str] = None
+    whisper_api_max_upload_mb: int = 24
     # Faster Whisper 配置
     faster_whisper_program: Optional[str] = None
     faster_whisper_model: Optional[FasterWhisperModelEnum] = None
@@ -552,12 +565,38 @@ class SubtitleConfig:
     custom_prompt_text: Optional[str] = None
 
 
+@dataclass
+class RenditionSpec:
+    """多规格输出中单个输出文件的配置"""
+
+    # 输出文件名后缀，如 "1080p"，输出为 "<视频名>-<name><extension>"
+    name: str
+    # 输出高度，宽度按比例缩放；为空时保持原分辨率
+    height: Optional[int] = None
+    vcodec: str = "libx264"
+    quality: str = "medium"
+    soft_subtitle: bool = False
+    # 字幕布局，如 "原文在上"、"仅译文"；为空时使用字幕文件原有的内容
+    subtitle_layout: Optional[str] = None
+    extension: str = ".mp4"
+
+
 @dataclass
 class SynthesisConfig:
     """视频合成配置类"""
 
     need_video: bool = True
     soft_subtitle: bool = True
+    # 硬字幕分段并行编码数，1 表示整段编码
+    burn_segments: int = 1
+    # 只重编码有字幕显示的GOP，其余部分直接复制
+    smart_burn: bool = False
+    # 软字幕按样式生成 ASS 字幕轨并内嵌字体，输出 MKV
+    styled_soft_subtitle: bool = False
+    subtitle_style: Optional[str] = None
+    subtitle_layout: Optional[str] = None
+    # 多规格输出，非空时一次解码同时生成所有规格，替代单个输出
+    renditions: List[RenditionSpec] = field(default_factory=list)
 
 
 @dataclass
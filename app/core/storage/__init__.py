@@ -1,9 +1,20 @@
 # app/core/storage/__init__.py
-from .cache_manager import CacheManager
-from .models import ASRCache, LLMCache, TranslationCache, UsageStatistics
+from .cache_manager import AudioCacheManager, CacheManager, MediaInfoManager
+from .models import (
+    ASRCache,
+    AudioCache,
+    LLMCache,
+    MediaInfoCache,
+    TranslationCache,
+    UsageStatistics,
+)
 
 __all__ = [
+    "AudioCacheManager",
+    "AudioCache",
     "CacheManager",
+    "MediaInfoManager",
+    "MediaInfoCache",
     "TranslationCache",
     "LLMCache",
     "UsageStatistics",
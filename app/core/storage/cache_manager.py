@@ -2,8 +2,13 @@
 import hashlib
 import json
 import logging
+import os
+import shutil
+import tempfile
+import threading
 from datetime import date, datetime
-from typing import Any, Dict, Optional
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
 
 from sqlalchemy import and_
 
@@ -11,14 +16,19 @@ from .constants import CACHE_CONFIG, OperationType, TranslatorType
 from .database import DatabaseManager
 from .models import (
     ASRCache,
+    AudioCache,
     DailyServiceUsage,
     LLMCache,
+    MediaInfoCache,
     TranslationCache,
     UsageStatistics,
 )
 
 logger = logging.getLogger(__name__)
 
+# 音频缓存目录中未登记的文件超过该时长（秒）后视为残留文件
+ORPHAN_FILE_AGE = 3600
+
 
 class BaseManager:
     """基础管理器类，提供通用的数据库操作和错误处理"""
@@ -287,6 +297,330 @@ class CacheManager(BaseManager):
             self.logger.error(f"Error setting ASR cache: {str(e)}")
             raise
 
+    def get_asr_chunk_result(
+        self, fingerprint: str, asr_type: str, **params
+    ) -> Optional[dict]:
+        """获取音频分块的语音识别缓存结果
+
+        Args:
+            fingerprint: 分块PCM内容哈希
+            asr_type: ASR服务类型
+            **params: 影响识别结果的ASR参数
+        """
+        return self.get_asr_result(self._generate_hash(fingerprint, params), asr_type)
+
+    def set_asr_chunk_result(
+        self, fingerprint: str, asr_type: str, result_data: dict, **params
+    ):
+        """设置音频分块的语音识别缓存结果"""
+        self.set_asr_result(
+            self._generate_hash(fingerprint, params), asr_type, result_data
+        )
+
+    def get_media_asr_result(
+        self, media_fingerprint: str, asr_type: str, **params
+    ) -> Optional[dict]:
+        """获取按源媒体文件索引的转录结果，无需提取音频即可查询
+
+        Args:
+            media_fingerprint: 源媒体文件内容指纹
+            asr_type: ASR服务类型
+            **params: 音频提取参数及影响识别结果的ASR参数
+        """
+        return self.get_asr_result(
+            self._generate_hash(media_fingerprint, {**params, "index": "media"}),
+            asr_type,
+        )
+
+    def set_media_asr_result(
+        self, media_fingerprint: str, asr_type: str, result_data: dict, **params
+    ):
+        """设置按源媒体文件索引的转录结果"""
+        self.set_asr_result(
+            self._generate_hash(media_fingerprint, {**params, "index": "media"}),
+            asr_type,
+            result_data,
+        )
+
+
+class AudioCacheManager(BaseManager):
+    """提取音频缓存管理器
+
+    音频按源文件指纹和提取参数缓存为WAV文件，超过容量上限时按最近访问时间淘汰。
+    get()/put() 返回的文件在 release() 之前处于使用中，不会被淘汰。
+    """
+
+    # 使用中的缓存key及引用计数，所有实例共享
+    _pins: Dict[str, int] = {}
+    _pins_lock = threading.Lock()
+
+    def __init__(self, app_data_path: str, max_size: Optional[int] = None):
+        if not app_data_path:
+            raise ValueError("app_data_path cannot be empty")
+        super().__init__(DatabaseManager(app_data_path))
+        self.audio_dir = Path(app_data_path) / CACHE_CONFIG["audio_dirname"]
+        self.audio_dir.mkdir(parents=True, exist_ok=True)
+        self.max_size = CACHE_CONFIG["audio_max_size"] if max_size is None else max_size
+
+    @classmethod
+    def make_key(cls, fingerprint: str, **params) -> str:
+        """由源文件指纹和提取参数生成缓存key"""
+        return cls._generate_hash(fingerprint, params)
+
+    def _file_path(self, cache_key: str) -> Path:
+        return self.audio_dir / f"{cache_key}.wav"
+
+    def _pin(self, cache_key: str) -> None:
+        with self._pins_lock:
+            self._pins[cache_key] = self._pins.get(cache_key, 0) + 1
+
+    def release(self, cache_key: str) -> None:
+        """结束使用 get()/put() 返回的缓存文件，之后可以被淘汰"""
+        with self._pins_lock:
+            count = self._pins.get(cache_key, 0) - 1
+            if count > 0:
+                self._pins[cache_key] = count
+            else:
+                self._pins.pop(cache_key, None)
+
+    def get(self, cache_key: str) -> Optional[Tuple[str, str]]:
+        """获取缓存的音频，命中时该文件在 release() 之前不会被淘汰
+
+        Returns:
+            (音频文件路径, 音频CRC32)，未命中时返回 None
+        """
+        path = self._file_path(cache_key)
+        # 先标记使用中再检查文件，检查之后不会再被其他线程淘汰
+        self._pin(cache_key)
+        cached = self._get(cache_key, path)
+        if cached is None:
+            self.release(cache_key)
+        return cached
+
+    def _get(self, cache_key: str, path: Path) -> Optional[Tuple[str, str]]:
+        try:
+            with self.db_manager.get_session() as session:
+                entry = session.query(AudioCache).filter_by(cache_key=cache_key).first()
+                if not entry:
+                    return None
+                if not path.is_file() or path.stat().st_size != entry.file_size:
+                    # 文件被外部删除或损坏
+                    session.delete(entry)
+                    path.unlink(missing_ok=True)
+                    return None
+                entry.last_accessed = datetime.utcnow()  # type: ignore
+                return str(path), str(entry.crc32_hex)
+        except Exception as e:
+            self.logger.error(f"Error getting audio cache: {str(e)}")
+            return None
+
+    def put(
+        self, cache_key: str, audio_file: str, crc32_hex: str, source_path: str = ""
+    ) -> str:
+        """将已写好的音频文件移入缓存，写入后按容量上限淘汰旧缓存
+
+        写入的文件在 release() 之前不会被淘汰，写入失败时不需要 release()。
+
+        Args:
+            audio_file: 完整的WAV文件，与缓存目录在同一文件系统时直接重命名；
+                调用后该文件不再存在
+
+        Returns:
+            缓存的音频文件路径
+        """
+        path = self._file_path(cache_key)
+        file_size = os.path.getsize(audio_file)
+        self._pin(cache_key)
+        try:
+            self._put(cache_key, path, audio_file, file_size, crc32_hex, source_path)
+        except BaseException:
+            self.release(cache_key)
+            raise
+        self.logger.info(f"Cached extracted audio: {source_path}")
+        try:
+            self.prune()
+        except Exception as e:
+            # 淘汰旧缓存失败不影响本次写入
+            self.logger.warning(f"Error pruning audio cache: {str(e)}")
+        return str(path)
+
+    def _put(
+        self,
+        cache_key: str,
+        path: Path,
+        audio_file: str,
+        file_size: int,
+        crc32_hex: str,
+        source_path: str,
+    ) -> None:
+        # 完整写出后再重命名，并发写入同一key时不会读到不完整的文件
+        if Path(audio_file).parent.resolve() == self.audio_dir.resolve():
+            os.replace(audio_file, path)
+        else:
+            fd, temp_path = tempfile.mkstemp(suffix=".tmp", dir=self.audio_dir)
+            os.close(fd)
+            try:
+                shutil.move(audio_file, temp_path)
+                os.replace(temp_path, path)
+            except BaseException:
+                Path(temp_path).unlink(missing_ok=True)
+                raise
+
+        now = datetime.utcnow()
+        with self.db_manager.get_session() as session:
+            entry = session.query(AudioCache).filter_by(cache_key=cache_key).first()
+            if entry:
+                entry.crc32_hex = crc32_hex  # type: ignore
+                entry.file_size = file_size  # type: ignore
+                entry.source_path = source_path  # type: ignore
+                entry.last_accessed = now  # type: ignore
+            else:
+                session.add(
+                    AudioCache(
+                        cache_key=cache_key,
+                        source_path=source_path,
+                        crc32_hex=crc32_hex,
+                        file_size=file_size,
+                        created_at=now,
+                        last_accessed=now,
+                    )
+                )
+
+    def entries(self) -> List[Dict[str, Any]]:
+        """列出缓存条目，最近访问的在前"""
+        with self.db_manager.get_session() as session:
+            return [
+                {
+                    "cache_key": entry.cache_key,
+                    "path": str(self._file_path(str(entry.cache_key))),
+                    "source_path": entry.source_path,
+                    "crc32_hex": entry.crc32_hex,
+                    "file_size": entry.file_size,
+                    "created_at": entry.created_at.isoformat(),
+                    "last_accessed": entry.last_accessed.isoformat(),
+                }
+                for entry in session.query(AudioCache)
+                .order_by(AudioCache.last_accessed.desc())
+                .all()
+            ]
+
+    def total_size(self) -> int:
+        """缓存音频总大小（字节）"""
+        return sum(entry["file_size"] for entry in self.entries())
+
+    def prune(self, max_size: Optional[int] = None, keep: str = "") -> int:
+        """按最近访问时间淘汰缓存，直到总大小不超过上限
+
+        Args:
+            max_size: 容量上限（字节），默认使用初始化时的上限
+            keep: 不淘汰的缓存key；使用中（未 release）的缓存始终跳过
+
+        Returns:
+            释放的字节数
+        """
+        max_size = self.max_size if max_size is None else max_size
+        freed = 0
+        with self.db_manager.get_session() as session:
+            entries = session.query(AudioCache).order_by(AudioCache.last_accessed).all()
+            total = sum(int(entry.file_size) for entry in entries)  # type: ignore
+            for entry in entries:
+                if total <= max_size:
+                    break
+                if entry.cache_key == keep:
+                    continue
+                # 持锁检查并删除，与 get() 标记使用中互斥
+                with self._pins_lock:
+                    if entry.cache_key in self._pins:
+                        continue
+                    try:
+                        self._file_path(str(entry.cache_key)).unlink(missing_ok=True)
+                    except OSError as e:
+                        # 文件正被使用（如 Windows 上仍被映射）时无法删除，保留条目下次再淘汰
+                        self.logger.warning(
+                            f"Skip evicting audio cache {entry.cache_key}: {str(e)}"
+                        )
+                        continue
+                # 文件删除成功后才删除索引，避免留下无索引的残留文件
+                session.delete(entry)
+                total -= int(entry.file_size)  # type: ignore
+                freed += int(entry.file_size)  # type: ignore
+            known = {f"{entry.cache_key}.wav" for entry in entries}
+
+        # 清理索引中不存在的残留文件，跳过可能正在写入的新文件
+        expire = datetime.now().timestamp() - ORPHAN_FILE_AGE
+        for path in self.audio_dir.iterdir():
+            if path.name in known or path.suffix not in (".wav", ".tmp"):
+                continue
+            try:
+                stat = path.stat()
+                if stat.st_mtime < expire:
+                    path.unlink()
+                    freed += stat.st_size
+            except OSError:
+                pass
+        if freed:
+            self.logger.info(f"Pruned {freed / 1024 / 1024:.1f}MB of audio cache")
+        return freed
+
+    def clear(self) -> int:
+        """清空音频缓存，使用中的除外"""
+        return self.prune(max_size=0)
+
+
+class MediaInfoManager(BaseManager):
+    """媒体信息索引管理器，按 (路径, 大小, 修改时间) 保存探测结果"""
+
+    def __init__(self, app_data_path: str):
+        if not app_data_path:
+            raise ValueError("app_data_path cannot be empty")
+        super().__init__(DatabaseManager(app_data_path))
+
+    def get(self, file_path: str, file_size: int, mtime_ns: int) -> Optional[dict]:
+        """获取媒体信息，文件已变化或未探测过时返回 None"""
+        try:
+            with self.db_manager.get_session() as session:
+                entry = (
+                    session.query(MediaInfoCache).filter_by(file_path=file_path).first()
+                )
+                if (
+                    entry
+                    and entry.file_size == file_size
+                    and entry.mtime_ns == mtime_ns
+                ):
+                    return entry.info_data  # type: ignore
+                return None
+        except Exception as e:
+            self.logger.error(f"Error getting media info: {str(e)}")
+            return None
+
+    def set(self, file_path: str, file_size: int, mtime_ns: int, info_data: dict):
+        """保存媒体信息，覆盖同一路径的旧记录"""
+        try:
+            with self.db_manager.get_session() as session:
+                entry = (
+                    session.query(MediaInfoCache).filter_by(file_path=file_path).first()
+                )
+                if entry:
+                    entry.file_size = file_size  # type: ignore
+                    entry.mtime_ns = mtime_ns  # type: ignore
+                    entry.info_data = info_data  # type: ignore
+                else:
+                    session.add(
+                        MediaInfoCache(
+                            file_path=file_path,
+                            file_size=file_size,
+                            mtime_ns=mtime_ns,
+                            info_data=info_data,
+                        )
+                    )
+        except Exception as e:
+            self.logger.error(f"Error saving media info: {str(e)}")
+
+    def clear(self):
+        """清空媒体信息索引"""
+        with self.db_manager.get_session() as session:
+            session.query(MediaInfoCache).delete()
+
 
 class ServiceUsageManager(BaseManager):
     """服务使用管理器"""
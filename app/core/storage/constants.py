@@ -20,4 +20,6 @@ CACHE_CONFIG = {
     "max_age": timedelta(days=30),  # 缓存最大保存时间
     "db_filename": "cache.db",
     "cleanup_threshold": 10000,  # 触发清理的记录数阈值
+    "audio_dirname": "audio",  # 提取音频缓存目录
+    "audio_max_size": 5 * 1024**3,  # 提取音频缓存的默认容量上限（字节）
 }
@@ -24,6 +24,43 @@ class ASRCache(Base):
     )
 
 
+class AudioCache(Base):
+    """提取音频缓存索引表，音频文件保存在缓存目录的 audio 子目录中"""
+
+    __tablename__ = "audio_cache"
+
+    id = Column(Integer, primary_key=True)
+    cache_key = Column(String(32), nullable=False)  # 源文件指纹与提取参数的哈希
+    source_path = Column(Text)  # 最近一次提取时的源文件路径，仅用于查看
+    crc32_hex = Column(String(8), nullable=False)  # 音频文件的CRC32，即ASR缓存key
+    file_size = Column(Integer, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    last_accessed = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (Index("idx_audio_cache_key", cache_key, unique=True),)
+
+    def __repr__(self):
+        return f"<AudioCache(key={self.cache_key}, size={self.file_size})>"
+
+
+class MediaInfoCache(Base):
+    """媒体信息索引表，文件大小或修改时间变化后重新探测"""
+
+    __tablename__ = "media_info_cache"
+
+    id = Column(Integer, primary_key=True)
+    file_path = Column(Text, nullable=False)
+    file_size = Column(Integer, nullable=False)
+    mtime_ns = Column(Integer, nullable=False)
+    info_data = Column(JSON, nullable=False)  # ffprobe 解析后的媒体信息
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (Index("idx_media_info_path", file_path, unique=True),)
+
+    def __repr__(self):
+        return f"<MediaInfoCache(path={self.file_path}, size={self.file_size})>"
+
+
 class TranslationCache(Base):
     """翻译结果缓存表"""
 
@@ -1,13 +1,15 @@
 import datetime
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional
 
 from app.common.config import cfg
 from app.config import MODEL_PATH, SUBTITLE_STYLE_PATH
+from app.core.bk_asr.subtitle_binary import SUBTITLE_BINARY_SUFFIX
 from app.core.entities import (
     LANGUAGES,
     FullProcessTask,
     LLMServiceEnum,
+    RenditionSpec,
     SplitTypeEnum,
     SubtitleConfig,
     SubtitleTask,
@@ -17,6 +19,7 @@ from app.core.entities import (
     TranscribeTask,
     TranscriptAndSubtitleTask,
 )
+from app.core.utils.media_info import get_media_info_service
 
 
 class TaskFactory:
@@ -37,6 +40,17 @@ class TaskFactory:
             return style_path.read_text(encoding="utf-8")
         return ""
 
+    @staticmethod
+    def get_renditions() -> List[RenditionSpec]:
+        """读取多规格输出配置，忽略字段不完整的项"""
+        renditions = []
+        for item in cfg.synthesis_renditions.value or []:
+            try:
+                renditions.append(RenditionSpec(**item))
+            except TypeError:
+                continue
+        return renditions
+
     @staticmethod
     def create_transcribe_task(
         file_path: str, need_next_task: bool = False
@@ -55,7 +69,7 @@ class TaskFactory:
                 Path(cfg.work_dir.value)
                 / file_name
                 / "subtitle"
-                / f"【原始字幕】{file_name}-{cfg.transcribe_model.value.value}-{cfg.transcribe_language.value.value}.srt"
+                / f"【原始字幕】{file_name}-{cfg.transcribe_model.value.value}-{cfg.transcribe_language.value.value}{SUBTITLE_BINARY_SUFFIX}"
             )
         else:
             need_word_time_stamp = False
@@ -66,13 +80,24 @@ class TaskFactory:
             transcribe_language=LANGUAGES[cfg.transcribe_language.value.value],
             use_asr_cache=cfg.use_asr_cache.value,
             need_word_time_stamp=need_word_time_stamp,
+            need_timing_log=cfg.asr_timing_log.value,
+            use_audio_cache=cfg.use_audio_cache.value,
+            audio_cache_size_gb=cfg.audio_cache_size_gb.value,
+            # 分块并行转录配置
+            need_chunked_transcribe=cfg.chunked_transcribe.value,
+            chunk_length_seconds=cfg.chunk_length_seconds.value,
+            chunk_workers=cfg.chunk_workers.value,
             # Whisper Cpp 配置
             whisper_model=cfg.whisper_model.value,
+            whisper_cpp_use_server=cfg.whisper_cpp_use_server.value,
+            whisper_cpp_server_url=cfg.whisper_cpp_server_url.value,
+            whisper_cpp_use_gpu=cfg.whisper_cpp_use_gpu.value,
             # Whisper API 配置
             whisper_api_key=cfg.whisper_api_key.value,
             whisper_api_base=cfg.whisper_api_base.value,
             whisper_api_model=cfg.whisper_api_model.value,
             whisper_api_prompt=cfg.whisper_api_prompt.value,
+            whisper_api_max_upload_mb=cfg.whisper_api_max_upload_mb.value,
             # Faster Whisper 配置
             faster_whisper_program=cfg.faster_whisper_program.value,
             faster_whisper_model=cfg.faster_whisper_model.value,
@@ -218,11 +243,30 @@ class TaskFactory:
             output_path = str(
                 Path(video_path).parent / f"【卡卡】{Path(video_path).stem}.mp4"
             )
+        styled_soft_subtitle = (
+            cfg.soft_subtitle.value and cfg.styled_soft_subtitle.value
+        )
+        if styled_soft_subtitle:
+            # ASS 字幕轨和字体附件需要 MKV 封装
+            output_path = str(Path(output_path).with_suffix(".mkv"))
 
         config = SynthesisConfig(
             need_video=cfg.need_video.value,
             soft_subtitle=cfg.soft_subtitle.value,
+            burn_segments=cfg.burn_segments.value,
+            smart_burn=cfg.smart_burn.value,
+            styled_soft_subtitle=styled_soft_subtitle,
+            subtitle_style=(
+                TaskFactory.get_subtitle_style(cfg.subtitle_style_name.value)
+                if styled_soft_subtitle
+                else None
+            ),
+            subtitle_layout=cfg.subtitle_layout.value,
+            renditions=TaskFactory.get_renditions(),
         )
+        if config.need_video:
+            # 提前在后台读取视频信息，合成时直接从索引中获取
+            get_media_info_service().prefetch([video_path])
 
         return SynthesisTask(
             queued_at=datetime.datetime.now(),
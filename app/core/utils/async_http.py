@@ -0,0 +1,193 @@
+"""异步HTTP工具：按事件循环共享的 httpx.AsyncClient 及同步调用包装"""
+
+import asyncio
+import atexit
+import contextvars
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Coroutine, Dict, List, Optional, TypeVar
+
+import httpx
+
+from ..utils.logger import setup_logger
+
+logger = setup_logger("async_http")
+
+T = TypeVar("T")
+
+# 连接池配置：同一事件循环中的所有请求共享连接
+MAX_CONNECTIONS = 64
+MAX_KEEPALIVE_CONNECTIONS = 16
+DEFAULT_TIMEOUT = httpx.Timeout(60.0, connect=10.0)
+# 流式请求体每次发送的字节数
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# httpx.AsyncClient 绑定创建时的事件循环，因此按事件循环分别缓存
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = (
+    weakref.WeakKeyDictionary()
+)
+_clients_lock = threading.Lock()
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """获取当前事件循环共享的异步HTTP客户端，须在协程中调用"""
+    loop = asyncio.get_running_loop()
+    with _clients_lock:
+        client = _clients.get(loop)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(
+                timeout=DEFAULT_TIMEOUT,
+                limits=httpx.Limits(
+                    max_connections=MAX_CONNECTIONS,
+                    max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+                ),
+                follow_redirects=True,
+            )
+            _clients[loop] = client
+        return client
+
+
+async def close_async_client():
+    """关闭当前事件循环的共享客户端"""
+    loop = asyncio.get_running_loop()
+    with _clients_lock:
+        client = _clients.pop(loop, None)
+    if client is not None:
+        await client.aclose()
+
+
+class _ThreadLoop:
+    """线程常驻的事件循环，需显式调用 close() 关闭共享客户端和循环"""
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.current_thread()
+
+    def close(self):
+        loop = self.loop
+        if loop.is_closed():
+            return
+        try:
+            loop.run_until_complete(close_async_client())
+            loop.run_until_complete(loop.shutdown_asyncgens())
+        except Exception as e:
+            logger.warning(f"关闭事件循环失败: {e}")
+        finally:
+            loop.close()
+
+
+_thread_state = threading.local()
+# 所有线程的常驻事件循环；线程结束后由 _close_loops 显式关闭
+_loops: List[_ThreadLoop] = []
+_loops_lock = threading.Lock()
+# 已在运行事件循环的线程中调用 run_sync 时使用的常驻线程
+_nested_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="run_sync")
+
+
+def _thread_loop() -> asyncio.AbstractEventLoop:
+    holder = getattr(_thread_state, "holder", None)
+    if holder is None or holder.loop.is_closed():
+        # 顺带关闭已结束线程遗留的事件循环
+        _close_loops(finished_only=True)
+        holder = _ThreadLoop()
+        _thread_state.holder = holder
+        with _loops_lock:
+            _loops.append(holder)
+    return holder.loop
+
+
+def _close_loops(finished_only: bool) -> None:
+    """关闭常驻事件循环
+
+    Args:
+        finished_only: 仅关闭所属线程已结束的事件循环
+    """
+    with _loops_lock:
+        closing = [
+            holder
+            for holder in _loops
+            if not finished_only or not holder.thread.is_alive()
+        ]
+        _loops[:] = [holder for holder in _loops if holder not in closing]
+    for holder in closing:
+        holder.close()
+
+
+def close_thread_loop():
+    """关闭当前线程的常驻事件循环及其共享客户端，下次调用 run_sync 时重新创建"""
+    holder: Optional[_ThreadLoop] = getattr(_thread_state, "holder", None)
+    if holder is not None:
+        _thread_state.holder = None
+        with _loops_lock:
+            if holder in _loops:
+                _loops.remove(holder)
+        holder.close()
+
+
+def close_all_thread_loops():
+    """关闭所有线程的常驻事件循环，程序退出时调用"""
+    _close_loops(finished_only=False)
+
+
+atexit.register(close_all_thread_loops)
+
+
+def run_sync(coro: Coroutine[Any, Any, T]) -> T:
+    """在当前线程的常驻事件循环中同步执行协程
+
+    同一线程的多次调用复用同一事件循环及其共享客户端，连接在调用之间保持；
+    当前线程已有运行中的事件循环时，改在常驻的辅助线程中执行，避免嵌套事件循环。
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return _thread_loop().run_until_complete(coro)
+    return _nested_executor.submit(
+        contextvars.copy_context().run, run_sync, coro
+    ).result()
+
+
+class MemoryViewStream:
+    """以内存视图为数据源的异步请求体，按块发送，不复制整段数据
+
+    httpx 不接受 memoryview 作为 content，直接传入该对象并在请求头中设置
+    Content-Length（见 headers()），避免退化为分块传输编码。
+
+    该对象接管传入的视图：每块发送后立即释放，退出上下文时释放视图本身，
+    底层 mmap 因此可以正常关闭。
+    """
+
+    def __init__(self, view: memoryview, chunk_size: int = STREAM_CHUNK_SIZE):
+        self.view = view
+        self._chunk_size = chunk_size
+        self._chunk: Optional[memoryview] = None
+
+    def __len__(self) -> int:
+        return len(self.view)
+
+    def headers(self) -> Dict[str, str]:
+        """请求体对应的 Content-Length 请求头"""
+        return {"Content-Length": str(len(self.view))}
+
+    async def __aiter__(self) -> AsyncIterator[memoryview]:
+        for offset in range(0, len(self.view), self._chunk_size):
+            chunk = self._chunk = self.view[offset : offset + self._chunk_size]
+            try:
+                yield chunk
+            finally:
+                chunk.release()
+                self._chunk = None
+
+    def close(self):
+        """释放视图及未发送完的分块（请求中断时生成器可能未执行到 finally）"""
+        if self._chunk is not None:
+            self._chunk.release()
+            self._chunk = None
+        self.view.release()
+
+    def __enter__(self) -> "MemoryViewStream":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
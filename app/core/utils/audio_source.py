@@ -0,0 +1,358 @@
+"""音频源：通过管道读取 ffmpeg 输出的PCM，边读取边计算哈希并写入WAV文件，仅在后端需要字节数据时才读入内存"""
+
+import hashlib
+import os
+import struct
+import subprocess
+import tempfile
+import zlib
+from pathlib import Path
+from typing import Callable, List, Optional
+
+from ...config import CACHE_PATH
+from ..storage.cache_manager import AudioCacheManager
+from ..utils.logger import setup_logger
+
+logger = setup_logger("audio_source")
+
+# 与 video2audio 一致的输出格式：16kHz 单声道 16位PCM
+SAMPLE_RATE = 16000
+CHANNELS = 1
+SAMPLE_WIDTH = 2
+# 每次从管道读取的字节数
+PIPE_READ_SIZE = 1024 * 1024
+# 源文件指纹：文件大小加上首、中、尾三段采样数据
+FINGERPRINT_SAMPLE_SIZE = 1024 * 1024
+# 影响提取结果的参数，变更后旧的音频缓存自动失效
+EXTRACT_PARAMS = {
+    "sample_rate": SAMPLE_RATE,
+    "channels": CHANNELS,
+    "sample_width": SAMPLE_WIDTH,
+    "filter": "aresample=async=1",
+}
+
+
+def _wav_header(data_size: int) -> bytes:
+    """生成标准44字节WAV文件头"""
+    byte_rate = SAMPLE_RATE * CHANNELS * SAMPLE_WIDTH
+    return struct.pack(
+        "<4sI4s4sIHHIIHH4sI",
+        b"RIFF",
+        36 + data_size,
+        b"WAVE",
+        b"fmt ",
+        16,
+        1,  # PCM
+        CHANNELS,
+        SAMPLE_RATE,
+        byte_rate,
+        CHANNELS * SAMPLE_WIDTH,
+        SAMPLE_WIDTH * 8,
+        b"data",
+        data_size,
+    )
+
+
+def _gf2_matrix_times(matrix: List[int], vector: int) -> int:
+    result = 0
+    i = 0
+    while vector:
+        if vector & 1:
+            result ^= matrix[i]
+        vector >>= 1
+        i += 1
+    return result
+
+
+def _gf2_matrix_square(matrix: List[int]) -> List[int]:
+    return [_gf2_matrix_times(matrix, row) for row in matrix]
+
+
+def crc32_combine(crc1: int, crc2: int, len2: int) -> int:
+    """由 crc32(A)、crc32(B) 和 B 的长度计算 crc32(A + B)（zlib crc32_combine 的移植）
+
+    WAV 文件头中的数据长度要在读完管道后才能确定，数据部分的 CRC 在读取时计算，
+    之后与文件头的 CRC 合并，无需再次读取数据。
+    """
+    if len2 <= 0:
+        return crc1
+    # 在 CRC 后追加一个 0 位的运算矩阵
+    odd = [0xEDB88320] + [1 << n for n in range(31)]
+    even = _gf2_matrix_square(odd)  # 追加 2 个 0 位
+    odd = _gf2_matrix_square(even)  # 追加 4 个 0 位
+    while True:
+        even = _gf2_matrix_square(odd)
+        if len2 & 1:
+            crc1 = _gf2_matrix_times(even, crc1)
+        len2 >>= 1
+        if not len2:
+            break
+        odd = _gf2_matrix_square(even)
+        if len2 & 1:
+            crc1 = _gf2_matrix_times(odd, crc1)
+        len2 >>= 1
+        if not len2:
+            break
+    return crc1 ^ crc2
+
+
+class AudioSource:
+    """WAV音频，数据保存在文件或内存中
+
+    可直接作为 audio_path 传给 ASR 后端：哈希值只计算一次；基于文件的音频由后端
+    按文件路径读取（或 mmap 映射），只有后端需要完整字节数据时才读入内存。
+    """
+
+    def __init__(
+        self,
+        data: Optional[bytes] = None,
+        path: Optional[str] = None,
+        crc32_hex: str = "",
+        name: str = "audio",
+    ):
+        if data is None and path is None:
+            raise ValueError("data or path must be provided")
+        self._data = data
+        # 已有的音频文件（如提取缓存），由外部管理，不会被 close() 删除
+        self._path = path
+        # materialize() 或提取音频时写出的临时文件，close() 时删除
+        self._temp_path: Optional[str] = None
+        # 结束使用 _path 时的回调（如允许淘汰对应的提取缓存），close() 时调用
+        self._release: Optional[Callable[[], None]] = None
+        self.name = name
+        self.crc32_hex = crc32_hex or self._compute_crc32()
+
+    @classmethod
+    def _from_temp_file(cls, path: str, crc32_hex: str, name: str) -> "AudioSource":
+        """由提取时写出的临时WAV文件创建，close() 时删除该文件"""
+        source = cls(path=path, crc32_hex=crc32_hex, name=name)
+        source._path = None
+        source._temp_path = path
+        return source
+
+    def _compute_crc32(self) -> str:
+        if self._data is not None:
+            crc32_value = zlib.crc32(self._data)
+        else:
+            crc32_value = 0
+            with open(str(self._path), "rb") as f:
+                while block := f.read(PIPE_READ_SIZE):
+                    crc32_value = zlib.crc32(block, crc32_value)
+        return format(crc32_value & 0xFFFFFFFF, "08x")
+
+    @classmethod
+    def from_media(
+        cls, media_path: str, directory: Optional[str] = None
+    ) -> "AudioSource":
+        """使用 ffmpeg 从音视频文件中提取音频，通过标准输出读取PCM
+
+        PCM 按块写入临时WAV文件并同时计算 CRC32，内存占用与音频长度无关。
+
+        Args:
+            media_path: 音视频文件路径
+            directory: 临时WAV文件所在目录，默认使用系统临时目录；写入音频缓存时
+                传入缓存目录，之后可直接重命名为缓存文件
+
+        Returns:
+            AudioSource: 提取出的音频，close() 时删除临时文件
+
+        Raises:
+            RuntimeError: ffmpeg 执行失败或没有音频流
+        """
+        cmd = [
+            "ffmpeg",
+            "-nostdin",
+            "-loglevel",
+            "error",
+            "-i",
+            media_path,
+            "-map",
+            "0:a",
+            "-ac",
+            str(CHANNELS),
+            "-ar",
+            str(SAMPLE_RATE),
+            "-af",
+            "aresample=async=1",  # 处理音频同步问题
+            "-f",
+            "s16le",
+            "-acodec",
+            "pcm_s16le",
+            "pipe:1",
+        ]
+        logger.info(f"提取音频执行命令: {' '.join(cmd)}")
+
+        fd, path = tempfile.mkstemp(suffix=".wav", dir=directory)
+        try:
+            # 错误输出写入临时文件，避免与标准输出同时读取时管道阻塞
+            with os.fdopen(fd, "wb") as f, tempfile.TemporaryFile() as stderr_file:
+                process = subprocess.Popen(
+                    cmd,
+                    stdout=subprocess.PIPE,
+                    stderr=stderr_file,
+                    creationflags=(
+                        getattr(subprocess, "CREATE_NO_WINDOW", 0)
+                        if os.name == "nt"
+                        else 0
+                    ),
+                )
+                assert process.stdout is not None
+                # 先占位文件头，读完后按实际长度改写
+                f.write(bytes(44))
+                size = 0
+                data_crc = 0
+                # 不足一个采样的尾部字节在读完后丢弃，CRC 只计算完整采样
+                pending = b""
+                frame = CHANNELS * SAMPLE_WIDTH
+                while block := process.stdout.read(PIPE_READ_SIZE):
+                    block = pending + block
+                    if extra := len(block) % frame:
+                        block, pending = block[:-extra], block[-extra:]
+                    else:
+                        pending = b""
+                    f.write(block)
+                    data_crc = zlib.crc32(block, data_crc)
+                    size += len(block)
+                process.stdout.close()
+                returncode = process.wait()
+                stderr_file.seek(0)
+                stderr = stderr_file.read().decode("utf-8", errors="replace")
+
+                if returncode != 0 or size == 0:
+                    logger.error(f"音频提取失败: {stderr[-500:]}")
+                    raise RuntimeError(f"音频提取失败: {stderr.strip()[-200:]}")
+                header = _wav_header(size)
+                f.seek(0)
+                f.write(header)
+        except BaseException:
+            Path(path).unlink(missing_ok=True)
+            raise
+
+        crc32_value = crc32_combine(zlib.crc32(header), data_crc, size)
+        logger.info(f"音频提取完成: {size / 1024 / 1024:.2f}MB PCM")
+        return cls._from_temp_file(
+            path, format(crc32_value & 0xFFFFFFFF, "08x"), Path(media_path).stem
+        )
+
+    @property
+    def data(self) -> bytes:
+        """WAV数据，基于文件的音频在首次访问时读入内存（仅供需要完整字节的后端使用）"""
+        if self._data is None:
+            with open(str(self.path), "rb") as f:
+                self._data = f.read()
+        return self._data
+
+    @property
+    def path(self) -> Optional[str]:
+        """音频文件路径，仅存在于内存中时为 None"""
+        for path in (self._path, self._temp_path):
+            if path and os.path.exists(path):
+                return path
+        return None
+
+    @property
+    def size(self) -> int:
+        if self._data is not None:
+            return len(self._data)
+        return os.path.getsize(str(self.path))
+
+    @property
+    def duration_ms(self) -> int:
+        """音频时长（毫秒）"""
+        return (self.size - 44) * 1000 // (SAMPLE_RATE * CHANNELS * SAMPLE_WIDTH)
+
+    def materialize(self) -> str:
+        """返回音频文件路径，仅存在于内存中时写入临时WAV文件，多次调用只写一次"""
+        if path := self.path:
+            return path
+        fd, path = tempfile.mkstemp(suffix=".wav")
+        with os.fdopen(fd, "wb") as f:
+            f.write(self.data)
+        self._temp_path = path
+        logger.info(f"音频已写出到临时文件: {path}")
+        return path
+
+    def unload(self):
+        """释放内存中的音频数据，之后按需从文件读取；须先有文件路径"""
+        if self.path:
+            self._data = None
+
+    def close(self):
+        """删除 materialize() 或提取音频时写出的临时文件，并结束使用缓存文件"""
+        if self._temp_path and os.path.exists(self._temp_path):
+            try:
+                os.unlink(self._temp_path)
+            except OSError as e:
+                logger.warning(f"清理临时文件失败: {e}")
+        self._temp_path = None
+        release, self._release = self._release, None
+        if release:
+            release()
+
+    def __enter__(self) -> "AudioSource":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def media_fingerprint(media_path: str) -> str:
+    """计算音视频文件的内容指纹
+
+    完整哈希大文件的耗时接近一次解码，因此只采样文件首、中、尾三段数据，
+    与文件大小一起作为指纹；与文件路径和修改时间无关，复制或改名后仍能命中。
+    """
+    size = os.path.getsize(media_path)
+    digest = hashlib.sha1(str(size).encode())
+    with open(media_path, "rb") as f:
+        if size <= FINGERPRINT_SAMPLE_SIZE * 3:
+            digest.update(f.read())
+        else:
+            for offset in (0, size // 2, size - FINGERPRINT_SAMPLE_SIZE):
+                f.seek(offset)
+                digest.update(f.read(FINGERPRINT_SAMPLE_SIZE))
+    return digest.hexdigest()
+
+
+def load_audio(
+    media_path: str, use_cache: bool = True, max_cache_size: Optional[int] = None
+) -> AudioSource:
+    """提取音视频文件的音频，命中提取缓存时跳过解码
+
+    Args:
+        media_path: 音视频文件路径
+        use_cache: 是否使用提取音频缓存
+        max_cache_size: 缓存容量上限（字节），默认使用 CACHE_CONFIG 中的配置
+
+    Returns:
+        AudioSource: 提取出的音频；使用缓存时指向缓存文件，close() 之前该缓存
+            不会被淘汰（批量任务中音频总量超过缓存上限时也不会互相淘汰）
+    """
+    if not use_cache:
+        return AudioSource.from_media(media_path)
+
+    cache = AudioCacheManager(str(CACHE_PATH), max_size=max_cache_size)
+    cache_key = cache.make_key(media_fingerprint(media_path), **EXTRACT_PARAMS)
+    name = Path(media_path).stem
+    if cached := cache.get(cache_key):
+        path, crc32_hex = cached
+        logger.info(f"命中音频提取缓存: {path}")
+        return _cached_source(cache, cache_key, path, crc32_hex, name)
+
+    # 直接在缓存目录中提取，写入缓存时只需重命名文件
+    source = AudioSource.from_media(media_path, directory=str(cache.audio_dir))
+    try:
+        path = cache.put(cache_key, str(source.path), source.crc32_hex, media_path)
+    except Exception as e:
+        logger.warning(f"写入音频提取缓存失败: {e}")
+        return source
+    return _cached_source(cache, cache_key, path, source.crc32_hex, name)
+
+
+def _cached_source(
+    cache: AudioCacheManager, cache_key: str, path: str, crc32_hex: str, name: str
+) -> AudioSource:
+    """指向提取缓存文件的音频，close() 时解除对该缓存的占用"""
+    source = AudioSource(path=path, crc32_hex=crc32_hex, name=name)
+    source._release = lambda: cache.release(cache_key)
+    return source
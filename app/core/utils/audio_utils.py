@@ -0,0 +1,354 @@
+"""音频处理工具：基于能量的静音检测与按静音切分WAV"""
+
+import bisect
+import hashlib
+import math
+import os
+import subprocess
+import wave
+from array import array
+from pathlib import Path
+from typing import List, Tuple
+
+from ..utils.logger import setup_logger
+
+logger = setup_logger("audio_utils")
+
+# 静音检测的配置常量
+VAD_FRAME_MS = 30  # 每帧时长（毫秒）
+VAD_SAMPLE_STEP = 8  # 计算能量时的采样步长，降低纯Python计算量
+SILENCE_THRESHOLD_DB = -40.0  # 低于该电平(dBFS)视为静音
+MIN_SILENCE_MS = 300  # 最短静音时长
+SAMPLE_SILENCE_LEVEL = 328  # 单个采样的静音幅度（约满幅的1%）
+
+
+def get_wav_duration_ms(wav_path: str) -> int:
+    """获取WAV文件时长（毫秒）"""
+    with wave.open(wav_path, "rb") as wf:
+        return int(wf.getnframes() * 1000 / wf.getframerate())
+
+
+def frame_energies(wav_path: str, frame_ms: int = VAD_FRAME_MS) -> List[float]:
+    """逐帧计算WAV音频的电平(dBFS)
+
+    仅支持16位PCM，流式读取，内存占用与音频长度无关。
+
+    Args:
+        wav_path: WAV文件路径
+        frame_ms: 每帧时长（毫秒）
+
+    Returns:
+        每帧电平列表
+    """
+    energies = []
+    with wave.open(wav_path, "rb") as wf:
+        if wf.getsampwidth() != 2:
+            raise ValueError(f"仅支持16位PCM音频: {wav_path}")
+        channels = wf.getnchannels()
+        frame_size = max(1, wf.getframerate() * frame_ms // 1000) * channels
+        step = VAD_SAMPLE_STEP * channels
+        # 每次读取约1秒音频，按整帧对齐
+        block_frames = frame_size * max(1, 1000 // frame_ms) // channels
+        while data := wf.readframes(block_frames):
+            samples = array("h", data)
+            for i in range(0, len(samples), frame_size):
+                frame = samples[i : i + frame_size : step]
+                if not frame:
+                    continue
+                mean_abs = sum(map(abs, frame)) / len(frame)
+                energies.append(20 * math.log10(max(mean_abs, 1) / 32768))
+    return energies
+
+
+def detect_silences(
+    wav_path: str,
+    threshold_db: float = SILENCE_THRESHOLD_DB,
+    min_silence_ms: int = MIN_SILENCE_MS,
+    frame_ms: int = VAD_FRAME_MS,
+) -> List[Tuple[int, int]]:
+    """检测音频中的静音区间
+
+    Args:
+        wav_path: WAV文件路径
+        threshold_db: 静音电平阈值(dBFS)
+        min_silence_ms: 最短静音时长（毫秒）
+        frame_ms: 每帧时长（毫秒）
+
+    Returns:
+        静音区间列表 [(start_ms, end_ms), ...]
+    """
+    silences = []
+    run_start = None
+    energies = frame_energies(wav_path, frame_ms)
+    for i, energy in enumerate(energies + [0.0]):
+        if energy < threshold_db:
+            if run_start is None:
+                run_start = i
+        elif run_start is not None:
+            if (i - run_start) * frame_ms >= min_silence_ms:
+                silences.append((run_start * frame_ms, i * frame_ms))
+            run_start = None
+    return _refine_silences(wav_path, silences, frame_ms)
+
+
+def _refine_silences(
+    wav_path: str,
+    silences: List[Tuple[int, int]],
+    frame_ms: int,
+    level: int = SAMPLE_SILENCE_LEVEL,
+) -> List[Tuple[int, int]]:
+    """将按帧量化的静音边界精确到采样
+
+    帧网格取决于音频起点，裁剪后同一段静音的帧边界会偏移；
+    精确到采样后静音边界只取决于音频内容。
+    """
+    refined = []
+    with wave.open(wav_path, "rb") as wf:
+        rate = wf.getframerate()
+        channels = wf.getnchannels()
+        total = wf.getnframes()
+        window = rate * frame_ms // 1000
+
+        def read(frame: int) -> Tuple[int, array]:
+            frame = max(0, frame)
+            wf.setpos(frame)
+            count = min(2 * window, total - frame)
+            return frame, array("h", wf.readframes(max(0, count)))
+
+        for start_ms, end_ms in silences:
+            # 静音起点：边界附近最后一个非静音采样之后
+            frame, samples = read(start_ms * rate // 1000 - window)
+            loud = [i for i, x in enumerate(samples) if abs(x) > level]
+            start = frame + loud[-1] // channels + 1 if loud else frame + window
+            # 静音终点：边界附近第一个非静音采样
+            frame, samples = read(end_ms * rate // 1000 - window)
+            loud_index = next(
+                (i for i, x in enumerate(samples) if abs(x) > level), None
+            )
+            end = (
+                frame + loud_index // channels
+                if loud_index is not None
+                else frame + window
+            )
+            if end > start:
+                refined.append((start * 1000 // rate, end * 1000 // rate))
+    return refined
+
+
+def compute_cut_points(
+    duration_ms: int,
+    silences: List[Tuple[int, int]],
+    chunk_ms: int,
+    search_ms: int = 30_000,
+) -> List[int]:
+    """在静音处选择切分点
+
+    切分点由内容决定：某段静音若是其前后 chunk_ms / 2 范围内最长的静音，
+    则取其中点作为锚点。锚点与绝对位置无关，裁剪片头后大部分切分点保持不变，
+    分块内容也随之不变（便于分块缓存命中）。
+    两个锚点相距过远时，再每隔约 chunk_ms 在附近最长静音处补充切分点。
+
+    Args:
+        duration_ms: 音频总时长（毫秒）
+        silences: 静音区间列表
+        chunk_ms: 目标分块时长（毫秒）
+        search_ms: 在目标位置前后搜索静音的范围（毫秒）
+
+    Returns:
+        切分点列表，首尾分别为 0 和 duration_ms
+    """
+    if duration_ms <= chunk_ms + search_ms:
+        return [0, duration_ms]
+
+    mids = [(start + end) // 2 for start, end in silences]
+    lengths = [end - start for start, end in silences]
+    radius = chunk_ms // 2
+
+    # 静音边界已精确到采样，换算为毫秒后仍有 1ms 的舍入误差
+    tolerance = 2
+
+    # 局部最长静音作为锚点，等长时取靠前者
+    anchors = []
+    for i, mid in enumerate(mids):
+        left = bisect.bisect_left(mids, mid - radius)
+        right = bisect.bisect_right(mids, mid + radius)
+        if all(
+            lengths[j] < lengths[i] - tolerance
+            or (abs(lengths[j] - lengths[i]) <= tolerance and j > i)
+            for j in range(left, right)
+            if j != i
+        ):
+            anchors.append(mid)
+
+    cut_points = [0]
+    for anchor in anchors + [duration_ms]:
+        # 锚点间隔过长时补充切分点
+        while anchor - cut_points[-1] > chunk_ms + search_ms:
+            target = cut_points[-1] + chunk_ms
+            # 静音越长越优先，等长时取离目标位置最近的
+            candidates = [
+                (lengths[i], -abs(mid - target), mid)
+                for i, mid in enumerate(mids)
+                if abs(mid - target) <= search_ms and cut_points[-1] < mid < anchor
+            ]
+            cut_points.append(max(candidates)[2] if candidates else target)
+        if anchor - cut_points[-1] >= search_ms and duration_ms - anchor >= search_ms:
+            cut_points.append(anchor)
+    cut_points.append(duration_ms)
+    return cut_points
+
+
+def split_wav(
+    wav_path: str, ranges: List[Tuple[int, int]], output_dir: str
+) -> List[str]:
+    """按时间区间将WAV切分为多个文件
+
+    Args:
+        wav_path: 源WAV文件路径
+        ranges: 时间区间列表 [(start_ms, end_ms), ...]
+        output_dir: 输出目录
+
+    Returns:
+        切分后的WAV文件路径列表
+    """
+    output_paths = []
+    Path(output_dir).mkdir(parents=True, exist_ok=True)
+    with wave.open(wav_path, "rb") as src:
+        params = src.getparams()
+        rate = src.getframerate()
+        for i, (start_ms, end_ms) in enumerate(ranges):
+            start_frame = start_ms * rate // 1000
+            end_frame = min(end_ms * rate // 1000, params.nframes)
+            src.setpos(start_frame)
+            chunk_path = str(Path(output_dir) / f"chunk_{i:04d}.wav")
+            with wave.open(chunk_path, "wb") as dst:
+                dst.setparams(params)
+                remaining = end_frame - start_frame
+                while remaining > 0:
+                    data = src.readframes(min(remaining, rate * 10))
+                    if not data:
+                        break
+                    dst.writeframes(data)
+                    remaining -= len(data) // (params.sampwidth * params.nchannels)
+            output_paths.append(chunk_path)
+    logger.info(f"音频已切分为 {len(output_paths)} 块")
+    return output_paths
+
+
+def pcm_fingerprint(
+    wav_path: str,
+    start_ms: int,
+    end_ms: int,
+    level: int = SAMPLE_SILENCE_LEVEL,
+) -> Tuple[str, int]:
+    """计算音频区间内PCM数据的内容哈希
+
+    哈希只覆盖区间内第一个到最后一个非静音采样，与切分点的细微偏移无关；
+    同一段音频在不同文件、不同位置出现时得到相同的哈希。
+
+    Args:
+        wav_path: WAV文件路径
+        start_ms: 区间起点（毫秒）
+        end_ms: 区间终点（毫秒）
+        level: 采样绝对值超过该值视为非静音
+
+    Returns:
+        (哈希值, 第一个非静音采样的绝对时间（毫秒）)
+    """
+    with wave.open(wav_path, "rb") as wf:
+        if wf.getsampwidth() != 2:
+            raise ValueError(f"仅支持16位PCM音频: {wav_path}")
+        rate = wf.getframerate()
+        channels = wf.getnchannels()
+        start_frame = start_ms * rate // 1000
+        end_frame = min(end_ms * rate // 1000, wf.getnframes())
+        block_frames = rate  # 每块1秒
+
+        def read_block(frame: int, count: int) -> array:
+            wf.setpos(frame)
+            return array("h", wf.readframes(count))
+
+        def is_loud(samples: array) -> bool:
+            return bool(samples) and (max(samples) > level or min(samples) < -level)
+
+        # 正向查找第一个非静音采样
+        first = None
+        for frame in range(start_frame, end_frame, block_frames):
+            samples = read_block(frame, min(block_frames, end_frame - frame))
+            if is_loud(samples):
+                index = next(i for i, x in enumerate(samples) if abs(x) > level)
+                first = frame + index // channels
+                break
+        if first is None:
+            return hashlib.sha1(b"").hexdigest(), start_ms
+
+        # 反向查找最后一个非静音采样
+        last = first
+        frame_end = end_frame
+        while frame_end > first:
+            frame = max(first, frame_end - block_frames)
+            samples = read_block(frame, frame_end - frame)
+            if is_loud(samples):
+                index = next(
+                    i
+                    for i in range(len(samples) - 1, -1, -1)
+                    if abs(samples[i]) > level
+                )
+                last = frame + index // channels
+                break
+            frame_end = frame
+
+        # 哈希 [first, last] 区间的原始PCM
+        digest = hashlib.sha1()
+        wf.setpos(first)
+        remaining = last - first + 1
+        while remaining > 0:
+            data = wf.readframes(min(remaining, block_frames))
+            if not data:
+                break
+            digest.update(data)
+            remaining -= len(data) // (2 * channels)
+    return digest.hexdigest(), first * 1000 // rate
+
+
+def encode_audio(wav_path: str, output_path: str, bitrate: str = "48k") -> bool:
+    """使用ffmpeg将WAV编码为体积更小的单声道MP3
+
+    Args:
+        wav_path: 源WAV文件路径
+        output_path: 输出文件路径
+        bitrate: 目标码率
+
+    Returns:
+        是否编码成功，ffmpeg不可用时返回False
+    """
+    cmd = [
+        "ffmpeg",
+        "-i",
+        wav_path,
+        "-ac",
+        "1",
+        "-c:a",
+        "libmp3lame",
+        "-b:a",
+        bitrate,
+        "-y",
+        output_path,
+    ]
+    try:
+        result = subprocess.run(
+            cmd,
+            capture_output=True,
+            encoding="utf-8",
+            errors="replace",
+            creationflags=(
+                getattr(subprocess, "CREATE_NO_WINDOW", 0) if os.name == "nt" else 0
+            ),
+        )
+    except OSError as e:
+        logger.warning(f"音频编码失败: {e}")
+        return False
+    if result.returncode != 0 or not Path(output_path).is_file():
+        logger.warning(f"音频编码失败: {result.stderr[-500:]}")
+        return False
+    return True
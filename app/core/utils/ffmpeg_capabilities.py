@@ -0,0 +1,256 @@
+"""ffmpeg 能力注册表：每个 ffmpeg 版本只探测一次，结果按可执行文件路径、大小和修改时间缓存到磁盘"""
+
+import json
+import os
+import re
+import shutil
+import subprocess
+import threading
+from dataclasses import asdict, dataclass, field
+from typing import Callable, Dict, List, Optional
+
+from ...config import CACHE_PATH
+from ..utils.logger import setup_logger
+
+logger = setup_logger("ffmpeg_capabilities")
+
+# 能力探测结果的缓存文件
+CAPABILITIES_FILE = CACHE_PATH / "ffmpeg_capabilities.json"
+# 缓存格式版本，探测内容变更后旧缓存自动失效
+CAPABILITIES_VERSION = 2
+
+_CREATION_FLAGS = getattr(subprocess, "CREATE_NO_WINDOW", 0) if os.name == "nt" else 0
+
+# 列表输出开头的标志位说明行，如 " D. = Demuxing supported"、"  T.. = Timeline support"
+_LEGEND_PATTERN = re.compile(r"^\s*(\S+) = ")
+# 条目行标志位列中允许的字符（未设置的标志位为 . 或空格）
+_FLAGS_PATTERN = re.compile(r"^[A-Za-z.| ]+$")
+
+
+@dataclass
+class FFmpegCapabilities:
+    """ffmpeg 可执行文件支持的硬件加速、编码器、滤镜和分离器"""
+
+    binary: str
+    version: str = ""
+    hwaccels: List[str] = field(default_factory=list)
+    encoders: List[str] = field(default_factory=list)
+    filters: List[str] = field(default_factory=list)
+    demuxers: List[str] = field(default_factory=list)
+
+    def __post_init__(self):
+        self._encoder_set = set(self.encoders)
+        self._filter_set = set(self.filters)
+        self._demuxer_set = set(self.demuxers)
+
+    def has_hwaccel(self, name: str) -> bool:
+        return name.lower() in self.hwaccels
+
+    def has_encoder(self, name: str) -> bool:
+        return name in self._encoder_set
+
+    def has_filter(self, name: str) -> bool:
+        return name in self._filter_set
+
+    def has_demuxer(self, name: str) -> bool:
+        return name in self._demuxer_set
+
+    @property
+    def libass(self) -> bool:
+        """是否编译了 libass（subtitles / ass 滤镜），硬字幕和样式预览依赖该库"""
+        return self.has_filter("subtitles") and self.has_filter("ass")
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+
+_lock = threading.Lock()
+# 进程内缓存，键为 _binary_key() 的结果
+_capabilities: Dict[str, FFmpegCapabilities] = {}
+# CUDA 设备初始化结果，取决于驱动而非 ffmpeg 本身，只在进程内缓存
+_cuda_available: Dict[str, bool] = {}
+
+
+def _binary_key(path: str) -> Optional[str]:
+    """可执行文件的缓存键：路径、大小和修改时间，升级或替换 ffmpeg 后自动失效"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (
+        f"{os.path.normcase(os.path.abspath(path))}|{stat.st_size}|{stat.st_mtime_ns}"
+    )
+
+
+def _run(binary: str, *args: str) -> str:
+    result = subprocess.run(
+        [binary, "-hide_banner", *args],
+        capture_output=True,
+        text=True,
+        encoding="utf-8",
+        errors="replace",
+        creationflags=_CREATION_FLAGS,
+    )
+    return result.stdout
+
+
+def _parse_names(
+    output: str, accept: Callable[[str, List[str]], bool] = lambda flags, fields: True
+) -> List[str]:
+    """解析 -encoders / -filters / -demuxers 的输出
+
+    条目行为 " " + 固定宽度的标志位列 + 名称 + 说明，标志位列的宽度取说明行中
+    最长的标志位（如 ffmpeg 7 分离器的 "..d"）。标志位中可能有空格（如 "D d"），
+    因此按列宽而不是按空白切分。
+
+    Args:
+        output: ffmpeg 输出
+        accept: 按 (标志位, 名称及之后的字段) 判断是否为有效条目
+    """
+    width = 0
+    names = []
+    for line in output.splitlines():
+        if match := _LEGEND_PATTERN.match(line):
+            width = max(width, len(match.group(1)))
+            continue
+        if not width or not line.startswith(" "):
+            continue
+        flags, rest = line[1 : 1 + width], line[1 + width :]
+        fields = rest.split()
+        if (
+            not fields
+            or not rest[:1].isspace()
+            or not _FLAGS_PATTERN.match(flags)
+            or not flags.strip()
+            or not accept(flags, fields)
+        ):
+            continue
+        # 分离器可能有多个别名，如 mov,mp4,m4a
+        names.extend(name for name in fields[0].split(",") if name)
+    return sorted(set(names))
+
+
+def _probe(binary: str) -> FFmpegCapabilities:
+    """执行 ffmpeg 列出各项能力"""
+    logger.info(f"探测 ffmpeg 能力: {binary}")
+    version_line = _run(binary, "-version").partition("\n")[0]
+    version = version_line.split(" ")[2] if version_line.count(" ") >= 2 else ""
+    hwaccels = [
+        line.strip().lower()
+        for line in _run(binary, "-hwaccels").splitlines()[1:]
+        if line.strip()
+    ]
+    return FFmpegCapabilities(
+        binary=binary,
+        version=version,
+        hwaccels=hwaccels,
+        encoders=_parse_names(_run(binary, "-encoders")),
+        filters=_parse_names(
+            _run(binary, "-filters"),
+            lambda flags, fields: len(fields) > 1 and "->" in fields[1],
+        ),
+        demuxers=_parse_names(
+            _run(binary, "-demuxers"), lambda flags, fields: flags[0] == "D"
+        ),
+    )
+
+
+def _load_disk_cache() -> Dict[str, Dict]:
+    try:
+        data = json.loads(CAPABILITIES_FILE.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict) or data.get("version") != CAPABILITIES_VERSION:
+        return {}
+    return data.get("binaries", {})
+
+
+def _save_disk_cache(key: str, capabilities: FFmpegCapabilities):
+    binaries = _load_disk_cache()
+    # 同一路径的旧版本记录不再有用
+    path = key.partition("|")[0]
+    binaries = {k: v for k, v in binaries.items() if k.partition("|")[0] != path}
+    binaries[key] = capabilities.to_dict()
+    temp_file = CAPABILITIES_FILE.with_suffix(".tmp")
+    try:
+        CAPABILITIES_FILE.parent.mkdir(parents=True, exist_ok=True)
+        temp_file.write_text(
+            json.dumps(
+                {"version": CAPABILITIES_VERSION, "binaries": binaries},
+                ensure_ascii=False,
+                indent=2,
+            ),
+            encoding="utf-8",
+        )
+        os.replace(temp_file, CAPABILITIES_FILE)
+    except OSError as e:
+        logger.warning(f"保存 ffmpeg 能力缓存失败: {e}")
+
+
+def get_capabilities(binary: str = "ffmpeg") -> Optional[FFmpegCapabilities]:
+    """获取 ffmpeg 的能力，优先读取进程内和磁盘缓存
+
+    Args:
+        binary: ffmpeg 可执行文件名或路径
+
+    Returns:
+        FFmpegCapabilities，找不到 ffmpeg 时返回 None
+    """
+    path = shutil.which(binary)
+    if not path or not (key := _binary_key(path)):
+        return None
+    with _lock:
+        if capabilities := _capabilities.get(key):
+            return capabilities
+        if cached := _load_disk_cache().get(key):
+            try:
+                capabilities = FFmpegCapabilities(**cached)
+            except TypeError:
+                capabilities = None
+        if not capabilities:
+            try:
+                capabilities = _probe(path)
+            except OSError as e:
+                logger.warning(f"探测 ffmpeg 能力失败: {e}")
+                return None
+            _save_disk_cache(key, capabilities)
+        _capabilities[key] = capabilities
+        return capabilities
+
+
+def is_cuda_available(binary: str = "ffmpeg") -> bool:
+    """ffmpeg 支持 CUDA 硬件加速且能初始化 CUDA 设备，每个进程只检查一次"""
+    capabilities = get_capabilities(binary)
+    if not capabilities or not capabilities.has_hwaccel("cuda"):
+        return False
+    key = _binary_key(capabilities.binary) or capabilities.binary
+    with _lock:
+        if key in _cuda_available:
+            return _cuda_available[key]
+        try:
+            result = subprocess.run(
+                [capabilities.binary, "-hide_banner", "-init_hw_device", "cuda"],
+                capture_output=True,
+                text=True,
+                encoding="utf-8",
+                errors="replace",
+                creationflags=_CREATION_FLAGS,
+            )
+            # stderr 中包含 "Cannot load cuda"、"Failed to load" 等错误信息时说明CUDA不可用
+            available = not any(
+                error in result.stderr.lower()
+                for error in ["cannot load cuda", "failed to load", "error"]
+            )
+        except OSError as e:
+            logger.warning(f"检查CUDA出错: {e}")
+            available = False
+        _cuda_available[key] = available
+        return available
+
+
+def clear_cache():
+    """清除进程内和磁盘上的探测结果，下次调用时重新探测"""
+    with _lock:
+        _capabilities.clear()
+        _cuda_available.clear()
+        CAPABILITIES_FILE.unlink(missing_ok=True)
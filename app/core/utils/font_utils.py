@@ -0,0 +1,150 @@
+"""字体文件查找：读取系统字体目录中 TrueType/OpenType 字体的名称表，按字体名定位字体文件"""
+
+import os
+import platform
+import struct
+import threading
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterable, List, Optional
+
+from ..utils.logger import setup_logger
+
+logger = setup_logger("font_utils")
+
+FONT_EXTENSIONS = {".ttf", ".otf", ".ttc", ".otc"}
+# 名称表中用于匹配的条目：字体族名、全名、PostScript 名、首选字体族名
+FONT_NAME_IDS = {1, 4, 6, 16}
+
+_index: Optional[Dict[str, List[str]]] = None
+_index_lock = threading.Lock()
+
+
+def system_font_dirs() -> List[Path]:
+    """当前系统的字体目录"""
+    home = Path.home()
+    system = platform.system()
+    if system == "Windows":
+        windir = os.environ.get("WINDIR", r"C:\Windows")
+        dirs = [Path(windir) / "Fonts"]
+        if local_app_data := os.environ.get("LOCALAPPDATA"):
+            dirs.append(Path(local_app_data) / "Microsoft" / "Windows" / "Fonts")
+    elif system == "Darwin":
+        dirs = [
+            Path("/System/Library/Fonts"),
+            Path("/Library/Fonts"),
+            home / "Library" / "Fonts",
+        ]
+    else:
+        dirs = [
+            Path("/usr/share/fonts"),
+            Path("/usr/local/share/fonts"),
+            home / ".fonts",
+            home / ".local" / "share" / "fonts",
+        ]
+    return [d for d in dirs if d.is_dir()]
+
+
+def _read_name_table(f: BinaryIO, offset: int) -> List[str]:
+    """读取单个字体（偏移表位于 offset）的名称"""
+    f.seek(offset)
+    header = f.read(12)
+    if len(header) < 12:
+        return []
+    num_tables = struct.unpack(">H", header[4:6])[0]
+    directory = f.read(16 * num_tables)
+    for i in range(num_tables):
+        tag, _, table_offset, length = struct.unpack(
+            ">4sIII", directory[i * 16 : i * 16 + 16]
+        )
+        if tag == b"name":
+            break
+    else:
+        return []
+
+    f.seek(table_offset)
+    table = f.read(length)
+    if len(table) < 6:
+        return []
+    _, count, string_offset = struct.unpack(">HHH", table[:6])
+    names = []
+    for i in range(count):
+        record = table[6 + i * 12 : 18 + i * 12]
+        if len(record) < 12:
+            break
+        platform_id, _, _, name_id, name_length, name_offset = struct.unpack(
+            ">HHHHHH", record
+        )
+        if name_id not in FONT_NAME_IDS:
+            continue
+        start = string_offset + name_offset
+        raw = table[start : start + name_length]
+        # Unicode 和 Windows 平台为 UTF-16BE，Mac 平台为单字节编码
+        encoding = "utf-16-be" if platform_id in (0, 3) else "latin-1"
+        name = raw.decode(encoding, errors="ignore").strip("\x00 ")
+        if name:
+            names.append(name)
+    return names
+
+
+def read_font_names(font_path: str) -> List[str]:
+    """读取字体文件中的字体名，字体集合（.ttc）返回其中所有字体的名称"""
+    try:
+        with open(font_path, "rb") as f:
+            header = f.read(12)
+            if header[:4] == b"ttcf":
+                num_fonts = struct.unpack(">I", header[8:12])[0]
+                offsets = struct.unpack(f">{num_fonts}I", f.read(4 * num_fonts))
+            else:
+                offsets = (0,)
+            names = []
+            for offset in offsets:
+                names.extend(_read_name_table(f, offset))
+            return list(dict.fromkeys(names))
+    except (OSError, struct.error) as e:
+        logger.debug(f"读取字体名称失败 {font_path}: {e}")
+        return []
+
+
+def _build_index(font_dirs: Iterable[Path]) -> Dict[str, List[str]]:
+    index: Dict[str, List[str]] = {}
+    for font_dir in font_dirs:
+        for root, _, files in os.walk(font_dir):
+            for file_name in files:
+                if Path(file_name).suffix.lower() not in FONT_EXTENSIONS:
+                    continue
+                path = os.path.join(root, file_name)
+                for name in read_font_names(path):
+                    paths = index.setdefault(name.lower(), [])
+                    if path not in paths:
+                        paths.append(path)
+    return index
+
+
+def find_font_files(
+    font_names: Iterable[str], font_dirs: Optional[Iterable[Path]] = None
+) -> Dict[str, List[str]]:
+    """按字体名查找字体文件，同一字体族的粗体、斜体等文件一并返回
+
+    系统字体目录的索引在进程内只建立一次。
+
+    Args:
+        font_names: 字体名列表（不区分大小写）
+        font_dirs: 查找的字体目录，默认使用系统字体目录
+
+    Returns:
+        {字体名: [字体文件路径, ...]}，找不到的字体不在结果中
+    """
+    global _index
+    if font_dirs is None:
+        with _index_lock:
+            if _index is None:
+                _index = _build_index(system_font_dirs())
+            index = _index
+    else:
+        index = _build_index(font_dirs)
+
+    result = {}
+    for name in font_names:
+        if paths := index.get(name.lower()):
+            result[name] = list(paths)
+    return result
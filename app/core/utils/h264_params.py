@@ -0,0 +1,143 @@
+"""解析 H.264 Annex B 码流中的 SPS/PPS，用于判断两段码流能否直接拼接"""
+
+import re
+from typing import Dict, Optional, Tuple
+
+_START_CODE = re.compile(b"\x00\x00\x01")
+_EMULATION_PREVENTION = re.compile(b"\x00\x00\x03")
+# NAL 单元类型：序列参数集、图像参数集
+_NAL_SPS = 7
+_NAL_PPS = 8
+# 带 chroma_format_idc 等扩展字段的 profile_idc
+_HIGH_PROFILE_IDCS = {100, 110, 122, 244, 44, 83, 86, 118, 128, 138, 139, 134, 135}
+
+
+class _BitReader:
+    """按位读取 RBSP，支持指数哥伦布编码"""
+
+    def __init__(self, data: bytes):
+        self._value = int.from_bytes(data, "big")
+        self._remaining = len(data) * 8
+
+    def u(self, bits: int) -> int:
+        if bits > self._remaining:
+            raise ValueError("参数集数据不完整")
+        self._remaining -= bits
+        return (self._value >> self._remaining) & ((1 << bits) - 1)
+
+    def ue(self) -> int:
+        zeros = 0
+        while not self.u(1):
+            zeros += 1
+        return (1 << zeros) - 1 + self.u(zeros)
+
+    def se(self) -> int:
+        value = self.ue()
+        return (value + 1) // 2 if value % 2 else -(value // 2)
+
+    def more_rbsp_data(self) -> bool:
+        """剩余的位中除结尾的停止位外是否还有数据"""
+        rest = self._value & ((1 << self._remaining) - 1)
+        return bool(rest & (rest - 1))
+
+
+def _skip_scaling_list(reader: _BitReader, size: int):
+    last_scale = next_scale = 8
+    for _ in range(size):
+        if next_scale:
+            next_scale = (last_scale + reader.se() + 256) % 256
+        last_scale = next_scale or last_scale
+
+
+def parse_sps(rbsp: bytes) -> Dict[str, int]:
+    """解析 SPS 中影响条带解析和参考帧管理的字段"""
+    reader = _BitReader(rbsp)
+    sps = {"profile_idc": reader.u(8)}
+    reader.u(8)  # constraint_set 标志
+    sps["level_idc"] = reader.u(8)
+    reader.ue()  # seq_parameter_set_id
+    sps.update(chroma_format_idc=1, bit_depth_luma=8, bit_depth_chroma=8)
+    if sps["profile_idc"] in _HIGH_PROFILE_IDCS:
+        sps["chroma_format_idc"] = reader.ue()
+        if sps["chroma_format_idc"] == 3:
+            sps["separate_colour_plane"] = reader.u(1)
+        sps["bit_depth_luma"] = reader.ue() + 8
+        sps["bit_depth_chroma"] = reader.ue() + 8
+        reader.u(1)  # qpprime_y_zero_transform_bypass_flag
+        if reader.u(1):  # seq_scaling_matrix_present_flag
+            for i in range(8 if sps["chroma_format_idc"] != 3 else 12):
+                if reader.u(1):
+                    _skip_scaling_list(reader, 16 if i < 6 else 64)
+    sps["log2_max_frame_num"] = reader.ue() + 4
+    sps["pic_order_cnt_type"] = reader.ue()
+    if sps["pic_order_cnt_type"] == 0:
+        sps["log2_max_pic_order_cnt_lsb"] = reader.ue() + 4
+    elif sps["pic_order_cnt_type"] == 1:
+        sps["delta_pic_order_always_zero"] = reader.u(1)
+        reader.se()  # offset_for_non_ref_pic
+        reader.se()  # offset_for_top_to_bottom_field
+        for _ in range(reader.ue()):
+            reader.se()
+    sps["max_num_ref_frames"] = reader.ue()
+    reader.u(1)  # gaps_in_frame_num_value_allowed_flag
+    sps["pic_width_in_mbs"] = reader.ue() + 1
+    sps["pic_height_in_map_units"] = reader.ue() + 1
+    sps["frame_mbs_only"] = reader.u(1)
+    return sps
+
+
+def parse_pps(rbsp: bytes) -> Dict[str, int]:
+    """解析 PPS 中影响条带解析和解码的字段"""
+    reader = _BitReader(rbsp)
+    reader.ue()  # pic_parameter_set_id
+    reader.ue()  # seq_parameter_set_id
+    pps = {
+        "entropy_coding_mode": reader.u(1),
+        "bottom_field_pic_order_in_frame_present": reader.u(1),
+        "num_slice_groups": reader.ue() + 1,
+    }
+    if pps["num_slice_groups"] > 1:
+        # FMO 仅用于 Baseline 扩展，不再解析后续字段
+        return pps
+    pps["num_ref_idx_l0_default_active"] = reader.ue() + 1
+    pps["num_ref_idx_l1_default_active"] = reader.ue() + 1
+    pps["weighted_pred"] = reader.u(1)
+    pps["weighted_bipred_idc"] = reader.u(2)
+    pps["pic_init_qp"] = reader.se() + 26
+    pps["pic_init_qs"] = reader.se() + 26
+    pps["chroma_qp_index_offset"] = reader.se()
+    pps["deblocking_filter_control_present"] = reader.u(1)
+    pps["constrained_intra_pred"] = reader.u(1)
+    pps["redundant_pic_cnt_present"] = reader.u(1)
+    pps["transform_8x8_mode"] = 0
+    if reader.more_rbsp_data():
+        pps["transform_8x8_mode"] = reader.u(1)
+        pps["pic_scaling_matrix_present"] = reader.u(1)
+        if not pps["pic_scaling_matrix_present"]:
+            pps["second_chroma_qp_index_offset"] = reader.se()
+    return pps
+
+
+def find_parameter_sets(
+    data: bytes,
+) -> Tuple[Optional[Dict[str, int]], Optional[Dict[str, int]]]:
+    """返回 Annex B 码流中第一个 SPS 和第一个 PPS 的解析结果，不存在时为 None"""
+    sps = pps = None
+    starts = [match.end() for match in _START_CODE.finditer(data)]
+    for start, end in zip(starts, starts[1:] + [len(data) + 3]):
+        if start >= len(data):
+            continue
+        nal_type = data[start] & 0x1F
+        if nal_type not in (_NAL_SPS, _NAL_PPS):
+            continue
+        # 去掉下一个起始码（及 4 字节起始码的前导零）和防竞争字节
+        rbsp = _EMULATION_PREVENTION.sub(
+            b"\x00\x00", data[start + 1 : end - 3].rstrip(b"\x00")
+        )
+        if nal_type == _NAL_SPS and sps is None:
+            sps = parse_sps(rbsp)
+        elif nal_type == _NAL_PPS and pps is None:
+            pps = parse_pps(rbsp)
+        if sps is not None and pps is not None:
+            break
+    return sps, pps
@@ -0,0 +1,322 @@
+"""媒体信息服务：使用 ffprobe JSON 输出读取媒体信息，在有限的进程池中探测，结果按 (路径, 大小, 修改时间) 建立持久索引
+
+未安装 ffprobe 时退回解析 `ffmpeg -i` 的输出。
+"""
+
+import json
+import os
+import re
+import shutil
+import subprocess
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from ...config import CACHE_PATH
+from ..storage.cache_manager import MediaInfoManager
+from ..utils.logger import setup_logger
+
+logger = setup_logger("media_info")
+
+# 同时运行的 ffprobe 进程数上限
+MAX_PROBE_WORKERS = min(4, os.cpu_count() or 1)
+# 单个文件的探测超时（秒）
+PROBE_TIMEOUT = 60
+
+_CREATION_FLAGS = getattr(subprocess, "CREATE_NO_WINDOW", 0) if os.name == "nt" else 0
+
+_IndexKey = Tuple[str, int, int]
+
+
+def _parse_rate(rate: str) -> float:
+    """解析 ffprobe 的帧率字符串，如 30000/1001"""
+    num, _, den = (rate or "").partition("/")
+    try:
+        return float(num) / float(den or 1)
+    except (ValueError, ZeroDivisionError):
+        return 0.0
+
+
+def _to_float(value, default: float = 0.0) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def parse_probe_output(file_path: str, probe: Dict) -> Dict:
+    """将 ffprobe JSON 输出整理为媒体信息字典
+
+    字段与 VideoInfo 一致，另外包含 start_time（秒）和 pix_fmt。
+    """
+    fmt = probe.get("format", {})
+    streams = probe.get("streams", [])
+    info = {
+        "file_name": Path(file_path).stem,
+        "file_path": file_path,
+        "duration_seconds": _to_float(fmt.get("duration")),
+        "bitrate_kbps": int(_to_float(fmt.get("bit_rate")) // 1000),
+        "video_codec": "",
+        "width": 0,
+        "height": 0,
+        "fps": 0.0,
+        "pix_fmt": "",
+        "audio_codec": "",
+        "audio_sampling_rate": 0,
+        "start_time": _to_float(fmt.get("start_time")),
+        "thumbnail_path": "",
+    }
+    # 跳过封面图片等附加图片流
+    video = next(
+        (
+            s
+            for s in streams
+            if s.get("codec_type") == "video"
+            and not s.get("disposition", {}).get("attached_pic")
+        ),
+        None,
+    )
+    if video:
+        info.update(
+            {
+                "video_codec": video.get("codec_name", ""),
+                "width": int(video.get("width") or 0),
+                "height": int(video.get("height") or 0),
+                "fps": _parse_rate(video.get("avg_frame_rate", ""))
+                or _parse_rate(video.get("r_frame_rate", "")),
+                "pix_fmt": video.get("pix_fmt", ""),
+            }
+        )
+    audio = next((s for s in streams if s.get("codec_type") == "audio"), None)
+    if audio:
+        info.update(
+            {
+                "audio_codec": audio.get("codec_name", ""),
+                "audio_sampling_rate": int(_to_float(audio.get("sample_rate"))),
+            }
+        )
+    return info
+
+
+def probe_media(file_path: str) -> Dict:
+    """执行 ffprobe 读取媒体信息
+
+    Raises:
+        RuntimeError: ffprobe 执行失败或输出无法解析
+    """
+    cmd = [
+        "ffprobe",
+        "-v",
+        "error",
+        "-print_format",
+        "json",
+        "-show_format",
+        "-show_streams",
+        file_path,
+    ]
+    try:
+        result = subprocess.run(
+            cmd,
+            capture_output=True,
+            text=True,
+            encoding="utf-8",
+            errors="replace",
+            timeout=PROBE_TIMEOUT,
+            creationflags=_CREATION_FLAGS,
+        )
+    except (OSError, subprocess.TimeoutExpired) as e:
+        raise RuntimeError(f"读取媒体信息失败: {e}") from e
+    if result.returncode != 0:
+        raise RuntimeError(f"读取媒体信息失败: {result.stderr.strip()[-200:]}")
+    try:
+        return parse_probe_output(file_path, json.loads(result.stdout or "{}"))
+    except ValueError as e:
+        raise RuntimeError(f"解析媒体信息失败: {e}") from e
+
+
+def parse_ffmpeg_output(file_path: str, output: str) -> Dict:
+    """从 `ffmpeg -i` 的输出中解析媒体信息，字段与 parse_probe_output 一致"""
+    info = parse_probe_output(file_path, {})
+    if duration_match := re.search(r"Duration: (\d+):(\d+):(\d+\.\d+)", output):
+        hours, minutes, seconds = map(float, duration_match.groups())
+        info["duration_seconds"] = hours * 3600 + minutes * 60 + seconds
+    if start_match := re.search(r"start: (-?\d+\.\d+)", output):
+        info["start_time"] = float(start_match.group(1))
+    if bitrate_match := re.search(r"bitrate: (\d+) kb/s", output):
+        info["bitrate_kbps"] = int(bitrate_match.group(1))
+    # 跳过封面图片等附加图片流
+    for video_match in re.finditer(
+        r"Stream #\d+:\d+.*Video: (\w+)[^,]*, (\w+).*?, (\d+)x(\d+).*?, "
+        r"([\d.]+)(k?) (?:fps|tbr)(.*)",
+        output,
+    ):
+        if "attached pic" in video_match.group(7):
+            continue
+        info.update(
+            {
+                "video_codec": video_match.group(1),
+                "pix_fmt": video_match.group(2),
+                "width": int(video_match.group(3)),
+                "height": int(video_match.group(4)),
+                "fps": float(video_match.group(5))
+                * (1000 if video_match.group(6) else 1),
+            }
+        )
+        break
+    if audio_match := re.search(r"Stream #\d+:\d+.*Audio: (\w+).*? (\d+) Hz", output):
+        info["audio_codec"] = audio_match.group(1)
+        info["audio_sampling_rate"] = int(audio_match.group(2))
+    return info
+
+
+def probe_media_with_ffmpeg(file_path: str) -> Dict:
+    """未安装 ffprobe 时通过 `ffmpeg -i` 读取媒体信息
+
+    Raises:
+        RuntimeError: ffmpeg 执行失败或未找到媒体时长
+    """
+    try:
+        result = subprocess.run(
+            ["ffmpeg", "-hide_banner", "-i", file_path],
+            capture_output=True,
+            text=True,
+            encoding="utf-8",
+            errors="replace",
+            timeout=PROBE_TIMEOUT,
+            creationflags=_CREATION_FLAGS,
+        )
+    except (OSError, subprocess.TimeoutExpired) as e:
+        raise RuntimeError(f"读取媒体信息失败: {e}") from e
+    # 未指定输出文件时 ffmpeg 总是返回非零，以是否解析出输入信息判断成功
+    if "Duration:" not in result.stderr:
+        raise RuntimeError(f"读取媒体信息失败: {result.stderr.strip()[-200:]}")
+    return parse_ffmpeg_output(file_path, result.stderr)
+
+
+def has_media_prober() -> bool:
+    """是否可以读取媒体信息（ffprobe 或 ffmpeg 可用）"""
+    return bool(shutil.which("ffprobe") or shutil.which("ffmpeg"))
+
+
+class MediaInfoService:
+    """媒体信息服务
+
+    所有探测在共享的线程池中执行，同时运行的 ffprobe 进程数有上限；
+    同一文件的并发请求只探测一次，结果保存在内存和数据库索引中。
+    """
+
+    def __init__(
+        self, app_data_path: str = str(CACHE_PATH), max_workers: int = MAX_PROBE_WORKERS
+    ):
+        self._index: Dict[_IndexKey, Dict] = {}
+        self._pending: Dict[_IndexKey, Future] = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="media_probe"
+        )
+        try:
+            self._store: Optional[MediaInfoManager] = MediaInfoManager(app_data_path)
+        except Exception as e:
+            logger.warning(f"媒体信息索引不可用，仅使用内存缓存: {e}")
+            self._store = None
+
+    @staticmethod
+    def _index_key(file_path: str) -> _IndexKey:
+        stat = os.stat(file_path)
+        return os.path.abspath(file_path), stat.st_size, stat.st_mtime_ns
+
+    def _probe(self, key: _IndexKey, file_path: str) -> Dict:
+        try:
+            if shutil.which("ffprobe"):
+                info = probe_media(file_path)
+                if self._store:
+                    self._store.set(*key, info)
+            else:
+                # ffmpeg 输出的信息不完整，只保存在内存中，安装 ffprobe 后重新探测
+                info = probe_media_with_ffmpeg(file_path)
+            with self._lock:
+                self._index[key] = info
+            return info
+        finally:
+            with self._lock:
+                self._pending.pop(key, None)
+
+    def submit(self, file_path: str) -> "Future[Dict]":
+        """提交探测任务，已在索引中的文件直接返回已完成的 Future"""
+        key = self._index_key(file_path)
+        with self._lock:
+            if key in self._index:
+                future: Future = Future()
+                future.set_result(self._index[key])
+                return future
+            if key in self._pending:
+                return self._pending[key]
+        if self._store and (info := self._store.get(*key)):
+            with self._lock:
+                self._index[key] = info
+            future = Future()
+            future.set_result(info)
+            return future
+        with self._lock:
+            if key not in self._pending:
+                self._pending[key] = self._executor.submit(self._probe, key, file_path)
+            return self._pending[key]
+
+    def get(self, file_path: str, timeout: Optional[float] = None) -> Dict:
+        """获取媒体信息，未索引时等待探测完成
+
+        Returns:
+            媒体信息字典的副本
+
+        Raises:
+            OSError: 文件不存在
+            RuntimeError: ffprobe 执行失败
+        """
+        return dict(self.submit(file_path).result(timeout=timeout))
+
+    def prefetch(self, file_paths: Iterable[str]) -> List["Future[Dict]"]:
+        """批量提交探测任务，不等待结果；不存在的文件跳过"""
+        futures = []
+        for file_path in file_paths:
+            try:
+                futures.append(self.submit(file_path))
+            except OSError:
+                continue
+        return futures
+
+    def get_cached(self, file_path: str) -> Optional[Dict]:
+        """只查询索引，不启动探测"""
+        try:
+            key = self._index_key(file_path)
+        except OSError:
+            return None
+        with self._lock:
+            if info := self._index.get(key):
+                return dict(info)
+        return self._store.get(*key) if self._store else None
+
+
+_service: Optional[MediaInfoService] = None
+_service_lock = threading.Lock()
+
+
+def get_media_info_service() -> MediaInfoService:
+    """获取全局媒体信息服务"""
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = MediaInfoService()
+        return _service
+
+
+def get_media_info(file_path: str) -> Optional[Dict]:
+    """获取媒体信息，失败时返回 None"""
+    if not has_media_prober():
+        logger.error("未找到 ffprobe 或 ffmpeg，无法获取媒体信息")
+        return None
+    try:
+        return get_media_info_service().get(file_path)
+    except (OSError, RuntimeError) as e:
+        logger.error(f"获取媒体信息失败: {e}")
+        return None
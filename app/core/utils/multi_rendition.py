@@ -0,0 +1,235 @@
+"""多规格输出：一次解码源视频，通过 split 滤镜同时生成多个分辨率、编码和字幕形式的输出"""
+
+import re
+import shutil
+import subprocess
+import tempfile
+from pathlib import Path
+from typing import Callable, List, Optional
+
+from ..bk_asr.asr_data import ASRData, is_layout_neutral
+from ..bk_asr.subtitle_binary import SUBTITLE_BINARY_SUFFIX
+from ..entities import RenditionSpec
+from ..utils.ass_auto_wrap import auto_wrap_ass_file
+from ..utils.ffmpeg_capabilities import get_capabilities, is_cuda_available
+from ..utils.logger import setup_logger
+from ..utils.media_info import get_media_info
+from ..utils.subprocess_helper import run_ffmpeg_with_progress
+
+logger = setup_logger("multi_rendition")
+
+# 软字幕可直接封装的容器及对应的字幕编码，其他容器使用与字幕文件相同的格式
+SOFT_SUBTITLE_CODECS = {".mp4": "mov_text", ".mov": "mov_text", ".m4v": "mov_text"}
+
+
+def rendition_output_path(output_path: str, spec: RenditionSpec) -> str:
+    """根据主输出路径生成某个规格的输出路径"""
+    path = Path(output_path)
+    return str(path.with_name(f"{path.stem}-{spec.name}{spec.extension}"))
+
+
+def _normalize_spec(spec: RenditionSpec) -> RenditionSpec:
+    """WebM 不支持常用字幕封装，与 add_subtitles 一致强制硬字幕并使用 VP9 编码"""
+    if spec.extension.lower() == ".webm":
+        return RenditionSpec(
+            name=spec.name,
+            height=spec.height,
+            vcodec="libvpx-vp9",
+            quality=spec.quality,
+            soft_subtitle=False,
+            subtitle_layout=spec.subtitle_layout,
+            extension=spec.extension,
+        )
+    return spec
+
+
+def _ass_style_section(ass_file: str) -> Optional[str]:
+    """读取 ASS 文件中的样式段，按布局重新生成字幕时保留原有样式"""
+    content = Path(ass_file).read_text(encoding="utf-8", errors="replace")
+    if match := re.search(r"\[V4\+ Styles\].*?(?=\n\s*\[Events\])", content, re.S):
+        return match.group(0).strip()
+    return None
+
+
+def _layout_source(subtitle_file: str) -> Optional[str]:
+    """可按布局重新生成的字幕：字幕本身是 .vcsub/JSON，或字幕处理时一同保存的同名
+    .vcsub（不早于字幕文件，字幕被修改过时不使用）；都不存在时返回 None"""
+    if is_layout_neutral(subtitle_file):
+        return subtitle_file
+    binary = Path(subtitle_file).with_suffix(SUBTITLE_BINARY_SUFFIX)
+    try:
+        if binary.stat().st_mtime >= Path(subtitle_file).stat().st_mtime:
+            return str(binary)
+    except OSError:
+        pass
+    return None
+
+
+def _prepare_subtitle(
+    subtitle_file: str, layout: Optional[str], workspace: Path, index: int
+) -> str:
+    """在工作目录中准备某个规格使用的字幕文件
+
+    有分别保存原文和译文的字幕数据时按规格的布局重新生成（ASS 保留原有样式，其他
+    生成 SRT）；否则字幕（SRT、ASS 等）已经排好布局，直接复制，不再重复排布。
+    """
+    source = _layout_source(subtitle_file)
+    if source and (layout or source == subtitle_file):
+        asr_data = ASRData.from_subtitle_file(source)
+        kwargs = {"layout": layout} if layout else {}
+        if Path(subtitle_file).suffix.lower() == ".ass":
+            path = workspace / f"subtitle_{index}.ass"
+            style = _ass_style_section(subtitle_file)
+            asr_data.to_ass(style_str=style, save_path=str(path), **kwargs)
+            return auto_wrap_ass_file(str(path))
+        path = workspace / f"subtitle_{index}.srt"
+        asr_data.to_srt(save_path=str(path), **kwargs)
+        return str(path)
+    if layout:
+        logger.info(f"字幕已排好布局，忽略规格的布局设置 {layout}: {subtitle_file}")
+    path = workspace / f"subtitle_{index}{Path(subtitle_file).suffix.lower()}"
+    shutil.copy2(subtitle_file, path)
+    if path.suffix == ".ass":
+        return auto_wrap_ass_file(str(path))
+    return str(path)
+
+
+def _subtitle_filter(subtitle_file: str) -> str:
+    escaped = Path(subtitle_file).as_posix().replace(":", r"\:")
+    if subtitle_file.endswith(".ass"):
+        return f"ass='{escaped}'"
+    return f"subtitles='{escaped}'"
+
+
+def build_rendition_command(
+    input_file: str,
+    subtitle_files: List[str],
+    output_paths: List[str],
+    specs: List[RenditionSpec],
+    use_cuda: bool = False,
+) -> List[str]:
+    """构建单次解码的多输出 ffmpeg 命令
+
+    需要重新编码的规格共享同一路解码结果，经 split 分出后各自缩放并烧录字幕；
+    不缩放的软字幕规格直接复制视频流，无需解码。
+
+    Args:
+        input_file: 输入视频路径
+        subtitle_files: 与规格一一对应的字幕文件（已位于工作目录中）
+        output_paths: 与规格一一对应的输出路径
+        specs: 输出规格列表
+        use_cuda: 是否使用CUDA硬件解码
+    """
+    cmd = ["ffmpeg"]
+    if use_cuda:
+        cmd.extend(["-hwaccel", "cuda"])
+    cmd.extend(["-i", input_file])
+
+    # 软字幕作为额外输入
+    subtitle_inputs = {}
+    for i, spec in enumerate(specs):
+        if spec.soft_subtitle:
+            subtitle_inputs[i] = len(subtitle_inputs) + 1
+            cmd.extend(["-i", subtitle_files[i]])
+
+    encoded = [
+        i for i, spec in enumerate(specs) if not spec.soft_subtitle or spec.height
+    ]
+    if encoded:
+        graph = []
+        if len(encoded) > 1:
+            splits = "".join(f"[s{i}]" for i in encoded)
+            graph.append(f"[0:v:0]split={len(encoded)}{splits}")
+        for i in encoded:
+            spec = specs[i]
+            filters = []
+            if spec.height:
+                # 宽度取偶数，满足常见编码器对尺寸的要求
+                filters.append(f"scale=-2:{spec.height}")
+            if not spec.soft_subtitle:
+                filters.append(_subtitle_filter(subtitle_files[i]))
+            source = f"[s{i}]" if len(encoded) > 1 else "[0:v:0]"
+            graph.append(f"{source}{','.join(filters) or 'null'}[v{i}]")
+        cmd.extend(["-filter_complex", ";".join(graph)])
+
+    for i, spec in enumerate(specs):
+        if i in encoded:
+            cmd.extend(
+                ["-map", f"[v{i}]", "-c:v", spec.vcodec, "-preset", spec.quality]
+            )
+        else:
+            cmd.extend(["-map", "0:v:0", "-c:v", "copy"])
+        cmd.extend(["-map", "0:a:0?", "-c:a", "copy"])
+        if i in subtitle_inputs:
+            subtitle_codec = SOFT_SUBTITLE_CODECS.get(
+                spec.extension.lower(), Path(subtitle_files[i]).suffix.lstrip(".")
+            )
+            cmd.extend(["-map", f"{subtitle_inputs[i]}:s:0", "-c:s", subtitle_codec])
+        cmd.extend(["-y", output_paths[i]])
+    return cmd
+
+
+def synthesize_renditions(
+    input_file: str,
+    subtitle_file: str,
+    output_paths: List[str],
+    specs: List[RenditionSpec],
+    progress_callback: Optional[Callable] = None,
+) -> None:
+    """一次解码生成多个规格的输出
+
+    Args:
+        input_file: 输入视频路径
+        subtitle_file: 字幕文件路径
+        output_paths: 与规格一一对应的输出路径
+        specs: 输出规格列表
+        progress_callback: 进度回调函数，参数为 (进度百分比字符串, 消息)
+    """
+    assert Path(input_file).is_file(), "输入文件不存在"
+    assert Path(subtitle_file).is_file(), "字幕文件不存在"
+    assert len(output_paths) == len(specs), "输出路径与规格数量不一致"
+    if not specs:
+        return
+
+    specs = [_normalize_spec(spec) for spec in specs]
+    capabilities = get_capabilities()
+    if capabilities:
+        if not capabilities.libass and any(not s.soft_subtitle for s in specs):
+            raise RuntimeError("当前 ffmpeg 未编译 libass，无法添加硬字幕")
+        for spec in specs:
+            # 不缩放的软字幕规格直接复制视频流，无需编码器
+            needs_encoder = not spec.soft_subtitle or spec.height
+            if needs_encoder and not capabilities.has_encoder(spec.vcodec):
+                raise RuntimeError(f"当前 ffmpeg 不支持 {spec.vcodec} 编码器")
+
+    workspace = Path(tempfile.mkdtemp(prefix="VideoCaptioner_renditions_"))
+    try:
+        subtitle_files = [
+            _prepare_subtitle(subtitle_file, spec.subtitle_layout, workspace, i)
+            for i, spec in enumerate(specs)
+        ]
+        for output_path in output_paths:
+            Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+        cmd = build_rendition_command(
+            input_file,
+            subtitle_files,
+            output_paths,
+            specs,
+            use_cuda=is_cuda_available(),
+        )
+        logger.info(f"多规格输出执行命令: {subprocess.list2cmdline(cmd)}")
+
+        total_duration = (get_media_info(input_file) or {}).get("duration_seconds", 0)
+
+        def on_progress(seconds: float):
+            if progress_callback and total_duration:
+                progress = min(seconds / total_duration * 100, 100)
+                progress_callback(f"{round(progress)}", "正在合成")
+
+        run_ffmpeg_with_progress(cmd, on_progress=on_progress)
+    finally:
+        shutil.rmtree(workspace, ignore_errors=True)
+
+    if progress_callback:
+        progress_callback("100", "合成完成")
+    logger.info(f"多规格输出完成: {output_paths}")
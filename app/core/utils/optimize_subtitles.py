@@ -28,14 +28,33 @@ def optimize_subtitles(asr_data):
         asr_data (ASRData): 包含字幕段落的 ASRData 对象。
     """
     segments = asr_data.segments
-    for i in range(len(segments) - 1, 0, -1):
-        seg = segments[i]
-        prev_seg = segments[i - 1]
-
+    if len(segments) < 2:
+        return
+    starts, ends, word_counts = [], [], []
+    for seg in segments:
+        starts.append(seg.start_time)
+        ends.append(seg.end_time)
+        word_counts.append(count_words(seg.text))
+
+    # 等价于从后往前逐个与下一段合并：[i, group_end] 是已合并的组，
+    # 组的开始时间即第 i 段的开始时间，组的词数为各段词数之和
+    runs = []
+    group_end = len(word_counts) - 1
+    group_words = word_counts[group_end]
+    for i in range(len(word_counts) - 1, 0, -1):
         # 判断前一个段落的词数是否小于等于4且时间相邻
         if (
-            count_words(prev_seg.text) <= 4
-            and abs(seg.start_time - prev_seg.end_time) < 100
-            and count_words(seg.text) <= 10
+            word_counts[i - 1] <= 4
+            and abs(starts[i] - ends[i - 1]) < 100
+            and group_words <= 10
         ):
-            asr_data.merge_with_next_segment(i - 1)
+            group_words += word_counts[i - 1]
+        else:
+            if group_end > i:
+                runs.append((i, group_end))
+            group_end = i - 1
+            group_words = word_counts[i - 1]
+    if group_end > 0:
+        runs.append((0, group_end))
+    runs.reverse()
+    asr_data.merge_segment_runs(runs)
@@ -0,0 +1,332 @@
+"""分段并行烧录硬字幕：在关键帧处切分视频，各段并行编码后无损拼接"""
+
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, List, Optional, Tuple
+
+from ..utils.logger import setup_logger
+from ..utils.media_info import get_media_info_service
+from ..utils.subprocess_helper import run_ffmpeg_with_progress
+
+logger = setup_logger("segmented_burn")
+
+# 每段的最短时长（秒），视频过短时不分段
+MIN_SEGMENT_SECONDS = 30
+# 定位时提前的时长（秒），小于半帧，避免浮点误差导致关键帧被丢弃
+SEEK_EPSILON = 0.001
+
+_CREATION_FLAGS = getattr(subprocess, "CREATE_NO_WINDOW", 0) if os.name == "nt" else 0
+
+
+def probe_keyframes(input_file: str) -> Tuple[float, float, List[float]]:
+    """读取视频的起始时间、时长和关键帧时间
+
+    起始时间和时长来自媒体信息索引；关键帧只读取数据包标志，不解码视频。
+
+    Returns:
+        (起始时间, 时长, 相对起始时间的关键帧时间列表)，均为秒
+    """
+    try:
+        info = get_media_info_service().get(input_file)
+    except RuntimeError as e:
+        raise ValueError(str(e)) from e
+    start_time = info["start_time"]
+    duration = info["duration_seconds"]
+
+    result = subprocess.run(
+        [
+            "ffprobe",
+            "-v",
+            "error",
+            "-select_streams",
+            "v:0",
+            "-show_entries",
+            "packet=pts_time,flags",
+            "-of",
+            "csv=p=0",
+            input_file,
+        ],
+        capture_output=True,
+        text=True,
+        encoding="utf-8",
+        errors="replace",
+        creationflags=_CREATION_FLAGS,
+    )
+    keyframes = []
+    for line in result.stdout.splitlines():
+        pts_time, _, flags = line.partition(",")
+        if "K" in flags and pts_time not in ("", "N/A"):
+            keyframes.append(float(pts_time) - start_time)
+    return start_time, duration, sorted(keyframes)
+
+
+def plan_segments(
+    keyframes: List[float], duration: float, segment_count: int
+) -> List[float]:
+    """选择分段边界：每个边界取离等分点最近的关键帧
+
+    Returns:
+        分段边界列表，首尾分别为 0 和视频时长；无法分段时只有首尾
+    """
+    segment_count = min(segment_count, int(duration // MIN_SEGMENT_SECONDS))
+    boundaries = [0.0]
+    for i in range(1, max(segment_count, 1)):
+        target = duration * i / segment_count
+        keyframe = min(keyframes, key=lambda t: abs(t - target), default=None)
+        # 相邻边界之间至少保留一个完整的最短分段
+        if (
+            keyframe is not None
+            and keyframe - boundaries[-1] >= MIN_SEGMENT_SECONDS / 2
+            and duration - keyframe >= MIN_SEGMENT_SECONDS / 2
+        ):
+            boundaries.append(keyframe)
+    boundaries.append(duration)
+    return boundaries
+
+
+def _escape_concat_path(path: str) -> str:
+    return Path(path).as_posix().replace("'", "'\\''")
+
+
+def encode_ranges(
+    input_file: str,
+    vf: str,
+    ranges: List[Tuple[float, float]],
+    output_paths: List[str],
+    vcodec: str,
+    quality: str,
+    duration: float,
+    use_cuda: bool = False,
+    max_workers: Optional[int] = None,
+    extra_args: Optional[List[str]] = None,
+    on_progress: Optional[Callable[[float], None]] = None,
+) -> None:
+    """并行编码多个以关键帧开始的区间（仅视频流）
+
+    字幕滤镜前后用 setpts 还原原始时间戳，字幕按在整段视频中的时间渲染，无需改写字幕文件。
+
+    Args:
+        input_file: 输入视频路径
+        vf: 字幕滤镜
+        ranges: 区间列表 [(开始秒, 结束秒), ...]，开始时间须为关键帧
+        output_paths: 与区间一一对应的输出路径
+        vcodec: 视频编码器
+        quality: 编码预设
+        duration: 视频总时长，结束时间达到总时长的区间编码到结尾
+        use_cuda: 是否使用CUDA硬件解码
+        max_workers: 最大并行数，默认每个区间一个进程
+        extra_args: 附加的输出参数
+        on_progress: 进度回调，参数为所有区间已编码的总秒数
+    """
+    encoded = [0.0] * len(ranges)
+    lock = threading.Lock()
+    failed = threading.Event()
+    processes: List[subprocess.Popen] = []
+
+    def report(index: int, seconds: float):
+        if not on_progress:
+            return
+        with lock:
+            encoded[index] = seconds
+            total = sum(encoded)
+        on_progress(total)
+
+    def encode(index: int, start: float, end: float, output_path: str):
+        seek = max(0.0, start - SEEK_EPSILON)
+        filters = vf
+        if seek > 0:
+            # 还原原始时间戳，字幕按整段视频中的时间渲染
+            filters = f"setpts=PTS+{seek}/TB,{vf},setpts=PTS-{seek}/TB"
+        cmd = ["ffmpeg"]
+        if use_cuda:
+            cmd.extend(["-hwaccel", "cuda"])
+        if seek > 0:
+            cmd.extend(["-ss", f"{seek:.6f}"])
+        cmd.extend(["-i", input_file])
+        if end < duration:
+            cmd.extend(["-t", f"{end - start:.6f}"])
+        cmd.extend(
+            [
+                "-map",
+                "0:v:0",
+                "-an",
+                "-sn",
+                "-vcodec",
+                vcodec,
+                "-preset",
+                quality,
+                "-vf",
+                filters,
+                *(extra_args or []),
+                "-y",
+                output_path,
+            ]
+        )
+        logger.info(f"分段{index}执行命令: {subprocess.list2cmdline(cmd)}")
+
+        def register(process: subprocess.Popen):
+            with lock:
+                processes.append(process)
+            if failed.is_set():
+                process.kill()
+
+        try:
+            run_ffmpeg_with_progress(
+                cmd,
+                on_progress=lambda seconds: report(index, seconds),
+                on_start=register,
+            )
+        except RuntimeError as e:
+            failed.set()
+            raise RuntimeError(f"分段{index}编码失败: {e}") from e
+        report(index, end - start)
+
+    with ThreadPoolExecutor(max_workers=max_workers or len(ranges)) as executor:
+        futures = [
+            executor.submit(encode, i, start, end, output_paths[i])
+            for i, (start, end) in enumerate(ranges)
+        ]
+        try:
+            for future in futures:
+                future.result()
+        except BaseException:
+            # 任一分段失败时终止其余编码进程
+            failed.set()
+            with lock:
+                for process in processes:
+                    if process.poll() is None:
+                        process.kill()
+            raise
+
+
+def concat_segments(
+    segment_paths: List[str],
+    input_file: str,
+    output: str,
+    durations: Optional[List[float]] = None,
+) -> None:
+    """用 concat 分离器按顺序拼接视频段，并从原视频复制音频流
+
+    Args:
+        durations: 各段时长（秒），指定后按该时长计算后续分段的时间偏移，
+            不依赖分离器从各段文件推算的时长
+    """
+    list_path = Path(segment_paths[0]).parent / "segments.txt"
+    lines = []
+    for i, path in enumerate(segment_paths):
+        lines.append(f"file '{_escape_concat_path(path)}'\n")
+        if durations:
+            lines.append(f"duration {durations[i]:.6f}\n")
+    list_path.write_text("".join(lines), encoding="utf-8")
+    cmd = [
+        "ffmpeg",
+        "-f",
+        "concat",
+        "-safe",
+        "0",
+        "-i",
+        str(list_path),
+        "-i",
+        input_file,
+        "-map",
+        "0:v",
+        "-map",
+        "1:a:0?",
+        "-c",
+        "copy",
+        "-y",
+        output,
+    ]
+    logger.info(f"拼接分段执行命令: {subprocess.list2cmdline(cmd)}")
+    result = subprocess.run(
+        cmd,
+        capture_output=True,
+        text=True,
+        encoding="utf-8",
+        errors="replace",
+        creationflags=_CREATION_FLAGS,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"拼接分段失败: {result.stderr[-500:]}")
+
+
+def burn_subtitles_segmented(
+    input_file: str,
+    vf: str,
+    output: str,
+    vcodec: str,
+    quality: str,
+    segment_count: int,
+    use_cuda: bool = False,
+    progress_callback: Optional[Callable] = None,
+    work_dir: Optional[str] = None,
+) -> bool:
+    """分段并行烧录字幕
+
+    各段从关键帧开始并行编码，视频段用 concat 分离器拼接，音频从原视频直接复制。
+
+    Args:
+        input_file: 输入视频路径
+        vf: 字幕滤镜（如 subtitles='...'）
+        output: 输出视频路径
+        vcodec: 视频编码器
+        quality: 编码预设
+        segment_count: 分段数（即并行编码数）
+        use_cuda: 是否使用CUDA硬件解码
+        progress_callback: 进度回调函数，参数为 (进度百分比字符串, 消息)
+        work_dir: 中间文件所在的工作目录，默认使用系统临时目录
+
+    Returns:
+        是否完成分段烧录；视频不适合分段（过短、无法读取关键帧）时返回 False，
+        由调用方改用整段编码
+    """
+    if segment_count < 2 or not shutil.which("ffprobe"):
+        return False
+    try:
+        _, duration, keyframes = probe_keyframes(input_file)
+    except (OSError, ValueError) as e:
+        logger.warning(f"读取关键帧失败，改用整段编码: {e}")
+        return False
+    boundaries = plan_segments(keyframes, duration, segment_count)
+    if len(boundaries) < 3:
+        logger.info("视频过短或关键帧不足，改用整段编码")
+        return False
+
+    ranges = list(zip(boundaries[:-1], boundaries[1:]))
+    logger.info(
+        f"分段烧录字幕: {len(ranges)} 段, 边界 {[round(b, 3) for b in boundaries]}"
+    )
+
+    def on_progress(seconds: float):
+        if progress_callback:
+            progress = min(seconds / duration * 100, 99)
+            progress_callback(f"{round(progress)}", "正在合成")
+
+    with tempfile.TemporaryDirectory(
+        prefix="VideoCaptioner_burn_", dir=work_dir
+    ) as temp_dir:
+        segment_paths = [
+            str(Path(temp_dir) / f"segment_{i:04d}.mkv") for i in range(len(ranges))
+        ]
+        encode_ranges(
+            input_file,
+            vf,
+            ranges,
+            segment_paths,
+            vcodec,
+            quality,
+            duration,
+            use_cuda=use_cuda,
+            on_progress=on_progress,
+        )
+        concat_segments(segment_paths, input_file, output)
+
+    if progress_callback:
+        progress_callback("100", "合成完成")
+    logger.info("分段烧录字幕完成")
+    return True
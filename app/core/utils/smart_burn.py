@@ -0,0 +1,503 @@
+"""按字幕时间线局部重编码：只重编码有字幕显示的GOP，其余GOP直接复制"""
+
+import json
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from ..bk_asr.asr_data import iter_segments
+from ..utils.h264_params import find_parameter_sets
+from ..utils.logger import setup_logger
+from ..utils.media_info import get_media_info_service
+from ..utils.segmented_burn import (
+    SEEK_EPSILON,
+    concat_segments,
+    encode_ranges,
+    probe_keyframes,
+)
+
+logger = setup_logger("smart_burn")
+
+# 字幕事件前后扩展的时长（秒），覆盖淡入淡出和时间取整误差
+EVENT_MARGIN = 0.1
+# 需重编码的时长占比超过该值时收益有限，改用常规编码
+MAX_REENCODE_RATIO = 0.8
+# 编码器与其输出的视频编码，源视频编码相同时才能与复制的GOP拼接
+ENCODER_CODECS = {"libx264": "h264"}
+# ffprobe 报告的 H.264 profile 与 libx264 的 -profile:v 参数
+H264_PROFILES = {
+    "Constrained Baseline": "baseline",
+    "Baseline": "baseline",
+    "Main": "main",
+    "High": "high",
+    "High 10": "high10",
+    "High 4:2:2": "high422",
+    "High 4:4:4 Predictive": "high444",
+}
+# 拼接处必须一致的 SPS/PPS 字段：输出文件只保存一份参数集（首段的），
+# 这些字段不一致时其他分段的条带头会被错误解析，或参考帧管理和熵解码方式不同
+SPLICE_SPS_FIELDS = (
+    "profile_idc",
+    "level_idc",
+    "chroma_format_idc",
+    "bit_depth_luma",
+    "bit_depth_chroma",
+    "log2_max_frame_num",
+    "pic_order_cnt_type",
+    "log2_max_pic_order_cnt_lsb",
+    "delta_pic_order_always_zero",
+    "max_num_ref_frames",
+    "pic_width_in_mbs",
+    "pic_height_in_map_units",
+    "frame_mbs_only",
+)
+SPLICE_PPS_FIELDS = (
+    "entropy_coding_mode",
+    "bottom_field_pic_order_in_frame_present",
+    "num_slice_groups",
+    "num_ref_idx_l0_default_active",
+    "num_ref_idx_l1_default_active",
+    "weighted_pred",
+    "weighted_bipred_idc",
+    "pic_init_qp",
+    "chroma_qp_index_offset",
+    "deblocking_filter_control_present",
+    "constrained_intra_pred",
+    "redundant_pic_cnt_present",
+    "transform_8x8_mode",
+    "pic_scaling_matrix_present",
+    "second_chroma_qp_index_offset",
+)
+# 读取关键帧码流时每次读取的字节数
+_READ_SIZE = 1024 * 1024
+# H.264 NAL 单元类型：非 IDR 图像的条带、IDR 图像的条带
+_NAL_SLICE = 1
+_NAL_IDR_SLICE = 5
+_START_CODE = re.compile(b"\x00\x00\x01")
+
+_CREATION_FLAGS = getattr(subprocess, "CREATE_NO_WINDOW", 0) if os.name == "nt" else 0
+
+
+def subtitle_intervals(subtitle_file: str) -> List[Tuple[float, float]]:
+    """读取字幕文件中有文字显示的时间区间（秒），重叠的区间合并"""
+    events = sorted(
+        (seg.start_time / 1000, seg.end_time / 1000)
+        for seg in iter_segments(subtitle_file)
+        if seg.text.strip() or seg.translated_text.strip()
+    )
+    merged: List[Tuple[float, float]] = []
+    for start, end in events:
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def keyframes_are_idr(input_file: str) -> bool:
+    """检查 H.264 视频的所有关键帧是否都是 IDR 帧（封闭 GOP）
+
+    开放 GOP 的 I 帧和带恢复点的非 IDR 关键帧之后的帧可能参考之前的帧，
+    在这些位置拼接重编码的片段会导致参考错误。只读取关键帧数据包，不解码视频；
+    分离器不支持只读取关键帧时会读到非 IDR 条带，按不安全处理。
+    """
+    cmd = [
+        "ffmpeg",
+        "-v",
+        "error",
+        "-discard",
+        "nokey",
+        "-i",
+        input_file,
+        "-map",
+        "0:v:0",
+        "-c",
+        "copy",
+        "-bsf:v",
+        "h264_mp4toannexb",
+        "-f",
+        "h264",
+        "pipe:1",
+    ]
+    process = subprocess.Popen(
+        cmd,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        creationflags=_CREATION_FLAGS,
+    )
+    assert process.stdout is not None
+    has_idr = False
+    tail = b""
+    try:
+        for chunk in iter(lambda: process.stdout.read(_READ_SIZE), b""):
+            # 保留上一块末尾的字节，起始码可能跨块
+            data = tail + chunk
+            for match in _START_CODE.finditer(data, 0, len(data) - 1):
+                nal_type = data[match.end()] & 0x1F
+                if nal_type == _NAL_SLICE:
+                    return False
+                has_idr = has_idr or nal_type == _NAL_IDR_SLICE
+            tail = data[-3:]
+    finally:
+        process.kill()
+        process.stdout.close()
+        process.wait()
+    return has_idr
+
+
+def _h264_profile(video_file: str) -> Tuple[str, int]:
+    """读取视频流的 profile 名称和 level（如 ("High", 40)）"""
+    result = subprocess.run(
+        [
+            "ffprobe",
+            "-v",
+            "error",
+            "-select_streams",
+            "v:0",
+            "-show_entries",
+            "stream=profile,level",
+            "-of",
+            "json",
+            video_file,
+        ],
+        capture_output=True,
+        text=True,
+        encoding="utf-8",
+        errors="replace",
+        creationflags=_CREATION_FLAGS,
+    )
+    streams = json.loads(result.stdout or "{}").get("streams") or [{}]
+    return streams[0].get("profile", ""), int(streams[0].get("level") or 0)
+
+
+def read_parameter_sets(
+    video_file: str,
+) -> Tuple[Optional[Dict[str, int]], Optional[Dict[str, int]]]:
+    """读取视频流第一个数据包携带的 SPS 和 PPS，不解码视频"""
+    result = subprocess.run(
+        [
+            "ffmpeg",
+            "-v",
+            "error",
+            "-i",
+            video_file,
+            "-map",
+            "0:v:0",
+            "-frames:v",
+            "1",
+            "-c",
+            "copy",
+            "-bsf:v",
+            "h264_mp4toannexb",
+            "-f",
+            "h264",
+            "pipe:1",
+        ],
+        capture_output=True,
+        creationflags=_CREATION_FLAGS,
+    )
+    return find_parameter_sets(result.stdout)
+
+
+def _parameter_set_diff(
+    source: Tuple[Dict[str, int], Dict[str, int]],
+    output: Tuple[Dict[str, int], Dict[str, int]],
+) -> Dict[str, Tuple[Optional[int], Optional[int]]]:
+    """比较拼接相关的 SPS/PPS 字段，返回不一致的字段及其 (源视频, 编码输出) 取值"""
+    diff = {}
+    for fields, src, out in (
+        (SPLICE_SPS_FIELDS, source[0], output[0]),
+        (SPLICE_PPS_FIELDS, source[1], output[1]),
+    ):
+        for name in fields:
+            if src.get(name) != out.get(name):
+                diff[name] = (src.get(name), out.get(name))
+    return diff
+
+
+def _encoder_output_args(
+    input_file: str, vcodec: str, quality: str, pix_fmt: str, work_dir: str
+) -> Optional[List[str]]:
+    """确定重编码参数，使编码器输出的 SPS/PPS 与源视频一致
+
+    按源视频的 profile、level、参考帧数、熵编码方式和 POC 类型设置编码参数后
+    试编码一帧，解析实际输出的 SPS/PPS 逐字段比较（编码器可能因预设未使用某些
+    特性而输出不同的参数，如更低的 profile 或不同的帧号位数）。
+
+    Returns:
+        编码参数；源视频的 profile 不受支持或试编码的参数集不一致时返回 None
+    """
+    profile, level = _h264_profile(input_file)
+    if profile not in H264_PROFILES or level <= 0:
+        logger.info(f"源视频 profile {profile!r} / level {level} 不受支持")
+        return None
+    source_sps, source_pps = read_parameter_sets(input_file)
+    if source_sps is None or source_pps is None:
+        logger.info("无法读取源视频的 SPS/PPS")
+        return None
+    args = [
+        "-pix_fmt",
+        pix_fmt,
+        "-profile:v",
+        H264_PROFILES[profile],
+        "-level:v",
+        f"{level / 10:.1f}",
+        # libx264 的参考帧数对应 PPS 中默认的 L0 参考索引数
+        "-refs",
+        str(source_pps.get("num_ref_idx_l0_default_active", 1)),
+        "-coder",
+        "cabac" if source_pps["entropy_coding_mode"] else "cavlc",
+    ]
+    if source_sps["pic_order_cnt_type"] == 2:
+        # POC 类型 2 表示没有 B 帧（显示顺序即解码顺序），libx264 不使用 B 帧时输出该类型
+        args.extend(["-bf", "0"])
+    sample = str(Path(work_dir) / "profile_probe.h264")
+    cmd = [
+        "ffmpeg",
+        "-v",
+        "error",
+        "-i",
+        input_file,
+        "-map",
+        "0:v:0",
+        "-frames:v",
+        "1",
+        "-an",
+        "-sn",
+        "-vcodec",
+        vcodec,
+        "-preset",
+        quality,
+        *args,
+        "-f",
+        "h264",
+        "-y",
+        sample,
+    ]
+    result = subprocess.run(
+        cmd,
+        capture_output=True,
+        text=True,
+        encoding="utf-8",
+        errors="replace",
+        creationflags=_CREATION_FLAGS,
+    )
+    if result.returncode != 0:
+        logger.info(f"试编码失败: {result.stderr.strip()[-200:]}")
+        return None
+    output_sps, output_pps = find_parameter_sets(Path(sample).read_bytes())
+    if output_sps is None or output_pps is None:
+        logger.info("试编码输出中没有 SPS/PPS")
+        return None
+    diff = _parameter_set_diff((source_sps, source_pps), (output_sps, output_pps))
+    if diff:
+        logger.info(
+            "编码器输出的参数集与源视频不一致: "
+            + ", ".join(f"{name} {src}->{out}" for name, (src, out) in diff.items())
+        )
+        return None
+    return args
+
+
+def plan_ranges(
+    keyframes: List[float],
+    duration: float,
+    events: List[Tuple[float, float]],
+    margin: float = EVENT_MARGIN,
+) -> List[Tuple[float, float, bool]]:
+    """将视频按GOP划分，并标记与字幕事件相交的GOP
+
+    相邻且类型相同的GOP合并为一个区间。
+
+    Returns:
+        [(开始秒, 结束秒, 是否需要重编码), ...]
+    """
+    starts = sorted({0.0, *(t for t in keyframes if 0 < t < duration)})
+    bounds = starts + [duration]
+    ranges: List[Tuple[float, float, bool]] = []
+    event_index = 0
+    for start, end in zip(bounds[:-1], bounds[1:]):
+        # 跳过已结束的字幕事件（事件和GOP均按时间排序）
+        while event_index < len(events) and events[event_index][1] + margin <= start:
+            event_index += 1
+        dirty = event_index < len(events) and events[event_index][0] - margin < end
+        if ranges and ranges[-1][2] == dirty:
+            ranges[-1] = (ranges[-1][0], end, dirty)
+        else:
+            ranges.append((start, end, dirty))
+    return ranges
+
+
+def _split_copy(input_file: str, cut_points: List[float], pattern: str) -> List[str]:
+    """在关键帧处无损切分视频流，返回按顺序排列的分段路径"""
+    cmd = [
+        "ffmpeg",
+        "-i",
+        input_file,
+        "-map",
+        "0:v:0",
+        "-c",
+        "copy",
+        "-f",
+        "segment",
+        "-segment_format",
+        "mpegts",
+        "-reset_timestamps",
+        "1",
+    ]
+    if cut_points:
+        cmd.extend(
+            [
+                "-segment_times",
+                ",".join(f"{max(0.0, t - SEEK_EPSILON):.6f}" for t in cut_points),
+            ]
+        )
+    else:
+        # 不切分时仍使用 segment 封装，输出单个分段
+        cmd.extend(["-segment_time", "1e9"])
+    cmd.extend(["-y", pattern])
+    logger.info(f"无损切分执行命令: {subprocess.list2cmdline(cmd)}")
+    result = subprocess.run(
+        cmd,
+        capture_output=True,
+        text=True,
+        encoding="utf-8",
+        errors="replace",
+        creationflags=_CREATION_FLAGS,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"无损切分失败: {result.stderr[-500:]}")
+    return sorted(str(p) for p in Path(pattern).parent.glob("copy_*.ts"))
+
+
+def burn_subtitles_smart(
+    input_file: str,
+    subtitle_file: str,
+    vf: str,
+    output: str,
+    vcodec: str,
+    quality: str,
+    use_cuda: bool = False,
+    max_workers: Optional[int] = None,
+    progress_callback: Optional[Callable] = None,
+    work_dir: Optional[str] = None,
+) -> bool:
+    """只重编码有字幕显示的GOP，其余GOP直接复制
+
+    编码耗时与字幕覆盖的时长成正比，而不是与视频总时长成正比。
+
+    Args:
+        input_file: 输入视频路径
+        subtitle_file: 字幕文件路径，用于计算字幕时间线
+        vf: 字幕滤镜
+        output: 输出视频路径
+        vcodec: 视频编码器
+        quality: 编码预设
+        use_cuda: 是否使用CUDA硬件解码
+        max_workers: 重编码区间的最大并行数
+        progress_callback: 进度回调函数，参数为 (进度百分比字符串, 消息)
+        work_dir: 中间文件所在的工作目录，默认使用系统临时目录
+
+    Returns:
+        是否完成局部重编码；源视频编码与目标编码器不一致、关键帧不是 IDR 帧、
+        编码器输出的 SPS/PPS 与源视频不一致、无法读取字幕时间线
+        或大部分画面都有字幕时返回 False，由调用方改用常规编码
+    """
+    if vcodec not in ENCODER_CODECS or not shutil.which("ffprobe"):
+        return False
+    try:
+        info = get_media_info_service().get(input_file)
+        codec_name, pix_fmt = info["video_codec"], info["pix_fmt"]
+        if codec_name != ENCODER_CODECS[vcodec] or not pix_fmt:
+            logger.info(f"源视频编码 {codec_name} 无法与 {vcodec} 拼接，改用常规编码")
+            return False
+        if not keyframes_are_idr(input_file):
+            logger.info(
+                "源视频存在非 IDR 关键帧（开放 GOP），无法安全拼接，改用常规编码"
+            )
+            return False
+        events = subtitle_intervals(subtitle_file)
+        _, duration, keyframes = probe_keyframes(input_file)
+    except (OSError, RuntimeError, ValueError) as e:
+        logger.warning(f"读取字幕时间线或关键帧失败，改用常规编码: {e}")
+        return False
+    if duration <= 0:
+        return False
+
+    ranges = plan_ranges(keyframes, duration, events)
+    dirty_ranges = [(start, end) for start, end, dirty in ranges if dirty]
+    dirty_seconds = sum(end - start for start, end in dirty_ranges)
+    if dirty_seconds / duration > MAX_REENCODE_RATIO:
+        logger.info(
+            f"字幕覆盖 {dirty_seconds / duration:.0%} 的画面，局部重编码收益有限，改用常规编码"
+        )
+        return False
+    logger.info(
+        f"局部重编码: {len(ranges)} 个区间, 重编码 {dirty_seconds:.1f}s / {duration:.1f}s"
+    )
+
+    def on_progress(seconds: float):
+        if progress_callback and dirty_seconds:
+            progress = min(seconds / dirty_seconds * 100, 99)
+            progress_callback(f"{round(progress)}", "正在合成")
+
+    with tempfile.TemporaryDirectory(
+        prefix="VideoCaptioner_smart_", dir=work_dir
+    ) as temp_dir:
+        # 拼接处的 SPS/PPS 需与复制的GOP一致，试编码的参数集不一致时放弃
+        encoder_args = _encoder_output_args(
+            input_file, vcodec, quality, pix_fmt, temp_dir
+        )
+        if encoder_args is None:
+            logger.info("编码器输出与源视频参数不一致，改用常规编码")
+            return False
+        copy_paths = _split_copy(
+            input_file,
+            [start for start, _, _ in ranges[1:]],
+            str(Path(temp_dir) / "copy_%04d.ts"),
+        )
+        if len(copy_paths) != len(ranges):
+            logger.warning(
+                f"无损切分得到 {len(copy_paths)} 段，预期 {len(ranges)} 段，改用常规编码"
+            )
+            return False
+
+        encode_paths = [
+            str(Path(temp_dir) / f"encode_{i:04d}.ts") for i in range(len(dirty_ranges))
+        ]
+        if dirty_ranges:
+            encode_ranges(
+                input_file,
+                vf,
+                dirty_ranges,
+                encode_paths,
+                vcodec,
+                quality,
+                duration,
+                use_cuda=use_cuda,
+                max_workers=max_workers,
+                # 像素格式和 SPS/PPS 与源视频一致，才能和复制的GOP拼接
+                extra_args=[*encoder_args, "-f", "mpegts"],
+                on_progress=on_progress,
+            )
+
+        encoded = iter(encode_paths)
+        segment_paths = [
+            next(encoded) if dirty else copy_path
+            for (_, _, dirty), copy_path in zip(ranges, copy_paths)
+        ]
+        concat_segments(
+            segment_paths,
+            input_file,
+            output,
+            durations=[end - start for start, end, _ in ranges],
+        )
+
+    if progress_callback:
+        progress_callback("100", "合成完成")
+    logger.info("局部重编码烧录字幕完成")
+    return True
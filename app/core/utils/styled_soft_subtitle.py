@@ -0,0 +1,165 @@
+"""带样式的软字幕：将 ASS 字幕轨和所需字体作为附件封装进 MKV，视频和音频直接复制"""
+
+import re
+import subprocess
+from pathlib import Path
+from typing import Callable, List, Optional
+
+from ..bk_asr.asr_data import ASRData, is_layout_neutral
+from ..utils.ass_auto_wrap import auto_wrap_ass_file
+from ..utils.font_utils import find_font_files
+from ..utils.logger import setup_logger
+from ..utils.media_info import get_media_info
+from ..utils.subprocess_helper import run_ffmpeg_with_progress
+
+logger = setup_logger("styled_soft_subtitle")
+
+# 字体附件的 MIME 类型，播放器按此识别字体
+FONT_MIMETYPES = {
+    ".ttf": "application/x-truetype-font",
+    ".ttc": "application/x-truetype-font",
+    ".otf": "application/vnd.ms-opentype",
+    ".otc": "application/vnd.ms-opentype",
+}
+
+_FONT_OVERRIDE_PATTERN = re.compile(r"\\fn([^\\}]+)")
+_STYLE_SECTION_PATTERN = re.compile(r"\[V4\+ Styles\].*?(?=\n\s*\[Events\])", re.S)
+
+
+def ass_font_names(ass_content: str) -> List[str]:
+    """读取 ASS 字幕使用的字体名：样式中的 Fontname 和事件中的 \\fn 覆盖标签"""
+    names = []
+    fields: List[str] = []
+    for line in ass_content.splitlines():
+        key, _, value = line.partition(":")
+        key = key.strip()
+        if key == "Format":
+            fields = [f.strip().lower() for f in value.split(",")]
+        elif key == "Style" and "fontname" in fields:
+            values = value.split(",")
+            if len(values) > fields.index("fontname"):
+                names.append(values[fields.index("fontname")].strip())
+        elif key == "Dialogue":
+            names.extend(m.strip() for m in _FONT_OVERRIDE_PATTERN.findall(value))
+    # 以 @ 开头的字体名表示竖排，对应的字体相同
+    return list(dict.fromkeys(name.lstrip("@") for name in names if name))
+
+
+def replace_ass_styles(ass_content: str, style_str: str) -> str:
+    """替换 ASS 字幕的样式段，字幕事件保持不变"""
+    style_str = style_str.strip()
+    if _STYLE_SECTION_PATTERN.search(ass_content):
+        return _STYLE_SECTION_PATTERN.sub(lambda _: style_str, ass_content, count=1)
+    return ass_content.replace("[Events]", f"{style_str}\n\n[Events]", 1)
+
+
+def write_styled_ass(
+    subtitle_file: str,
+    save_path: str,
+    style_str: Optional[str] = None,
+    layout: Optional[str] = None,
+) -> str:
+    """生成带样式的 ASS 字幕
+
+    只有分别保存原文和译文的字幕（.vcsub、JSON）才按布局重新生成；SRT、VTT、ASS
+    已经排好布局，ASS 保留字幕事件、仅替换样式，SRT、VTT 按文件中的行顺序转为 ASS。
+
+    Returns:
+        经过自动换行处理的 ASS 文件路径
+    """
+    if is_layout_neutral(subtitle_file):
+        asr_data = ASRData.from_subtitle_file(subtitle_file)
+        kwargs = {"layout": layout} if layout else {}
+        asr_data.to_ass(style_str=style_str, save_path=save_path, **kwargs)
+    elif Path(subtitle_file).suffix.lower() == ".ass":
+        if style_str:
+            content = Path(subtitle_file).read_text(encoding="utf-8", errors="replace")
+            content = replace_ass_styles(content, style_str)
+            Path(save_path).write_text(content, encoding="utf-8")
+        else:
+            Path(save_path).write_bytes(Path(subtitle_file).read_bytes())
+    else:
+        # 双语 SRT 的第一行解析为原文、第二行为译文，“原文在上”即保持原有顺序
+        asr_data = ASRData.from_subtitle_file(subtitle_file)
+        asr_data.to_ass(style_str=style_str, save_path=save_path, layout="原文在上")
+    return auto_wrap_ass_file(save_path)
+
+
+def build_mux_command(
+    input_file: str, ass_file: str, output: str, font_files: List[str]
+) -> List[str]:
+    """构建封装命令：复制视频和全部音频，添加 ASS 字幕轨和字体附件"""
+    cmd = [
+        "ffmpeg",
+        "-i",
+        input_file,
+        "-i",
+        ass_file,
+        "-map",
+        "0:v:0",
+        "-map",
+        "0:a?",
+        "-map",
+        "1:s:0",
+        "-c:v",
+        "copy",
+        "-c:a",
+        "copy",
+        "-c:s",
+        "ass",
+        "-disposition:s:0",
+        "default",
+    ]
+    for i, font_file in enumerate(font_files):
+        mimetype = FONT_MIMETYPES.get(
+            Path(font_file).suffix.lower(), "application/x-truetype-font"
+        )
+        cmd.extend(["-attach", font_file, f"-metadata:s:t:{i}", f"mimetype={mimetype}"])
+    cmd.extend(["-y", output])
+    return cmd
+
+
+def add_styled_soft_subtitle(
+    input_file: str,
+    subtitle_file: str,
+    output: str,
+    workspace: Path,
+    style_str: Optional[str] = None,
+    layout: Optional[str] = None,
+    progress_callback: Optional[Callable] = None,
+) -> None:
+    """将带样式的 ASS 字幕和所需字体封装进 MKV
+
+    播放器使用内嵌字体渲染字幕，外观与硬字幕一致，同时字幕仍可开关、切换。
+
+    Args:
+        input_file: 输入视频路径
+        subtitle_file: 字幕文件路径
+        output: 输出 MKV 路径
+        workspace: 中间文件所在的工作目录
+        style_str: ASS 样式字符串，为空时使用字幕自身样式或默认样式
+        layout: 字幕布局
+        progress_callback: 进度回调函数，参数为 (进度百分比字符串, 消息)
+    """
+    ass_file = write_styled_ass(
+        subtitle_file, str(workspace / "styled.ass"), style_str, layout
+    )
+    font_names = ass_font_names(Path(ass_file).read_text(encoding="utf-8"))
+    found = find_font_files(font_names)
+    if missing := [name for name in font_names if name not in found]:
+        logger.warning(f"未找到字体，播放时将使用播放器的替代字体: {missing}")
+    font_files = list(dict.fromkeys(p for paths in found.values() for p in paths))
+
+    Path(output).parent.mkdir(parents=True, exist_ok=True)
+    cmd = build_mux_command(input_file, ass_file, output, font_files)
+    logger.info(f"添加样式软字幕执行命令: {subprocess.list2cmdline(cmd)}")
+
+    total_duration = (get_media_info(input_file) or {}).get("duration_seconds", 0)
+
+    def on_progress(seconds: float):
+        if progress_callback and total_duration:
+            progress = min(seconds / total_duration * 100, 100)
+            progress_callback(f"{round(progress)}", "正在合成")
+
+    run_ffmpeg_with_progress(cmd, on_progress=on_progress)
+    logger.info(f"样式软字幕封装完成，内嵌字体 {len(font_files)} 个")
@@ -1,8 +1,10 @@
 """子进程输出流处理工具模块"""
 
+import os
 import queue
 import threading
-from typing import Callable, Optional, Tuple
+from collections import deque
+from typing import Callable, List, Optional, Tuple
 import subprocess
 from ..utils.logger import setup_logger
 
@@ -85,6 +87,11 @@ class StreamReader:
         """检查队列是否为空"""
         return self.output_queue.empty()
 
+    def join(self, timeout: Optional[float] = None) -> None:
+        """等待读取线程结束，之后队列中即为全部输出"""
+        for thread in self.threads:
+            thread.join(timeout)
+
 
 def run_process_with_stream_reader(
     cmd: list,
@@ -165,3 +172,77 @@ def run_process_with_stream_reader(
         handler_thread.start()
 
     return process
+
+
+def run_ffmpeg_with_progress(
+    cmd: List[str],
+    on_progress: Optional[Callable[[float], None]] = None,
+    on_start: Optional[Callable[[subprocess.Popen], None]] = None,
+    error_lines: int = 20,
+) -> None:
+    """
+    运行 ffmpeg 并通过 -progress 输出的键值对读取进度
+
+    标准输出和错误输出由 StreamReader 在后台线程读取，主循环不会阻塞在单个管道上。
+
+    Args:
+        cmd: ffmpeg 命令列表，首项为 ffmpeg 可执行文件
+        on_progress: 进度回调，参数为已输出的时长（秒）
+        on_start: 进程启动后的回调，可用于登记进程以便外部终止
+        error_lines: 失败时保留的错误输出行数
+
+    Raises:
+        RuntimeError: ffmpeg 返回非零退出码
+    """
+    # 进度以 key=value 形式逐行写入标准输出，关闭错误输出中的统计行
+    cmd = [cmd[0], "-nostdin", "-nostats", "-progress", "pipe:1", *cmd[1:]]
+    process = subprocess.Popen(
+        cmd,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        encoding="utf-8",
+        errors="replace",
+        creationflags=(
+            getattr(subprocess, "CREATE_NO_WINDOW", 0) if os.name == "nt" else 0
+        ),
+    )
+    if on_start:
+        on_start(process)
+    reader = StreamReader(process)
+    reader.start_reading()
+
+    stderr_tail: deque = deque(maxlen=error_lines)
+    out_time = 0.0
+
+    def handle(stream_name: str, line: str):
+        nonlocal out_time
+        if stream_name == "stderr":
+            stderr_tail.append(line)
+            return
+        key, _, value = line.strip().partition("=")
+        if key == "out_time_us" and value.isdigit():
+            out_time = int(value) / 1_000_000
+        elif key == "progress" and on_progress:
+            # 每个进度块以 progress=continue/end 结尾
+            on_progress(out_time)
+
+    try:
+        while process.poll() is None:
+            if output := reader.get_output(timeout=0.1):
+                handle(*output)
+        reader.join()
+        for stream_name, line in reader.get_remaining_output():
+            handle(stream_name, line)
+    except BaseException:
+        if process.poll() is None:
+            process.kill()
+        raise
+
+    if process.returncode != 0:
+        error_info = "".join(stderr_tail)
+        logger.error(f"ffmpeg 执行失败: {error_info}")
+        raise RuntimeError(
+            f"ffmpeg 执行失败({process.returncode}): {error_info[-500:]}"
+        )
@@ -6,6 +6,7 @@ from typing import Optional, Tuple
 from app.config import CACHE_PATH, RESOURCE_PATH
 
 from .ass_auto_wrap import auto_wrap_ass_file
+from .ffmpeg_capabilities import get_capabilities
 from .logger import setup_logger
 
 logger = setup_logger("subtitle_preview")
@@ -75,7 +76,11 @@ def generate_ass_file(
 def ensure_background(bg_path: Path) -> Path:
     """确保背景图片存在，若不存在则创建默认黑色背景"""
     if not bg_path.is_file() or not bg_path.exists():
+        capabilities = get_capabilities()
         if not Path(DEFAULT_BG_PATH).exists():
+            if not capabilities or not capabilities.has_demuxer("lavfi"):
+                logger.error("当前 ffmpeg 不支持 lavfi，无法生成默认背景")
+                return Path(DEFAULT_BG_PATH)
             DEFAULT_BG_PATH.parent.mkdir(parents=True, exist_ok=True)
             run_subprocess(
                 [
@@ -101,6 +106,9 @@ def generate_preview(
     height: int,
 ) -> str:
     """生成预览图片"""
+    capabilities = get_capabilities()
+    if capabilities and not capabilities.libass:
+        raise RuntimeError("当前 ffmpeg 未编译 libass，无法生成字幕预览")
 
     ass_file = generate_ass_file(style_str, preview_text, width, height)
     ass_file = auto_wrap_ass_file(ass_file)
@@ -1,5 +1,4 @@
 import os
-import re
 import shutil
 import subprocess
 import tempfile
@@ -8,7 +7,13 @@ from typing import Optional, Callable
 from typing import Dict, Literal
 
 from ..utils.ass_auto_wrap import auto_wrap_ass_file
+from ..utils.ffmpeg_capabilities import get_capabilities, is_cuda_available
 from ..utils.logger import setup_logger
+from ..utils.media_info import get_media_info
+from ..utils.segmented_burn import burn_subtitles_segmented
+from ..utils.smart_burn import burn_subtitles_smart
+from ..utils.styled_soft_subtitle import add_styled_soft_subtitle
+from ..utils.subprocess_helper import run_ffmpeg_with_progress
 
 logger = setup_logger("video_utils")
 
@@ -58,46 +63,10 @@ def video2audio(input_file: str, output: str = "") -> bool:
 
 
 def check_cuda_available() -> bool:
-    """检查CUDA是否可用"""
-    logger.info("检查CUDA是否可用")
-    try:
-        # 首先检查ffmpeg是否支持cuda
-        result = subprocess.run(
-            ["ffmpeg", "-hwaccels"],
-            capture_output=True,
-            text=True,
-            creationflags=(
-                getattr(subprocess, "CREATE_NO_WINDOW", 0) if os.name == "nt" else 0
-            ),
-        )
-        if "cuda" not in result.stdout.lower():
-            logger.info("CUDA不在支持的硬件加速器列表中")
-            return False
-
-        # 进一步检查CUDA设备信息
-        result = subprocess.run(
-            ["ffmpeg", "-hide_banner", "-init_hw_device", "cuda"],
-            capture_output=True,
-            text=True,
-            creationflags=(
-                getattr(subprocess, "CREATE_NO_WINDOW", 0) if os.name == "nt" else 0
-            ),
-        )
-
-        # 如果stderr中包含"Cannot load cuda" 或 "Failed to load"等错误信息，说明CUDA不可用
-        if any(
-            error in result.stderr.lower()
-            for error in ["cannot load cuda", "failed to load", "error"]
-        ):
-            logger.info("CUDA设备初始化失败")
-            return False
-
-        logger.info("CUDA可用")
-        return True
-
-    except Exception as e:
-        logger.exception(f"检查CUDA出错: {str(e)}")
-        return False
+    """检查CUDA是否可用，结果来自 ffmpeg 能力注册表，不重复探测"""
+    available = is_cuda_available()
+    logger.info("CUDA可用" if available else "CUDA不可用")
+    return available
 
 
 def add_subtitles(
@@ -118,15 +87,70 @@ def add_subtitles(
     vcodec: str = "libx264",
     soft_subtitle: bool = False,
     progress_callback: Optional[Callable] = None,
+    segment_count: int = 1,
+    smart_burn: bool = False,
+    styled_soft_subtitle: bool = False,
+    subtitle_style: Optional[str] = None,
+    subtitle_layout: Optional[str] = None,
 ) -> None:
     assert Path(input_file).is_file(), "输入文件不存在"
     assert Path(subtitle_file).is_file(), "字幕文件不存在"
 
-    # 移动到临时文件  Fix: 路径错误
+    # 每次合成使用独立的工作目录，并行合成时字幕和中间文件互不覆盖
+    workspace = Path(tempfile.mkdtemp(prefix="VideoCaptioner_synthesis_"))
+    try:
+        _add_subtitles(
+            input_file,
+            subtitle_file,
+            output,
+            quality,
+            vcodec,
+            soft_subtitle,
+            progress_callback,
+            segment_count,
+            smart_burn,
+            workspace,
+            styled_soft_subtitle,
+            subtitle_style,
+            subtitle_layout,
+        )
+    finally:
+        shutil.rmtree(workspace, ignore_errors=True)
+
+
+def _add_subtitles(
+    input_file: str,
+    subtitle_file: str,
+    output: str,
+    quality: str,
+    vcodec: str,
+    soft_subtitle: bool,
+    progress_callback: Optional[Callable],
+    segment_count: int,
+    smart_burn: bool,
+    workspace: Path,
+    styled_soft_subtitle: bool = False,
+    subtitle_style: Optional[str] = None,
+    subtitle_layout: Optional[str] = None,
+) -> None:
+    # MKV 支持 ASS 字幕轨和字体附件，按所选样式封装软字幕
+    if soft_subtitle and styled_soft_subtitle:
+        if Path(output).suffix.lower() == ".mkv":
+            add_styled_soft_subtitle(
+                input_file,
+                subtitle_file,
+                output,
+                workspace,
+                style_str=subtitle_style,
+                layout=subtitle_layout,
+                progress_callback=progress_callback,
+            )
+            return
+        logger.warning("样式软字幕需要 MKV 输出，改用普通软字幕")
+
+    # 复制到工作目录  Fix: 路径错误
     suffix = Path(subtitle_file).suffix.lower()
-    temp_dir = Path(tempfile.gettempdir()) / "VideoCaptioner"
-    temp_dir.mkdir(exist_ok=True)
-    temp_subtitle = temp_dir / f"temp_subtitle.{suffix}"
+    temp_subtitle = workspace / f"subtitle{suffix}"
     shutil.copy2(subtitle_file, temp_subtitle)
     subtitle_file = str(temp_subtitle)
 
@@ -171,172 +195,101 @@ def add_subtitles(
                 getattr(subprocess, "CREATE_NO_WINDOW", 0) if os.name == "nt" else 0
             ),
         )
+        return
+
+    logger.info("使用硬字幕")
+    capabilities = get_capabilities()
+    if capabilities and not capabilities.libass:
+        raise RuntimeError("当前 ffmpeg 未编译 libass，无法添加硬字幕")
+    subtitle_path = subtitle_file
+    subtitle_file = Path(subtitle_file).as_posix().replace(":", r"\:")
+    # 根据输出文件后缀决定vf参数
+    if Path(output).suffix.lower() == ".ass":
+        vf = f"ass='{subtitle_file}'"
     else:
-        logger.info("使用硬字幕")
-        subtitle_file = Path(subtitle_file).as_posix().replace(":", r"\:")
-        # 根据输出文件后缀决定vf参数
-        if Path(output).suffix.lower() == ".ass":
-            vf = f"ass='{subtitle_file}'"
-        else:
-            # 其他格式使用默认的vf参数
-            vf = f"subtitles='{subtitle_file}'"
+        # 其他格式使用默认的vf参数
+        vf = f"subtitles='{subtitle_file}'"
 
-        if Path(output).suffix.lower() == ".webm":
-            vcodec = "libvpx-vp9"
-            logger.info("WebM格式视频，使用libvpx-vp9编码器")
-
-        # 检查CUDA是否可用
-        use_cuda = check_cuda_available()
-        cmd = ["ffmpeg"]
-        if use_cuda:
-            logger.info("使用CUDA加速")
-            cmd.extend(["-hwaccel", "cuda"])
-        cmd.extend(
-            [
-                "-i",
-                input_file,
-                "-acodec",
-                "copy",
-                "-vcodec",
-                vcodec,
-                "-preset",
-                quality,
-                "-vf",
-                vf,
-                "-y",  # 覆盖输出文件
-                output,
-            ]
-        )
-
-        cmd_str = subprocess.list2cmdline(cmd)
-        logger.info(f"添加硬字幕执行命令: {cmd_str}")
-
-        try:
-            process = subprocess.Popen(
-                cmd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-                encoding="utf-8",
-                errors="replace",
-                creationflags=(
-                    getattr(subprocess, "CREATE_NO_WINDOW", 0) if os.name == "nt" else 0
-                ),
-            )
-
-            # 实时读取输出并调用回调函数
-            total_duration = None
-            current_time = 0
-
-            while True:
-                output_line = process.stderr.readline()
-                if not output_line or (process.poll() is not None):
-                    break
-                if not progress_callback:
-                    continue
+    if Path(output).suffix.lower() == ".webm":
+        vcodec = "libvpx-vp9"
+        logger.info("WebM格式视频，使用libvpx-vp9编码器")
 
-                if total_duration is None:
-                    duration_match = re.search(
-                        r"Duration: (\d{2}):(\d{2}):(\d{2}\.\d{2})", output_line
-                    )
-                    if duration_match:
-                        h, m, s = map(float, duration_match.groups())
-                        total_duration = h * 3600 + m * 60 + s
-                        logger.info(f"视频总时长: {total_duration}秒")
+    if capabilities and not capabilities.has_encoder(vcodec):
+        raise RuntimeError(f"当前 ffmpeg 不支持 {vcodec} 编码器")
 
-                # 解析当前处理时间
-                time_match = re.search(
-                    r"time=(\d{2}):(\d{2}):(\d{2}\.\d{2})", output_line
-                )
-                if time_match:
-                    h, m, s = map(float, time_match.groups())
-                    current_time = h * 3600 + m * 60 + s
+    # 检查CUDA是否可用
+    use_cuda = check_cuda_available()
 
-                # 计算进度百分比
-                if total_duration:
-                    progress = (current_time / total_duration) * 100
-                    progress_callback(f"{round(progress)}", "正在合成")
+    # 局部重编码或分段并行编码，不适用时改用整段编码
+    if smart_burn and burn_subtitles_smart(
+        input_file,
+        subtitle_path,
+        vf,
+        output,
+        vcodec,
+        quality,
+        use_cuda=use_cuda,
+        max_workers=segment_count,
+        progress_callback=progress_callback,
+        work_dir=str(workspace),
+    ):
+        return
+    if segment_count > 1 and burn_subtitles_segmented(
+        input_file,
+        vf,
+        output,
+        vcodec,
+        quality,
+        segment_count,
+        use_cuda=use_cuda,
+        progress_callback=progress_callback,
+        work_dir=str(workspace),
+    ):
+        return
+
+    cmd = ["ffmpeg"]
+    if use_cuda:
+        logger.info("使用CUDA加速")
+        cmd.extend(["-hwaccel", "cuda"])
+    cmd.extend(
+        [
+            "-i",
+            input_file,
+            "-acodec",
+            "copy",
+            "-vcodec",
+            vcodec,
+            "-preset",
+            quality,
+            "-vf",
+            vf,
+            "-y",  # 覆盖输出文件
+            output,
+        ]
+    )
 
-            if progress_callback:
-                progress_callback("100", "合成完成")
-            # 检查进程的返回码
-            return_code = process.wait()
-            if return_code != 0:
-                error_info = process.stderr.read()
-                logger.error(f"视频合成失败， {error_info}")
-                raise Exception(return_code)
-            logger.info("视频合成完成")
+    cmd_str = subprocess.list2cmdline(cmd)
+    logger.info(f"添加硬字幕执行命令: {cmd_str}")
 
-        except Exception as e:
-            logger.exception(f"关闭 FFmpeg: {str(e)}")
-            if process and process.poll() is None:  # 如果进程还在运行
-                process.kill()  # 如果进程没有及时终止，强制结束它
-            raise
-        finally:
-            # 删除临时文件
-            if temp_subtitle.exists():
-                temp_subtitle.unlink()
+    # 总时长来自媒体信息索引，用于换算进度百分比
+    total_duration = (get_media_info(input_file) or {}).get("duration_seconds", 0)
+    logger.info(f"视频总时长: {total_duration}秒")
 
+    def on_progress(seconds: float):
+        if progress_callback and total_duration:
+            progress = min(seconds / total_duration * 100, 100)
+            progress_callback(f"{round(progress)}", "正在合成")
 
-def get_video_info(file_path: str) -> Optional[Dict]:
-    """获取视频信息"""
     try:
-        cmd = ["ffmpeg", "-i", file_path]
-
-        # logger.info(f"获取视频信息执行命令: {' '.join(cmd)}")
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            encoding="utf-8",
-            errors="replace",
-            creationflags=(
-                getattr(subprocess, "CREATE_NO_WINDOW", 0) if os.name == "nt" else 0
-            ),
-        )
-        info = result.stderr
-
-        video_info_dict = {
-            "file_name": Path(file_path).stem,
-            "file_path": file_path,
-            "duration_seconds": 0,
-            "bitrate_kbps": 0,
-            "video_codec": "",
-            "width": 0,
-            "height": 0,
-            "fps": 0,
-            "audio_codec": "",
-            "audio_sampling_rate": 0,
-            "thumbnail_path": "",
-        }
-
-        # 提取时长
-        if duration_match := re.search(r"Duration: (\d+):(\d+):(\d+\.\d+)", info):
-            hours, minutes, seconds = map(float, duration_match.groups())
-            video_info_dict["duration_seconds"] = hours * 3600 + minutes * 60 + seconds
+        run_ffmpeg_with_progress(cmd, on_progress=on_progress)
+    except Exception as e:
+        logger.exception(f"视频合成失败: {str(e)}")
+        raise
+    if progress_callback:
+        progress_callback("100", "合成完成")
+    logger.info("视频合成完成")
 
-        # 提取比特率
-        if bitrate_match := re.search(r"bitrate: (\d+) kb/s", info):
-            video_info_dict["bitrate_kbps"] = int(bitrate_match.group(1))
 
-        # 提取视频流信息
-        if video_stream_match := re.search(
-            r"Stream #.*?Video: (\w+)(?:\s*\([^)]*\))?.* (\d+)x(\d+).*?(?:(\d+(?:\.\d+)?)\s*(?:fps|tb[rn]))",
-            info,
-            re.DOTALL,
-        ):
-            video_info_dict.update(
-                {
-                    "video_codec": video_stream_match.group(1),
-                    "width": int(video_stream_match.group(2)),
-                    "height": int(video_stream_match.group(3)),
-                    "fps": float(video_stream_match.group(4)),
-                }
-            )
-        else:
-            logger.warning("未找到视频流信息")
-
-        return video_info_dict
-    except Exception as e:
-        logger.exception(f"获取视频信息时出错: {str(e)}")
-        return None
+def get_video_info(file_path: str) -> Optional[Dict]:
+    """获取视频信息，结果来自媒体信息索引"""
+    return get_media_info(file_path)
@@ -1,19 +1,20 @@
 import queue
 import time
 from functools import partial
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 
 from PyQt5.QtCore import QThread, pyqtSignal
 
 from app.core.entities import (
     BatchTaskStatus,
     BatchTaskType,
+    TranscribeModelEnum,
     TranscribeTask,
 )
 from app.core.task_factory import TaskFactory
 from app.core.utils.logger import setup_logger
 from app.thread.subtitle_thread import SubtitleThread
-from app.thread.transcript_thread import TranscriptThread
+from app.thread.transcript_thread import BatchTranscriptThread, TranscriptThread
 from app.thread.video_synthesis_thread import VideoSynthesisThread
 
 logger = setup_logger("batch_process_thread")
@@ -54,22 +55,30 @@ class BatchProcessThread(QThread):
     def run(self):
         while self.is_running:
             # 检查是否有正在运行的任务数量是否达到上限
-            running_tasks = sum(
-                1
-                for task in self.current_tasks.values()
-                if task.status == BatchTaskStatus.RUNNING
-            )
-
-            if running_tasks < self.max_concurrent_tasks:
+            if self._running_slots() < self.max_concurrent_tasks:
                 try:
                     # 非阻塞方式获取任务
                     task = self.task_queue.get_nowait()
-                    self._process_task(task)
                 except queue.Empty:
                     time.sleep(0.1)  # 避免CPU过度使用
+                    continue
+                try:
+                    self._process_task(task)
+                finally:
+                    self.task_queue.task_done()
             else:
                 time.sleep(0.1)
 
+    def _running_slots(self) -> int:
+        """正在占用的并发数，合并处理的批量任务共用一个线程，只占一个名额"""
+        return len(
+            {
+                id(task.current_thread or task)
+                for task in self.current_tasks.values()
+                if task.status == BatchTaskStatus.RUNNING
+            }
+        )
+
     def _process_task(self, batch_task: BatchTask):
         try:
             batch_task.status = BatchTaskStatus.RUNNING
@@ -113,6 +122,17 @@ class BatchProcessThread(QThread):
     def _handle_transcribe_task(self, batch_task: BatchTask):
         # self.max_concurrent_tasks = 3
         task = self.factory.create_transcribe_task(batch_task.file_path)
+        # FasterWhisper 合并排队中的转录任务，只加载一次模型
+        if (
+            task.transcribe_config
+            and task.transcribe_config.transcribe_model
+            == TranscribeModelEnum.FASTER_WHISPER
+        ):
+            queued_tasks = self._take_queued_tasks(BatchTaskType.TRANSCRIBE)
+            if queued_tasks:
+                self._handle_transcribe_batch([batch_task] + queued_tasks)
+                return
+
         thread = TranscriptThread(task)
         batch_task.current_thread = thread
 
@@ -131,6 +151,66 @@ class BatchProcessThread(QThread):
 
         thread.start()
 
+    def _take_queued_tasks(self, task_type: BatchTaskType) -> List[BatchTask]:
+        """从队列中取出所有指定类型的等待任务，其他任务按原顺序放回队列"""
+        taken: List[BatchTask] = []
+        others: List[BatchTask] = []
+        while True:
+            try:
+                task = self.task_queue.get_nowait()
+            except queue.Empty:
+                break
+            (taken if task.task_type == task_type else others).append(task)
+        for task in others:
+            self.task_queue.put(task)
+        # 取出的任务已交给批量线程处理，放回的任务由 put 重新计数
+        for _ in range(len(taken) + len(others)):
+            self.task_queue.task_done()
+        for task in taken:
+            task.status = BatchTaskStatus.RUNNING
+            self.task_progress.emit(task.file_path, 0, str(BatchTaskStatus.RUNNING))
+        return taken
+
+    def _handle_transcribe_batch(self, batch_tasks: List[BatchTask]):
+        logger.info(f"合并 {len(batch_tasks)} 个转录任务批量处理")
+        tasks = [
+            self.factory.create_transcribe_task(batch_task.file_path)
+            for batch_task in batch_tasks
+        ]
+        thread = BatchTranscriptThread(tasks)
+        task_map = {
+            task.file_path: batch_task for task, batch_task in zip(tasks, batch_tasks)
+        }
+        for batch_task in batch_tasks:
+            batch_task.current_thread = thread
+
+        # 保存线程引用
+        self.threads.append(thread)
+
+        def on_progress(progress: int, message: str):
+            for batch_task in batch_tasks:
+                if batch_task.status == BatchTaskStatus.RUNNING:
+                    self._on_progress_wrapper(batch_task, progress, message)
+
+        def on_error(error: str):
+            for batch_task in batch_tasks:
+                if batch_task.status == BatchTaskStatus.RUNNING:
+                    self._on_error_wrapper(batch_task, error)
+
+        def on_task_finished(task: TranscribeTask):
+            self._on_finished_wrapper(task_map[task.file_path])
+
+        def on_task_error(task: TranscribeTask, error: str):
+            # 单个文件失败只标记该任务，其他文件继续转录
+            self._on_error_wrapper(task_map[task.file_path], error)
+
+        thread.progress.connect(on_progress)
+        thread.error.connect(on_error)
+        thread.task_finished.connect(on_task_finished)
+        thread.task_error.connect(on_task_error)
+
+        thread.start()
+
     def _handle_subtitle_task(self, batch_task: BatchTask):
         logger.info(f"开始处理字幕任务: {batch_task.file_path}")
 
@@ -7,6 +7,11 @@ from PyQt5.QtCore import QThread, pyqtSignal
 
 from app.config import CACHE_PATH
 from app.core.bk_asr.asr_data import ASRData
+from app.core.bk_asr.subtitle_binary import (
+    SUBTITLE_BINARY_SUFFIX,
+    is_subtitle_binary,
+)
+from app.core.bk_asr.subtitle_export import LAYOUTS, ExportTarget
 from app.core.entities import SubtitleConfig, SubtitleTask, TranslatorServiceEnum
 from app.core.storage.cache_manager import ServiceUsageManager
 from app.core.storage.database import DatabaseManager
@@ -98,8 +103,12 @@ class SubtitleThread(QThread):
                 .stem.replace("【原始字幕】", "")
                 .replace("【下载字幕】", "")
             )
+            # 流水线中间结果沿用二进制字幕，SRT/ASS 只在最后写出
+            split_suffix = (
+                SUBTITLE_BINARY_SUFFIX if is_subtitle_binary(subtitle_path) else ".srt"
+            )
             split_path = str(
-                Path(subtitle_path).parent / f"【断句字幕】{output_name}.srt"
+                Path(subtitle_path).parent / f"【断句字幕】{output_name}{split_suffix}"
             )
             assert subtitle_path is not None, self.tr("字幕文件路径为空")
 
@@ -176,6 +185,9 @@ class SubtitleThread(QThread):
                 asr_data = self.optimizer.optimize_subtitle(asr_data)
                 self.update_all.emit(asr_data.to_json())
 
+            # 所有字幕文件在最后一次遍历中写出
+            export_targets = []
+
             # 4. 翻译字幕
             translator_map = {
                 TranslatorServiceEnum.OPENAI: TranslatorType.OPENAI,
@@ -223,47 +235,52 @@ class SubtitleThread(QThread):
                 self.update_all.emit(asr_data.to_json())
                 # 保存翻译结果(单语、双语)
                 if self.task.need_next_task and self.task.video_path:
-                    for subtitle_layout in ["原文在上", "译文在上", "仅原文", "仅译文"]:
+                    for subtitle_layout in LAYOUTS:
                         save_path = str(
                             Path(self.task.subtitle_path).parent
                             / f"{Path(self.task.video_path).stem}-{subtitle_layout}.srt"
                         )
-                        asr_data.save(
-                            save_path=save_path,
-                            ass_style=subtitle_config.subtitle_style or "",
-                            layout=subtitle_layout,
+                        export_targets.append(
+                            ExportTarget(
+                                save_path,
+                                layout=subtitle_layout,
+                                ass_style=subtitle_config.subtitle_style or "",
+                            )
                         )
-                        logger.info(f"字幕保存到 {save_path}")
 
             # 5. 保存字幕
-            asr_data.save(
-                save_path=self.task.output_path or "",
-                ass_style=subtitle_config.subtitle_style or "",
-                layout=subtitle_config.subtitle_layout or "仅译文",
+            export_targets.append(
+                ExportTarget(
+                    self.task.output_path or "",
+                    layout=subtitle_config.subtitle_layout or "仅译文",
+                    ass_style=subtitle_config.subtitle_style or "",
+                )
             )
-            logger.info(f"字幕保存到 {self.task.output_path}")
-
-            # 6. 文件移动与清理
             if self.task.need_next_task and self.task.video_path:
-                # 保存srt/ass文件到视频目录（对于全流程任务）
+                # 保存srt文件到视频目录（对于全流程任务）
                 save_srt_path = (
                     Path(self.task.video_path).parent
                     / f"{Path(self.task.video_path).stem}.srt"
                 )
-                asr_data.to_srt(
-                    save_path=str(save_srt_path),
-                    layout=subtitle_config.subtitle_layout or "仅译文",
+                export_targets.append(
+                    ExportTarget(
+                        str(save_srt_path),
+                        layout=subtitle_config.subtitle_layout or "仅译文",
+                    )
+                )
+            for stats in asr_data.export(export_targets):
+                logger.info(
+                    f"字幕保存到 {stats.path} "
+                    f"({stats.bytes_written} 字节, {stats.seconds * 1000:.1f}ms)"
                 )
-                # save_ass_path = (
-                #     Path(self.task.video_path).parent
-                #     / f"{Path(self.task.video_path).stem}.ass"
-                # )
-                # asr_data.to_ass(
-                #     save_path=str(save_ass_path),
-                #     layout=subtitle_config.subtitle_layout,
-                #     style_str=subtitle_config.subtitle_style,
-                # )
-            else:
+            if self.task.need_next_task and self.task.output_path:
+                # 同时保存分别记录原文和译文的二进制字幕，多规格合成时按各自的布局生成
+                asr_data.to_binary(
+                    str(Path(self.task.output_path).with_suffix(SUBTITLE_BINARY_SUFFIX))
+                )
+
+            # 6. 文件清理
+            if not (self.task.need_next_task and self.task.video_path):
                 # 删除断句文件（对于仅字幕任务）
                 split_path = str(
                     Path(self.task.subtitle_path).parent
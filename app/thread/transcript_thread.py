@@ -1,21 +1,56 @@
 import datetime
-import os
-import tempfile
 from pathlib import Path
+from typing import List, Optional
 
 from PyQt5.QtCore import QThread, pyqtSignal
 
 from app.config import CACHE_PATH
-from app.core.bk_asr import transcribe
-from app.core.entities import TranscribeModelEnum, TranscribeTask
+from app.core.bk_asr import (
+    cache_transcription,
+    get_cached_transcription,
+    transcribe,
+    transcribe_batch,
+)
+from app.core.bk_asr.asr_data import ASRData
+from app.core.bk_asr.subtitle_binary import is_subtitle_binary
+from app.core.entities import TranscribeConfig, TranscribeModelEnum, TranscribeTask
 from app.core.storage.cache_manager import ServiceUsageManager
 from app.core.storage.database import DatabaseManager
+from app.core.utils.async_http import close_thread_loop
+from app.core.utils.audio_source import AudioSource, load_audio
 from app.core.utils.logger import setup_logger
-from app.core.utils.video_utils import video2audio
 
 logger = setup_logger("transcript_thread")
 
 
+def _load_task_audio(file_path: str, config: TranscribeConfig) -> AudioSource:
+    """按转录配置提取音频，启用时使用提取音频缓存"""
+    return load_audio(
+        file_path,
+        use_cache=config.use_audio_cache,
+        max_cache_size=config.audio_cache_size_gb * 1024**3,
+    )
+
+
+def _write_transcript(asr_data: ASRData, task: TranscribeTask) -> None:
+    """写出转录结果：流水线中间结果为二进制字幕，其余为 SRT"""
+    output_path = Path(str(task.output_path))
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    if is_subtitle_binary(str(output_path)):
+        config = task.transcribe_config
+        metadata = {
+            "source": task.file_path,
+            "word_timestamp": asr_data.is_word_timestamp(),
+        }
+        if config:
+            metadata["transcribe_model"] = config.transcribe_model.value
+            metadata["transcribe_language"] = config.transcribe_language
+        asr_data.to_binary(str(output_path), metadata=metadata)
+    else:
+        asr_data.to_srt(save_path=str(output_path))
+    logger.info("字幕文件已保存到: %s", str(output_path))
+
+
 class TranscriptThread(QThread):
     finished = pyqtSignal(TranscribeTask)
     progress = pyqtSignal(int, str)
@@ -30,7 +65,7 @@ class TranscriptThread(QThread):
         self.service_manager = ServiceUsageManager(db_manager)
 
     def run(self):
-        temp_file = None
+        audio_source = None
         try:
             logger.info("\n===========转录任务开始===========")
             logger.info(f"时间：{datetime.datetime.now()}")
@@ -49,18 +84,8 @@ class TranscriptThread(QThread):
             if not video_path.exists():
                 logger.error(f"视频文件不存在：{video_path}")
                 raise ValueError(self.tr("视频文件不存在"))
-
-            # 对于BIJIAN和JIANYING模型，检查服务使用限制
-            if self.task.transcribe_config.transcribe_model in [
-                TranscribeModelEnum.BIJIAN,
-                TranscribeModelEnum.JIANYING,
-            ]:
-                if not self.service_manager.check_service_available(
-                    "asr", self.MAX_DAILY_ASR_CALLS
-                ):
-                    raise Exception(
-                        self.tr("公益ASR服务已达到每日使用限制，建议使用本地转录")
-                    )
+            if not self.task.transcribe_config:
+                raise ValueError(self.tr("转录配置为空"))
 
             # 检查是否存在下载的字幕文件（对于视频url的任务，前面可能已下载字幕文件）
             if self.task.need_next_task and self.task.file_path:
@@ -82,31 +107,46 @@ class TranscriptThread(QThread):
                     self.finished.emit(self.task)
                     return
 
+            # 按源文件查询转录缓存，命中时无需提取音频（已下载字幕的任务优先使用下载的字幕）
+            cached_data = get_cached_transcription(
+                str(video_path), self.task.transcribe_config
+            )
+            if cached_data:
+                self._save_subtitle(cached_data)
+                self.progress.emit(100, self.tr("转录完成"))
+                self.finished.emit(self.task)
+                return
+
+            # 对于BIJIAN和JIANYING模型，检查服务使用限制
+            if self.task.transcribe_config.transcribe_model in [
+                TranscribeModelEnum.BIJIAN,
+                TranscribeModelEnum.JIANYING,
+            ]:
+                if not self.service_manager.check_service_available(
+                    "asr", self.MAX_DAILY_ASR_CALLS
+                ):
+                    raise Exception(
+                        self.tr("公益ASR服务已达到每日使用限制，建议使用本地转录")
+                    )
+
             self.progress.emit(5, self.tr("转换音频中"))
             logger.info("开始转换音频")
 
-            # 转换音频文件
-            temp_dir = tempfile.gettempdir()
-            temp_file = tempfile.NamedTemporaryFile(
-                suffix=".wav", dir=temp_dir, delete=False
+            # 通过管道提取音频（命中提取缓存时跳过解码），仅在后端需要文件路径时才写出临时文件
+            audio_source = self._load_audio(
+                str(video_path), self.task.transcribe_config
             )
-            temp_file.close()
-            is_success = video2audio(str(video_path), output=temp_file.name)
-            if not is_success:
-                logger.error("音频转换失败")
-                raise RuntimeError(self.tr("音频转换失败"))
 
             self.progress.emit(20, self.tr("语音转录中"))
             logger.info("开始语音转录")
 
             # 进行转录，并回调进度。 （传入 transcribe_config）
-            if not self.task.transcribe_config:
-                raise ValueError(self.tr("转录配置为空"))
             asr_data = transcribe(
-                temp_file.name,
+                audio_source,
                 self.task.transcribe_config,
                 callback=self.progress_callback,
             )
+            cache_transcription(str(video_path), self.task.transcribe_config, asr_data)
 
             # 如果是BIJIAN或JIANYING模型，增加使用次数
             if self.task.transcribe_config.transcribe_model in [
@@ -115,13 +155,7 @@ class TranscriptThread(QThread):
             ]:
                 self.service_manager.increment_usage("asr", self.MAX_DAILY_ASR_CALLS)
 
-            # 保存字幕文件
-            if not self.task.output_path:
-                raise ValueError(self.tr("输出路径为空"))
-            output_path = Path(self.task.output_path)
-            output_path.parent.mkdir(parents=True, exist_ok=True)
-            asr_data.to_srt(save_path=str(output_path))
-            logger.info("字幕文件已保存到: %s", str(output_path))
+            self._save_subtitle(asr_data)
 
             self.progress.emit(100, self.tr("转录完成"))
             self.finished.emit(self.task)
@@ -131,11 +165,128 @@ class TranscriptThread(QThread):
             self.progress.emit(100, self.tr("转录失败"))
         finally:
             # 清理临时文件
-            if temp_file and os.path.exists(temp_file.name):
+            if audio_source:
+                audio_source.close()
+            close_thread_loop()
+
+    def _save_subtitle(self, asr_data: ASRData):
+        """保存字幕文件"""
+        if not self.task.output_path:
+            raise ValueError(self.tr("输出路径为空"))
+        _write_transcript(asr_data, self.task)
+
+    def _load_audio(self, file_path: str, config: TranscribeConfig) -> AudioSource:
+        try:
+            return _load_task_audio(file_path, config)
+        except (OSError, RuntimeError) as e:
+            logger.error(f"音频转换失败: {e}")
+            raise RuntimeError(self.tr("音频转换失败"))
+
+    def progress_callback(self, value, message):
+        progress = min(20 + (value * 0.8), 100)
+        self.progress.emit(int(progress), message)
+
+
+class BatchTranscriptThread(QThread):
+    """批量转录线程：多个文件一次性交给 transcribe_batch，共享模型加载
+
+    每个文件单独报告结果：转录完成后立即保存并发出 task_finished，
+    失败的文件发出 task_error，不影响其他文件。
+    """
+
+    task_finished = pyqtSignal(TranscribeTask)
+    task_error = pyqtSignal(TranscribeTask, str)
+    progress = pyqtSignal(int, str)
+    error = pyqtSignal(str)
+
+    def __init__(self, tasks: List[TranscribeTask]):
+        super().__init__()
+        self.tasks = tasks
+
+    def run(self):
+        audio_sources: List[AudioSource] = []
+        try:
+            logger.info(
+                f"\n===========批量转录任务开始({len(self.tasks)} 个)==========="
+            )
+            self.progress.emit(5, self.tr("转换音频中"))
+            jobs = []
+            pending_tasks: List[TranscribeTask] = []
+            for task in self.tasks:
                 try:
-                    os.unlink(temp_file.name)
+                    audio_source = self._prepare(task)
                 except Exception as e:
-                    logger.warning(f"清理临时文件失败: {e}")
+                    self._on_task_error(task, e)
+                    continue
+                if audio_source is None:
+                    continue
+                audio_sources.append(audio_source)
+                jobs.append((audio_source, task.transcribe_config))
+                pending_tasks.append(task)
+
+            def on_result(index: int, result):
+                task = pending_tasks[index]
+                if isinstance(result, Exception):
+                    self._on_task_error(task, result)
+                    return
+                try:
+                    assert task.file_path and task.transcribe_config
+                    cache_transcription(task.file_path, task.transcribe_config, result)
+                    self._save_subtitle(task, result)
+                except Exception as e:
+                    self._on_task_error(task, e)
+
+            self.progress.emit(20, self.tr("语音转录中"))
+            if jobs:
+                transcribe_batch(
+                    jobs, callback=self.progress_callback, on_result=on_result
+                )
+
+            self.progress.emit(100, self.tr("转录完成"))
+        except Exception as e:
+            logger.exception("批量转录过程中发生错误: %s", str(e))
+            self.error.emit(str(e))
+            self.progress.emit(100, self.tr("转录失败"))
+        finally:
+            for audio_source in audio_sources:
+                audio_source.close()
+            close_thread_loop()
+
+    def _prepare(self, task: TranscribeTask) -> Optional[AudioSource]:
+        """检查任务并提取音频；命中转录缓存时直接保存结果并返回 None"""
+        if not task.file_path or not Path(task.file_path).exists():
+            raise ValueError(self.tr("视频文件不存在"))
+        if not task.transcribe_config:
+            raise ValueError(self.tr("转录配置为空"))
+        # 命中转录缓存的文件直接保存，不再提取音频
+        cached_data = get_cached_transcription(task.file_path, task.transcribe_config)
+        if cached_data:
+            self._save_subtitle(task, cached_data)
+            return None
+        try:
+            audio_source = _load_task_audio(task.file_path, task.transcribe_config)
+        except (OSError, RuntimeError) as e:
+            logger.error(f"音频转换失败: {e}")
+            raise RuntimeError(self.tr("音频转换失败"))
+        # 多个文件同时转录，音频保留在磁盘上以限制内存占用
+        try:
+            audio_source.materialize()
+            audio_source.unload()
+        except BaseException:
+            audio_source.close()
+            raise
+        return audio_source
+
+    def _on_task_error(self, task: TranscribeTask, error: Exception):
+        logger.error("批量转录任务失败 %s: %s", task.file_path, str(error))
+        self.task_error.emit(task, str(error))
+
+    def _save_subtitle(self, task: TranscribeTask, asr_data: ASRData):
+        """保存字幕文件并通知该任务完成"""
+        if not task.output_path:
+            raise ValueError(self.tr("输出路径为空"))
+        _write_transcript(asr_data, task)
+        self.task_finished.emit(task)
 
     def progress_callback(self, value, message):
         progress = min(20 + (value * 0.8), 100)
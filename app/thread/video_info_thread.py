@@ -1,12 +1,13 @@
 import os
-import re
 import subprocess
 import tempfile
+from dataclasses import fields
 from pathlib import Path
 
 from PyQt5.QtCore import QThread, pyqtSignal
 
 from app.core.entities import VideoInfo
+from app.core.utils.media_info import get_media_info_service, has_media_prober
 from app.core.utils.logger import setup_logger
 
 logger = setup_logger("video_info_thread")
@@ -36,60 +37,16 @@ class VideoInfoThread(QThread):
 
     def _get_video_info(self, thumbnail_path: str) -> VideoInfo:
         """获取视频信息"""
+        if not has_media_prober():
+            raise RuntimeError("未找到 ffprobe 或 ffmpeg，无法获取视频信息")
         try:
-            cmd = ["ffmpeg", "-i", self.file_path]
-            # logger.info(f"获取视频信息执行命令: {' '.join(cmd)}")
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                encoding="utf-8",
-                errors="replace",
-                creationflags=getattr(subprocess, "CREATE_NO_WINDOW", 0),
-            )
-            info = result.stderr
-
+            info = get_media_info_service().get(self.file_path)
             video_info_dict = {
-                "file_name": Path(self.file_path).stem,
-                "file_path": self.file_path,
-                "duration_seconds": 0,
-                "bitrate_kbps": 0,
-                "video_codec": "",
-                "width": 0,
-                "height": 0,
-                "fps": 0,
-                "audio_codec": "",
-                "audio_sampling_rate": 0,
-                "thumbnail_path": "",
+                field.name: info.get(field.name, "") for field in fields(VideoInfo)
             }
+            logger.info(f"视频时长: {video_info_dict['duration_seconds']}秒")
 
-            # 提取时长
-            if duration_match := re.search(r"Duration: (\d+):(\d+):(\d+\.\d+)", info):
-                hours, minutes, seconds = map(float, duration_match.groups())
-                video_info_dict["duration_seconds"] = (
-                    hours * 3600 + minutes * 60 + seconds
-                )
-                logger.info(f"视频时长: {video_info_dict['duration_seconds']}秒")
-
-            # 提取比特率
-            if bitrate_match := re.search(r"bitrate: (\d+) kb/s", info):
-                video_info_dict["bitrate_kbps"] = int(bitrate_match.group(1))
-
-            # 提取视频流信息
-            if video_stream_match := re.search(
-                r"Stream #\d+:\d+.*Video: (\w+).*?, (\d+)x(\d+).*?, ([\d.]+) (?:fps|tb)",
-                info,
-                re.DOTALL,
-            ):
-                video_info_dict.update(
-                    {
-                        "video_codec": video_stream_match.group(1),
-                        "width": int(video_stream_match.group(2)),
-                        "height": int(video_stream_match.group(3)),
-                        "fps": float(video_stream_match.group(4)),
-                    }
-                )
-
+            if video_info_dict["video_codec"]:
                 if thumbnail_path:
                     if self._extract_thumbnail(
                         video_info_dict["duration_seconds"] * 0.3, thumbnail_path
@@ -99,17 +56,6 @@ class VideoInfoThread(QThread):
                 video_info_dict["thumbnail_path"] = thumbnail_path
                 logger.warning("未找到视频流信息")
 
-            # 提取音频流信息
-            if audio_stream_match := re.search(
-                r"Stream #\d+:\d+.*Audio: (\w+).* (\d+) Hz", info
-            ):
-                video_info_dict.update(
-                    {
-                        "audio_codec": audio_stream_match.group(1),
-                        "audio_sampling_rate": int(audio_stream_match.group(2)),
-                    }
-                )
-
             return VideoInfo(**video_info_dict)
         except Exception as e:
             logger.exception(f"获取视频信息时出错: {str(e)}")
@@ -4,6 +4,10 @@ from PyQt5.QtCore import QThread, pyqtSignal
 
 from app.core.entities import SynthesisTask
 from app.core.utils.logger import setup_logger
+from app.core.utils.multi_rendition import (
+    rendition_output_path,
+    synthesize_renditions,
+)
 from app.core.utils.video_utils import add_subtitles
 
 logger = setup_logger("video_synthesis_thread")
@@ -45,16 +49,36 @@ class VideoSynthesisThread(QThread):
             if not output_path:
                 raise ValueError(self.tr("输出路径为空"))
 
-            add_subtitles(
-                video_file,
-                subtitle_file,
-                output_path,
-                soft_subtitle=soft_subtitle,
-                progress_callback=self.progress_callback,
-            )
+            renditions = self.task.synthesis_config.renditions
+            if renditions:
+                # 一次解码生成所有规格
+                output_paths = [
+                    rendition_output_path(output_path, spec) for spec in renditions
+                ]
+                synthesize_renditions(
+                    video_file,
+                    subtitle_file,
+                    output_paths,
+                    renditions,
+                    progress_callback=self.progress_callback,
+                )
+            else:
+                output_paths = [output_path]
+                add_subtitles(
+                    video_file,
+                    subtitle_file,
+                    output_path,
+                    soft_subtitle=soft_subtitle,
+                    progress_callback=self.progress_callback,
+                    segment_count=self.task.synthesis_config.burn_segments,
+                    smart_burn=self.task.synthesis_config.smart_burn,
+                    styled_soft_subtitle=self.task.synthesis_config.styled_soft_subtitle,
+                    subtitle_style=self.task.synthesis_config.subtitle_style,
+                    subtitle_layout=self.task.synthesis_config.subtitle_layout,
+                )
 
             self.progress.emit(100, self.tr("合成完成"))
-            logger.info(f"视频合成完成，保存路径: {output_path}")
+            logger.info(f"视频合成完成，保存路径: {', '.join(output_paths)}")
 
             self.finished.emit(self.task)
         except Exception as e:
@@ -33,6 +33,7 @@ from app.core.entities import (
     SupportedSubtitleFormats,
     SupportedVideoFormats,
 )
+from app.core.utils.media_info import get_media_info_service
 from app.thread.batch_process_thread import (
     BatchProcessThread,
     BatchTask,
@@ -232,6 +233,10 @@ class BatchProcessInterface(QWidget):
             if not exists:
                 self.add_task_to_table(file_path)
 
+        # 在后台有限的进程池中读取媒体信息，后续任务直接查询索引
+        if task_type != BatchTaskType.SUBTITLE:
+            get_media_info_service().prefetch(valid_files)
+
     def filter_files(self, file_paths, task_type: BatchTaskType):
         valid_extensions = {}
 
@@ -0,0 +1,160 @@
+"""ASRData 列式存储基准
+
+与旧版“每段一个对象、列表保存”的模型对比，输出每段占用的内存和主要操作的耗时：
+
+    python scripts/benchmark_asr_data.py [段数]
+
+旧模型的加载 = 相同的解析器 + 逐行创建对象，与旧版 ASRData 的行为一致。
+"""
+
+import gc
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.core.bk_asr.asr_data import ASRData, ASRDataSeg  # noqa: E402
+from app.core.bk_asr.subtitle_export import ms_to_srt_time  # noqa: E402
+from app.core.bk_asr.subtitle_parser import iter_file_rows  # noqa: E402
+from app.core.utils.optimize_subtitles import (  # noqa: E402
+    count_words,
+    optimize_subtitles,
+)
+
+
+class ObjectSeg:
+    """旧版分段：普通对象，字段保存在 __dict__ 中"""
+
+    def __init__(self, text, start_time, end_time, translated_text=""):
+        self.text = text
+        self.translated_text = translated_text
+        self.start_time = start_time
+        self.end_time = end_time
+
+
+class ObjectData:
+    """旧版 ASRData 的存储方式：分段对象列表"""
+
+    def __init__(self, segments):
+        segments = [seg for seg in segments if seg.text and seg.text.strip()]
+        segments.sort(key=lambda seg: seg.start_time)
+        self.segments = segments
+
+    @classmethod
+    def from_subtitle_file(cls, file_path):
+        return cls([ObjectSeg(*row) for row in iter_file_rows(file_path)])
+
+    def merge_with_next_segment(self, index):
+        seg, next_seg = self.segments[index], self.segments[index + 1]
+        self.segments[index : index + 2] = [
+            ObjectSeg(f"{seg.text} {next_seg.text}", seg.start_time, next_seg.end_time)
+        ]
+
+
+def write_srt(path: str, count: int) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(count):
+            start = i * 100
+            f.write(
+                f"{i + 1}\n{ms_to_srt_time(start)} --> {ms_to_srt_time(start + 80)}\n"
+                f"word{i % 5000}\n\n"
+            )
+
+
+def timed(func):
+    gc.collect()
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def measure(func, count: int):
+    """返回 (结果, 耗时, 常驻字节/段, 峰值字节/段)"""
+    _, elapsed = timed(func)
+    gc.collect()
+    tracemalloc.start()
+    result = func()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, current / count, peak / count
+
+
+def report(label: str, old: float, new: float, unit: str = "s") -> None:
+    ratio = old / new if new else float("inf")
+    print(f"{label:<32}{old:>12.3f}{unit}{new:>12.3f}{unit}{ratio:>9.2f}x")
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 300_000
+    print(f"段数: {count}")
+    print(f"{'':<32}{'对象列表':>12} {'列式存储':>12} {'倍数':>9}")
+
+    fd, srt_path = tempfile.mkstemp(suffix=".srt")
+    os.close(fd)
+    try:
+        write_srt(srt_path, count)
+        old, old_time, old_bytes, old_peak = measure(
+            lambda: ObjectData.from_subtitle_file(srt_path), count
+        )
+        new, new_time, new_bytes, new_peak = measure(
+            lambda: ASRData.from_subtitle_file(srt_path), count
+        )
+        report("加载 SRT", old_time, new_time)
+        report("常驻内存 (字节/段)", old_bytes, new_bytes, "B")
+        report("峰值内存 (字节/段)", old_peak, new_peak, "B")
+        del old, new
+    finally:
+        os.remove(srt_path)
+
+    rows = [(f"word{i % 5000}", i * 100, i * 100 + 80) for i in range(count)]
+    _, old_time = timed(lambda: ObjectData([ObjectSeg(*row) for row in rows]))
+    _, new_time = timed(lambda: ASRData([ASRDataSeg(*row) for row in rows]))
+    report("由分段对象创建", old_time, new_time)
+
+    merges = min(10_000, count // 3)
+    old = ObjectData([ObjectSeg(*row) for row in rows])
+    new = ASRData([ASRDataSeg(*row) for row in rows])
+    _, old_time = timed(
+        lambda: [
+            old.merge_with_next_segment(i)
+            for i in range(count - 2, count - 2 - merges, -1)
+        ]
+    )
+    _, new_time = timed(
+        lambda: [
+            new.merge_with_next_segment(i)
+            for i in range(count - 2, count - 2 - merges, -1)
+        ]
+    )
+    report(f"从后往前合并 {merges} 次", old_time, new_time)
+
+    # 逐段优化断句：旧版逐个合并，新版一次压缩
+    words = [
+        (" ".join(["w"] * (i % 3 + 1)), i * 100, i * 100 + 50) for i in range(count)
+    ]
+    old = ObjectData([ObjectSeg(*row) for row in words])
+    new = ASRData([ASRDataSeg(*row) for row in words])
+
+    def old_optimize():
+        segments = old.segments
+        for i in range(len(segments) - 1, 0, -1):
+            prev_seg, seg = segments[i - 1], segments[i]
+            if (
+                count_words(prev_seg.text) <= 4
+                and abs(seg.start_time - prev_seg.end_time) < 100
+                and count_words(seg.text) <= 10
+            ):
+                old.merge_with_next_segment(i - 1)
+
+    _, old_time = timed(old_optimize)
+    _, new_time = timed(lambda: optimize_subtitles(new))
+    report("优化断句 (optimize_subtitles)", old_time, new_time)
+    assert len(old.segments) == len(new.segments)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+import json
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from types import SimpleNamespace
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+# 测试直接从仓库根目录导入 app 包
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+class HttpStub:
+    """本地 HTTP 桩服务：按 (方法, 路径) 路由到处理函数，并记录收到的请求
+
+    处理函数接收请求对象，返回 dict/list（以 JSON 响应）、bytes/str，
+    或 (状态码, 响应头, 响应体) 三元组。
+    """
+
+    def __init__(self):
+        self.routes = {}
+        self.requests = []
+        self.url = ""
+
+    def route(self, method: str, path: str):
+        def register(handler):
+            self.routes[(method, path)] = handler
+            return handler
+
+        return register
+
+    def handle(self, handler: BaseHTTPRequestHandler):
+        if handler.headers.get("Transfer-Encoding", "").lower() == "chunked":
+            body = _read_chunked(handler.rfile)
+        else:
+            body = handler.rfile.read(int(handler.headers.get("Content-Length") or 0))
+        url = urlsplit(handler.path)
+        request = SimpleNamespace(
+            method=handler.command,
+            path=url.path,
+            query={k: v[0] for k, v in parse_qs(url.query).items()},
+            headers=handler.headers,
+            body=body,
+        )
+        self.requests.append(request)
+        route = self.routes.get((request.method, request.path))
+        if route is None:
+            status, headers, payload = 404, {}, b"not found"
+        else:
+            result = route(request)
+            status, headers, payload = (
+                result if isinstance(result, tuple) else (200, {}, result)
+            )
+        if isinstance(payload, (dict, list)):
+            payload = json.dumps(payload).encode()
+            headers = {"Content-Type": "application/json", **headers}
+        elif isinstance(payload, str):
+            payload = payload.encode()
+        handler.send_response(status)
+        for key, value in headers.items():
+            handler.send_header(key, value)
+        handler.send_header("Content-Length", str(len(payload)))
+        handler.end_headers()
+        handler.wfile.write(payload)
+
+
+def _read_chunked(rfile) -> bytes:
+    chunks = []
+    while size := int(rfile.readline().strip(), 16):
+        chunks.append(rfile.read(size))
+        rfile.readline()
+    rfile.readline()
+    return b"".join(chunks)
+
+
+@pytest.fixture
+def http_stub():
+    stub = HttpStub()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            stub.handle(self)
+
+        do_POST = do_PUT = do_GET
+
+        def log_message(self, *args):
+            pass
+
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    stub.url = f"http://127.0.0.1:{httpd.server_address[1]}"
+    yield stub
+    httpd.shutdown()
+    httpd.server_close()
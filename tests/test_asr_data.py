@@ -0,0 +1,102 @@
+import random
+
+from app.core.bk_asr.asr_data import ASRData, ASRDataSeg
+from app.core.utils.optimize_subtitles import count_words, optimize_subtitles
+
+
+def make_data(count: int) -> ASRData:
+    return ASRData([ASRDataSeg(f"w{i}", i * 10, i * 10 + 5) for i in range(count)])
+
+
+def texts(asr_data: ASRData):
+    return [seg.text for seg in asr_data.segments]
+
+
+def test_view_survives_delete_and_insert():
+    asr_data = make_data(5)
+    first = asr_data.segments[0]
+    del asr_data.segments[1]
+    first.text = "X"
+    assert asr_data.segments[0].text == "X"
+    assert asr_data.segments[0] is first
+
+    fourth = asr_data.segments[3]
+    asr_data.segments.insert(0, ASRDataSeg("new", 0, 1))
+    assert asr_data.segments[4] is fourth
+    fourth.text = "moved"
+    assert texts(asr_data) == ["new", "X", "w2", "w3", "moved"]
+
+
+def test_index_of_iterated_segment():
+    asr_data = make_data(3)
+    segments = list(asr_data.segments)
+    assert asr_data.segments.index(segments[2]) == 2
+
+
+def test_deleted_view_keeps_values_and_detaches():
+    asr_data = make_data(4)
+    gone = asr_data.segments[2]
+    del asr_data.segments[2]
+    gone.text = "changed"
+    assert gone.start_time == 20
+    assert texts(asr_data) == ["w0", "w1", "w3"]
+
+
+def test_merged_rows_detach_and_later_views_shift():
+    asr_data = make_data(5)
+    merged_away = asr_data.segments[1]
+    last = asr_data.segments[4]
+    asr_data.merge_with_next_segment(0)
+    assert merged_away.text == "w1"
+    assert asr_data.segments[3] is last
+    last.end_time = 99
+    assert asr_data.segments[3].end_time == 99
+    assert texts(asr_data) == ["w0 w1", "w2", "w3", "w4"]
+
+
+def test_appended_segment_writes_through():
+    asr_data = make_data(2)
+    seg = ASRDataSeg("tail", 100, 200)
+    asr_data.segments.append(seg)
+    seg.text = "tail2"
+    assert asr_data.segments[-1].text == "tail2"
+
+
+def test_interval_lookup_after_merge():
+    asr_data = make_data(6)
+    assert asr_data.at(21).text == "w2"
+    asr_data.merge_segments(1, 3)
+    assert asr_data.at(21).text == "w1w2w3"
+    assert asr_data.at(41).text == "w4"
+
+
+def _merge_one_by_one(asr_data: ASRData) -> None:
+    """optimize_subtitles 的原始实现：从后往前逐个合并"""
+    segments = asr_data.segments
+    for i in range(len(segments) - 1, 0, -1):
+        seg, prev_seg = segments[i], segments[i - 1]
+        if (
+            count_words(prev_seg.text) <= 4
+            and abs(seg.start_time - prev_seg.end_time) < 100
+            and count_words(seg.text) <= 10
+        ):
+            asr_data.merge_with_next_segment(i - 1)
+
+
+def test_optimize_subtitles_matches_sequential_merges():
+    rng = random.Random(0)
+    words = ["a", "hello world", "你好", "x, y!", "one two three four five"]
+    for _ in range(200):
+        rows, time = [], 0
+        for _ in range(rng.randint(0, 30)):
+            time += rng.choice([0, 50, 150, 500])
+            end = time + rng.randint(1, 300)
+            rows.append((rng.choice(words), time, end))
+            time = end
+        expected = ASRData([ASRDataSeg(*row) for row in rows])
+        _merge_one_by_one(expected)
+        actual = ASRData([ASRDataSeg(*row) for row in rows])
+        optimize_subtitles(actual)
+        assert [(s.text, s.start_time, s.end_time) for s in actual.segments] == [
+            (s.text, s.start_time, s.end_time) for s in expected.segments
+        ]
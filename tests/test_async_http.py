@@ -0,0 +1,77 @@
+import asyncio
+import mmap
+import threading
+
+import pytest
+
+pytest.importorskip("httpx")
+
+from app.core.utils import async_http  # noqa: E402
+from app.core.utils.async_http import (  # noqa: E402
+    MemoryViewStream,
+    close_thread_loop,
+    run_sync,
+)
+
+
+@pytest.fixture
+def mapped(tmp_path):
+    path = tmp_path / "audio.bin"
+    path.write_bytes(bytes(range(256)) * 64)
+    with open(path, "rb") as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    view = memoryview(mm)
+    yield mm, view
+    view.release()
+    mm.close()
+
+
+async def _consume(stream: MemoryViewStream, limit: int = -1) -> bytes:
+    data = bytearray()
+    async for chunk in stream:
+        data += chunk
+        if len(data) >= limit > 0:
+            break
+    return bytes(data)
+
+
+def test_stream_releases_slices(mapped):
+    mm, view = mapped
+    with MemoryViewStream(view[100:9000], chunk_size=1000) as body:
+        assert asyncio.run(_consume(body)) == bytes(view[100:9000])
+    view.release()
+    mm.close()
+
+
+def test_stream_releases_slices_after_interrupted_send(mapped):
+    mm, view = mapped
+    with MemoryViewStream(view[:], chunk_size=1000) as body:
+        generator = body.__aiter__()
+
+        async def first_chunk():
+            return bytes(await generator.__anext__())
+
+        # 请求中断：生成器停在 yield 处，分块仍被引用
+        assert len(asyncio.run(first_chunk())) == 1000
+    view.release()
+    mm.close()
+
+
+def test_thread_loops_closed_explicitly():
+    async def current_loop():
+        return asyncio.get_running_loop()
+
+    loops = []
+    worker = threading.Thread(target=lambda: loops.append(run_sync(current_loop())))
+    worker.start()
+    worker.join()
+    assert not loops[0].is_closed()
+
+    # 已结束线程的事件循环在下次创建事件循环时关闭
+    main_loop = run_sync(current_loop())
+    close_thread_loop()
+    assert main_loop.is_closed()
+    run_sync(current_loop())
+    assert loops[0].is_closed()
+    close_thread_loop()
+    assert all(holder.thread.is_alive() for holder in async_http._loops)
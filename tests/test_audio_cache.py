@@ -0,0 +1,42 @@
+import os
+
+from app.core.storage.cache_manager import AudioCacheManager
+
+
+def write_wav(path, size: int) -> str:
+    with open(path, "wb") as f:
+        f.write(bytes(size))
+    return str(path)
+
+
+def test_pinned_audio_survives_prune(tmp_path):
+    cache = AudioCacheManager(str(tmp_path / "cache"), max_size=100)
+    # 批量任务：音频总量超过缓存上限，先写入的音频仍在使用中
+    paths = [
+        cache.put(f"key{i}", write_wav(tmp_path / f"{i}.wav", 80), "00000000")
+        for i in range(3)
+    ]
+    assert all(os.path.exists(path) for path in paths)
+
+    for i in range(3):
+        cache.release(f"key{i}")
+    cache.prune()
+    assert cache.total_size() <= 100
+    assert not os.path.exists(paths[0])
+
+
+def test_get_pins_until_release(tmp_path):
+    cache = AudioCacheManager(str(tmp_path / "cache"), max_size=1000)
+    cache.put("old", write_wav(tmp_path / "old.wav", 80), "00000000")
+    cache.release("old")
+    path, _ = cache.get("old")
+
+    # 另一个线程写入新音频触发淘汰，使用中的文件不会被删除
+    cache.max_size = 0
+    cache.put("new", write_wav(tmp_path / "new.wav", 80), "00000000")
+    assert os.path.exists(path)
+
+    cache.release("old")
+    cache.prune()
+    assert not os.path.exists(path)
+    assert cache.get("old") is None
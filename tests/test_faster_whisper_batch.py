@@ -0,0 +1,81 @@
+import os
+import stat
+import sys
+import textwrap
+
+import pytest
+
+from app.core.bk_asr.asr_data import ASRData
+from app.core.bk_asr.faster_whisper import FasterWhisperASR
+
+# 模拟 faster-whisper：依次处理输入的音频，内容以 "bad" 开头的音频转录失败
+FAKE_PROGRAM = textwrap.dedent(
+    """\
+    import sys
+    from pathlib import Path
+
+    failed = False
+    for arg in sys.argv[1:]:
+        path = Path(arg)
+        if path.suffix != ".wav":
+            continue
+        if path.read_bytes().startswith(b"bad"):
+            print(f"error: cannot decode {path}", flush=True)
+            failed = True
+            continue
+        srt = f"1\\n00:00:00,000 --> 00:00:01,000\\n{path.read_bytes().decode()}\\n"
+        path.with_suffix(".srt").write_text(srt, encoding="utf-8")
+        print("100%", flush=True)
+        print(f"Subtitles are written to {path.parent}", flush=True)
+    sys.exit(1 if failed else 0)
+    """
+)
+
+
+@pytest.fixture
+def fake_faster_whisper(tmp_path, monkeypatch):
+    if os.name == "nt":
+        pytest.skip("模拟程序使用 shebang 脚本")
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    program = bin_dir / "faster-whisper"
+    program.write_text(f"#!{sys.executable}\n{FAKE_PROGRAM}", encoding="utf-8")
+    program.chmod(program.stat().st_mode | stat.S_IEXEC)
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+
+
+def make_asr(tmp_path, name: str, content: bytes) -> FasterWhisperASR:
+    audio = tmp_path / f"{name}.wav"
+    audio.write_bytes(content)
+    return FasterWhisperASR(
+        str(audio),
+        faster_whisper_program="faster-whisper",
+        whisper_model="tiny",
+        model_dir="",
+        language="en",
+    )
+
+
+def test_failed_file_does_not_fail_the_batch(tmp_path, fake_faster_whisper):
+    asr_list = [
+        make_asr(tmp_path, "a", b"first"),
+        make_asr(tmp_path, "b", b"bad audio"),
+        make_asr(tmp_path, "c", b"third"),
+    ]
+    reported = []
+    results = FasterWhisperASR.run_batch(
+        asr_list, on_result=lambda i, result: reported.append((i, result))
+    )
+
+    assert isinstance(results[0], ASRData)
+    assert results[0].segments[0].text == "first"
+    assert isinstance(results[1], Exception)
+    assert results[2].segments[0].text == "third"  # type: ignore
+    # 成功的文件在写出后立即回调，失败的文件在程序结束后回调
+    assert [i for i, _ in reported] == [0, 2, 1]
+
+
+def test_single_file_failure_raises(tmp_path, fake_faster_whisper):
+    asr = make_asr(tmp_path, "a", b"bad audio")
+    with pytest.raises(RuntimeError):
+        asr.run()
@@ -0,0 +1,62 @@
+import shutil
+import struct
+import wave
+
+import pytest
+
+from app.core.utils import media_info
+from app.core.utils.media_info import MediaInfoService, parse_ffmpeg_output
+
+FFMPEG_OUTPUT = """\
+Input #0, mov,mp4,m4a,3gp,3g2,mj2, from 'video.mp4':
+  Duration: 00:01:02.50, start: 0.021333, bitrate: 1234 kb/s
+  Stream #0:0[0x1](und): Video: h264 (High) (avc1 / 0x31637661), \
+yuv420p(tv, bt709, progressive), 1920x1080 [SAR 1:1 DAR 16:9], 1100 kb/s, \
+29.97 fps, 29.97 tbr, 30k tbn (default)
+  Stream #0:1[0x2](und): Audio: aac (LC) (mp4a / 0x6134706D), 44100 Hz, \
+stereo, fltp, 128 kb/s (default)
+  Stream #0:2[0x0]: Video: mjpeg (Baseline), yuvj420p(pc, bt470bg/unknown/unknown), \
+600x600 [SAR 1:1 DAR 1:1], 90k tbr, 90k tbn (attached pic)
+At least one output file must be specified
+"""
+
+
+def test_parse_ffmpeg_output():
+    info = parse_ffmpeg_output("/videos/video.mp4", FFMPEG_OUTPUT)
+    assert info["file_name"] == "video"
+    assert info["duration_seconds"] == pytest.approx(62.5)
+    assert info["start_time"] == pytest.approx(0.021333)
+    assert info["bitrate_kbps"] == 1234
+    assert (info["video_codec"], info["pix_fmt"]) == ("h264", "yuv420p")
+    assert (info["width"], info["height"]) == (1920, 1080)
+    assert info["fps"] == pytest.approx(29.97)
+    assert (info["audio_codec"], info["audio_sampling_rate"]) == ("aac", 44100)
+
+
+def test_service_falls_back_to_ffmpeg(tmp_path, monkeypatch):
+    if not shutil.which("ffmpeg"):
+        pytest.skip("需要 ffmpeg")
+    real_which = shutil.which
+    monkeypatch.setattr(
+        media_info.shutil,
+        "which",
+        lambda name: None if name == "ffprobe" else real_which(name),
+    )
+    audio = tmp_path / "audio.wav"
+    with wave.open(str(audio), "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(16000)
+        f.writeframes(struct.pack("<h", 0) * 32000)
+
+    service = MediaInfoService(str(tmp_path / "cache"), max_workers=1)
+    info = service.get(str(audio))
+
+    assert info["duration_seconds"] == pytest.approx(2.0, abs=0.05)
+    assert (info["audio_codec"], info["audio_sampling_rate"]) == ("pcm_s16le", 16000)
+    # 不完整的 ffmpeg 结果不写入持久索引
+    assert (
+        service._store is None
+        or service._store.get(*service._index_key(str(audio))) is None
+    )
+    assert media_info.has_media_prober()
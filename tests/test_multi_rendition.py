@@ -0,0 +1,46 @@
+import os
+from pathlib import Path
+
+from app.core.bk_asr.asr_data import ASRData, ASRDataSeg
+from app.core.utils.multi_rendition import _prepare_subtitle
+
+
+def bilingual() -> ASRData:
+    return ASRData([ASRDataSeg("hello", 0, 1000, "你好")])
+
+
+def read_lines(path: str):
+    return Path(path).read_text(encoding="utf-8").splitlines()
+
+
+def test_laid_out_srt_is_copied(tmp_path):
+    srt = tmp_path / "in.srt"
+    bilingual().to_srt(layout="译文在上", save_path=str(srt))
+    prepared = _prepare_subtitle(str(srt), "译文在上", tmp_path, 0)
+    assert read_lines(prepared) == read_lines(str(srt))
+
+
+def test_renditions_use_saved_binary_subtitle(tmp_path):
+    ass = tmp_path / "styled.ass"
+    bilingual().to_ass(layout="译文在上", save_path=str(ass))
+    bilingual().to_binary(str(ass.with_suffix(".vcsub")))
+
+    only_original = _prepare_subtitle(str(ass), "仅原文", tmp_path, 0)
+    texts = [line.rsplit(",", 1)[-1] for line in read_lines(only_original)]
+    assert "hello" in texts and "你好" not in texts
+
+    swapped = _prepare_subtitle(str(ass), "原文在上", tmp_path, 1)
+    assert any(
+        line.startswith("Dialogue:") and "Default" in line and line.endswith("hello")
+        for line in read_lines(swapped)
+    )
+
+
+def test_stale_binary_subtitle_is_ignored(tmp_path):
+    srt = tmp_path / "edited.srt"
+    binary = srt.with_suffix(".vcsub")
+    ASRData([ASRDataSeg("old", 0, 1000, "旧")]).to_binary(str(binary))
+    bilingual().to_srt(layout="译文在上", save_path=str(srt))
+    os.utime(binary, (0, 0))
+    prepared = _prepare_subtitle(str(srt), "仅原文", tmp_path, 0)
+    assert read_lines(prepared) == read_lines(str(srt))
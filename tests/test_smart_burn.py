@@ -0,0 +1,159 @@
+import shutil
+import subprocess
+
+import pytest
+
+pytest.importorskip("httpx")
+
+from app.core.utils.smart_burn import (  # noqa: E402
+    burn_subtitles_smart,
+    read_parameter_sets,
+)
+
+# 在字幕所在的GOP上画一个色块，模拟字幕滤镜
+BOX_FILTER = "drawbox=x=0:y=0:w=120:h=40:color=red:t=fill"
+FPS = 25
+
+
+def _has_libx264() -> bool:
+    if not (shutil.which("ffmpeg") and shutil.which("ffprobe")):
+        return False
+    result = subprocess.run(
+        ["ffmpeg", "-hide_banner", "-encoders"], capture_output=True, text=True
+    )
+    return "libx264" in result.stdout
+
+
+pytestmark = pytest.mark.skipif(
+    not _has_libx264(), reason="需要 ffmpeg、ffprobe 和 libx264"
+)
+
+
+def _can_read_mpegts(tmp_path) -> bool:
+    """局部重编码以 MPEG-TS 分段拼接，部分 ffmpeg 构建读取 MPEG-TS 时会崩溃"""
+    clip = tmp_path / "probe.ts"
+    make_clip(clip)
+    result = subprocess.run(
+        ["ffmpeg", "-v", "error", "-i", str(clip), "-f", "null", "-"],
+        capture_output=True,
+    )
+    clip.unlink()
+    return result.returncode == 0
+
+
+def make_clip(path, *encoder_args: str):
+    """生成 4 秒测试视频，每秒一个 IDR 关键帧"""
+    subprocess.run(
+        [
+            "ffmpeg",
+            "-v",
+            "error",
+            "-f",
+            "lavfi",
+            "-i",
+            f"testsrc=size=320x240:rate={FPS}",
+            "-t",
+            "4",
+            "-c:v",
+            "libx264",
+            "-preset",
+            "veryfast",
+            "-pix_fmt",
+            "yuv420p",
+            "-g",
+            str(FPS),
+            "-sc_threshold",
+            "0",
+            *encoder_args,
+            "-y",
+            str(path),
+        ],
+        check=True,
+    )
+
+
+def framemd5(path) -> list:
+    """逐帧解码后的画面哈希"""
+    result = subprocess.run(
+        [
+            "ffmpeg",
+            "-v",
+            "error",
+            "-i",
+            str(path),
+            "-map",
+            "0:v:0",
+            "-f",
+            "framemd5",
+            "-",
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return [
+        line.rsplit(",", 1)[1].strip()
+        for line in result.stdout.splitlines()
+        if line and not line.startswith("#")
+    ]
+
+
+@pytest.fixture
+def subtitle(tmp_path):
+    path = tmp_path / "sub.srt"
+    path.write_text("1\n00:00:01,200 --> 00:00:01,600\n字幕\n", encoding="utf-8")
+    return str(path)
+
+
+def test_only_subtitled_gop_changes(tmp_path, subtitle):
+    if not _can_read_mpegts(tmp_path):
+        pytest.skip("当前 ffmpeg 无法读取 MPEG-TS")
+    source = tmp_path / "source.mp4"
+    output = tmp_path / "output.mp4"
+    make_clip(source)
+
+    assert burn_subtitles_smart(
+        str(source),
+        subtitle,
+        BOX_FILTER,
+        str(output),
+        "libx264",
+        "veryfast",
+        work_dir=str(tmp_path),
+    )
+
+    source_frames, output_frames = framemd5(source), framemd5(output)
+    assert len(output_frames) == len(source_frames) == 4 * FPS
+    for index, (src, out) in enumerate(zip(source_frames, output_frames)):
+        if FPS <= index < 2 * FPS:
+            assert src != out, f"第 {index} 帧应带有字幕"
+        else:
+            assert src == out, f"第 {index} 帧应原样复制"
+
+
+def test_parameter_sets_follow_encoder_settings(tmp_path):
+    clip = tmp_path / "cavlc.mp4"
+    make_clip(clip, "-coder", "cavlc", "-bf", "0", "-refs", "2")
+    sps, pps = read_parameter_sets(str(clip))
+    assert pps["num_ref_idx_l0_default_active"] == 2
+    assert sps["pic_order_cnt_type"] == 2
+    assert (sps["pic_width_in_mbs"], sps["pic_height_in_map_units"]) == (20, 15)
+    assert pps["entropy_coding_mode"] == 0
+
+
+def test_mismatched_parameter_sets_fall_back(tmp_path, subtitle):
+    # 源视频关闭加权预测，编码器预设开启，PPS 不一致
+    source = tmp_path / "source.mp4"
+    output = tmp_path / "output.mp4"
+    make_clip(source, "-x264-params", "weightp=0")
+
+    assert not burn_subtitles_smart(
+        str(source),
+        subtitle,
+        BOX_FILTER,
+        str(output),
+        "libx264",
+        "veryfast",
+        work_dir=str(tmp_path),
+    )
+    assert not output.exists()
@@ -0,0 +1,47 @@
+from pathlib import Path
+
+from app.core.bk_asr.asr_data import ASRData, ASRDataSeg
+from app.core.bk_asr.subtitle_export import DEFAULT_ASS_STYLE
+from app.core.utils.styled_soft_subtitle import write_styled_ass
+
+
+def dialogues(ass_file: str):
+    """[(样式, 文本)]"""
+    rows = []
+    for line in Path(ass_file).read_text(encoding="utf-8").splitlines():
+        if line.startswith("Dialogue:"):
+            fields = line.split(",", 9)
+            rows.append((fields[3], fields[9]))
+    return rows
+
+
+def bilingual() -> ASRData:
+    return ASRData([ASRDataSeg("hello", 0, 1000, "你好")])
+
+
+def test_laid_out_srt_keeps_its_order(tmp_path):
+    srt = tmp_path / "in.srt"
+    bilingual().to_srt(layout="译文在上", save_path=str(srt))
+    ass = write_styled_ass(str(srt), str(tmp_path / "out.ass"), layout="译文在上")
+    # 译文仍在上方（Default 样式），不会被再次颠倒
+    assert dialogues(ass) == [("Secondary", "hello"), ("Default", "你好")]
+
+
+def test_binary_subtitle_is_laid_out(tmp_path):
+    vcsub = tmp_path / "in.vcsub"
+    bilingual().to_binary(str(vcsub))
+    ass = write_styled_ass(str(vcsub), str(tmp_path / "out.ass"), layout="译文在上")
+    assert dialogues(ass) == [("Secondary", "hello"), ("Default", "你好")]
+    ass = write_styled_ass(str(vcsub), str(tmp_path / "out.ass"), layout="原文在上")
+    assert dialogues(ass) == [("Secondary", "你好"), ("Default", "hello")]
+
+
+def test_laid_out_ass_only_changes_styles(tmp_path):
+    source = tmp_path / "in.ass"
+    bilingual().to_ass(layout="译文在上", save_path=str(source))
+    style = DEFAULT_ASS_STYLE.replace("MicrosoftYaHei-Bold", "Custom Font")
+    ass = write_styled_ass(
+        str(source), str(tmp_path / "out.ass"), style_str=style, layout="原文在上"
+    )
+    assert dialogues(ass) == dialogues(str(source))
+    assert "Custom Font" in Path(ass).read_text(encoding="utf-8")
@@ -0,0 +1,80 @@
+import contextvars
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from app.core.bk_asr import timing
+
+
+def _read_backends(path):
+    if not path.exists():
+        return []
+    lines = path.read_text(encoding="utf-8").splitlines()
+    return [json.loads(line)["backend"] for line in lines]
+
+
+def test_log_scoped_to_enabled_run(tmp_path):
+    log_path = tmp_path / "timing.jsonl"
+    inside = threading.Event()
+    done = threading.Event()
+
+    def enabled_run():
+        with timing.jsonl_log(str(log_path), True):
+            inside.set()
+            with timing.track("enabled", "total"):
+                pass
+            done.wait(5)
+
+    def disabled_run():
+        inside.wait(5)
+        # 另一个任务正在记录时，未启用的任务不会写入
+        with timing.jsonl_log(str(log_path), False):
+            with timing.track("disabled", "total"):
+                pass
+        with timing.track("untracked", "total"):
+            pass
+        done.set()
+
+    threads = [
+        threading.Thread(target=enabled_run),
+        threading.Thread(target=disabled_run),
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert _read_backends(log_path) == ["enabled"]
+
+
+def test_nested_disabled_run_not_logged(tmp_path):
+    log_path = tmp_path / "timing.jsonl"
+    with timing.jsonl_log(str(log_path), True):
+        with timing.jsonl_log(str(log_path), False):
+            with timing.track("inner", "total"):
+                pass
+        with timing.track("outer", "total"):
+            pass
+    with timing.track("after", "total"):
+        pass
+
+    assert _read_backends(log_path) == ["outer"]
+
+
+def test_log_follows_copied_context_into_workers(tmp_path):
+    log_path = tmp_path / "timing.jsonl"
+
+    def work(i):
+        with timing.track(f"chunk{i}", "request"):
+            pass
+
+    with timing.jsonl_log(str(log_path), True):
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            futures = [
+                executor.submit(contextvars.copy_context().run, work, i)
+                for i in range(4)
+            ]
+            for future in futures:
+                future.result()
+
+    assert sorted(_read_backends(log_path)) == [f"chunk{i}" for i in range(4)]
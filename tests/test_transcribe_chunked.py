@@ -0,0 +1,101 @@
+import importlib
+import math
+import struct
+import wave
+
+import pytest
+
+pytest.importorskip("httpx")
+pytest.importorskip("openai")
+
+from app.core.bk_asr.asr_data import ASRData, ASRDataSeg  # noqa: E402
+from app.core.entities import TranscribeConfig  # noqa: E402
+
+# app.core.bk_asr 导出了同名函数 transcribe，按模块路径导入
+transcribe = importlib.import_module("app.core.bk_asr.transcribe")
+
+SAMPLE_RATE = 16000
+
+
+def write_wav(path, seconds: int, gap_every: int):
+    """生成单声道 16 位 WAV：每秒频率不同的正弦音，每隔 gap_every 秒插入 1 秒静音
+
+    各分块内容互不相同，分块缓存不会在分块之间命中。
+    """
+    silence = b"\x00\x00" * SAMPLE_RATE
+    with wave.open(str(path), "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(SAMPLE_RATE)
+        for second in range(seconds):
+            if second % gap_every == gap_every - 1:
+                f.writeframes(silence)
+                continue
+            freq = 200 + 10 * second
+            f.writeframes(
+                b"".join(
+                    struct.pack(
+                        "<h", int(8000 * math.sin(2 * math.pi * freq * i / SAMPLE_RATE))
+                    )
+                    for i in range(SAMPLE_RATE)
+                )
+            )
+
+
+class FakeASR:
+    """记录调用次数的后端，每个分块返回一个分段"""
+
+    calls = 0
+
+    def __init__(self, audio_path, **kwargs):
+        self.audio_path = audio_path
+
+    def run(self, callback=None):
+        FakeASR.calls += 1
+        with wave.open(self.audio_path) as f:
+            duration_ms = f.getnframes() * 1000 // f.getframerate()
+        return ASRData([ASRDataSeg("chunk", 0, duration_ms)])
+
+
+@pytest.fixture
+def long_wav(tmp_path, monkeypatch):
+    monkeypatch.setattr(transcribe, "CACHE_PATH", tmp_path / "cache")
+    FakeASR.calls = 0
+    path = tmp_path / "audio.wav"
+    write_wav(path, 90, gap_every=5)
+    return str(path)
+
+
+def _run(wav_path: str, use_asr_cache: bool, api_key: str) -> ASRData:
+    config = TranscribeConfig(
+        use_asr_cache=use_asr_cache,
+        need_chunked_transcribe=True,
+        chunk_length_seconds=10,
+        chunk_workers=2,
+    )
+    asr_args = {"use_cache": use_asr_cache, "language": "en", "api_key": api_key}
+    return transcribe._transcribe_chunked(
+        wav_path, FakeASR, asr_args, config, lambda *args: None
+    )
+
+
+def test_no_fingerprint_without_cache(long_wav, monkeypatch):
+    def fail_fingerprint(*args, **kwargs):
+        raise AssertionError("未启用缓存时不应计算分块指纹")
+
+    monkeypatch.setattr(transcribe, "pcm_fingerprint", fail_fingerprint)
+    asr_data = _run(long_wav, use_asr_cache=False, api_key="key-1")
+    assert FakeASR.calls > 1
+    assert asr_data.segments
+
+
+def test_chunk_cache_ignores_api_key(long_wav):
+    first = _run(long_wav, use_asr_cache=True, api_key="key-1")
+    calls = FakeASR.calls
+    assert calls > 1
+
+    second = _run(long_wav, use_asr_cache=True, api_key="key-2")
+    assert FakeASR.calls == calls
+    assert [(seg.start_time, seg.end_time) for seg in second.segments] == [
+        (seg.start_time, seg.end_time) for seg in first.segments
+    ]
@@ -0,0 +1,170 @@
+import json
+import zlib
+
+import pytest
+
+pytest.importorskip("httpx")
+
+from app.core.bk_asr import jianying  # noqa: E402
+from app.core.bk_asr.bcut import BcutASR  # noqa: E402
+from app.core.utils.async_http import close_thread_loop, run_sync  # noqa: E402
+
+AUDIO = bytes(range(256)) * 1000
+
+
+@pytest.fixture
+def audio_file(tmp_path):
+    path = tmp_path / "audio.mp3"
+    path.write_bytes(AUDIO)
+    yield str(path)
+    close_thread_loop()
+
+
+def test_bcut_uploads_parts_and_transcribes(http_stub, audio_file):
+    per_size = 100_000
+    clips = -(-len(AUDIO) // per_size)
+    prefix = "/x/bcut/rubick-interface"
+    parts = {}
+
+    @http_stub.route("POST", prefix + "/resource/create")
+    def create(request):
+        assert json.loads(request.body)["size"] == len(AUDIO)
+        return {
+            "data": {
+                "in_boss_key": "key",
+                "resource_id": "rid",
+                "upload_id": "uid",
+                "upload_urls": [f"{http_stub.url}/part/{i}" for i in range(clips)],
+                "per_size": per_size,
+                "size": len(AUDIO),
+            }
+        }
+
+    for clip in range(clips):
+
+        @http_stub.route("PUT", f"/part/{clip}")
+        def upload_part(request, clip=clip):
+            assert int(request.headers["Content-Length"]) == len(request.body)
+            parts[clip] = request.body
+            return 200, {"Etag": f"etag{clip}"}, b""
+
+    @http_stub.route("POST", prefix + "/resource/create/complete")
+    def complete(request):
+        etags = json.loads(request.body)["Etags"]
+        assert etags == ",".join(f"etag{i}" for i in range(clips))
+        return {"data": {"download_url": "download"}}
+
+    @http_stub.route("POST", prefix + "/task")
+    def task(request):
+        assert json.loads(request.body)["resource"] == "download"
+        return {"data": {"task_id": "tid"}}
+
+    @http_stub.route("GET", prefix + "/task/result")
+    def result(request):
+        assert request.query["task_id"] == "tid"
+        utterances = [{"transcript": "你好", "start_time": 0, "end_time": 1000}]
+        return {"data": {"state": 4, "result": json.dumps({"utterances": utterances})}}
+
+    asr = BcutASR(audio_file, use_cache=False, api_base_url=http_stub.url + prefix)
+    asr_data = asr.run()
+
+    assert b"".join(parts[i] for i in range(clips)) == AUDIO
+    assert [seg.text for seg in asr_data.segments] == ["你好"]
+
+
+@pytest.fixture
+def jianying_stub(http_stub, monkeypatch):
+    """模拟剪映签名、上传凭证、VOD 申请上传及分片上传接口"""
+    monkeypatch.setattr(jianying, "API_BASE_URL", http_stub.url)
+    monkeypatch.setattr(jianying, "SIGN_URL", http_stub.url + "/sign")
+    monkeypatch.setattr(jianying, "VOD_API_URL", http_stub.url + "/")
+    monkeypatch.setattr(jianying, "UPLOAD_URL_SCHEME", "http")
+    monkeypatch.setattr(jianying, "UPLOAD_PART_SIZE", 100_000)
+    monkeypatch.setattr(jianying, "credential_cache", jianying.CredentialCache())
+    http_stub.store_uri = "store/audio"
+    http_stub.parts = {}
+    http_stub.check_payload = []
+    # 依次返回的 VOD 错误，为空时正常返回上传地址
+    http_stub.vod_errors = []
+
+    http_stub.route("POST", "/sign")(lambda request: {"sign": "ABC"})
+    http_stub.route("POST", "/lv/v1/upload_sign")(
+        lambda request: {
+            "data": {
+                "access_key_id": "ak",
+                "secret_access_key": "sk",
+                "session_token": "st",
+            }
+        }
+    )
+
+    @http_stub.route("GET", "/")
+    def apply_upload(request):
+        assert request.query["FileSize"] == str(len(AUDIO))
+        assert request.headers["x-amz-security-token"] == "st"
+        if http_stub.vod_errors:
+            code = http_stub.vod_errors.pop(0)
+            return {"ResponseMetadata": {"Error": {"Code": code, "Message": code}}}
+        store_info = {
+            "StoreUri": http_stub.store_uri,
+            "Auth": "auth",
+            "UploadID": "uid",
+        }
+        return {
+            "Result": {
+                "UploadAddress": {
+                    "StoreInfos": [store_info],
+                    "SessionKey": "session",
+                    "UploadHosts": [http_stub.url.split("://")[1]],
+                }
+            }
+        }
+
+    @http_stub.route("PUT", "/" + http_stub.store_uri)
+    def upload_part(request):
+        crc32_hex = format(zlib.crc32(request.body) & 0xFFFFFFFF, "08x")
+        assert request.headers["Content-CRC32"] == crc32_hex
+        assert request.headers["Authorization"] == "auth"
+        http_stub.parts[int(request.query["partNumber"])] = (request.body, crc32_hex)
+        return {"success": 0}
+
+    @http_stub.route("POST", "/" + http_stub.store_uri)
+    def check(request):
+        http_stub.check_payload.append(request.body.decode())
+        return {"success": 0}
+
+    return http_stub
+
+
+def _sign_requests(stub):
+    return [r for r in stub.requests if r.path == "/lv/v1/upload_sign"]
+
+
+def test_jianying_uploads_parts_with_crc(jianying_stub, audio_file):
+    asr = jianying.JianYingASR(audio_file)
+    assert run_sync(asr.upload()) == jianying_stub.store_uri
+
+    parts = jianying_stub.parts
+    numbers = sorted(parts)
+    assert numbers == list(range(1, len(parts) + 1))
+    assert len(parts) == -(-len(AUDIO) // 100_000)
+    assert b"".join(parts[i][0] for i in numbers) == AUDIO
+    assert jianying_stub.check_payload == [
+        ",".join(f"{i}:{parts[i][1]}" for i in numbers)
+    ]
+
+
+def test_jianying_refreshes_upload_token_on_credential_error(jianying_stub, audio_file):
+    jianying_stub.vod_errors = ["InvalidSecurityToken"]
+    asr = jianying.JianYingASR(audio_file)
+    assert run_sync(asr.upload()) == jianying_stub.store_uri
+    assert len(_sign_requests(jianying_stub)) == 2
+
+
+def test_jianying_other_upload_errors_not_retried(jianying_stub, audio_file):
+    jianying_stub.vod_errors = ["InternalError"]
+    asr = jianying.JianYingASR(audio_file)
+    with pytest.raises(RuntimeError, match="InternalError"):
+        run_sync(asr.upload())
+    assert len(_sign_requests(jianying_stub)) == 1
+    assert not jianying_stub.parts
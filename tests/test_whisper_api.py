@@ -0,0 +1,119 @@
+import email
+import io
+import math
+import struct
+import wave
+from email import policy
+
+import pytest
+
+pytest.importorskip("httpx")
+pytest.importorskip("openai")
+
+from app.core.bk_asr import whisper_api  # noqa: E402
+from app.core.bk_asr.whisper_api import WhisperAPI  # noqa: E402
+from app.core.utils.async_http import close_thread_loop  # noqa: E402
+
+SAMPLE_RATE = 16000
+
+
+def write_wav(path, seconds: int, gap_every: int = 0):
+    """生成单声道 16 位 WAV：正弦音，每隔 gap_every 秒插入 1 秒静音"""
+    frames = bytearray()
+    for second in range(seconds):
+        silent = gap_every and second % gap_every == gap_every - 1
+        for i in range(SAMPLE_RATE):
+            value = (
+                0
+                if silent
+                else int(8000 * math.sin(2 * math.pi * 440 * i / SAMPLE_RATE))
+            )
+            frames += struct.pack("<h", value)
+    with wave.open(str(path), "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(SAMPLE_RATE)
+        f.writeframes(bytes(frames))
+
+
+def uploaded_file(request):
+    """解析 multipart 请求体，返回 (文件名, 文件内容)"""
+    message = email.message_from_bytes(
+        b"Content-Type: "
+        + request.headers["Content-Type"].encode()
+        + b"\r\n\r\n"
+        + request.body,
+        policy=policy.HTTP,
+    )
+    for part in message.iter_parts():
+        if part.get_param("name", header="content-disposition") == "file":
+            return part.get_filename(), part.get_payload(decode=True)
+    raise AssertionError("no file part")
+
+
+@pytest.fixture
+def transcription_stub(http_stub):
+    """模拟转录接口：每段返回一个覆盖整段音频的分段，文本为该段时长(ms)"""
+
+    @http_stub.route("POST", "/v1/audio/transcriptions")
+    def transcribe(request):
+        file_name, data = uploaded_file(request)
+        with wave.open(io.BytesIO(data)) as f:
+            duration_ms = f.getnframes() * 1000 // f.getframerate()
+        seconds = duration_ms / 1000
+        return {
+            "text": str(duration_ms),
+            "language": "english",
+            "duration": seconds,
+            "segments": [
+                {"id": 0, "start": 0.0, "end": seconds, "text": str(duration_ms)}
+            ],
+        }
+
+    yield http_stub
+    close_thread_loop()
+
+
+def make_asr(wav_path, stub, max_upload_mb: int):
+    return WhisperAPI(
+        str(wav_path),
+        whisper_model="whisper-1",
+        language="en",
+        base_url=stub.url + "/v1",
+        api_key="sk-test",
+        max_upload_mb=max_upload_mb,
+    )
+
+
+def test_small_wav_uploaded_without_encoding(transcription_stub, tmp_path, monkeypatch):
+    def fail_encode(*args, **kwargs):
+        raise AssertionError("不应编码")
+
+    monkeypatch.setattr(whisper_api, "encode_audio", fail_encode)
+    wav_path = tmp_path / "audio.wav"
+    write_wav(wav_path, 3)
+
+    asr_data = make_asr(wav_path, transcription_stub, 1).run()
+
+    assert len(transcription_stub.requests) == 1
+    assert uploaded_file(transcription_stub.requests[0])[0] == "audio.wav"
+    assert [(seg.start_time, seg.end_time) for seg in asr_data.segments] == [(0, 3000)]
+
+
+def test_split_pieces_merged_with_offsets(transcription_stub, tmp_path, monkeypatch):
+    # 不编码 MP3，按 WAV 码率切分：1MB 上限约 29 秒一段
+    monkeypatch.setattr(whisper_api, "get_capabilities", lambda: None)
+    wav_path = tmp_path / "audio.wav"
+    write_wav(wav_path, 80, gap_every=10)
+
+    asr_data = make_asr(wav_path, transcription_stub, 1).run()
+
+    segments = asr_data.segments
+    assert len(transcription_stub.requests) == len(segments) > 1
+    offset = 0
+    for seg in segments:
+        duration_ms = int(seg.text)
+        assert seg.start_time == offset
+        assert seg.end_time == offset + duration_ms
+        offset += duration_ms
+    assert offset == 80_000
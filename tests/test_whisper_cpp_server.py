@@ -0,0 +1,98 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from app.core.bk_asr import whisper_cpp
+from app.core.bk_asr.whisper_cpp import WhisperCppASR
+from app.core.bk_asr.whisper_cpp_server import MultipartFileBody, WhisperCppServer
+
+SRT = "1\n00:00:00,000 --> 00:00:01,000\nhello world\n"
+
+
+class FakeWhisperServer(BaseHTTPRequestHandler):
+    """模拟 whisper-server 的 /inference 接口，记录收到的请求"""
+
+    requests = []
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        self.requests.append((self.path, dict(self.headers), body))
+        payload = SRT.encode()
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def fake_server():
+    FakeWhisperServer.requests = []
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), FakeWhisperServer)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}", FakeWhisperServer.requests
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def _parse_multipart(headers, body):
+    boundary = headers["Content-Type"].split("boundary=")[1].encode()
+    parts = {}
+    for part in body.split(b"--" + boundary)[1:-1]:
+        head, _, content = part.partition(b"\r\n\r\n")
+        name = head.split(b'name="')[1].split(b'"')[0].decode()
+        parts[name] = content[: -len(b"\r\n")]
+    return parts
+
+
+def test_multipart_body_reads_in_blocks(tmp_path):
+    audio = tmp_path / "audio.wav"
+    audio.write_bytes(bytes(range(256)) * 100)
+    with MultipartFileBody({"a": "1"}, "file", "audio.wav", str(audio)) as body:
+        chunks = []
+        while chunk := body.read(1000):
+            assert len(chunk) <= 1000
+            chunks.append(chunk)
+        data = b"".join(chunks)
+    assert len(data) == len(body)
+    assert audio.read_bytes() in data
+
+
+def test_inference_uploads_file(fake_server, tmp_path):
+    url, requests = fake_server
+    audio = tmp_path / "audio.wav"
+    audio.write_bytes(b"RIFF" + b"\x01\x02" * 50000)
+
+    server = WhisperCppServer(server_url=url)
+    assert server.inference(str(audio), "zh", "提示") == SRT
+
+    path, headers, body = requests[0]
+    assert path == "/inference"
+    assert "chunked" not in headers.get("Transfer-Encoding", "")
+    parts = _parse_multipart(headers, body)
+    assert parts["file"] == audio.read_bytes()
+    assert parts["language"] == b"zh"
+    assert parts["response_format"] == b"srt"
+
+
+def test_asr_server_mode_does_not_load_audio(fake_server, tmp_path, monkeypatch):
+    url, requests = fake_server
+    models = tmp_path / "models"
+    models.mkdir()
+    (models / "ggml-tiny.bin").write_bytes(b"")
+    monkeypatch.setattr(whisper_cpp, "MODEL_PATH", str(models))
+    audio = tmp_path / "audio.wav"
+    audio.write_bytes(b"RIFF" + b"\x00" * 4096)
+
+    asr = WhisperCppASR(str(audio), whisper_model="tiny", server_url=url)
+    result = asr.run()
+
+    assert [seg.text for seg in result.segments] == ["hello world"]
+    assert asr._file_binary is None
+    assert _parse_multipart(requests[0][1], requests[0][2])["file"] == (
+        audio.read_bytes()
+    )